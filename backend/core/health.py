@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.utils import timezone
+import psutil
+from .metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CPU_PERCENT = registry.gauge("system_cpu_percent", "Host CPU utilisation in percent.")
+MEMORY_PERCENT = registry.gauge("system_memory_percent", "Host memory in use in percent.")
+DISK_PERCENT = registry.gauge("system_disk_percent", "Root filesystem in use in percent.")
+
+
+class SystemSampler:
+    """
+    Samples host resources on a background thread every ``SYSTEM_SAMPLE_INTERVAL`` seconds.
+
+    CPU utilisation is measured between two samples, so reading the latest
+    snapshot never blocks a request. The thread also publishes this
+    process's metrics, so idle web workers stay visible to scrapes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._thread = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def _ensure_sampler(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="system-sampler", daemon=True
+                )
+                self._thread.start()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take a sample without waiting; CPU usage is relative to the previous one."""
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage("/")
+        snapshot = {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": memory.percent,
+            "memory_available_gb": round(memory.available / (1024**3), 2),
+            "disk_percent": disk.percent,
+            "disk_free_gb": round(disk.free / (1024**3), 2),
+            "sampled_at": timezone.now(),
+        }
+        CPU_PERCENT.set(snapshot["cpu_percent"])
+        MEMORY_PERCENT.set(snapshot["memory_percent"])
+        DISK_PERCENT.set(snapshot["disk_percent"])
+        self._snapshot = snapshot
+        return snapshot
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Could not sample system resources: {e}")
+            registry.publish()
+            time.sleep(settings.SYSTEM_SAMPLE_INTERVAL)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the latest sample, starting the sampler on first use.
+
+        Until the sampler has run, a sample is taken in the calling thread so
+        there is always something to report; psutil reports 0.0 CPU for the
+        very first measurement of a process.
+        """
+        self._ensure_sampler()
+        if self._snapshot is None:
+            try:
+                return self.sample()
+            except Exception as e:
+                logger.warning(f"Could not sample system resources: {e}")
+        return self._snapshot
+
+
+system_sampler = SystemSampler()
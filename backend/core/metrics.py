@@ -0,0 +1,323 @@
+import bisect
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Sequence
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Published snapshots of idle processes expire after this many seconds
+PROCESS_SNAPSHOT_TTL = 60 * 60
+PROCESS_INDEX_KEY = "metrics:processes"
+PROCESS_KEY_PREFIX = "metrics:process:"
+# Label that tells the series of counters and histograms of each process apart
+PROCESS_LABEL = "process"
+
+
+class Metric:
+    """A named metric with a fixed set of labels, safe to update from any thread."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> tuple:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _sample(self, value):
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [[list(key), self._sample(value)] for key, value in self._values.items()]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labels": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into upper-bound buckets, with their sum and count."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block, also when it raises."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def _sample(self, value):
+        return {"counts": list(value[0]), "sum": value[1]}
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """
+    The metrics of this process, rendered in the Prometheus text format.
+
+    Every process (web workers and Celery workers) keeps its own values and
+    publishes them to the cache at most every ``METRICS_PUBLISH_INTERVAL``
+    seconds, so a scrape of any web process reports all of them. Counters
+    and histograms carry a ``process`` label (``<host>:<pid>``) so each
+    process's series only ever grows; aggregate with e.g.
+    ``sum without (process) (rate(...))``. Gauges describe the process that
+    serves the scrape.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._published_at = 0.0
+        if hasattr(os, "register_at_fork"):
+            # A forked worker starts counting from zero under its own pid
+            os.register_at_fork(after_in_child=self.clear)
+
+    def _register(self, cls, name: str, documentation: str, labelnames, **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered differently")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def clear(self) -> None:
+        """Reset every value, keeping the registered metrics."""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+        self._published_at = 0.0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {name: metric.snapshot() for name, metric in list(self._metrics.items())}
+
+    @staticmethod
+    def _process_key() -> str:
+        return f"{PROCESS_KEY_PREFIX}{socket.gethostname()}:{os.getpid()}"
+
+    def publish(self, force: bool = False) -> None:
+        """Share this process's values through the cache, at most once per interval."""
+        now = time.monotonic()
+        if not force and now - self._published_at < settings.METRICS_PUBLISH_INTERVAL:
+            return
+        self._published_at = now
+
+        key = self._process_key()
+        try:
+            cache.set(key, self.snapshot(), PROCESS_SNAPSHOT_TTL)
+            # Racing processes may drop each other here; the next publish re-adds them
+            index = cache.get(PROCESS_INDEX_KEY) or []
+            if key not in index:
+                cache.set(PROCESS_INDEX_KEY, index + [key], None)
+        except Exception as e:
+            logger.warning(f"Could not publish metrics: {e}")
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Merge this process's values with those published by other processes."""
+        own_key = self._process_key()
+        snapshots = {own_key[len(PROCESS_KEY_PREFIX):]: self.snapshot()}
+        try:
+            index = cache.get(PROCESS_INDEX_KEY) or []
+            published = cache.get_many([key for key in index if key != own_key])
+            expired = [key for key in index if key != own_key and key not in published]
+            if expired:
+                cache.set(PROCESS_INDEX_KEY, [key for key in index if key not in expired], None)
+            for key in index:
+                if key in published:
+                    snapshots[key[len(PROCESS_KEY_PREFIX):]] = published[key]
+        except Exception as e:
+            logger.warning(f"Could not read published metrics: {e}")
+        return merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        return render_snapshot(self.collect())
+
+
+def merge_snapshots(snapshots: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Combine the snapshots of several processes, keyed by process name.
+
+    Counters and histograms keep one series per process under the
+    ``process`` label instead of being added up: a sum drops whenever a
+    worker is recycled or its snapshot expires, which Prometheus reads as a
+    counter reset. Series of processes that are gone simply go stale. For
+    gauges, the first process's value wins.
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for process, snapshot in snapshots.items():
+        for name, metric in snapshot.items():
+            per_process = metric["type"] in ("counter", "histogram")
+            labels = list(metric["labels"]) + ([PROCESS_LABEL] if per_process else [])
+            target = merged.setdefault(name, {**metric, "labels": labels, "samples": {}})
+            if (
+                metric["type"] != target["type"]
+                or labels != target["labels"]
+                or metric.get("buckets") != target.get("buckets")
+            ):
+                continue
+            samples = target["samples"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels) + ((process,) if per_process else ())
+                samples.setdefault(key, value)
+
+    for metric in merged.values():
+        metric["samples"] = [[list(key), value] for key, value in metric["samples"].items()]
+    return merged
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return repr(value)
+    return str(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def render_snapshot(snapshot: Dict[str, Dict[str, Any]]) -> str:
+    """Render metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for name in sorted(snapshot):
+        metric = snapshot[name]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in sorted(metric["samples"]):
+            if metric["type"] != "histogram":
+                lines.append(f"{name}{_format_labels(metric['labels'], labels)} {_format_value(value)}")
+                continue
+            cumulative = 0
+            bounds = list(metric["buckets"]) + [float("inf")]
+            for bound, count in zip(bounds, value["counts"]):
+                cumulative += count
+                le = _format_labels(metric["labels"], labels, le=_format_value(float(bound)))
+                lines.append(f"{name}_bucket{le} {cumulative}")
+            label_text = _format_labels(metric["labels"], labels)
+            lines.append(f"{name}_sum{label_text} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{label_text} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests.",
+    ["view", "method", "status"],
+)
+HTTP_REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "Database queries run per HTTP request.",
+    ["view", "method"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+HTTP_REQUEST_DB_SECONDS = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time spent in database queries per HTTP request.",
+    ["view", "method"],
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "llm_request_duration_seconds",
+    "Latency of provider API calls.",
+    ["provider", "model", "mode", "outcome"],
+)
+EXTRACTION_STAGE_SECONDS = registry.histogram(
+    "extraction_stage_duration_seconds",
+    "Time spent in the CPU and database stages of entity extraction.",
+    ["stage"],
+)
+CELERY_TASK_SECONDS = registry.histogram(
+    "celery_task_duration_seconds",
+    "Run time of Celery tasks.",
+    ["task", "state"],
+)
@@ -0,0 +1,53 @@
+import time
+from django.db import connection
+from .metrics import (
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_QUERIES,
+    HTTP_REQUEST_SECONDS,
+    registry,
+)
+
+
+class QueryTimer:
+    """Database execute wrapper that counts queries and adds up their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.monotonic() - start
+
+
+class MetricsMiddleware:
+    """
+    Record the duration and database queries of every request per view.
+
+    Views are labelled by their URL name rather than the path, so the
+    number of series stays bounded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        start = time.monotonic()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        duration = time.monotonic() - start
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(
+            duration, view=view, method=request.method, status=response.status_code
+        )
+        HTTP_REQUEST_QUERIES.observe(queries.count, view=view, method=request.method)
+        HTTP_REQUEST_DB_SECONDS.observe(queries.duration, view=view, method=request.method)
+        registry.publish()
+        return response
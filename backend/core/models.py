@@ -83,6 +83,33 @@ class SoftDeleteModel(models.Model):
         self.save(update_fields=['is_deleted', 'deleted_at', 'deleted_by'])
 
 
+class CounterFieldsModel(models.Model):
+    """
+    Abstract base model for denormalized counters maintained with deltas.
+
+    A full ``save()`` of an existing row leaves ``counter_fields`` alone, so
+    a stale instance cannot overwrite counts changed by concurrent updates.
+    Name the fields in ``update_fields`` to write them explicitly.
+    """
+    
+    counter_fields = ()
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        full_update = (
+            not self._state.adding and not args
+            and kwargs.get('update_fields') is None and not kwargs.get('force_insert')
+        )
+        if full_update:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class AuditLog(models.Model):
     """Audit trail for system activities."""
     
@@ -0,0 +1,155 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def _lookup(instance, path: str) -> Any:
+    """Follow a ``__``-separated field path on a model instance."""
+    for name in path.split("__"):
+        if instance is None:
+            return None
+        instance = getattr(instance, name)
+    return instance
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for cursor positions.
+
+    ``DjangoJSONEncoder`` cuts datetimes to milliseconds, which would skip
+    rows sharing the boundary row's millisecond, so datetimes are tagged and
+    kept to the microsecond.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return {"$dt": o.isoformat(timespec="microseconds")}
+        return super().default(o)
+
+
+def _decode_cursor_value(obj):
+    if set(obj) == {"$dt"}:
+        value = parse_datetime(obj["$dt"])
+        if value is None:
+            raise ValueError("Invalid datetime in cursor")
+        return value
+    return obj
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination.
+
+    Each page continues after the sort key of the previous page's last row,
+    so deep pages cost the same as the first one and no ``COUNT(*)`` is
+    run. Pages follow the given ordering, or else the queryset's own; the
+    primary key is appended as a tie-breaker when the ordering does not
+    end with it. Ordering fields may be model fields or annotations.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, ordering: Optional[Sequence[str]] = None, page_size: Optional[int] = None):
+        self.ordering = list(ordering) if ordering else None
+        self.page_size = page_size or settings.REST_FRAMEWORK.get("PAGE_SIZE") or 20
+        self.next_position = None
+        self.request = None
+
+    def get_ordering(self, queryset) -> List[str]:
+        ordering = list(self.ordering or queryset.query.order_by or queryset.model._meta.ordering)
+        if not all(isinstance(field, str) and field != "?" for field in ordering):
+            raise ValueError("Keyset pagination needs an ordering by field names")
+        if not ordering or ordering[-1].lstrip("-") not in ("pk", "id"):
+            descending = bool(ordering) and ordering[-1].startswith("-")
+            ordering.append("-pk" if descending else "pk")
+        return ordering
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def encode_cursor(self, position: List[Any]) -> str:
+        data = json.dumps(position, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request, ordering: List[str]) -> Optional[List[Any]]:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            position = json.loads(
+                base64.urlsafe_b64decode(padded.encode()), object_hook=_decode_cursor_value
+            )
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    @staticmethod
+    def _after(ordering: List[str], position: List[Any]) -> Q:
+        """Build the condition selecting rows that sort after ``position``."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        ordering = self.get_ordering(queryset)
+        position = self.decode_cursor(request, ordering)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self._after(ordering, position))
+
+        # One extra row tells whether there is a next page
+        rows = list(queryset[: page_size + 1])
+        page = rows[:page_size]
+        if len(rows) > page_size:
+            self.next_position = [_lookup(page[-1], field.lstrip("-")) for field in ordering]
+        else:
+            self.next_position = None
+        return page
+
+    def get_next_link(self) -> Optional[str]:
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
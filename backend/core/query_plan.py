@@ -0,0 +1,70 @@
+from typing import Dict, Optional, Sequence
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+class QueryPlan:
+    """
+    The related rows and annotations a serializer needs, fetched up front.
+
+    Views declare one plan per serializer instead of letting nested
+    serializers query once per row: ``select_related`` for to-one
+    relations, ``prefetch_related`` for to-many ones, and annotations for
+    counts that would otherwise be a ``COUNT(*)`` per object.
+    """
+
+    def __init__(
+        self,
+        select_related: Sequence[str] = (),
+        prefetch_related: Sequence = (),
+        annotations: Optional[Dict] = None,
+    ):
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        self.annotations = dict(annotations or {})
+
+    def apply(self, queryset):
+        """Apply the plan to a queryset."""
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        return queryset
+
+
+class QueryPlanMixin:
+    """Apply a generic view's ``query_plan`` to the queryset it serializes."""
+
+    query_plan: Optional[QueryPlan] = None
+
+    def get_query_plan(self) -> Optional[QueryPlan]:
+        return self.query_plan
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        plan = self.get_query_plan()
+        return plan.apply(queryset) if plan else queryset
+
+
+def count_subquery(queryset, field: str):
+    """
+    Count the rows of ``queryset`` pointing at the outer row through ``field``.
+
+    Unlike ``Count()`` over a join, the count stays correct when the outer
+    query has other joins or ``DISTINCT``, and needs no ``GROUP BY``.
+    """
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def annotated(instance, name: str):
+    """Get an annotation of a model instance, or None when it was not annotated."""
+    return instance.__dict__.get(name)
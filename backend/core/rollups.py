@@ -0,0 +1,26 @@
+from typing import Any, Dict
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def add_to_rollup(model, key: Dict[str, Any], **deltas) -> None:
+    """
+    Add ``deltas`` to the counters of the rollup row identified by ``key``.
+
+    The row is updated with F-expressions, so concurrent writers add up
+    instead of overwriting each other, and created on first use. ``key``
+    must match a unique constraint of ``model``.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**key).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**key).update(**updates)
@@ -0,0 +1,206 @@
+import logging
+import re
+import unicodedata
+from typing import List
+from django.db import connections
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+logger = logging.getLogger(__name__)
+
+# Harakat, Quranic marks, superscript alef, tatweel and zero-width/direction marks
+DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640\u200b-\u200f]")
+WHITESPACE = re.compile(r"\s+")
+WORD = re.compile(r"\w+")
+
+# Letter variants that Urdu text mixes freely, mapped to their Urdu forms
+CHARACTER_VARIANTS = str.maketrans(
+    {
+        # Alef
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ٲ": "ا",
+        "ٳ": "ا",
+        # Yeh
+        "ي": "ی",
+        "ى": "ی",
+        "ئ": "ی",
+        "ۍ": "ی",
+        "ێ": "ی",
+        "ۓ": "ے",
+        # Heh
+        "ه": "ہ",
+        "ۀ": "ہ",
+        "ۂ": "ہ",
+        "ة": "ہ",
+        # Kaf and waw
+        "ك": "ک",
+        "ڪ": "ک",
+        "ؤ": "و",
+        # Arabic-Indic and Extended Arabic-Indic digits
+        **{chr(0x0660 + i): str(i) for i in range(10)},
+        **{chr(0x06F0 + i): str(i) for i in range(10)},
+    }
+)
+
+
+def normalize_urdu(text: str) -> str:
+    """
+    Normalize Urdu text for searching.
+
+    Folds presentation forms (NFKC), maps alef/yeh/heh/kaf variants to one
+    form, strips diacritics and tatweel, case-folds Latin text and collapses
+    whitespace, so that spelling variants of a word match each other.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).translate(CHARACTER_VARIANTS)
+    text = DIACRITICS.sub("", text)
+    return WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def build_search_text(*parts: str) -> str:
+    """Build the normalized text stored in a model's ``search_text`` field."""
+    return normalize_urdu(" ".join(part for part in parts if part))
+
+
+def search_terms(query: str) -> List[str]:
+    """Split a search query into normalized terms."""
+    return WORD.findall(normalize_urdu(query))
+
+
+# SQLite FTS5 index, kept in sync with the model table by triggers
+
+def _fts_table(db_table: str) -> str:
+    return f"{db_table}_fts"
+
+
+def _fts_statements(db_table: str) -> List[str]:
+    fts = _fts_table(db_table)
+    delete_old = (
+        f"INSERT INTO {fts}({fts}, rowid, search_text) VALUES ('delete', old.id, old.search_text);"
+    )
+    insert_new = f"INSERT INTO {fts}(rowid, search_text) VALUES (new.id, new.search_text);"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"search_text, content='{db_table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {db_table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {db_table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF search_text ON {db_table} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def install_sqlite_fts(connection, db_table: str) -> bool:
+    """Create the FTS5 index and sync triggers for a table; False without FTS5."""
+    try:
+        with connection.cursor() as cursor:
+            for statement in _fts_statements(db_table):
+                cursor.execute(statement)
+    except Exception as e:
+        logger.warning(f"SQLite FTS5 index for {db_table} unavailable: {e}")
+        return False
+    return True
+
+
+def uninstall_sqlite_fts(connection, db_table: str) -> None:
+    fts = _fts_table(db_table)
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+# Tables whose FTS index and triggers are known to exist, per database
+_fts_ready = set()
+
+
+def _ensure_sqlite_fts(connection, db_table: str) -> bool:
+    """
+    Check that the FTS index of a table is in place, repairing it if needed.
+
+    Rebuilding a table (as SQLite migrations do) drops its triggers, so
+    they are recreated here rather than trusted to still exist.
+    """
+    key = (connection.alias, db_table)
+    if key in _fts_ready:
+        return True
+
+    fts = _fts_table(db_table)
+    expected = {fts, f"{fts}_ai", f"{fts}_ad", f"{fts}_au"}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)", sorted(expected)
+        )
+        found = {row[0] for row in cursor.fetchall()}
+    if found == expected:
+        _fts_ready.add(key)
+        return True
+    # Not memoized: the repair may be rolled back with the surrounding transaction
+    return install_sqlite_fts(connection, db_table)
+
+
+def postgres_search_index(model_name: str):
+    """Get the GIN index over a model's normalized search text (Postgres only)."""
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(
+        SearchVector("search_text", config="simple"), name=f"{model_name}_search_gin"
+    )
+
+
+def search(queryset, query: str):
+    """
+    Filter a queryset of a model with a ``search_text`` field by a query.
+
+    Every term of the normalized query must match (as a word prefix). The
+    results are annotated with ``search_rank`` (higher is more relevant)
+    and ordered by it. Uses a GIN-indexed full-text search on Postgres,
+    an FTS5 index on SQLite and plain substring matching elsewhere.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    connection = connections[queryset.db]
+    db_table = queryset.model._meta.db_table
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        tsquery = " & ".join(f"'{term}':*" for term in terms)
+        search_query = SearchQuery(tsquery, config="simple", search_type="raw")
+        queryset = queryset.annotate(
+            search_vector=SearchVector("search_text", config="simple")
+        ).filter(search_vector=search_query)
+        # ts_rank is a float4; as float8 the value in a pagination cursor
+        # compares equal to the row again
+        queryset = queryset.annotate(
+            search_rank=Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        )
+    elif connection.vendor == "sqlite" and _ensure_sqlite_fts(connection, db_table):
+        fts = _fts_table(db_table)
+        match = " ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        queryset = queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+        ).annotate(
+            search_rank=RawSQL(
+                f"SELECT -bm25({fts}) FROM {fts} "
+                f"WHERE {fts} MATCH %s AND {fts}.rowid = {db_table}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= Q(search_text__contains=term)
+        queryset = queryset.filter(condition).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+    return queryset.order_by("-search_rank", "-pk")
@@ -66,26 +66,20 @@ class AuditLogStatsSerializer(serializers.Serializer):
     """Audit log statistics serializer."""
 
     total_logs = serializers.IntegerField()
-    action_breakdown = serializers.DictField()
-    resource_type_breakdown = serializers.DictField()
-    user_breakdown = serializers.DictField()
-    recent_activity = serializers.ListField()
-    activity_trend = serializers.ListField()
+    action_distribution = serializers.ListField()
+    resource_type_distribution = serializers.ListField()
+    user_activity = serializers.ListField()
+    recent_activity = serializers.IntegerField()
+    top_ip_addresses = serializers.ListField()
 
 
 class SystemHealthSerializer(serializers.Serializer):
     """System health serializer."""
 
-    database_status = serializers.CharField()
-    redis_status = serializers.CharField()
-    celery_status = serializers.CharField()
-    storage_status = serializers.CharField()
-    memory_usage = serializers.DictField()
-    disk_usage = serializers.DictField()
-    active_users = serializers.IntegerField()
-    active_jobs = serializers.IntegerField()
-    uptime = serializers.CharField()
-    last_backup = serializers.DateTimeField(required=False)
+    timestamp = serializers.DateTimeField()
+    status = serializers.DictField()
+    system_resources = serializers.DictField(allow_null=True)
+    django_settings = serializers.DictField()
 
 
 class ExportRequestSerializer(serializers.Serializer):
@@ -0,0 +1,22 @@
+import time
+from celery.signals import task_postrun, task_prerun
+from .metrics import CELERY_TASK_SECONDS, registry
+
+# Start times of the tasks running in this worker, by task id
+_task_starts = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, **kwargs):
+    _task_starts[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    start = _task_starts.pop(task_id, None)
+    if start is None or task is None:
+        return
+    CELERY_TASK_SECONDS.observe(
+        time.monotonic() - start, task=task.name, state=state or "UNKNOWN"
+    )
+    registry.publish()
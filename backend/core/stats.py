@@ -0,0 +1,214 @@
+import logging
+import time
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+StatsProvider = Callable[..., Dict[str, Any]]
+
+
+def stats_provider(scope: str):
+    """
+    Mark a function as a dashboard stats provider.
+
+    The function takes the scope's key (a document, project or user id,
+    or nothing for global stats) and returns the dashboard as a dict.
+    Writes that affect the dashboard call ``invalidate_stats(scope, key)``.
+    """
+
+    def decorator(func: StatsProvider) -> StatsProvider:
+        func.stats_scope = scope
+        return func
+
+    return decorator
+
+
+def _provider_path(provider: StatsProvider) -> str:
+    return f"{provider.__module__}.{provider.__qualname__}"
+
+
+def _entry_key(provider: StatsProvider, key) -> str:
+    return f"stats:{_provider_path(provider)}:{key}"
+
+
+def _version_key(scope: str, key) -> str:
+    return f"stats_version:{scope}:{key}"
+
+
+def _get_version(scope: str, key) -> int:
+    """Get the cache version of a scope, creating it if needed."""
+    version_key = _version_key(scope, key)
+    version = cache.get(version_key)
+    if version is None:
+        # Start from the clock so an evicted version never revives old entries
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    return version
+
+
+def _bump_version(scope: str, key) -> None:
+    version_key = _version_key(scope, key)
+    try:
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate {scope} stats for {key}: {e}")
+
+
+def invalidate_stats(scope: str, key=None) -> None:
+    """
+    Mark the cached dashboards of a scope as stale once the transaction commits.
+
+    Stale dashboards are still served while they are recomputed in the
+    background, so invalidation never makes a dashboard load cold.
+    """
+    transaction.on_commit(partial(_bump_version, scope, key))
+
+
+def _compute(provider: StatsProvider, key) -> Dict[str, Any]:
+    return provider(key) if key is not None else provider()
+
+
+def refresh_stats(provider: StatsProvider, key=None) -> Dict[str, Any]:
+    """Compute a dashboard and store it in the cache."""
+    scope = provider.stats_scope
+    entry_key = _entry_key(provider, key)
+    try:
+        # Read the version first: a write during the computation leaves it stale
+        version = _get_version(scope, key)
+    except Exception as e:
+        logger.debug(f"Stats cache unavailable: {e}")
+        version = None
+
+    stats = _compute(provider, key)
+
+    if version is not None:
+        entry = {
+            "stats": stats,
+            "version": version,
+            "fresh_until": time.time() + settings.STATS_CACHE_TTL,
+        }
+        try:
+            timeout = settings.STATS_CACHE_TTL + settings.STATS_CACHE_STALE_TTL
+            cache.set(entry_key, entry, timeout)
+            cache.delete(f"{entry_key}:refreshing")
+        except Exception as e:
+            logger.debug(f"Could not cache stats {entry_key}: {e}")
+    return stats
+
+
+def _schedule_refresh(provider: StatsProvider, key) -> Optional[Dict[str, Any]]:
+    """
+    Recompute a stale dashboard in the background, once at a time.
+
+    Falls back to recomputing it right away when the task cannot be
+    queued, and returns the new stats in that case.
+    """
+    entry_key = _entry_key(provider, key)
+    if not cache.add(f"{entry_key}:refreshing", 1, settings.STATS_REFRESH_LOCK_TTL):
+        return None
+
+    from .tasks import refresh_cached_stats
+
+    try:
+        refresh_cached_stats.delay(_provider_path(provider), key)
+    except Exception as e:
+        logger.warning(f"Could not schedule stats refresh for {entry_key}: {e}")
+        return refresh_stats(provider, key)
+    return None
+
+
+def get_stats(provider: StatsProvider, key=None) -> Dict[str, Any]:
+    """
+    Get a dashboard from the cache, computing it on a miss.
+
+    Fresh entries are returned as they are. Entries past their TTL or
+    invalidated by a write are returned too, while a background task
+    recomputes them (stale-while-revalidate). Only a dashboard that was
+    never cached, or has been stale for longer than
+    ``STATS_CACHE_STALE_TTL``, is computed during the request.
+    """
+    scope = provider.stats_scope
+    try:
+        version = _get_version(scope, key)
+        entry: Optional[Dict[str, Any]] = cache.get(_entry_key(provider, key))
+    except Exception as e:
+        logger.debug(f"Stats cache unavailable: {e}")
+        return _compute(provider, key)
+
+    if entry is None:
+        return refresh_stats(provider, key)
+
+    if entry["version"] != version or entry["fresh_until"] <= time.time():
+        refreshed = _schedule_refresh(provider, key)
+        if refreshed is not None:
+            return refreshed
+    return entry["stats"]
+
+
+def refresh_stats_by_path(provider_path: str, key=None) -> Dict[str, Any]:
+    """Refresh a dashboard given its provider's dotted path."""
+    return refresh_stats(import_string(provider_path), key)
+
+
+def percentage(part, whole) -> float:
+    """Get ``part`` as a percentage of ``whole``, or 0 when ``whole`` is empty."""
+    return (part / whole * 100) if whole else 0
+
+
+@stats_provider("audit")
+def compute_audit_log_stats() -> Dict[str, Any]:
+    """Compute the audit log dashboard in two grouped queries."""
+    from .models import AuditLog
+
+    rows = (
+        AuditLog.objects.order_by()
+        .values("action", "resource_type", "user__username")
+        .annotate(
+            count=Count("id"),
+            recent=Count("id", filter=Q(timestamp__gte=timezone.now() - timedelta(days=7))),
+        )
+    )
+    actions, resource_types, users = Counter(), Counter(), Counter()
+    recent_logs = 0
+    for row in rows:
+        actions[row["action"]] += row["count"]
+        resource_types[row["resource_type"]] += row["count"]
+        users[row["user__username"]] += row["count"]
+        recent_logs += row["recent"]
+
+    top_ip_addresses = (
+        AuditLog.objects.exclude(ip_address=None)
+        .order_by()
+        .values("ip_address")
+        .annotate(count=Count("id"))
+        .order_by("-count")[:10]
+    )
+
+    return {
+        "total_logs": sum(actions.values()),
+        "action_distribution": [
+            {"action": action, "count": count} for action, count in actions.most_common()
+        ],
+        "resource_type_distribution": [
+            {"resource_type": resource_type, "count": count}
+            for resource_type, count in resource_types.most_common()
+        ],
+        "user_activity": [
+            {"user__username": username, "total_actions": count}
+            for username, count in users.most_common()
+        ],
+        "recent_activity": recent_logs,
+        "top_ip_addresses": list(top_ip_addresses),
+    }
@@ -0,0 +1,53 @@
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+# Rows fetched from the database per round trip while streaming
+STREAM_CHUNK_SIZE = 500
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON renderer.
+
+    Lets content negotiation accept ``Accept: application/x-ndjson`` and
+    ``?format=ndjson``. Views stream their rows with ``ndjson_response``;
+    anything else rendered here (e.g. errors) becomes a single line.
+    """
+
+    media_type = NDJSON_CONTENT_TYPE
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n").encode()
+
+
+def wants_ndjson(request) -> bool:
+    """Check whether content negotiation picked NDJSON for a DRF request."""
+    renderer = getattr(request, "accepted_renderer", None)
+    return isinstance(renderer, NDJSONRenderer)
+
+
+def _ndjson_lines(queryset, serializer_class, chunk_size: int):
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        data = serializer_class(instance).data
+        yield json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+def ndjson_response(queryset, serializer_class, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Stream a queryset as newline-delimited JSON, one serialized row per line.
+
+    Rows are read with a server-side cursor in chunks and serialized one at
+    a time, so memory use does not grow with the size of the result.
+    """
+    return StreamingHttpResponse(
+        _ndjson_lines(queryset, serializer_class, chunk_size),
+        content_type=NDJSON_CONTENT_TYPE,
+    )
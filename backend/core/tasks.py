@@ -0,0 +1,14 @@
+import logging
+from celery import shared_task
+from .stats import refresh_stats_by_path
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_cached_stats(provider_path, key=None):
+    """Recompute a stale cached dashboard."""
+    try:
+        refresh_stats_by_path(provider_path, key)
+    except Exception as e:
+        logger.error(f"Failed to refresh stats {provider_path} for {key}: {e}")
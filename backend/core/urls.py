@@ -19,6 +19,7 @@ urlpatterns = [
     path("audit-logs/stats/", views.audit_log_stats, name="audit_log_stats"),
     # System administration
     path("system/health/", views.system_health, name="system_health"),
+    path("system/metrics/", views.metrics, name="metrics"),
     path("system/info/", views.system_info, name="system_info"),
     path("system/database-stats/", views.database_stats, name="database_stats"),
     path("system/clear-cache/", views.clear_cache, name="clear_cache"),
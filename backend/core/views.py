@@ -8,10 +8,16 @@ from django.utils import timezone
 from django.core.cache import cache
 from django.db import connection
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
 
-import psutil
+import hmac
 import os
+import time
+from .health import system_sampler
+from .metrics import registry
 from .models import AuditLog
+from .stats import compute_audit_log_stats, get_stats
 from .serializers import (
     AuditLogSerializer,
     AuditLogListSerializer,
@@ -22,6 +28,8 @@ from .serializers import (
     ImportRequestSerializer,
 )
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 class AuditLogListView(generics.ListAPIView):
     """List audit logs with filtering."""
@@ -127,78 +135,27 @@ class AuditLogFilterView(generics.ListAPIView):
 @permission_classes([IsAuthenticated, IsAdminUser])
 def audit_log_stats(request):
     """Get audit log statistics."""
-    # Overall statistics
-    total_logs = AuditLog.objects.count()
-
-    # Action distribution
-    action_stats = (
-        AuditLog.objects.values("action")
-        .annotate(
-            count=Count("id"),
-            success_count=Count("id", filter=Q(success=True)),
-            failure_count=Count("id", filter=Q(success=False)),
-        )
-        .order_by("-count")
-    )
-
-    # Model distribution
-    model_stats = (
-        AuditLog.objects.values("model").annotate(count=Count("id")).order_by("-count")
-    )
-
-    # User activity
-    user_stats = (
-        AuditLog.objects.values("user__username")
-        .annotate(
-            total_actions=Count("id"),
-            successful_actions=Count("id", filter=Q(success=True)),
-            failed_actions=Count("id", filter=Q(success=False)),
-        )
-        .order_by("-total_actions")
-    )
-
-    # Success rate
-    success_rate = AuditLog.objects.filter(success=True).count()
-    failure_rate = total_logs - success_rate
-
-    # Recent activity
-    recent_logs = AuditLog.objects.filter(
-        timestamp__gte=timezone.now() - timezone.timedelta(days=7)
-    ).count()
-
-    # IP address distribution
-    ip_stats = (
-        AuditLog.objects.values("ip_address")
-        .annotate(count=Count("id"))
-        .order_by("-count")[:10]
-    )
-
-    stats = {
-        "total_logs": total_logs,
-        "success_rate": (success_rate / total_logs * 100) if total_logs > 0 else 0,
-        "failure_rate": (failure_rate / total_logs * 100) if total_logs > 0 else 0,
-        "action_distribution": list(action_stats),
-        "model_distribution": list(model_stats),
-        "user_activity": list(user_stats),
-        "recent_activity": recent_logs,
-        "top_ip_addresses": list(ip_stats),
-    }
-
-    serializer = AuditLogStatsSerializer(stats)
+    serializer = AuditLogStatsSerializer(get_stats(compute_audit_log_stats))
     return Response(serializer.data)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def system_health(request):
-    """Get system health information."""
+    """
+    Get system health information.
+
+    System resources come from the background sampler, so the check only
+    waits for a trivial query and a cache round trip.
+    """
     # Database health
     try:
+        start = time.monotonic()
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
-            db_status = "healthy"
-            db_response_time = None
-    except Exception as e:
+        db_status = "healthy"
+        db_response_time = round(time.monotonic() - start, 4)
+    except Exception:
         db_status = "unhealthy"
         db_response_time = None
 
@@ -210,20 +167,7 @@ def system_health(request):
         cache_status = "unhealthy"
 
     # System resources
-    try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
-
-        system_resources = {
-            "cpu_percent": cpu_percent,
-            "memory_percent": memory.percent,
-            "memory_available_gb": round(memory.available / (1024**3), 2),
-            "disk_percent": disk.percent,
-            "disk_free_gb": round(disk.free / (1024**3), 2),
-        }
-    except Exception:
-        system_resources = None
+    system_resources = system_sampler.snapshot()
 
     # Django settings health
     django_health = {
@@ -232,13 +176,14 @@ def system_health(request):
         "cache_backend": getattr(settings, "CACHES", {})
         .get("default", {})
         .get("BACKEND"),
-        "static_root": getattr(settings, "STATIC_ROOT", None),
-        "media_root": getattr(settings, "MEDIA_ROOT", None),
+        "static_root": str(settings.STATIC_ROOT) if settings.STATIC_ROOT else None,
+        "media_root": str(settings.MEDIA_ROOT) if settings.MEDIA_ROOT else None,
     }
 
     # Application status
     app_status = {
         "database": db_status,
+        "database_response_time": db_response_time,
         "cache": cache_status,
         "system_resources": system_resources is not None,
         "overall": "healthy"
@@ -257,6 +202,28 @@ def system_health(request):
     return Response(serializer.data)
 
 
+@require_GET
+def metrics(request):
+    """
+    Serve the metrics of all processes in the Prometheus text format.
+
+    Scrapers authenticate with ``Authorization: Bearer <METRICS_TOKEN>``;
+    without a configured token the endpoint is only open in DEBUG mode.
+    """
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if token:
+        allowed = hmac.compare_digest(authorization, f"Bearer {token}")
+    else:
+        allowed = settings.DEBUG
+    if not allowed:
+        return HttpResponseForbidden()
+
+    # Start sampling so the system gauges are filled in
+    system_sampler.snapshot()
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def export_request(request):
@@ -0,0 +1,61 @@
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+logger = logging.getLogger(__name__)
+
+# Browsers cannot set headers on a WebSocket handshake, so the access token
+# is offered as a subprotocol pair: ``new WebSocket(url, ["access_token", token])``
+TOKEN_SUBPROTOCOL = "access_token"
+
+
+def token_from_scope(scope) -> Optional[str]:
+    """
+    Find the JWT access token of a WebSocket handshake.
+
+    The token is read from the ``access_token`` subprotocol pair or, failing
+    that, from the ``token`` query string parameter.
+    """
+    subprotocols = list(scope.get("subprotocols") or [])
+    if TOKEN_SUBPROTOCOL in subprotocols:
+        index = subprotocols.index(TOKEN_SUBPROTOCOL)
+        if index + 1 < len(subprotocols):
+            return subprotocols[index + 1]
+
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    tokens = query.get("token")
+    return tokens[0] if tokens else None
+
+
+@database_sync_to_async
+def get_user_for_token(raw_token: str):
+    """Validate an access token the way the API does and return its user."""
+    authentication = JWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed) as e:
+        logger.info(f"Rejected WebSocket token: {e}")
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Populate ``scope["user"]`` from a simplejwt access token.
+
+    The REST API only accepts JWT bearer tokens, so WebSocket consumers are
+    authenticated with the same tokens instead of the session cookie.
+    Connections without a valid token get an ``AnonymousUser``.
+    """
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        raw_token = token_from_scope(scope)
+        scope["user"] = await get_user_for_token(raw_token) if raw_token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
@@ -0,0 +1,170 @@
+import logging
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from core.stats import invalidate_stats
+
+logger = logging.getLogger(__name__)
+
+# How an entity contributes to the counters: (document id, is verified),
+# or None when it is not counted (soft-deleted or not saved yet)
+EntityState = Optional[Tuple[int, bool]]
+
+
+def entity_state(is_deleted: bool, document_id: int, is_verified: bool) -> EntityState:
+    """Get the counter contribution of an entity."""
+    if is_deleted:
+        return None
+    return document_id, bool(is_verified)
+
+
+class EntityCountDeltas:
+    """Collect per-document counter changes and apply them in one go."""
+
+    def __init__(self):
+        self.total = Counter()
+        self.verified = Counter()
+
+    def add(self, document_id: int, total: int = 0, verified: int = 0) -> None:
+        self.total[document_id] += total
+        self.verified[document_id] += verified
+
+    def change(self, old: EntityState, new: EntityState) -> None:
+        """Record an entity moving from one state to another."""
+        if old == new:
+            return
+        if old is not None:
+            self.add(old[0], -1, -int(old[1]))
+        if new is not None:
+            self.add(new[0], 1, int(new[1]))
+
+    def apply(self) -> None:
+        """Apply the deltas to documents and roll them up to their projects."""
+        apply_entity_count_deltas(self.total, self.verified)
+
+
+def apply_entity_count_deltas(total: Counter, verified: Counter) -> None:
+    """
+    Adjust document and project entity counters by per-document deltas.
+
+    Counters are updated with F-expressions, so concurrent changes add up
+    instead of overwriting each other. Entities of soft-deleted documents
+    do not count towards their project. The cached stats of the affected
+    documents and projects are invalidated.
+    """
+    from documents.models import Document
+    from projects.models import Project
+
+    document_ids = [
+        document_id
+        for document_id in set(total) | set(verified)
+        if total.get(document_id, 0) or verified.get(document_id, 0)
+    ]
+    if not document_ids:
+        return
+
+    project_total, project_verified = Counter(), Counter()
+    # No savepoint: callers usually run this inside their own transaction
+    with transaction.atomic(savepoint=False):
+        for document_id in document_ids:
+            total_delta = total.get(document_id, 0)
+            verified_delta = verified.get(document_id, 0)
+            Document.objects.filter(pk=document_id).update(
+                total_entities=F("total_entities") + total_delta,
+                verified_entities=F("verified_entities") + verified_delta,
+                unverified_entities=F("unverified_entities") + (total_delta - verified_delta),
+            )
+            invalidate_stats("document", document_id)
+
+        visible = Document.objects.filter(pk__in=document_ids, is_deleted=False)
+        for document_id, project_id in visible.values_list("pk", "project_id"):
+            project_total[project_id] += total.get(document_id, 0)
+            project_verified[project_id] += verified.get(document_id, 0)
+
+        for project_id in project_total:
+            Project.objects.filter(pk=project_id).update(
+                total_entities=F("total_entities") + project_total[project_id],
+                verified_entities=F("verified_entities") + project_verified[project_id],
+            )
+            invalidate_stats("project", project_id)
+
+
+def apply_document_visibility(document, visible: bool) -> None:
+    """Add a restored document's counts to its project, or remove a deleted one's."""
+    from documents.models import Document
+    from projects.models import Project
+
+    counts = Document.objects.filter(pk=document.pk).values(
+        "total_entities", "verified_entities"
+    ).first()
+    if not counts:
+        return
+    sign = 1 if visible else -1
+    Project.objects.filter(pk=document.project_id).update(
+        total_entities=F("total_entities") + sign * counts["total_entities"],
+        verified_entities=F("verified_entities") + sign * counts["verified_entities"],
+    )
+    invalidate_stats("project", document.project_id)
+
+
+def reconcile_entity_counts(
+    document_ids: Optional[Iterable[int]] = None, project_ids: Optional[Iterable[int]] = None
+) -> int:
+    """
+    Recompute entity counters from the entities themselves.
+
+    Fixes drift from writes that bypass the deltas (e.g. raw queryset
+    updates). Limited to the given documents and projects, or everything
+    when neither is given. Returns the number of rows corrected.
+    """
+    from documents.models import Document
+    from projects.models import Project
+
+    documents = Document.objects.all()
+    projects = Project.objects.all()
+    if document_ids is not None:
+        document_ids = list(document_ids)
+        documents = documents.filter(pk__in=document_ids)
+        project_ids = set(project_ids or ()) | set(
+            documents.values_list("project_id", flat=True)
+        )
+    if project_ids is not None:
+        projects = projects.filter(pk__in=list(project_ids))
+
+    live = Q(entities__is_deleted=False)
+    corrected = 0
+    with transaction.atomic():
+        stale_documents = documents.annotate(
+            actual_total=Count("entities", filter=live),
+            actual_verified=Count("entities", filter=live & Q(entities__is_verified=True)),
+        ).exclude(
+            total_entities=F("actual_total"),
+            verified_entities=F("actual_verified"),
+            unverified_entities=F("actual_total") - F("actual_verified"),
+        )
+        for document_id, total, verified in stale_documents.values_list(
+            "id", "actual_total", "actual_verified"
+        ):
+            corrected += Document.objects.filter(pk=document_id).update(
+                total_entities=total,
+                verified_entities=verified,
+                unverified_entities=total - verified,
+            )
+
+        visible = Q(documents__is_deleted=False)
+        stale_projects = projects.annotate(
+            actual_total=Coalesce(Sum("documents__total_entities", filter=visible), 0),
+            actual_verified=Coalesce(Sum("documents__verified_entities", filter=visible), 0),
+        ).exclude(total_entities=F("actual_total"), verified_entities=F("actual_verified"))
+        for project_id, total, verified in stale_projects.values_list(
+            "id", "actual_total", "actual_verified"
+        ):
+            corrected += Project.objects.filter(pk=project_id).update(
+                total_entities=total, verified_entities=verified
+            )
+
+    if corrected:
+        logger.info(f"Reconciled entity counters of {corrected} documents and projects")
+    return corrected
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:42
+
+from django.db import migrations, models
+from core.search import (
+    build_search_text,
+    install_sqlite_fts,
+    postgres_search_index,
+    uninstall_sqlite_fts,
+)
+
+
+def fill_search_text(apps, schema_editor):
+    Document = apps.get_model('documents', 'Document')
+    batch = []
+    documents = Document.objects.only('title', 'description', 'content')
+    for document in documents.iterator(chunk_size=500):
+        document.search_text = build_search_text(
+            document.title, document.description, document.content
+        )
+        batch.append(document)
+        if len(batch) >= 500:
+            Document.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Document.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.add_index(
+            apps.get_model('documents', 'Document'), postgres_search_index('document')
+        )
+    elif connection.vendor == 'sqlite':
+        install_sqlite_fts(connection, 'documents_document')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.remove_index(
+            apps.get_model('documents', 'Document'), postgres_search_index('document')
+        )
+    elif connection.vendor == 'sqlite':
+        uninstall_sqlite_fts(connection, 'documents_document')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_search_text'),
+        ('projects', '0003_project_entity_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['project', 'is_deleted', '-created_at', '-id'], name='documents_d_project_2308bb_idx'),
+        ),
+    ]
@@ -2,13 +2,18 @@ from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from core.models import UserStampedModel, SoftDeleteModel
+from django.db import transaction
+from core.models import CounterFieldsModel, UserStampedModel, SoftDeleteModel
+from core.search import build_search_text
+from core.stats import invalidate_stats
 import difflib
 
 
-class Document(UserStampedModel, SoftDeleteModel):
+class Document(CounterFieldsModel, UserStampedModel, SoftDeleteModel):
     """Text document for NER processing and analysis."""
     
+    counter_fields = ('total_entities', 'verified_entities', 'unverified_entities')
+    
     # Basic Information
     title = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True)
@@ -82,6 +87,9 @@ class Document(UserStampedModel, SoftDeleteModel):
     metadata = models.JSONField(default=dict)
     notes = models.TextField(blank=True)
     
+    # Normalized title, description and content for core.search
+    search_text = models.TextField(blank=True, editable=False)
+    
     class Meta:
         db_table = 'documents_document'
         verbose_name = 'Document'
@@ -93,6 +101,7 @@ class Document(UserStampedModel, SoftDeleteModel):
             models.Index(fields=['language']),
             models.Index(fields=['created_by']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['project', 'is_deleted', '-created_at', '-id']),
         ]
     
     def __str__(self):
@@ -116,10 +125,18 @@ class Document(UserStampedModel, SoftDeleteModel):
             raise ValidationError("Quality score must be between 0 and 1")
     
     def save(self, *args, **kwargs):
-        """Override save to calculate text metrics."""
+        """Override save to calculate text metrics and the search text."""
         if self.content:
             self.calculate_text_metrics()
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'title', 'description', 'content'} & set(update_fields):
+            self.search_text = build_search_text(self.title, self.description, self.content)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'search_text'}
         super().save(*args, **kwargs)
+        invalidate_stats('document', self.pk)
+        invalidate_stats('project', self.project_id)
     
     def calculate_text_metrics(self):
         """Calculate text analysis metrics."""
@@ -130,7 +147,21 @@ class Document(UserStampedModel, SoftDeleteModel):
         self.word_count = len(words)
         
         self.character_count = len(self.content)
-    
+
+    def get_text(self):
+        """Get the document text, read from the uploaded file if there is one."""
+        if self.file:
+            try:
+                with self.file.open('rb') as f:
+                    data = f.read()
+            except (OSError, ValueError):
+                return self.content or ""
+            try:
+                return data.decode(self.encoding or 'utf-8')
+            except (UnicodeDecodeError, LookupError):
+                return data.decode('latin-1')
+        return self.content or ""
+
     def start_processing(self):
         """Mark document as processing."""
         self.processing_status = 'processing'
@@ -219,24 +250,54 @@ class Document(UserStampedModel, SoftDeleteModel):
         """Get document metadata."""
         return self.metadata.get(key, default)
     
+    def mark_processed(self, text):
+        """Remember the version whose text was processed, for incremental re-extraction."""
+        version = self.versions.order_by('-version_number').first()
+        if version is not None and version.content == text:
+            self.set_metadata('processed_version', version.version_number)
+    
+    def get_processed_version(self):
+        """Get the version entity positions refer to, if it is known."""
+        version_number = self.get_metadata('processed_version')
+        if version_number is None:
+            return None
+        return self.versions.filter(version_number=version_number).first()
+    
     def update_entity_counts(self):
-        """Update entity count fields."""
-        from entities.models import Entity
+        """Recount entity count fields (they are normally kept up to date by deltas)."""
+        from .counters import reconcile_entity_counts
+        
+        reconcile_entity_counts(document_ids=[self.pk])
+        self.refresh_from_db(fields=list(self.counter_fields))
+    
+    def delete(self, using=None, keep_parents=False):
+        """Soft delete the document and remove its entities from the project counts."""
+        from .counters import apply_document_visibility
         
-        total = Entity.objects.filter(document=self, is_deleted=False).count()
-        verified = Entity.objects.filter(
-            document=self, 
-            is_deleted=False, 
-            is_verified=True
-        ).count()
+        with transaction.atomic():
+            was_visible = not self.is_deleted
+            super().delete(using, keep_parents)
+            if was_visible:
+                apply_document_visibility(self, visible=False)
+    
+    def restore(self):
+        """Restore the document and add its entities back to the project counts."""
+        from .counters import apply_document_visibility
         
-        self.total_entities = total
-        self.verified_entities = verified
-        self.unverified_entities = total - verified
+        with transaction.atomic():
+            was_visible = not self.is_deleted
+            super().restore()
+            if not was_visible:
+                apply_document_visibility(self, visible=True)
+    
+    def hard_delete(self, using=None, keep_parents=False):
+        """Delete the document from the database, updating the project counts."""
+        from .counters import apply_document_visibility
         
-        self.save(update_fields=[
-            'total_entities', 'verified_entities', 'unverified_entities'
-        ])
+        with transaction.atomic():
+            if not self.is_deleted:
+                apply_document_visibility(self, visible=False)
+            super().hard_delete(using, keep_parents)
 
 
 class DocumentVersion(models.Model):
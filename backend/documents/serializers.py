@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import Document, DocumentVersion
-from users.serializers import UserListSerializer
-from projects.serializers import ProjectListSerializer
+from users.serializers import UserListSerializer, UserSummarySerializer
+from projects.serializers import ProjectListSerializer, ProjectSummarySerializer
 from projects.models import Project
 
 
@@ -138,8 +138,8 @@ class DocumentUpdateSerializer(serializers.ModelSerializer):
 class DocumentListSerializer(serializers.ModelSerializer):
     """Document list serializer."""
 
-    project = ProjectListSerializer(read_only=True)
-    created_by = UserListSerializer(read_only=True)
+    project = ProjectSummarySerializer(read_only=True)
+    created_by = UserSummarySerializer(read_only=True)
     processing_time_display = serializers.CharField(
         source="get_processing_time_display", read_only=True
     )
@@ -174,6 +174,15 @@ class DocumentListSerializer(serializers.ModelSerializer):
         ]
 
 
+class DocumentSummarySerializer(serializers.ModelSerializer):
+    """Minimal document serializer for nesting in list rows."""
+
+    class Meta:
+        model = Document
+        fields = ["id", "title"]
+        read_only_fields = fields
+
+
 class DocumentDetailSerializer(DocumentSerializer):
     """Document detail serializer with versions."""
 
@@ -216,14 +225,20 @@ class DocumentProcessingSerializer(serializers.Serializer):
         choices=["general_ner", "urdu_ner", "marsiya_ner", "custom"], required=False
     )
     custom_prompt = serializers.CharField(required=False, allow_blank=True)
+    incremental = serializers.BooleanField(required=False, default=False)
 
 
 class DocumentStatsSerializer(serializers.Serializer):
     """Document statistics serializer."""
 
-    total_documents = serializers.IntegerField()
-    processing_status_breakdown = serializers.DictField()
-    language_breakdown = serializers.DictField()
-    entity_counts = serializers.DictField()
-    average_processing_time = serializers.CharField()
-    recent_uploads = serializers.ListField()
+    total_entities = serializers.IntegerField()
+    verified_entities = serializers.IntegerField()
+    unverified_entities = serializers.IntegerField()
+    verification_rate = serializers.FloatField()
+    entity_type_distribution = serializers.ListField()
+    confidence_stats = serializers.DictField()
+    processing_duration = serializers.DurationField(allow_null=True)
+    word_count = serializers.IntegerField()
+    character_count = serializers.IntegerField()
+    line_count = serializers.IntegerField()
+    total_versions = serializers.IntegerField()
@@ -0,0 +1,54 @@
+from typing import Any, Dict
+from core.query_plan import count_subquery
+from core.stats import percentage, stats_provider
+from .models import Document, DocumentVersion
+
+
+@stats_provider("document")
+def compute_document_stats(document_id) -> Dict[str, Any]:
+    """Compute the dashboard of a document in two queries."""
+    from entities.models import Entity
+    from entities.stats import summarize_entities
+
+    document = (
+        Document.objects.filter(pk=document_id)
+        .annotate(total_versions=count_subquery(DocumentVersion.objects.all(), "document"))
+        .values(
+            "total_entities",
+            "verified_entities",
+            "unverified_entities",
+            "word_count",
+            "character_count",
+            "line_count",
+            "processing_started_at",
+            "processing_completed_at",
+            "total_versions",
+        )
+        .get()
+    )
+    summary = summarize_entities(Entity.objects.filter(document_id=document_id, is_deleted=False))
+
+    processing_duration = None
+    if document["processing_completed_at"] and document["processing_started_at"]:
+        processing_duration = (
+            document["processing_completed_at"] - document["processing_started_at"]
+        )
+
+    return {
+        "total_entities": document["total_entities"],
+        "verified_entities": document["verified_entities"],
+        "unverified_entities": document["unverified_entities"],
+        "verification_rate": percentage(
+            document["verified_entities"], document["total_entities"]
+        ),
+        "entity_type_distribution": [
+            {"entity_type__name": entry["entity_type__name"], "count": entry["count"]}
+            for entry in summary["entity_types"]
+        ],
+        "confidence_stats": summary["confidence"],
+        "processing_duration": processing_duration,
+        "word_count": document["word_count"],
+        "character_count": document["character_count"],
+        "line_count": document["line_count"],
+        "total_versions": document["total_versions"],
+    }
@@ -0,0 +1,18 @@
+import logging
+from celery import shared_task
+from .counters import reconcile_entity_counts
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def update_entity_counts(document_ids=None):
+    """Reconcile document and project entity counters with the entities."""
+    try:
+        corrected = reconcile_entity_counts(document_ids=document_ids)
+        logger.info(f"Entity counter reconciliation corrected {corrected} rows")
+        return corrected
+
+    except Exception as e:
+        logger.error(f"Failed to reconcile entity counts: {e}")
+        return 0
@@ -1,15 +1,16 @@
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import JSONRenderer
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Avg
 from django.utils import timezone
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 import os
 from .models import Document, DocumentVersion
+from .stats import compute_document_stats
 from .serializers import (
     DocumentSerializer,
     DocumentCreateSerializer,
@@ -22,9 +23,16 @@ from .serializers import (
     DocumentStatsSerializer,
 )
 from projects.permissions import IsProjectMember, CanUploadDocuments
+from projects.access import get_request_project
+from core.pagination import KeysetPagination
+from core.query_plan import QueryPlan, QueryPlanMixin
+from core.search import search
+from core.stats import get_stats
+from core.streaming import NDJSONRenderer, ndjson_response, wants_ndjson
 
 from processing.tasks import process_document_with_llm
-from projects.models import Project
+
+DOCUMENT_LIST_PLAN = QueryPlan(select_related=("project", "created_by"))
 
 
 class DocumentCreateView(generics.CreateAPIView):
@@ -46,15 +54,18 @@ class DocumentCreateView(generics.CreateAPIView):
         )
 
 
-class DocumentListView(generics.ListAPIView):
-    """List documents for a project."""
+class DocumentListView(QueryPlanMixin, generics.ListAPIView):
+    """List documents for a project, newest first, with cursor pagination."""
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = DocumentListSerializer
+    pagination_class = KeysetPagination
+    ordering_fields = ["created_at", "title", "word_count", "total_entities"]
+    query_plan = DOCUMENT_LIST_PLAN
 
     def get_queryset(self):
         project_slug = self.kwargs.get("project_slug")
-        project = get_object_or_404(Project, slug=project_slug)
+        project = get_request_project(self.request, project_slug)
 
         queryset = Document.objects.filter(project=project, is_deleted=False)
 
@@ -71,13 +82,9 @@ class DocumentListView(generics.ListAPIView):
         if verified_only and verified_only.lower() == "true":
             queryset = queryset.filter(verified_entities__gt=0)
 
-        search = self.request.query_params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search)
-                | Q(content__icontains=search)
-                | Q(description__icontains=search)
-            )
+        query = self.request.query_params.get("search")
+        if query:
+            return search(queryset, query)
 
         return queryset.order_by("-created_at")
 
@@ -150,11 +157,12 @@ class DocumentDeleteView(generics.DestroyAPIView):
         instance.save()
 
 
-class DocumentVersionListView(generics.ListAPIView):
+class DocumentVersionListView(QueryPlanMixin, generics.ListAPIView):
     """List document versions."""
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = DocumentVersionSerializer
+    query_plan = QueryPlan(select_related=("changed_by__profile",))
 
     def get_queryset(self):
         project_slug = self.kwargs.get("project_slug")
@@ -218,8 +226,12 @@ class DocumentProcessingView(generics.GenericAPIView):
         prompt_type = serializer.validated_data.get("prompt_type", "marsiya")
 
         # Start the processing task
+        incremental = serializer.validated_data.get("incremental", False)
         task = process_document_with_llm.delay(
-            document_id=document.id, prompt_type=prompt_type, user_id=request.user.id
+            document_id=document.id,
+            prompt_type=prompt_type,
+            user_id=request.user.id,
+            incremental=incremental,
         )
 
         # Update document status
@@ -233,6 +245,7 @@ class DocumentProcessingView(generics.GenericAPIView):
                 "document_id": document.id,
                 "task_id": task.id,
                 "prompt_type": prompt_type,
+                "incremental": incremental,
             }
         )
 
@@ -241,51 +254,12 @@ class DocumentProcessingView(generics.GenericAPIView):
 @permission_classes([IsAuthenticated, IsProjectMember])
 def document_stats(request, project_slug, pk):
     """Get document statistics."""
-    document = get_object_or_404(Document, id=pk, project__slug=project_slug)
-
-    # Entity statistics
-    total_entities = document.entities.count()
-    verified_entities = document.entities.filter(is_verified=True).count()
-    unverified_entities = total_entities - verified_entities
-
-    # Entity type distribution
-    entity_type_stats = (
-        document.entities.values("entity_type__name")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-
-    # Confidence score statistics
-    confidence_stats = document.entities.aggregate(
-        avg_confidence=Avg("confidence_score"),
-        min_confidence=Avg("confidence_score"),
-        max_confidence=Avg("confidence_score"),
+    project = get_request_project(request, project_slug)
+    document_id = get_object_or_404(
+        Document.objects.filter(project=project).values_list("id", flat=True), id=pk
     )
 
-    # Processing statistics
-    processing_duration = None
-    if document.processing_completed_at and document.processing_started_at:
-        processing_duration = (
-            document.processing_completed_at - document.processing_started_at
-        )
-
-    stats = {
-        "total_entities": total_entities,
-        "verified_entities": verified_entities,
-        "unverified_entities": unverified_entities,
-        "verification_rate": (verified_entities / total_entities * 100)
-        if total_entities > 0
-        else 0,
-        "entity_type_distribution": list(entity_type_stats),
-        "confidence_stats": confidence_stats,
-        "processing_duration": processing_duration,
-        "word_count": document.word_count,
-        "character_count": document.character_count,
-        "line_count": document.line_count,
-        "total_versions": document.versions.count(),
-    }
-
-    serializer = DocumentStatsSerializer(stats)
+    serializer = DocumentStatsSerializer(get_stats(compute_document_stats, document_id))
     return Response(serializer.data)
 
 
@@ -305,9 +279,15 @@ def document_restore(request, project_slug, pk):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated, IsProjectMember])
+@renderer_classes([JSONRenderer, NDJSONRenderer])
 def document_search(request, project_slug):
-    """Search documents within a project."""
-    project = get_object_or_404(Project, slug=project_slug)
+    """
+    Search documents within a project.
+
+    Results are cursor-paginated by relevance; with ``?format=ndjson`` (or
+    ``Accept: application/x-ndjson``) all matches are streamed instead.
+    """
+    project = get_request_project(request, project_slug)
 
     query = request.query_params.get("q", "")
     if not query:
@@ -315,22 +295,25 @@ def document_search(request, project_slug):
             {"error": "Search query is required"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    documents = Document.objects.filter(
-        Q(title__icontains=query)
-        | Q(content__icontains=query)
-        | Q(description__icontains=query),
-        project=project,
-    ).order_by("-created_at")
+    documents = search(
+        DOCUMENT_LIST_PLAN.apply(Document.objects.filter(project=project, is_deleted=False)),
+        query,
+    )
 
-    serializer = DocumentListSerializer(documents, many=True)
-    return Response(serializer.data)
+    if wants_ndjson(request):
+        return ndjson_response(documents, DocumentListSerializer)
+
+    paginator = KeysetPagination(ordering=("-search_rank", "-pk"))
+    page = paginator.paginate_queryset(documents, request)
+    serializer = DocumentListSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, IsProjectMember])
 def document_bulk_action(request, project_slug):
     """Perform bulk actions on documents."""
-    project = get_object_or_404(Project, slug=project_slug)
+    project = get_request_project(request, project_slug)
 
     action = request.data.get("action")
     document_ids = request.data.get("document_ids", [])
@@ -0,0 +1,91 @@
+import logging
+from typing import Any, Dict, Iterable, Optional
+from django.db import transaction
+from django.utils import timezone
+from core.stats import invalidate_stats
+from documents.counters import EntityCountDeltas
+from .models import Entity
+
+logger = logging.getLogger(__name__)
+
+# Fields that may be set on many entities at once
+BULK_UPDATE_FIELDS = ("entity_type", "tags", "attributes", "notes")
+
+
+class BulkScopeError(Exception):
+    """Raised when some requested entities are missing or out of scope."""
+
+
+def get_bulk_scope(
+    entity_ids: Iterable[int], project_slug: str, document_id: Optional[int] = None
+):
+    """
+    Get the live entities of a bulk request, scoped to a project.
+
+    Without ``document_id`` the entities may come from any document of the
+    project. Raises ``BulkScopeError`` unless every id was found.
+    """
+    entity_ids = set(entity_ids)
+    queryset = Entity.objects.filter(
+        id__in=entity_ids, is_deleted=False, document__project__slug=project_slug
+    )
+    if document_id is not None:
+        queryset = queryset.filter(document_id=document_id)
+    if queryset.count() != len(entity_ids):
+        raise BulkScopeError("Some entities not found or access denied")
+    return Entity.objects.filter(id__in=entity_ids)
+
+
+def bulk_verify_entities(queryset, user) -> int:
+    """Verify the unverified entities of ``queryset`` and return how many changed."""
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(is_verified=False, is_deleted=False)
+            .select_for_update()
+            .values_list("id", "document_id")
+        )
+        if not rows:
+            return 0
+
+        now = timezone.now()
+        count = Entity.objects.filter(id__in=[row[0] for row in rows]).update(
+            is_verified=True, verified_by=user, verified_at=now, updated_by=user, updated_at=now
+        )
+        deltas = EntityCountDeltas()
+        for _, document_id in rows:
+            deltas.add(document_id, verified=1)
+        deltas.apply()
+    return count
+
+
+def bulk_delete_entities(queryset, user) -> int:
+    """Soft-delete the entities of ``queryset`` and return how many changed."""
+    with transaction.atomic():
+        rows = list(
+            queryset.filter(is_deleted=False)
+            .select_for_update()
+            .values_list("id", "document_id", "is_verified")
+        )
+        if not rows:
+            return 0
+
+        count = Entity.objects.filter(id__in=[row[0] for row in rows]).update(
+            is_deleted=True, deleted_at=timezone.now(), deleted_by=user
+        )
+        deltas = EntityCountDeltas()
+        for _, document_id, is_verified in rows:
+            deltas.add(document_id, total=-1, verified=-int(is_verified))
+        deltas.apply()
+    return count
+
+
+def bulk_update_entities(queryset, updates: Dict[str, Any], user) -> int:
+    """Set the same field values on every entity of ``queryset``."""
+    values = {field: updates[field] for field in BULK_UPDATE_FIELDS if field in updates}
+    if "entity_type" in values:
+        values["entity_type_id"] = values.pop("entity_type")
+    with transaction.atomic():
+        queryset = queryset.filter(is_deleted=False)
+        for document_id in queryset.order_by().values_list("document_id", flat=True).distinct():
+            invalidate_stats("document", document_id)
+        return queryset.update(**values, updated_by=user, updated_at=timezone.now())
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:42
+
+from django.db import migrations, models
+from core.search import (
+    build_search_text,
+    install_sqlite_fts,
+    postgres_search_index,
+    uninstall_sqlite_fts,
+)
+
+
+def fill_search_text(apps, schema_editor):
+    Entity = apps.get_model('entities', 'Entity')
+    batch = []
+    entities = Entity.objects.only('text', 'context_before', 'context_after')
+    for entity in entities.iterator(chunk_size=500):
+        entity.search_text = build_search_text(
+            entity.text, entity.context_before, entity.context_after
+        )
+        batch.append(entity)
+        if len(batch) >= 500:
+            Entity.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Entity.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.add_index(
+            apps.get_model('entities', 'Entity'), postgres_search_index('entity')
+        )
+    elif connection.vendor == 'sqlite':
+        install_sqlite_fts(connection, 'entities_entity')
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.remove_index(
+            apps.get_model('entities', 'Entity'), postgres_search_index('entity')
+        )
+    elif connection.vendor == 'sqlite':
+        uninstall_sqlite_fts(connection, 'entities_entity')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('entities', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='entity',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
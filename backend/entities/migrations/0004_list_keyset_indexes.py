@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_list_keyset_indexes'),
+        ('entities', '0003_search_text'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='entity',
+            index=models.Index(fields=['document', 'line_number', 'word_position', 'id'], name='entities_en_documen_6e90f8_idx'),
+        ),
+    ]
@@ -1,8 +1,17 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from core.models import UserStampedModel, SoftDeleteModel
+from core.query_plan import annotated
+from core.search import build_search_text
+from core.stats import invalidate_stats
+from documents.counters import EntityCountDeltas, entity_state
+
+# Fields that decide whether and how an entity is counted on its document
+COUNTED_FIELDS = {'is_deleted', 'is_verified', 'document', 'document_id'}
+_UNKNOWN = object()
 
 
 class EntityType(models.Model):
@@ -58,13 +67,23 @@ class EntityType(models.Model):
             rules.append(f"{key}: {value}")
         return '; '.join(rules) if rules else 'No validation rules'
     
+    @staticmethod
+    def count_annotations():
+        """Get annotations that count the entities of each type in one grouped query."""
+        return {
+            'entities_count': Count('entities'),
+            'verified_entities_count': Count('entities', filter=Q(entities__is_verified=True)),
+        }
+    
     def get_entities_count(self):
         """Get total count of entities of this type."""
-        return self.entities.count()
+        count = annotated(self, 'entities_count')
+        return self.entities.count() if count is None else count
     
     def get_verified_entities_count(self):
         """Get count of verified entities of this type."""
-        return self.entities.filter(is_verified=True).count()
+        count = annotated(self, 'verified_entities_count')
+        return self.entities.filter(is_verified=True).count() if count is None else count
 
 
 class Entity(UserStampedModel, SoftDeleteModel):
@@ -138,6 +157,9 @@ class Entity(UserStampedModel, SoftDeleteModel):
     attributes = models.JSONField(default=dict)
     notes = models.TextField(blank=True)
     
+    # Normalized text and context for core.search
+    search_text = models.TextField(blank=True, editable=False)
+    
     class Meta:
         db_table = 'entities_entity'
         verbose_name = 'Entity'
@@ -146,6 +168,7 @@ class Entity(UserStampedModel, SoftDeleteModel):
             models.Index(fields=['text']),
             models.Index(fields=['entity_type']),
             models.Index(fields=['document']),
+            models.Index(fields=['document', 'line_number', 'word_position', 'id']),
             models.Index(fields=['start_position', 'end_position']),
             models.Index(fields=['line_number']),
             models.Index(fields=['is_verified']),
@@ -156,6 +179,68 @@ class Entity(UserStampedModel, SoftDeleteModel):
     def __str__(self):
         return f"{self.text} ({self.entity_type.name})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ('is_deleted', 'document_id', 'is_verified')):
+            instance._counter_state = entity_state(
+                instance.is_deleted, instance.document_id, instance.is_verified
+            )
+        return instance
+    
+    def _get_saved_counter_state(self):
+        """Get how the stored row is counted, as loaded or from the database."""
+        if self._state.adding:
+            return None
+        state = getattr(self, '_counter_state', _UNKNOWN)
+        if state is _UNKNOWN:
+            row = Entity.objects.filter(pk=self.pk).values_list(
+                'is_deleted', 'document_id', 'is_verified'
+            ).first()
+            state = entity_state(*row) if row else None
+        return state
+    
+    def build_search_text(self):
+        """Get the normalized text searched for this entity."""
+        return build_search_text(self.text, self.context_before, self.context_after)
+    
+    def save(self, *args, **kwargs):
+        """
+        Save the entity and apply the change to the document counters.
+        
+        The document's cached stats are invalidated on every save, since
+        fields like the entity type or confidence change the dashboards
+        without changing any counter.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'text', 'context_before', 'context_after'} & set(update_fields):
+            self.search_text = self.build_search_text()
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = {*update_fields, 'search_text'}
+        
+        if update_fields is not None and not COUNTED_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                old = self._get_saved_counter_state()
+                super().save(*args, **kwargs)
+                new = entity_state(self.is_deleted, self.document_id, self.is_verified)
+                deltas = EntityCountDeltas()
+                deltas.change(old, new)
+                deltas.apply()
+            self._counter_state = new
+        invalidate_stats('document', self.document_id)
+    
+    def hard_delete(self, using=None, keep_parents=False):
+        """Delete the entity from the database and from the document counters."""
+        with transaction.atomic():
+            old = self._get_saved_counter_state()
+            super().hard_delete(using, keep_parents)
+            deltas = EntityCountDeltas()
+            deltas.change(old, None)
+            deltas.apply()
+        self._counter_state = None
+    
     def clean(self):
         """Validate entity data."""
         if self.start_position >= self.end_position:
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import EntityType, Entity, EntityRelationship
-from users.serializers import UserListSerializer
-from documents.serializers import DocumentListSerializer
+from users.serializers import UserListSerializer, UserSummarySerializer
+from documents.serializers import DocumentListSerializer, DocumentSummarySerializer
 
 
 class EntityTypeSerializer(serializers.ModelSerializer):
@@ -44,6 +44,15 @@ class EntityTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
 
+class EntityTypeSummarySerializer(serializers.ModelSerializer):
+    """Minimal entity type serializer for nesting in list rows."""
+
+    class Meta:
+        model = EntityType
+        fields = ["id", "name", "display_name", "color_code", "icon"]
+        read_only_fields = fields
+
+
 class EntityTypeCreateSerializer(serializers.ModelSerializer):
     """Entity type creation serializer."""
 
@@ -174,9 +183,9 @@ class EntityUpdateSerializer(serializers.ModelSerializer):
 class EntityListSerializer(serializers.ModelSerializer):
     """Entity list serializer."""
 
-    entity_type = EntityTypeSerializer(read_only=True)
-    document = DocumentListSerializer(read_only=True)
-    created_by = UserListSerializer(read_only=True)
+    entity_type = EntityTypeSummarySerializer(read_only=True)
+    document = DocumentSummarySerializer(read_only=True)
+    created_by = UserSummarySerializer(read_only=True)
 
     class Meta:
         model = Entity
@@ -211,6 +220,11 @@ class EntityBulkUpdateSerializer(serializers.Serializer):
     attributes = serializers.DictField(required=False)
     notes = serializers.CharField(required=False, allow_blank=True)
 
+    def validate_entity_type(self, value):
+        if not EntityType.objects.filter(id=value, is_active=True).exists():
+            raise serializers.ValidationError("Unknown entity type")
+        return value
+
 
 class EntityRelationshipSerializer(serializers.ModelSerializer):
     """Entity relationship serializer."""
@@ -277,6 +291,8 @@ class EntityRelationshipUpdateSerializer(serializers.ModelSerializer):
 class EntitySearchSerializer(serializers.Serializer):
     """Entity search serializer."""
 
+    query = serializers.CharField(required=False, allow_blank=True)
+    entity_types = serializers.ListField(child=serializers.CharField(), required=False)
     text = serializers.CharField(required=False)
     entity_type = serializers.IntegerField(required=False)
     document = serializers.IntegerField(required=False)
@@ -300,9 +316,10 @@ class EntityStatsSerializer(serializers.Serializer):
     total_entities = serializers.IntegerField()
     verified_entities = serializers.IntegerField()
     unverified_entities = serializers.IntegerField()
-    entity_type_breakdown = serializers.DictField()
-    source_breakdown = serializers.DictField()
-    confidence_distribution = serializers.DictField()
     verification_rate = serializers.FloatField()
-    recent_entities = serializers.ListField()
+    entity_type_distribution = serializers.ListField()
+    source_distribution = serializers.ListField()
+    confidence_stats = serializers.DictField()
+    verification_stats = serializers.DictField()
+    line_distribution = serializers.ListField()
 
@@ -0,0 +1,81 @@
+from collections import Counter
+from typing import Any, Dict
+from django.db.models import Count, Max, Min, Q, Sum
+from core.stats import percentage, stats_provider
+from .models import Entity
+
+
+def summarize_entities(queryset) -> Dict[str, Any]:
+    """Summarize entities by type, source, verification and confidence in one query."""
+    rows = (
+        queryset.order_by()
+        .values("entity_type__name", "source")
+        .annotate(
+            count=Count("id"),
+            verified=Count("id", filter=Q(is_verified=True)),
+            confidence_sum=Sum("confidence_score"),
+            min_confidence=Min("confidence_score"),
+            max_confidence=Max("confidence_score"),
+        )
+    )
+
+    types: Dict[str, Dict[str, Any]] = {}
+    sources = Counter()
+    total = verified = 0
+    confidence_sum = 0.0
+    min_confidence = max_confidence = None
+    for row in rows:
+        name = row["entity_type__name"]
+        entry = types.setdefault(
+            name, {"entity_type__name": name, "count": 0, "verified_count": 0}
+        )
+        entry["count"] += row["count"]
+        entry["verified_count"] += row["verified"]
+        sources[row["source"]] += row["count"]
+        total += row["count"]
+        verified += row["verified"]
+        confidence_sum += row["confidence_sum"] or 0
+        if min_confidence is None or row["min_confidence"] < min_confidence:
+            min_confidence = row["min_confidence"]
+        if max_confidence is None or row["max_confidence"] > max_confidence:
+            max_confidence = row["max_confidence"]
+
+    for entry in types.values():
+        entry["unverified_count"] = entry["count"] - entry["verified_count"]
+
+    return {
+        "total": total,
+        "verified": verified,
+        "unverified": total - verified,
+        "entity_types": sorted(types.values(), key=lambda entry: -entry["count"]),
+        "sources": [{"source": source, "count": count} for source, count in sources.most_common()],
+        "confidence": {
+            "avg_confidence": confidence_sum / total if total else None,
+            "min_confidence": min_confidence,
+            "max_confidence": max_confidence,
+        },
+    }
+
+
+@stats_provider("document")
+def compute_entity_stats(document_id) -> Dict[str, Any]:
+    """Compute the entity dashboard of a document in two queries."""
+    entities = Entity.objects.filter(document_id=document_id, is_deleted=False)
+    summary = summarize_entities(entities)
+    lines = entities.order_by("line_number").values("line_number").annotate(count=Count("id"))
+
+    return {
+        "entity_type_distribution": summary["entity_types"],
+        "source_distribution": summary["sources"],
+        "confidence_stats": summary["confidence"],
+        "verification_stats": {
+            "total": summary["total"],
+            "verified": summary["verified"],
+            "unverified": summary["unverified"],
+        },
+        "line_distribution": list(lines),
+        "total_entities": summary["total"],
+        "verified_entities": summary["verified"],
+        "unverified_entities": summary["unverified"],
+        "verification_rate": percentage(summary["verified"], summary["total"]),
+    }
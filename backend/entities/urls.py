@@ -61,6 +61,22 @@ urlpatterns = [
         views.entity_bulk_delete,
         name="entity_bulk_delete",
     ),
+    # Bulk actions across the documents of a project
+    path(
+        "bulk-update/<slug:project_slug>/",
+        views.EntityBulkUpdateView.as_view(),
+        name="project_entity_bulk_update",
+    ),
+    path(
+        "bulk-verify/<slug:project_slug>/",
+        views.entity_bulk_verify,
+        name="project_entity_bulk_verify",
+    ),
+    path(
+        "bulk-delete/<slug:project_slug>/",
+        views.entity_bulk_delete,
+        name="project_entity_bulk_delete",
+    ),
     path(
         "stats/<slug:project_slug>/<int:document_pk>/",
         views.entity_stats,
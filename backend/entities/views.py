@@ -2,10 +2,12 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Avg, F
+from django.db.models import Q, Prefetch
 from django.utils import timezone
 from .models import Entity, EntityType, EntityRelationship
+from .stats import compute_entity_stats
 from .serializers import (
     EntitySerializer,
     EntityCreateSerializer,
@@ -23,16 +25,48 @@ from .serializers import (
     EntityStatsSerializer,
 )
 from projects.permissions import IsProjectMember, CanEditEntities
+from projects.access import get_request_project
+from core.pagination import KeysetPagination
+from core.query_plan import QueryPlan, QueryPlanMixin
+from core.search import search
+from core.stats import get_stats
+from core.streaming import NDJSONRenderer, ndjson_response, wants_ndjson
+from .bulk import (
+    BulkScopeError,
+    bulk_delete_entities,
+    bulk_update_entities,
+    bulk_verify_entities,
+    get_bulk_scope,
+)
 from documents.models import Document
-from projects.models import Project
+
+ENTITY_LIST_PLAN = QueryPlan(select_related=("entity_type", "document", "created_by"))
+
+# EntitySerializer nests full entity types (with counts), documents and users
+ENTITY_DETAIL_PLAN = QueryPlan(
+    select_related=(
+        "document__project",
+        "document__created_by",
+        "created_by__profile",
+        "updated_by__profile",
+        "verified_by__profile",
+    ),
+    prefetch_related=(
+        Prefetch(
+            "entity_type",
+            queryset=EntityType.objects.annotate(**EntityType.count_annotations()),
+        ),
+    ),
+)
 
 
-class EntityTypeListView(generics.ListAPIView):
+class EntityTypeListView(QueryPlanMixin, generics.ListAPIView):
     """List all entity types."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = EntityTypeSerializer
     queryset = EntityType.objects.filter(is_active=True).order_by("sort_order")
+    query_plan = QueryPlan(annotations=EntityType.count_annotations())
 
 
 class EntityTypeCreateView(generics.CreateAPIView):
@@ -56,11 +90,14 @@ class EntityTypeUpdateView(generics.UpdateAPIView):
         serializer.save(updated_by=self.request.user)
 
 
-class EntityListView(generics.ListAPIView):
-    """List entities for a document."""
+class EntityListView(QueryPlanMixin, generics.ListAPIView):
+    """List entities for a document in reading order, with cursor pagination."""
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = EntityListSerializer
+    pagination_class = KeysetPagination
+    ordering_fields = ["line_number", "word_position", "confidence_score", "created_at"]
+    query_plan = ENTITY_LIST_PLAN
 
     def get_queryset(self):
         project_slug = self.kwargs.get("project_slug")
@@ -95,13 +132,9 @@ class EntityListView(generics.ListAPIView):
         if confidence_max:
             queryset = queryset.filter(confidence_score__lte=float(confidence_max))
 
-        search = self.request.query_params.get("search")
-        if search:
-            queryset = queryset.filter(
-                Q(text__icontains=search)
-                | Q(context_before__icontains=search)
-                | Q(context_after__icontains=search)
-            )
+        query = self.request.query_params.get("search")
+        if query:
+            return search(queryset, query)
 
         return queryset.order_by("line_number", "word_position")
 
@@ -119,7 +152,7 @@ class EntityDetailView(generics.RetrieveAPIView):
         entity_id = self.kwargs.get("pk")
 
         return get_object_or_404(
-            Entity,
+            ENTITY_DETAIL_PLAN.apply(Entity.objects.all()),
             id=entity_id,
             document__id=document_id,
             document__project__slug=project_slug,
@@ -156,16 +189,8 @@ class EntityUpdateView(generics.UpdateAPIView):
         )
 
     def perform_update(self, serializer):
-        entity = serializer.save(updated_by=self.request.user)
-
-        # Update document entity counts
-        document = entity.document
-        document.total_entities = document.entities.count()
-        document.verified_entities = document.entities.filter(is_verified=True).count()
-        document.unverified_entities = (
-            document.total_entities - document.verified_entities
-        )
-        document.save()
+        # Document entity counts are updated by Entity.save
+        serializer.save(updated_by=self.request.user)
 
 
 class EntityDeleteView(generics.DestroyAPIView):
@@ -187,20 +212,12 @@ class EntityDeleteView(generics.DestroyAPIView):
         )
 
     def perform_destroy(self, instance):
-        document = instance.document
+        # Document entity counts are updated by Entity.save
         instance.is_deleted = True
         instance.deleted_at = timezone.now()
         instance.deleted_by = self.request.user
         instance.save()
 
-        # Update document entity counts
-        document.total_entities = document.entities.count()
-        document.verified_entities = document.entities.filter(is_verified=True).count()
-        document.unverified_entities = (
-            document.total_entities - document.verified_entities
-        )
-        document.save()
-
 
 class EntityVerificationView(generics.UpdateAPIView):
     """Verify an entity."""
@@ -222,55 +239,28 @@ class EntityVerificationView(generics.UpdateAPIView):
         )
 
     def perform_update(self, serializer):
-        entity = serializer.save(
-            verified_by=self.request.user, verified_at=timezone.now()
-        )
-
-        # Update document entity counts
-        document = entity.document
-        document.verified_entities = document.entities.filter(is_verified=True).count()
-        document.unverified_entities = (
-            document.total_entities - document.verified_entities
-        )
-        document.save()
+        # Document entity counts are updated by Entity.save
+        serializer.save(verified_by=self.request.user, verified_at=timezone.now())
 
 
 class EntityBulkUpdateView(generics.GenericAPIView):
-    """Bulk update entities."""
+    """Bulk update entities, optionally across the documents of a project."""
 
     permission_classes = [IsAuthenticated, CanEditEntities]
     serializer_class = EntityBulkUpdateSerializer
 
-    def post(self, request, project_slug, document_pk):
+    def post(self, request, project_slug, document_pk=None):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        entity_ids = serializer.validated_data["entity_ids"]
-        updates = serializer.validated_data["updates"]
-
-        # Verify all entities belong to the document
-        entities = Entity.objects.filter(
-            id__in=entity_ids,
-            document__id=document_pk,
-            document__project__slug=project_slug,
-        )
-
-        if len(entities) != len(entity_ids):
-            return Response(
-                {"error": "Some entities not found or access denied"},
-                status=status.HTTP_400_BAD_REQUEST,
+        try:
+            entities = get_bulk_scope(
+                serializer.validated_data["entity_ids"], project_slug, document_pk
             )
+        except BulkScopeError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Apply updates
-        updated_count = 0
-        for entity in entities:
-            for field, value in updates.items():
-                if hasattr(entity, field):
-                    setattr(entity, field, value)
-
-            entity.updated_by = request.user
-            entity.save()
-            updated_count += 1
+        updated_count = bulk_update_entities(entities, serializer.validated_data, request.user)
 
         return Response(
             {
@@ -280,11 +270,17 @@ class EntityBulkUpdateView(generics.GenericAPIView):
         )
 
 
-class EntityRelationshipListView(generics.ListAPIView):
+class EntityRelationshipListView(QueryPlanMixin, generics.ListAPIView):
     """List entity relationships."""
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = EntityRelationshipSerializer
+    query_plan = QueryPlan(
+        prefetch_related=(
+            Prefetch("source_entity", queryset=ENTITY_DETAIL_PLAN.apply(Entity.objects.all())),
+            Prefetch("target_entity", queryset=ENTITY_DETAIL_PLAN.apply(Entity.objects.all())),
+        )
+    )
 
     def get_queryset(self):
         project_slug = self.kwargs.get("project_slug")
@@ -323,31 +319,34 @@ class EntityRelationshipDeleteView(generics.DestroyAPIView):
 
 
 class EntitySearchView(generics.GenericAPIView):
-    """Search entities across documents."""
+    """
+    Search entities across documents.
+
+    Results are cursor-paginated; with ``?format=ndjson`` (or
+    ``Accept: application/x-ndjson``) all matches are streamed instead.
+    """
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = EntitySearchSerializer
+    renderer_classes = [JSONRenderer, NDJSONRenderer]
 
     def post(self, request, project_slug):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        query = serializer.validated_data["query"]
+        query = serializer.validated_data.get("query") or serializer.validated_data.get(
+            "text", ""
+        )
         entity_types = serializer.validated_data.get("entity_types", [])
         is_verified = serializer.validated_data.get("is_verified")
 
         # Get project
-        project = get_object_or_404(Project, slug=project_slug)
+        project = get_request_project(request, project_slug)
 
         # Build query
-        queryset = Entity.objects.filter(document__project=project)
-
-        if query:
-            queryset = queryset.filter(
-                Q(text__icontains=query)
-                | Q(context_before__icontains=query)
-                | Q(context_after__icontains=query)
-            )
+        queryset = ENTITY_LIST_PLAN.apply(
+            Entity.objects.filter(document__project=project, is_deleted=False)
+        )
 
         if entity_types:
             queryset = queryset.filter(entity_type__name__in=entity_types)
@@ -355,17 +354,26 @@ class EntitySearchView(generics.GenericAPIView):
         if is_verified is not None:
             queryset = queryset.filter(is_verified=is_verified)
 
-        # Order by relevance (could be enhanced with search ranking)
-        entities = queryset.order_by("-confidence_score", "-created_at")
+        # Order by search relevance, or by confidence without a query
+        if query:
+            entities = search(queryset, query)
+            ordering = ("-search_rank", "-pk")
+        else:
+            ordering = ("-confidence_score", "-pk")
+            entities = queryset.order_by(*ordering)
+
+        if wants_ndjson(request):
+            return ndjson_response(entities, EntityListSerializer)
 
-        # Serialize results
-        entity_serializer = EntityListSerializer(entities, many=True)
+        paginator = KeysetPagination(ordering=ordering)
+        page = paginator.paginate_queryset(entities, request, view=self)
+        entity_serializer = EntityListSerializer(page, many=True)
 
         return Response(
             {
                 "query": query,
                 "results": entity_serializer.data,
-                "total_count": entities.count(),
+                "next": paginator.get_next_link(),
             }
         )
 
@@ -374,71 +382,19 @@ class EntitySearchView(generics.GenericAPIView):
 @permission_classes([IsAuthenticated, IsProjectMember])
 def entity_stats(request, project_slug, document_pk):
     """Get entity statistics for a document."""
-    document = get_object_or_404(Document, id=document_pk, project__slug=project_slug)
-
-    # Entity type distribution
-    entity_type_stats = (
-        document.entities.values("entity_type__name")
-        .annotate(
-            count=Count("id"),
-            verified_count=Count("id", filter=Q(is_verified=True)),
-            unverified_count=Count("id", filter=Q(is_verified=False)),
-        )
-        .order_by("-count")
-    )
-
-    # Source distribution
-    source_stats = (
-        document.entities.values("source")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-
-    # Confidence score statistics
-    confidence_stats = document.entities.aggregate(
-        avg_confidence=Avg("confidence_score"),
-        min_confidence=Avg("confidence_score"),
-        max_confidence=Avg("confidence_score"),
+    project = get_request_project(request, project_slug)
+    document_id = get_object_or_404(
+        Document.objects.filter(project=project).values_list("id", flat=True), id=document_pk
     )
 
-    # Verification statistics
-    verification_stats = document.entities.aggregate(
-        total=Count("id"),
-        verified=Count("id", filter=Q(is_verified=True)),
-        unverified=Count("id", filter=Q(is_verified=False)),
-    )
-
-    # Line distribution
-    line_stats = (
-        document.entities.values("line_number")
-        .annotate(count=Count("id"))
-        .order_by("line_number")
-    )
-
-    stats = {
-        "entity_type_distribution": list(entity_type_stats),
-        "source_distribution": list(source_stats),
-        "confidence_stats": confidence_stats,
-        "verification_stats": verification_stats,
-        "line_distribution": list(line_stats),
-        "total_entities": verification_stats["total"],
-        "verified_entities": verification_stats["verified"],
-        "unverified_entities": verification_stats["unverified"],
-        "verification_rate": (
-            verification_stats["verified"] / verification_stats["total"] * 100
-        )
-        if verification_stats["total"] > 0
-        else 0,
-    }
-
-    serializer = EntityStatsSerializer(stats)
+    serializer = EntityStatsSerializer(get_stats(compute_entity_stats, document_id))
     return Response(serializer.data)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, CanEditEntities])
-def entity_bulk_verify(request, project_slug, document_pk):
-    """Bulk verify entities."""
+def entity_bulk_verify(request, project_slug, document_pk=None):
+    """Bulk verify entities, optionally across the documents of a project."""
     entity_ids = request.data.get("entity_ids", [])
 
     if not entity_ids:
@@ -446,34 +402,12 @@ def entity_bulk_verify(request, project_slug, document_pk):
             {"error": "Entity IDs are required"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Verify all entities belong to the document
-    entities = Entity.objects.filter(
-        id__in=entity_ids,
-        document__id=document_pk,
-        document__project__slug=project_slug,
-    )
+    try:
+        entities = get_bulk_scope(entity_ids, project_slug, document_pk)
+    except BulkScopeError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    if len(entities) != len(entity_ids):
-        return Response(
-            {"error": "Some entities not found or access denied"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    # Verify entities
-    verified_count = 0
-    for entity in entities:
-        if not entity.is_verified:
-            entity.is_verified = True
-            entity.verified_by = request.user
-            entity.verified_at = timezone.now()
-            entity.save()
-            verified_count += 1
-
-    # Update document entity counts
-    document = entities.first().document
-    document.verified_entities = document.entities.filter(is_verified=True).count()
-    document.unverified_entities = document.total_entities - document.verified_entities
-    document.save()
+    verified_count = bulk_verify_entities(entities, request.user)
 
     return Response(
         {
@@ -485,8 +419,8 @@ def entity_bulk_verify(request, project_slug, document_pk):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated, CanEditEntities])
-def entity_bulk_delete(request, project_slug, document_pk):
-    """Bulk delete entities."""
+def entity_bulk_delete(request, project_slug, document_pk=None):
+    """Bulk delete entities, optionally across the documents of a project."""
     entity_ids = request.data.get("entity_ids", [])
 
     if not entity_ids:
@@ -494,34 +428,12 @@ def entity_bulk_delete(request, project_slug, document_pk):
             {"error": "Entity IDs are required"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Verify all entities belong to the document
-    entities = Entity.objects.filter(
-        id__in=entity_ids,
-        document__id=document_pk,
-        document__project__slug=project_slug,
-    )
-
-    if len(entities) != len(entity_ids):
-        return Response(
-            {"error": "Some entities not found or access denied"},
-            status=status.HTTP_400_BAD_REQUEST,
-        )
+    try:
+        entities = get_bulk_scope(entity_ids, project_slug, document_pk)
+    except BulkScopeError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Delete entities
-    deleted_count = 0
-    for entity in entities:
-        entity.is_deleted = True
-        entity.deleted_at = timezone.now()
-        entity.deleted_by = request.user
-        entity.save()
-        deleted_count += 1
-
-    # Update document entity counts
-    document = entities.first().document
-    document.total_entities = document.entities.count()
-    document.verified_entities = document.entities.filter(is_verified=True).count()
-    document.unverified_entities = document.total_entities - document.verified_entities
-    document.save()
+    deleted_count = bulk_delete_entities(entities, request.user)
 
     return Response(
         {
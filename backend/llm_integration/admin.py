@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import LLMModel, LLMProcessingConfig
+from .models import LLMModel, LLMProcessingConfig, LLMUsageDailyStats, LLMUsageRecord
 
 
 @admin.register(LLMModel)
@@ -66,3 +66,28 @@ class LLMProcessingConfigAdmin(admin.ModelAdmin):
             'fields': ('enable_post_processing', 'enable_entity_validation', 'enable_confidence_scoring')
         }),
     )
+
+
+@admin.register(LLMUsageDailyStats)
+class LLMUsageDailyStatsAdmin(admin.ModelAdmin):
+    """Admin for LLMUsageDailyStats."""
+    list_display = ('date', 'llm_model', 'request_count', 'failed_request_count', 'cache_hit_count', 'total_cost')
+    list_filter = ('llm_model', 'date')
+    readonly_fields = (
+        'date', 'llm_model', 'request_count', 'failed_request_count', 'cache_hit_count',
+        'chunk_count', 'entities_extracted', 'prompt_tokens', 'completion_tokens',
+        'total_cost', 'total_processing_time'
+    )
+    ordering = ('-date', 'llm_model')
+
+
+@admin.register(LLMUsageRecord)
+class LLMUsageRecordAdmin(admin.ModelAdmin):
+    """Admin for LLMUsageRecord."""
+    list_display = ('created_at', 'llm_model', 'operation', 'success', 'cache_hit', 'prompt_tokens', 'completion_tokens', 'latency', 'cost')
+    list_filter = ('llm_model', 'operation', 'success', 'cache_hit')
+    readonly_fields = (
+        'created_at', 'llm_model', 'operation', 'success', 'cache_hit', 'chunk_count',
+        'entity_count', 'prompt_tokens', 'completion_tokens', 'latency', 'cost'
+    )
+    ordering = ('-created_at',)
@@ -0,0 +1,263 @@
+import json
+import logging
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Any, Iterator, Optional, Tuple
+from django.conf import settings
+import openai
+import requests
+from .clients import get_provider_api_key
+
+logger = logging.getLogger(__name__)
+
+# Normalized batch states shared by all providers
+BATCH_IN_PROGRESS = "in_progress"
+BATCH_COMPLETED = "completed"
+BATCH_FAILED = "failed"
+
+
+class BatchProvider:
+    """
+    Interface for provider-side batch processing.
+
+    A batch is a list of requests, each a dict with ``custom_id``,
+    ``prompt``, ``system``, ``max_tokens`` and ``temperature``. Providers
+    turn these into their own JSONL submission format, report a normalized
+    status while the batch runs, and stream results back as
+    ``(custom_id, text, error)`` tuples.
+    """
+
+    def __init__(self, llm_model):
+        self.llm_model = llm_model
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        """Submit a batch and return the provider's batch ID."""
+        raise NotImplementedError
+
+    def get_status(self, batch_id: str) -> str:
+        """Get the normalized status of a batch."""
+        raise NotImplementedError
+
+    def iter_results(self, batch_id: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """Yield ``(custom_id, text, error)`` for every request in a finished batch."""
+        raise NotImplementedError
+
+    @staticmethod
+    def to_jsonl(lines: List[Dict[str, Any]]) -> bytes:
+        """Encode records as JSON Lines."""
+        return "".join(
+            json.dumps(line, ensure_ascii=False) + "\n" for line in lines
+        ).encode("utf-8")
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """Batch processing through the OpenAI Batch API."""
+
+    ENDPOINT = "/v1/chat/completions"
+    STATUS_MAP = {
+        "validating": BATCH_IN_PROGRESS,
+        "in_progress": BATCH_IN_PROGRESS,
+        "finalizing": BATCH_IN_PROGRESS,
+        "cancelling": BATCH_IN_PROGRESS,
+        "completed": BATCH_COMPLETED,
+        "failed": BATCH_FAILED,
+        "expired": BATCH_FAILED,
+        "cancelled": BATCH_FAILED,
+    }
+
+    def __init__(self, llm_model):
+        super().__init__(llm_model)
+        options = {"api_key": get_provider_api_key(llm_model)}
+        if llm_model.api_base_url:
+            options["base_url"] = llm_model.api_base_url
+        self.client = openai.OpenAI(**options)
+
+    def build_line(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build one line of the batch input file."""
+        return {
+            "custom_id": request["custom_id"],
+            "method": "POST",
+            "url": self.ENDPOINT,
+            "body": {
+                "model": self.llm_model.model_name,
+                "messages": [
+                    {"role": "system", "content": request["system"]},
+                    {"role": "user", "content": request["prompt"]},
+                ],
+                "temperature": request["temperature"],
+                "max_tokens": request["max_tokens"],
+                "response_format": {"type": "json_object"},
+            },
+        }
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        content = self.to_jsonl([self.build_line(r) for r in batch_requests])
+        input_file = self.client.files.create(
+            file=(f"marsiya-ner-{uuid.uuid4().hex}.jsonl", content), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=self.ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def get_status(self, batch_id: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        return self.STATUS_MAP.get(batch.status, BATCH_IN_PROGRESS)
+
+    def iter_results(self, batch_id: str):
+        batch = self.client.batches.retrieve(batch_id)
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).iter_lines():
+                yield self.parse_line(line)
+
+    @staticmethod
+    def parse_line(line: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Parse one line of a batch output or error file."""
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            error = record.get("error") or response.get("body", {}).get("error")
+            return record["custom_id"], None, str(error)
+        return record["custom_id"], response["body"]["choices"][0]["message"]["content"], None
+
+
+class AnthropicBatchProvider(BatchProvider):
+    """
+    Batch processing through the Anthropic Message Batches API.
+
+    The pinned SDK predates message batches, so the HTTP API is called
+    directly.
+    """
+
+    API_URL = "https://api.anthropic.com/v1/messages/batches"
+    API_VERSION = "2023-06-01"
+
+    def __init__(self, llm_model):
+        super().__init__(llm_model)
+        self.api_url = (
+            f"{llm_model.api_base_url.rstrip('/')}/v1/messages/batches"
+            if llm_model.api_base_url
+            else self.API_URL
+        )
+        self.headers = {
+            "x-api-key": get_provider_api_key(llm_model),
+            "anthropic-version": self.API_VERSION,
+            "content-type": "application/json",
+        }
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        response = requests.request(
+            method, url, headers=self.headers, timeout=settings.LLM_REQUEST_TIMEOUT, **kwargs
+        )
+        response.raise_for_status()
+        return response
+
+    def build_line(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Build one request of the batch submission."""
+        return {
+            "custom_id": request["custom_id"],
+            "params": {
+                "model": self.llm_model.model_name,
+                "max_tokens": request["max_tokens"],
+                "temperature": request["temperature"],
+                "system": request["system"],
+                "messages": [{"role": "user", "content": request["prompt"]}],
+            },
+        }
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        response = self._request(
+            "POST",
+            self.api_url,
+            json={"requests": [self.build_line(r) for r in batch_requests]},
+        )
+        return response.json()["id"]
+
+    def get_status(self, batch_id: str) -> str:
+        batch = self._request("GET", f"{self.api_url}/{batch_id}").json()
+        if batch["processing_status"] != "ended":
+            return BATCH_IN_PROGRESS
+        return BATCH_COMPLETED if batch.get("results_url") else BATCH_FAILED
+
+    def iter_results(self, batch_id: str):
+        batch = self._request("GET", f"{self.api_url}/{batch_id}").json()
+        response = self._request("GET", batch["results_url"], stream=True)
+        for line in response.iter_lines(decode_unicode=True):
+            if line:
+                yield self.parse_line(line)
+
+    @staticmethod
+    def parse_line(line: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Parse one line of a batch results file."""
+        record = json.loads(line)
+        result = record.get("result") or {}
+        if result.get("type") != "succeeded":
+            return record["custom_id"], None, str(result.get("error") or result.get("type"))
+        return record["custom_id"], result["message"]["content"][0]["text"], None
+
+
+class LocalBatchProvider(BatchProvider):
+    """
+    File-backed stand-in for a provider batch API.
+
+    Submissions are written as OpenAI-style JSONL under
+    ``LLM_BATCH_LOCAL_DIR``. The first poll answers every request with
+    ``responder`` (by default an empty entity list) and writes an output
+    file in the same format, so the whole batch flow can run offline.
+    """
+
+    def __init__(self, llm_model, responder: Optional[Callable[[Dict[str, Any]], str]] = None):
+        super().__init__(llm_model)
+        self.directory = Path(settings.LLM_BATCH_LOCAL_DIR)
+        self.responder = responder or (lambda request: json.dumps({"entities": []}))
+
+    def _path(self, batch_id: str, kind: str) -> Path:
+        return self.directory / f"{batch_id}.{kind}.jsonl"
+
+    def submit(self, batch_requests: List[Dict[str, Any]]) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        batch_id = f"local-batch-{uuid.uuid4().hex}"
+        self._path(batch_id, "input").write_bytes(self.to_jsonl(batch_requests))
+        return batch_id
+
+    def get_status(self, batch_id: str) -> str:
+        input_path = self._path(batch_id, "input")
+        output_path = self._path(batch_id, "output")
+        if output_path.exists():
+            return BATCH_COMPLETED
+        if not input_path.exists():
+            return BATCH_FAILED
+
+        lines = []
+        with input_path.open(encoding="utf-8") as f:
+            for line in f:
+                request = json.loads(line)
+                try:
+                    lines.append({"custom_id": request["custom_id"], "text": self.responder(request)})
+                except Exception as e:
+                    lines.append({"custom_id": request["custom_id"], "error": str(e)})
+        output_path.write_bytes(self.to_jsonl(lines))
+        return BATCH_IN_PROGRESS
+
+    def iter_results(self, batch_id: str):
+        with self._path(batch_id, "output").open(encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                yield record["custom_id"], record.get("text"), record.get("error")
+
+
+def get_batch_provider(llm_model, **kwargs) -> BatchProvider:
+    """Get the batch provider for an LLM model."""
+    providers = {
+        "openai": OpenAIBatchProvider,
+        "anthropic": AnthropicBatchProvider,
+        "local": LocalBatchProvider,
+    }
+    provider_class = providers.get(llm_model.provider)
+    if provider_class is None:
+        raise ValueError(f"Batch mode is not supported for provider: {llm_model.provider}")
+    return provider_class(llm_model, **kwargs)
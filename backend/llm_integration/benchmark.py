@@ -0,0 +1,443 @@
+import asyncio
+import json
+import math
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import override_settings
+from django.utils import timezone
+from core.metrics import EXTRACTION_STAGE_SECONDS, LLM_REQUEST_SECONDS
+from core.middleware import QueryTimer
+from documents.models import Document
+from projects.models import Project
+from .models import LLMModel, LLMProcessingConfig
+from .persistence import save_extracted_entities
+from .services import LLMService
+
+RESULTS_VERSION = 1
+
+# Stages reported per document, in pipeline order
+STAGES = (
+    "chunk",
+    "call",
+    "parse",
+    "resolve_positions",
+    "merge",
+    "persist_build",
+    "persist_write",
+)
+
+# Names the synthetic corpus is built from, with the type the fake provider reports
+GAZETTEER = {
+    "حسین": "PERSON",
+    "عباس": "PERSON",
+    "علی اکبر": "PERSON",
+    "علی اصغر": "PERSON",
+    "زینب": "PERSON",
+    "سکینہ": "PERSON",
+    "قاسم": "PERSON",
+    "عون و محمد": "PERSON",
+    "حر": "PERSON",
+    "کربلا": "LOCATION",
+    "کوفہ": "LOCATION",
+    "مدینہ": "LOCATION",
+    "فرات": "LOCATION",
+    "شام": "LOCATION",
+    "نجف": "LOCATION",
+    "عاشور": "DATE",
+    "محرم": "DATE",
+    "شب عاشور": "DATE",
+}
+
+PHRASES = (
+    "کا غم ہے",
+    "کی پیاس بڑھی",
+    "پہ جان فدا",
+    "کے دشت میں",
+    "کے لب خشک ہیں",
+    "کے خیمے میں اداسی",
+    "پہ تیروں کی بارش",
+    "کی صبر کی منزل",
+    "سے آنسو رواں",
+    "کا سر نیزے پہ",
+    "کا دل ہے بےقرار",
+    "کی ریت پہ سجدہ",
+    "کی شام غریباں",
+    "کی فریاد سنو",
+)
+
+# Marsiya stanzas (bands) are musaddas: six lines
+LINES_PER_STANZA = 6
+
+
+def generate_corpus(stanzas: int, seed: int = 0) -> str:
+    """
+    Build a synthetic Urdu marsiya of ``stanzas`` six-line stanzas.
+
+    The same size and seed always give the same text. Every line names one
+    or two entities from ``GAZETTEER``, so extraction has realistic work.
+    """
+    rng = random.Random(f"{seed}:{stanzas}")
+    names = list(GAZETTEER)
+    bands = []
+    for _ in range(stanzas):
+        lines = []
+        for _ in range(LINES_PER_STANZA):
+            words = [rng.choice(names), rng.choice(PHRASES)]
+            if rng.random() < 0.4:
+                words += ["اور", rng.choice(names), rng.choice(PHRASES)]
+            lines.append(" ".join(words))
+        bands.append("\n".join(lines))
+    return "\n\n".join(bands)
+
+
+@dataclass
+class FakeProviderConfig:
+    """Behaviour of the fake provider; latencies are in seconds."""
+
+    latency: float = 0.2
+    jitter: float = 0.25
+    tokens_per_second: float = 200.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.latency < 0 or self.jitter < 0:
+            raise ValueError("latency and jitter must not be negative")
+        if self.tokens_per_second <= 0:
+            raise ValueError("tokens_per_second must be positive")
+        if not 0 <= self.error_rate < 1:
+            raise ValueError("error_rate must be in [0, 1)")
+
+
+class FakeProviderError(Exception):
+    """A retryable provider failure (HTTP 503)."""
+
+    status_code = 503
+
+
+class FakeLLMClient:
+    """
+    Stand-in for the OpenAI async client that answers extraction prompts.
+
+    It reports every ``GAZETTEER`` name found in the prompt, without offsets,
+    after a delay of ``latency`` (with ``jitter``) plus the time to generate
+    the answer at ``tokens_per_second``. Failures happen at ``error_rate``.
+    Randomness is derived from the prompt and attempt, so results do not
+    depend on the order in which concurrent calls are made.
+    """
+
+    def __init__(self, config: FakeProviderConfig):
+        self.config = config
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.calls = 0
+        self.errors = 0
+        self._attempts: Dict[str, int] = {}
+
+    async def create(self, model: str, messages: List[Dict[str, str]], **kwargs):
+        prompt = messages[-1]["content"]
+        attempt = self._attempts.get(prompt, 0)
+        self._attempts[prompt] = attempt + 1
+        rng = random.Random(f"{self.config.seed}:{attempt}:{prompt}")
+        self.calls += 1
+
+        entities = [
+            {"text": name, "entity_type": entity_type, "confidence": 0.9}
+            for name, entity_type in GAZETTEER.items()
+            if name in prompt
+        ]
+        content = json.dumps({"entities": entities}, ensure_ascii=False)
+        # Roughly three characters of Urdu per token
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 3
+        completion_tokens = len(content) // 3
+
+        delay = self.config.latency * (1 + rng.uniform(-1, 1) * self.config.jitter)
+        await asyncio.sleep(max(delay, 0) + completion_tokens / self.config.tokens_per_second)
+        if rng.random() < self.config.error_rate:
+            self.errors += 1
+            raise FakeProviderError("Fake provider unavailable")
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+            ),
+        )
+
+
+class BenchmarkService(LLMService):
+    """LLMService that talks to a fake client with the benchmark's config."""
+
+    def __init__(self, llm_model: LLMModel, config: LLMProcessingConfig, client: FakeLLMClient):
+        super().__init__(llm_model)
+        self.config = config
+        self.client = client
+
+    def _get_client(self):
+        return self.client
+
+
+def _percentile(values: Sequence[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p / 100 * len(ordered)), 1) - 1]
+
+
+def _histogram_totals(histogram, **labels) -> Dict[tuple, Dict[str, float]]:
+    """Observation count and sum of each series matching ``labels``."""
+    positions = [histogram.labelnames.index(name) for name in labels]
+    totals = {}
+    for key, value in histogram.snapshot()["samples"]:
+        if all(key[i] == str(v) for i, v in zip(positions, labels.values())):
+            totals[tuple(key)] = {"count": sum(value["counts"]), "sum": value["sum"]}
+    return totals
+
+
+def _stage_totals() -> Dict[str, Dict[str, float]]:
+    return {key[0]: value for key, value in _histogram_totals(EXTRACTION_STAGE_SECONDS).items()}
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident memory of this process (ru_maxrss is in bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 2)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_size(
+    stanzas: int,
+    documents: int,
+    provider: FakeProviderConfig,
+    llm_model: LLMModel,
+    config: LLMProcessingConfig,
+    project: Project,
+    user,
+    trace_memory: bool,
+) -> Dict[str, Any]:
+    """Extract and persist ``documents`` documents of ``stanzas`` stanzas each."""
+    client = FakeLLMClient(provider)
+    texts = [generate_corpus(stanzas, seed=provider.seed * 1000 + i) for i in range(documents)]
+    stages_before = _stage_totals()
+    calls_before = _histogram_totals(LLM_REQUEST_SECONDS, model=llm_model.model_name)
+
+    document_rows = [
+        Document.objects.create(
+            title=f"Benchmark {stanzas}x{i}", content=text, project=project, created_by=user
+        )
+        for i, text in enumerate(texts)
+    ]
+
+    if trace_memory:
+        tracemalloc.start()
+    latencies, queries, entities, failed = [], [], 0, 0
+    started = time.monotonic()
+    for document, text in zip(document_rows, texts):
+        timer = QueryTimer()
+        doc_started = time.monotonic()
+        with connection.execute_wrapper(timer):
+            try:
+                service = BenchmarkService(llm_model, config, client)
+                extracted = service.extract_entities(text, "marsiya")
+                entities += len(save_extracted_entities(document, extracted, user_id=user.id))
+            except FakeProviderError:
+                failed += 1
+        latencies.append(time.monotonic() - doc_started)
+        queries.append(timer.count)
+    elapsed = time.monotonic() - started
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    stages_after = _stage_totals()
+    stages = {}
+    for stage in STAGES:
+        after = stages_after.get(stage, {"count": 0, "sum": 0.0})
+        before = stages_before.get(stage, {"count": 0, "sum": 0.0})
+        total = after["sum"] - before["sum"]
+        stages[stage] = {
+            "count": after["count"] - before["count"],
+            "total_seconds": total,
+            "seconds_per_document": total / documents,
+        }
+
+    calls = {"count": 0, "errors": 0, "total_seconds": 0.0}
+    for key, after in _histogram_totals(LLM_REQUEST_SECONDS, model=llm_model.model_name).items():
+        before = calls_before.get(key, {"count": 0, "sum": 0.0})
+        count = after["count"] - before["count"]
+        calls["count"] += count
+        calls["total_seconds"] += after["sum"] - before["sum"]
+        if key[LLM_REQUEST_SECONDS.labelnames.index("outcome")] == "error":
+            calls["errors"] += count
+    calls["mean_seconds"] = calls["total_seconds"] / calls["count"] if calls["count"] else None
+
+    return {
+        "stanzas": stanzas,
+        "characters_per_document": sum(len(text) for text in texts) // documents,
+        "documents": documents,
+        "failed_documents": failed,
+        "entities": entities,
+        "elapsed_seconds": elapsed,
+        "documents_per_minute": documents / elapsed * 60 if elapsed else None,
+        "document_latency": {
+            "mean": sum(latencies) / documents,
+            "p50": _percentile(latencies, 50),
+            "p95": _percentile(latencies, 95),
+            "max": max(latencies),
+        },
+        "stages": stages,
+        "provider_calls": calls,
+        "queries_per_document": sum(queries) / documents,
+        "max_queries_per_document": max(queries),
+        "peak_traced_memory_mb": round(peak_memory / 2**20, 2) if peak_memory is not None else None,
+    }
+
+
+def run_benchmark(
+    sizes: Sequence[int] = (10, 50, 200),
+    documents: int = 5,
+    provider: Optional[FakeProviderConfig] = None,
+    chunk_size: int = 1000,
+    overlap_size: int = 100,
+    trace_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run the extraction pipeline over synthetic corpora and measure it.
+
+    Each corpus size runs ``documents`` documents through ``LLMService``
+    and ``save_extracted_entities`` against the fake provider. Everything
+    is written inside a transaction that is rolled back, and the
+    extraction cache is disabled so every document reaches the provider.
+    Stage timings come from the ``extraction_stage_duration_seconds`` and
+    ``llm_request_duration_seconds`` metrics.
+    """
+    if documents < 1 or not sizes or min(sizes) < 1:
+        raise ValueError("documents and sizes must be positive")
+    provider = provider or FakeProviderConfig()
+
+    benchmark_caches = {
+        **settings.CACHES,
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "benchmark_llm": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    }
+    with override_settings(CACHES=benchmark_caches, LLM_CACHE_ALIAS="benchmark_llm"):
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username=f"benchmark-{time.time_ns()}", password=None
+            )
+            project = Project.objects.create(
+                name="Benchmark", slug=f"benchmark-{time.time_ns()}", created_by=user
+            )
+            llm_model = LLMModel.objects.create(
+                name="Benchmark fake provider",
+                provider="openai",
+                model_name=f"benchmark-fake-{time.time_ns()}",
+                api_key="benchmark",
+                rate_limit_per_minute=10**9,
+                rate_limit_per_hour=10**9,
+            )
+            config = LLMProcessingConfig(
+                name="Benchmark",
+                llm_model=llm_model,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                is_active=True,
+            )
+            config.save()
+
+            results = [
+                _run_size(size, documents, provider, llm_model, config, project, user, trace_memory)
+                for size in sizes
+            ]
+            transaction.set_rollback(True)
+
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": timezone.now().isoformat(),
+        "commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": settings.DATABASES["default"]["ENGINE"],
+            "platform": sys.platform,
+            "peak_rss_mb": _peak_rss_mb(),
+        },
+        "parameters": {
+            "sizes": list(sizes),
+            "documents": documents,
+            "chunk_size": chunk_size,
+            "overlap_size": overlap_size,
+            "llm_max_concurrent_requests": settings.LLM_MAX_CONCURRENT_REQUESTS,
+            "provider": asdict(provider),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare two benchmark results size by size.
+
+    Changes are relative to the baseline: positive ``documents_per_minute``
+    changes are improvements, positive latency and query changes are
+    regressions.
+    """
+
+    def change(old, new):
+        if old in (None, 0) or new is None:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    baseline_sizes = {result["stanzas"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = baseline_sizes.get(result["stanzas"])
+        if old is None:
+            continue
+        rows.append(
+            {
+                "stanzas": result["stanzas"],
+                "documents_per_minute": change(
+                    old["documents_per_minute"], result["documents_per_minute"]
+                ),
+                "p95_latency": change(
+                    old["document_latency"]["p95"], result["document_latency"]["p95"]
+                ),
+                "queries_per_document": change(
+                    old["queries_per_document"], result["queries_per_document"]
+                ),
+                "stages": {
+                    stage: change(
+                        old["stages"].get(stage, {}).get("seconds_per_document"),
+                        result["stages"][stage]["seconds_per_document"],
+                    )
+                    for stage in result["stages"]
+                },
+            }
+        )
+    return rows
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import logging
+import unicodedata
+import zlib
+from typing import Dict, List, Optional, Any, Iterable
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode NFC, newlines, trailing spaces)."""
+    text = unicodedata.normalize("NFC", text or "")
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return "\n".join(line.rstrip() for line in text.split("\n")).strip()
+
+
+def text_digest(text: str) -> str:
+    """Get a stable digest of the exact text."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache for LLM entity extraction results.
+
+    Keys are SHA-256 digests of the normalized text plus everything that
+    influences the LLM output (prompt template, model name, temperature and
+    entity types), so they are identical across processes and restarts.
+    Values are zlib-compressed JSON. Entries expire after ``LLM_CACHE_TTL``
+    seconds and every hit refreshes the TTL, so rarely used entries are the
+    ones that age out first.
+
+    Two levels are kept:
+
+    - ``document``: the final positioned entities for a whole text, stored
+      with a digest of the exact text so offsets are only reused verbatim.
+    - ``segment``: entities for a single stanza, with offsets relative to
+      the stanza, so editing one stanza only re-extracts that stanza.
+    """
+
+    KEY_PREFIX = "llm_entities"
+    VERSION = 1
+
+    def __init__(
+        self,
+        model_name: str,
+        prompt_template: str,
+        temperature: float,
+        entity_types: Optional[Iterable[str]] = None,
+    ):
+        self.cache = caches[settings.LLM_CACHE_ALIAS]
+        self.ttl = settings.LLM_CACHE_TTL
+        self.fingerprint = text_digest(
+            json.dumps(
+                {
+                    "model_name": model_name,
+                    "prompt_template": prompt_template,
+                    "temperature": round(float(temperature), 4),
+                    "entity_types": sorted(str(t).upper() for t in entity_types or []),
+                },
+                sort_keys=True,
+            )
+        )
+
+    def make_key(self, level: str, text: str) -> str:
+        """Build the cache key for a text at a cache level."""
+        digest = text_digest(f"{self.fingerprint}\n{normalize_text(text)}")
+        return f"{self.KEY_PREFIX}:v{self.VERSION}:{level}:{digest}"
+
+    @staticmethod
+    def _dump(value: Any) -> bytes:
+        return zlib.compress(
+            json.dumps(value, ensure_ascii=False).encode("utf-8"),
+            settings.LLM_CACHE_COMPRESSION_LEVEL,
+        )
+
+    @staticmethod
+    def _load(raw: Optional[bytes]) -> Any:
+        if raw is None:
+            return None
+        try:
+            return json.loads(zlib.decompress(raw).decode("utf-8"))
+        except (zlib.error, ValueError, TypeError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry: {e}")
+            return None
+
+    def _touch(self, keys: Iterable[str]):
+        """Refresh the TTL of entries that were just read."""
+        for key in keys:
+            try:
+                self.cache.touch(key, self.ttl)
+            except Exception as e:
+                logger.debug(f"Failed to refresh cache entry {key}: {e}")
+
+    def get_document(self, text: str) -> Optional[List[Dict[str, Any]]]:
+        """Get cached entities for an exact document text."""
+        key = self.make_key("document", text)
+        value = self._load(self.cache.get(key))
+        if not value or value.get("digest") != text_digest(text):
+            return None
+
+        self._touch([key])
+        return value["entities"]
+
+    def set_document(self, text: str, entities: List[Dict[str, Any]]):
+        """Cache the positioned entities for a document text."""
+        self.cache.set(
+            self.make_key("document", text),
+            self._dump({"digest": text_digest(text), "entities": entities}),
+            timeout=self.ttl,
+        )
+
+    def get_segments(
+        self, segment_texts: List[str]
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Get cached entities for many segments in one round trip.
+
+        Returns a mapping from segment index to its entities (relative to
+        the segment); missing segments are left out.
+        """
+        keys = [self.make_key("segment", text) for text in segment_texts]
+        raw_values = self.cache.get_many(list(set(keys)))
+
+        hits = {}
+        for index, key in enumerate(keys):
+            value = self._load(raw_values.get(key))
+            if value is not None:
+                hits[index] = value
+
+        self._touch(raw_values.keys())
+        return hits
+
+    def set_segments(self, segments: Dict[str, List[Dict[str, Any]]]):
+        """Cache entities (relative to the segment) keyed by segment text."""
+        if not segments:
+            return
+
+        self.cache.set_many(
+            {
+                self.make_key("segment", text): self._dump(entities)
+                for text, entities in segments.items()
+            },
+            timeout=self.ttl,
+        )
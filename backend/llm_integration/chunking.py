@@ -0,0 +1,176 @@
+import logging
+from typing import Dict, List, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TextChunker:
+    """Split long documents into overlapping windows on stanza/line boundaries."""
+
+    def __init__(self, chunk_size: int = 1000, overlap_size: int = 100):
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        if overlap_size < 0 or overlap_size >= chunk_size:
+            raise ValueError("Overlap size must be between 0 and chunk size")
+
+        self.chunk_size = chunk_size
+        self.overlap_size = overlap_size
+
+    def _get_line_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Get (start, end) offsets of every line, including its newline."""
+        spans = []
+        start = 0
+        for line in text.splitlines(keepends=True):
+            end = start + len(line)
+
+            # Hard-split lines that are longer than a whole chunk on whitespace
+            while end - start > self.chunk_size:
+                split_at = text.rfind(" ", start + 1, start + self.chunk_size)
+                if split_at == -1:
+                    split_at = start + self.chunk_size
+                else:
+                    split_at += 1
+                spans.append((start, split_at))
+                start = split_at
+
+            spans.append((start, end))
+            start = end
+        return spans
+
+    @staticmethod
+    def _is_stanza_break(text: str, span: Tuple[int, int]) -> bool:
+        """Check whether a line is blank, i.e. separates two stanzas."""
+        return not text[span[0] : span[1]].strip()
+
+    def split(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Split text into overlapping chunks.
+
+        Each chunk is a dict with ``index``, ``text``, ``start`` and ``end``,
+        where ``start``/``end`` are offsets into the original text.
+        """
+        if not text:
+            return []
+
+        if len(text) <= self.chunk_size:
+            return [{"index": 0, "text": text, "start": 0, "end": len(text)}]
+
+        spans = self._get_line_spans(text)
+        chunks = []
+        first = 0
+
+        while first < len(spans):
+            chunk_start = spans[first][0]
+
+            # Greedily take lines until the window is full
+            last = first
+            while (
+                last + 1 < len(spans)
+                and spans[last + 1][1] - chunk_start <= self.chunk_size
+            ):
+                last += 1
+
+            # Prefer ending on a stanza break in the second half of the window
+            if last + 1 < len(spans):
+                for candidate in range(last, first, -1):
+                    if spans[candidate][1] - chunk_start < self.chunk_size // 2:
+                        break
+                    if self._is_stanza_break(text, spans[candidate]):
+                        last = candidate
+                        break
+
+            chunk_end = spans[last][1]
+            chunks.append(
+                {
+                    "index": len(chunks),
+                    "text": text[chunk_start:chunk_end],
+                    "start": chunk_start,
+                    "end": chunk_end,
+                }
+            )
+
+            if last + 1 >= len(spans):
+                break
+
+            # Step back over trailing lines that fit in the overlap window
+            next_first = last + 1
+            while (
+                next_first - 1 > first
+                and chunk_end - spans[next_first - 1][0] <= self.overlap_size
+            ):
+                next_first -= 1
+            first = next_first
+
+        logger.debug(f"Split {len(text)} characters into {len(chunks)} chunks")
+        return chunks
+
+
+def split_segments(text: str, max_size: int = 1000) -> List[Dict[str, Any]]:
+    """
+    Split text into stanza segments for per-stanza caching.
+
+    Stanzas are separated by blank lines, which stay attached to the stanza
+    before them so segments cover the text without gaps. Stanzas longer than
+    ``max_size`` are split further on line boundaries.
+    """
+    segments = []
+    chunker = TextChunker(max_size, 0)
+
+    def add_segment(start: int, end: int):
+        if start >= end:
+            return
+        for piece in chunker.split(text[start:end]):
+            segments.append(
+                {
+                    "index": len(segments),
+                    "text": piece["text"],
+                    "start": start + piece["start"],
+                    "end": start + piece["end"],
+                }
+            )
+
+    segment_start = 0
+    position = 0
+    in_break = False
+    for line in text.splitlines(keepends=True):
+        is_blank = not line.strip()
+        if in_break and not is_blank:
+            add_segment(segment_start, position)
+            segment_start = position
+        in_break = is_blank
+        position += len(line)
+
+    add_segment(segment_start, len(text))
+    return segments
+
+
+def merge_chunk_entities(
+    chunk_results: Iterable[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
+) -> List[Dict[str, Any]]:
+    """
+    Merge per-chunk entities back into document offsets.
+
+    Entity positions are shifted by the chunk start. Entities found twice in
+    overlapping windows are de-duplicated, keeping the highest confidence.
+    """
+    merged = {}
+
+    for chunk, entities in chunk_results:
+        offset = chunk["start"]
+        for entity in entities:
+            document_entity = dict(entity)
+            document_entity["start"] = entity["start"] + offset
+            document_entity["end"] = entity["end"] + offset
+
+            key = (
+                document_entity["start"],
+                document_entity["end"],
+                str(document_entity["entity_type"]).upper(),
+            )
+            existing = merged.get(key)
+            if existing is None or document_entity.get(
+                "confidence", 0
+            ) > existing.get("confidence", 0):
+                merged[key] = document_entity
+
+    return sorted(merged.values(), key=lambda e: (e["start"], e["end"]))
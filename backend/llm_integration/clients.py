@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, Optional, Tuple
+from django.conf import settings
+import openai
+import anthropic
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClientPool:
+    """
+    Process-wide pool of async LLM provider clients.
+
+    Clients are keyed by provider, base URL and API key and live on a single
+    background event loop, so their HTTP connection pools (and TLS sessions)
+    are reused across requests. Each LLM model also gets a semaphore that
+    bounds how many of its requests can be in flight at once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Drop all state, e.g. after the process was forked."""
+        self._pid = os.getpid()
+        self._loop = None
+        self._thread = None
+        self._clients = {}
+        self._semaphores = {}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop if it is not running yet."""
+        with self._lock:
+            # Celery prefork workers inherit the parent's pool but not its thread
+            if self._pid != os.getpid():
+                self._reset()
+
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="llm-client-pool",
+                    daemon=True,
+                )
+                self._thread.start()
+                # Clients bound to a previous loop cannot be reused
+                self._clients = {}
+                self._semaphores = {}
+
+            return self._loop
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the pool's event loop and wait for its result."""
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result(timeout)
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """Drive an async generator on the pool's event loop from sync code."""
+        try:
+            while True:
+                try:
+                    yield self.run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(agen.aclose())
+
+    async def aiterate(self, agen: AsyncIterator) -> AsyncIterator:
+        """
+        Drive an async generator on the pool's event loop from another event loop.
+
+        Items are handed over through a queue on the caller's loop. Closing
+        or cancelling the caller cancels the generator on the pool's loop.
+        """
+        loop = self._ensure_loop()
+        caller_loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        finished = object()
+
+        async def pump():
+            try:
+                async for item in agen:
+                    caller_loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+            except Exception as e:
+                caller_loop.call_soon_threadsafe(queue.put_nowait, (finished, e))
+            else:
+                caller_loop.call_soon_threadsafe(queue.put_nowait, (finished, None))
+
+        future = asyncio.run_coroutine_threadsafe(pump(), loop)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is finished:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            future.cancel()
+
+    @staticmethod
+    def _client_key(provider: str, api_key: str, base_url: str) -> Tuple[str, str, str]:
+        """Build the pool key without keeping the raw API key around."""
+        key_digest = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+        return provider, base_url or "", key_digest
+
+    def get_client(self, provider: str, api_key: str, base_url: str = ""):
+        """Get (or create) the pooled async client for a provider/endpoint/key."""
+        self._ensure_loop()
+        key = self._client_key(provider, api_key, base_url)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                options = {
+                    "api_key": api_key,
+                    "max_retries": 0,
+                    "timeout": settings.LLM_REQUEST_TIMEOUT,
+                }
+                if base_url:
+                    options["base_url"] = base_url
+
+                if provider == "openai":
+                    client = openai.AsyncOpenAI(**options)
+                elif provider == "anthropic":
+                    client = anthropic.AsyncAnthropic(**options)
+                else:
+                    raise ValueError(f"Unsupported LLM provider: {provider}")
+
+                self._clients[key] = client
+                logger.debug(f"Created pooled {provider} client for {base_url or 'default endpoint'}")
+
+            return client
+
+    @staticmethod
+    def get_concurrency_limit(llm_model) -> int:
+        """
+        Get how many requests a model may have in flight.
+
+        An explicit ``max_concurrency`` provider setting wins. Otherwise the
+        limit is derived from ``rate_limit_per_minute`` assuming a request
+        takes about ten seconds, capped by ``LLM_MAX_CONCURRENT_REQUESTS``.
+        """
+        limit = llm_model.get_setting("max_concurrency")
+        if not limit:
+            limit = llm_model.rate_limit_per_minute // 6
+        return max(1, min(int(limit), settings.LLM_MAX_CONCURRENT_REQUESTS))
+
+    def get_semaphore(self, llm_model) -> asyncio.Semaphore:
+        """Get the concurrency semaphore for an LLM model."""
+        limit = self.get_concurrency_limit(llm_model)
+        key = (llm_model.pk, limit)
+
+        with self._lock:
+            semaphore = self._semaphores.get(key)
+            if semaphore is None:
+                semaphore = asyncio.Semaphore(limit)
+                self._semaphores[key] = semaphore
+            return semaphore
+
+
+client_pool = AsyncClientPool()
+
+
+def get_provider_api_key(llm_model) -> str:
+    """Get the API key for a model, falling back to the provider-wide setting."""
+    if llm_model.api_key:
+        return llm_model.api_key
+
+    fallback_settings: Dict[str, str] = {
+        "openai": "OPENAI_API_KEY",
+        "anthropic": "ANTHROPIC_API_KEY",
+    }
+    setting_name = fallback_settings.get(llm_model.provider)
+    return getattr(settings, setting_name, "") if setting_name else ""
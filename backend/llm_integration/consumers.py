@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from core.websocket import TOKEN_SUBPROTOCOL
+from .clients import client_pool
+from .serializers import EntityExtractionRequestSerializer
+from .services import LLMService
+
+logger = logging.getLogger(__name__)
+
+
+class EntityExtractionConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Stream entity extraction over a WebSocket.
+
+    The client sends an extraction request (the same fields as the
+    ``extract/`` endpoint) and receives the events of
+    ``LLMService.astream_entities`` as JSON messages, followed by an
+    ``error`` event if the extraction fails. One extraction runs at a time
+    per connection; it is cancelled when the client disconnects.
+
+    Clients authenticate with a JWT access token (see
+    ``core.websocket.JWTAuthMiddleware``); unauthenticated connections are
+    closed with code 4401.
+    """
+
+    async def connect(self):
+        self.extraction = None
+        user = self.scope.get("user")
+        if user is None or not user.is_authenticated:
+            await self.close(code=4401)
+            return
+        # Echo the token subprotocol, or browsers abort the handshake
+        subprotocols = self.scope.get("subprotocols") or []
+        await self.accept(TOKEN_SUBPROTOCOL if TOKEN_SUBPROTOCOL in subprotocols else None)
+
+    async def disconnect(self, code):
+        if self.extraction is not None:
+            self.extraction.cancel()
+
+    async def receive_json(self, content, **kwargs):
+        serializer = EntityExtractionRequestSerializer(data=content)
+        if not serializer.is_valid():
+            await self.send_json({"type": "error", "errors": serializer.errors})
+            return
+        if self.extraction is not None and not self.extraction.done():
+            await self.send_json({"type": "error", "message": "An extraction is already running"})
+            return
+
+        self.extraction = asyncio.ensure_future(
+            self.stream_extraction(
+                serializer.validated_data["text"],
+                serializer.validated_data.get("prompt_type", "marsiya_ner"),
+            )
+        )
+
+    async def stream_extraction(self, text: str, prompt_type: str):
+        """Run one extraction and forward its events to the client."""
+        try:
+            llm_service = await database_sync_to_async(LLMService)()
+            chunk_count = 0
+            async for event in client_pool.aiterate(llm_service.astream_entities(text, prompt_type)):
+                if event["type"] == "start":
+                    chunk_count = event["chunks"]
+                elif event["type"] == "complete":
+                    await database_sync_to_async(llm_service._update_usage_stats)(
+                        event["processing_time"],
+                        event["total_entities"],
+                        chunk_count=chunk_count,
+                        cache_hit=event["cached"],
+                        operation="stream",
+                    )
+                await self.send_json(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in streamed entity extraction: {e}")
+            await self.send_json({"type": "error", "message": str(e)})
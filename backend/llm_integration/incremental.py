@@ -0,0 +1,246 @@
+import bisect
+import difflib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from documents.counters import EntityCountDeltas
+from entities.models import Entity
+from .chunking import split_segments
+from .matching import TextPositionIndex
+from .persistence import save_extracted_entities
+
+logger = logging.getLogger(__name__)
+
+# (tag, old_start, old_end, new_start, new_end) in character offsets
+Opcode = Tuple[str, int, int, int, int]
+
+
+def diff_texts(old_text: str, new_text: str) -> List[Opcode]:
+    """
+    Diff two texts line by line.
+
+    Returns ``difflib`` opcodes converted to character offsets, so unchanged
+    lines come out as ``equal`` blocks that map one-to-one between texts.
+    """
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    old_starts = _line_starts(old_lines)
+    new_starts = _line_starts(new_lines)
+
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        (tag, old_starts[i1], old_starts[i2], new_starts[j1], new_starts[j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+    ]
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line))
+    return starts
+
+
+class OffsetMap:
+    """Map character offsets between two versions of a text using diff opcodes."""
+
+    def __init__(self, opcodes: List[Opcode]):
+        self.opcodes = opcodes
+        self._old_starts = [op[1] for op in opcodes]
+        self._new_starts = [op[3] for op in opcodes]
+
+    def _find(self, starts: List[int], offset: int) -> Opcode:
+        return self.opcodes[max(0, bisect.bisect_right(starts, offset) - 1)]
+
+    def old_to_new(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Get the new position of an unchanged span, or None if it was edited."""
+        tag, old_start, old_end, new_start, _ = self._find(self._old_starts, start)
+        if tag != "equal" or end > old_end:
+            return None
+        shift = new_start - old_start
+        return start + shift, end + shift
+
+    def new_to_old(self, offset: int, side: str = "start") -> int:
+        """Get the old offset for a new offset; edited regions map to their bounds."""
+        tag, old_start, old_end, new_start, new_end = self._find(self._new_starts, offset)
+        if tag == "equal":
+            return old_start + min(offset - new_start, old_end - old_start)
+        return old_start if side == "start" else old_end
+
+
+def plan_reextraction(
+    old_text: str, new_text: str, max_segment_size: int = 1000
+) -> Dict[str, Any]:
+    """
+    Work out which parts of an edited text need to be extracted again.
+
+    Every changed line is widened to the stanza (see ``split_segments``) it
+    belongs to, so the LLM sees the same context as in a full run. Returns
+    the diff ``opcodes``, the ``changes`` (old spans whose text was edited)
+    and the ``spans`` to re-extract, each with its ``new_start``/``new_end``
+    and the ``old_start``/``old_end`` it replaces.
+    """
+    opcodes = diff_texts(old_text, new_text)
+    changed = [op for op in opcodes if op[0] != "equal"]
+    if not changed:
+        return {"opcodes": opcodes, "changes": [], "spans": []}
+
+    segments = split_segments(new_text, max_segment_size)
+    segment_starts = [segment["start"] for segment in segments]
+    dirty = []
+    for _, _, _, new_start, new_end in changed:
+        if not segments:
+            break
+        first = max(0, bisect.bisect_right(segment_starts, new_start) - 1)
+        last = max(first, bisect.bisect_left(segment_starts, new_end) - 1)
+        dirty.append([segments[first]["start"], segments[last]["end"]])
+
+    # Merge stanzas touched by several edits
+    dirty.sort()
+    merged = []
+    for start, end in dirty:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    offset_map = OffsetMap(opcodes)
+    spans = [
+        {
+            "new_start": start,
+            "new_end": end,
+            "old_start": offset_map.new_to_old(start, "start"),
+            "old_end": offset_map.new_to_old(end, "end"),
+        }
+        for start, end in merged
+    ]
+    return {
+        "opcodes": opcodes,
+        "changes": [(op[1], op[2]) for op in changed],
+        "spans": spans,
+    }
+
+
+def reextract_changes(
+    document,
+    old_text: str,
+    new_text: str,
+    extract: Callable[[str], List[Dict[str, Any]]],
+    prompt_type: str = "marsiya",
+    user_id: Optional[int] = None,
+    max_segment_size: int = 1000,
+) -> Dict[str, Any]:
+    """
+    Bring a document's entities from ``old_text`` up to date with ``new_text``.
+
+    Only the changed stanzas are passed to ``extract``. Entities that
+    overlap an edit are invalidated (soft-deleted), as are LLM entities in
+    the re-extracted stanzas, which are replaced by the new results. All
+    other entities are shifted to their new offsets; manual and verified
+    entities outside the edits are kept.
+    """
+    plan = plan_reextraction(old_text, new_text, max_segment_size)
+    offset_map = OffsetMap(plan["opcodes"])
+
+    # Call the LLM before touching the database
+    extracted = []
+    for span in plan["spans"]:
+        for entity in extract(new_text[span["new_start"] : span["new_end"]]):
+            extracted.append(
+                dict(
+                    entity,
+                    start=entity["start"] + span["new_start"],
+                    end=entity["end"] + span["new_start"],
+                )
+            )
+
+    def overlaps(entity: Entity, ranges) -> bool:
+        return any(
+            (entity.start_position < end and entity.end_position > start)
+            or (start == end and entity.start_position < start < entity.end_position)
+            for start, end in ranges
+        )
+
+    reextracted_ranges = [(span["old_start"], span["old_end"]) for span in plan["spans"]]
+    position_index = TextPositionIndex(new_text)
+    invalidated, shifted, kept = [], [], set()
+    deltas = EntityCountDeltas()
+
+    entities = Entity.objects.filter(document=document, is_deleted=False).select_related(
+        "entity_type"
+    )
+    for entity in entities:
+        if overlaps(entity, plan["changes"]) or (
+            entity.source == "llm"
+            and not entity.is_verified
+            and overlaps(entity, reextracted_ranges)
+        ):
+            invalidated.append(entity.id)
+            deltas.add(document.id, total=-1, verified=-int(entity.is_verified))
+            continue
+
+        position = offset_map.old_to_new(entity.start_position, entity.end_position)
+        if position is None:
+            invalidated.append(entity.id)
+            deltas.add(document.id, total=-1, verified=-int(entity.is_verified))
+            continue
+
+        start, end = position
+        kept.add((start, end, entity.entity_type.name.upper()))
+        context_before, context_after = position_index.context(start, end)
+        values = {
+            "start_position": start,
+            "end_position": end,
+            "line_number": position_index.line_number(start),
+            "word_position": position_index.word_position(start),
+            "context_before": context_before,
+            "context_after": context_after,
+        }
+        if any(getattr(entity, field) != value for field, value in values.items()):
+            for field, value in values.items():
+                setattr(entity, field, value)
+            entity.search_text = entity.build_search_text()
+            shifted.append(entity)
+
+    # Kept manual or verified entities win over re-extracted duplicates
+    new_entities = [
+        entity
+        for entity in extracted
+        if (entity["start"], entity["end"], str(entity["entity_type"]).upper()) not in kept
+    ]
+
+    with transaction.atomic():
+        if invalidated:
+            Entity.objects.filter(id__in=invalidated).update(
+                is_deleted=True, deleted_at=timezone.now(), deleted_by_id=user_id
+            )
+            deltas.apply()
+        if shifted:
+            Entity.objects.bulk_update(
+                shifted,
+                [
+                    "start_position",
+                    "end_position",
+                    "line_number",
+                    "word_position",
+                    "context_before",
+                    "context_after",
+                    "search_text",
+                ],
+                batch_size=500,
+            )
+        saved = save_extracted_entities(
+            document, new_entities, prompt_type=prompt_type, user_id=user_id, text=new_text
+        )
+
+    result = {
+        "changed_spans": len(plan["spans"]),
+        "reextracted_characters": sum(s["new_end"] - s["new_start"] for s in plan["spans"]),
+        "total_characters": len(new_text),
+        "entities_invalidated": len(invalidated),
+        "entities_shifted": len(shifted),
+        "entities_extracted": len(saved),
+    }
+    logger.info(f"Incremental re-extraction of document {document.id}: {result}")
+    return result
@@ -0,0 +1,97 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from llm_integration.benchmark import FakeProviderConfig, compare_results, run_benchmark
+
+
+def _sizes(value):
+    try:
+        sizes = [int(size) for size in value.split(",") if size.strip()]
+    except ValueError:
+        raise CommandError(f"Invalid sizes: {value}")
+    if not sizes or min(sizes) < 1:
+        raise CommandError(f"Invalid sizes: {value}")
+    return sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark entity extraction against a fake LLM provider on synthetic "
+        "marsiya corpora and write the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=_sizes, default=[10, 50, 200],
+            help="Comma-separated corpus sizes in stanzas (default: 10,50,200)",
+        )
+        parser.add_argument(
+            "--documents", type=int, default=5, help="Documents per corpus size"
+        )
+        parser.add_argument(
+            "--latency", type=float, default=0.2, help="Fake provider base latency in seconds"
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0.25, help="Relative latency jitter (0.25 = +/-25%%)"
+        )
+        parser.add_argument(
+            "--tokens-per-second", type=float, default=200.0,
+            help="Fake provider output throughput",
+        )
+        parser.add_argument(
+            "--error-rate", type=float, default=0.0,
+            help="Fraction of provider calls that fail with a retryable 503",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--overlap-size", type=int, default=100)
+        parser.add_argument(
+            "--no-tracemalloc", action="store_true",
+            help="Skip peak memory tracing, which slows the Python stages down",
+        )
+        parser.add_argument("--output", help="Write the results to this file instead of stdout")
+        parser.add_argument(
+            "--compare", help="Baseline results file to report relative changes against"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            provider = FakeProviderConfig(
+                latency=options["latency"],
+                jitter=options["jitter"],
+                tokens_per_second=options["tokens_per_second"],
+                error_rate=options["error_rate"],
+                seed=options["seed"],
+            )
+            results = run_benchmark(
+                sizes=options["sizes"],
+                documents=options["documents"],
+                provider=provider,
+                chunk_size=options["chunk_size"],
+                overlap_size=options["overlap_size"],
+                trace_memory=not options["no_tracemalloc"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = json.dumps(results, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            for result in results["results"]:
+                self.stdout.write(
+                    f"{result['stanzas']} stanzas: "
+                    f"{result['documents_per_minute']:.1f} documents/min, "
+                    f"p95 {result['document_latency']['p95']:.3f}s, "
+                    f"{result['queries_per_document']:.1f} queries/document"
+                )
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                baseline = json.load(f)
+            self.stderr.write(
+                f"Change against {baseline.get('commit') or options['compare']} (%):"
+            )
+            self.stderr.write(json.dumps(compare_results(baseline, results), indent=2))
@@ -0,0 +1,135 @@
+import bisect
+import logging
+import unicodedata
+from collections import deque
+from typing import Dict, List, Iterable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Zero-width (non-)joiners appear inside Urdu words and do not end them
+WORD_JOINERS = {"\u200c", "\u200d"}
+
+
+def is_word_char(char: str) -> bool:
+    """Check whether a character is part of a word (letters, digits, marks)."""
+    return (
+        char.isalnum()
+        or char in WORD_JOINERS
+        or unicodedata.category(char).startswith("M")
+    )
+
+
+class AhoCorasickMatcher:
+    """
+    Multi-pattern string matcher (Aho–Corasick automaton).
+
+    The automaton is built once for a set of patterns and then finds every
+    occurrence of all of them in a single pass over the text, so resolving
+    many entity surface forms costs O(text + matches) instead of one scan
+    per entity.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._build()
+
+    def _build(self):
+        """Build the trie and its failure links."""
+        for pattern_index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(pattern_index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield ``(start, end, pattern)`` for every occurrence in the text."""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_index in self._output[state]:
+                pattern = self.patterns[pattern_index]
+                yield position + 1 - len(pattern), position + 1, pattern
+
+    def find_words(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Find occurrences that are whole words.
+
+        A match must not be preceded or followed by a word character, so a
+        name is not matched inside a longer word.
+        """
+        matches = []
+        for start, end, pattern in self.iter_matches(text):
+            if start > 0 and is_word_char(text[start - 1]) and is_word_char(pattern[0]):
+                continue
+            if end < len(text) and is_word_char(text[end]) and is_word_char(pattern[-1]):
+                continue
+            matches.append((start, end, pattern))
+
+        matches.sort()
+        return matches
+
+
+class TextPositionIndex:
+    """
+    Map character offsets in a text to line numbers and word positions.
+
+    Line and word start offsets are computed once, so each lookup is a
+    binary search.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.line_starts = [0]
+        position = 0
+        for line in text.splitlines(keepends=True):
+            position += len(line)
+            self.line_starts.append(position)
+
+        self.word_starts = [
+            i
+            for i, char in enumerate(text)
+            if not char.isspace() and (i == 0 or text[i - 1].isspace())
+        ]
+
+    def line_number(self, offset: int) -> int:
+        """Get the 1-based line number containing an offset."""
+        line_count = len(self.line_starts) - 1
+        return max(1, min(bisect.bisect_right(self.line_starts, offset), line_count))
+
+    def word_position(self, offset: int) -> int:
+        """Get the 1-based position of the word at an offset within its line."""
+        line_start = self.line_starts[self.line_number(offset) - 1]
+        first_word = bisect.bisect_left(self.word_starts, line_start)
+        return max(1, bisect.bisect_right(self.word_starts, offset) - first_word)
+
+    def context(self, start: int, end: int, size: int = 50) -> Tuple[str, str]:
+        """Get the text before and after a span."""
+        return (
+            self.text[max(0, start - size) : start],
+            self.text[end : end + size],
+        )
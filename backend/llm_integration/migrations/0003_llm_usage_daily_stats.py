@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm_integration', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LLMUsageDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('request_count', models.IntegerField(default=0)),
+                ('failed_request_count', models.IntegerField(default=0)),
+                ('chunk_count', models.IntegerField(default=0)),
+                ('entities_extracted', models.IntegerField(default=0)),
+                ('total_processing_time', models.FloatField(default=0, help_text='Seconds')),
+                ('llm_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='llm_integration.llmmodel')),
+            ],
+            options={
+                'verbose_name': 'LLM Usage Daily Stats',
+                'verbose_name_plural': 'LLM Usage Daily Stats',
+                'db_table': 'llm_integration_llm_usage_daily_stats',
+                'ordering': ['-date', 'llm_model'],
+                'unique_together': {('date', 'llm_model')},
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('llm_integration', '0003_llm_usage_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='llmusagedailystats',
+            name='cache_hit_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='llmusagedailystats',
+            name='completion_tokens',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='llmusagedailystats',
+            name='prompt_tokens',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='llmusagedailystats',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=14),
+        ),
+        migrations.AlterField(
+            model_name='llmmodel',
+            name='total_cost',
+            field=models.DecimalField(decimal_places=6, default=0.0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name='LLMUsageRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('operation', models.CharField(choices=[('extract', 'Extraction'), ('stream', 'Streaming Extraction'), ('hedge', 'Hedged Calls')], default='extract', max_length=20)),
+                ('success', models.BooleanField(default=True)),
+                ('cache_hit', models.BooleanField(default=False)),
+                ('chunk_count', models.PositiveIntegerField(default=0)),
+                ('entity_count', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('completion_tokens', models.PositiveIntegerField(default=0)),
+                ('latency', models.FloatField(help_text='Seconds')),
+                ('cost', models.DecimalField(decimal_places=6, default=0, max_digits=12)),
+                ('llm_model', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_records', to='llm_integration.llmmodel')),
+            ],
+            options={
+                'verbose_name': 'LLM Usage Record',
+                'verbose_name_plural': 'LLM Usage Records',
+                'db_table': 'llm_integration_llm_usage_record',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['llm_model', 'created_at'], name='llm_integra_llm_mod_3d2619_idx'), models.Index(fields=['llm_model', 'latency'], name='llm_integra_llm_mod_c637a8_idx')],
+            },
+        ),
+    ]
@@ -1,7 +1,14 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from core.models import UserStampedModel, SoftDeleteModel
+from decimal import Decimal
+
+# Costs are kept to a millionth of the currency unit
+COST_PRECISION = Decimal('0.000001')
 
 
 class LLMModel(UserStampedModel, SoftDeleteModel):
@@ -50,8 +57,8 @@ class LLMModel(UserStampedModel, SoftDeleteModel):
         default=0.00
     )
     total_cost = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
+        max_digits=14,
+        decimal_places=6,
         default=0.00
     )
     
@@ -107,34 +114,31 @@ class LLMModel(UserStampedModel, SoftDeleteModel):
             return False
     
     def record_request(self, success: bool, response_time: float = None, tokens_used: int = 0):
-        """Record API request metrics."""
-        self.total_requests += 1
-        
-        if success:
-            self.successful_requests += 1
-        else:
-            self.failed_requests += 1
-        
+        """Record API request metrics with one atomic update."""
+        updates = {
+            'total_requests': F('total_requests') + 1,
+            'successful_requests': F('successful_requests') + int(success),
+            'failed_requests': F('failed_requests') + int(not success),
+        }
         if response_time:
-            if self.average_response_time:
-                # Calculate running average
-                self.average_response_time = (
-                    (self.average_response_time * (self.total_requests - 1) + response_time) 
-                    / self.total_requests
-                )
-            else:
-                self.average_response_time = response_time
-        
-        # Calculate cost
+            # The right-hand side sees the row before this update
+            updates['average_response_time'] = (
+                Coalesce(F('average_response_time'), 0.0) * F('total_requests') + response_time
+            ) / (F('total_requests') + 1)
         if tokens_used > 0:
-            cost = (tokens_used / 1000) * float(self.cost_per_1k_tokens)
-            self.total_cost += cost
+            updates['total_cost'] = F('total_cost') + self.get_cost(tokens_used)
         
-        self.save(update_fields=[
+        LLMModel.objects.filter(pk=self.pk).update(**updates)
+        self.refresh_from_db(fields=[
             'total_requests', 'successful_requests', 'failed_requests',
             'average_response_time', 'total_cost'
         ])
     
+    def get_cost(self, tokens: int) -> Decimal:
+        """Get the cost of ``tokens`` tokens at this model's price."""
+        price = Decimal(str(self.cost_per_1k_tokens))
+        return (Decimal(tokens) / 1000 * price).quantize(COST_PRECISION)
+    
     def get_success_rate(self):
         """Get success rate percentage."""
         if self.total_requests == 0:
@@ -282,3 +286,82 @@ class LLMProcessingConfig(models.Model):
             'overlap_size': self.overlap_size,
             'effective_chunk_size': self.chunk_size - self.overlap_size
         }
+
+
+class LLMUsageDailyStats(models.Model):
+    """Daily rollup of entity extraction requests per LLM model."""
+    
+    date = models.DateField()
+    llm_model = models.ForeignKey(
+        LLMModel,
+        on_delete=models.CASCADE,
+        related_name='daily_stats'
+    )
+    
+    # Counters, maintained incrementally from the usage ledger. Requests
+    # count provider-backed extractions; cache hits are counted apart.
+    request_count = models.IntegerField(default=0)
+    failed_request_count = models.IntegerField(default=0)
+    cache_hit_count = models.IntegerField(default=0)
+    chunk_count = models.IntegerField(default=0)
+    entities_extracted = models.IntegerField(default=0)
+    prompt_tokens = models.BigIntegerField(default=0)
+    completion_tokens = models.BigIntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=14, decimal_places=6, default=0)
+    total_processing_time = models.FloatField(default=0, help_text="Seconds")
+    
+    class Meta:
+        db_table = 'llm_integration_llm_usage_daily_stats'
+        verbose_name = 'LLM Usage Daily Stats'
+        verbose_name_plural = 'LLM Usage Daily Stats'
+        ordering = ['-date', 'llm_model']
+        unique_together = ['date', 'llm_model']
+    
+    def __str__(self):
+        return f"{self.date} {self.llm_model.name}: {self.request_count}"
+
+
+class LLMUsageRecord(models.Model):
+    """One entity extraction request in the append-only LLM usage ledger."""
+    
+    llm_model = models.ForeignKey(
+        LLMModel,
+        on_delete=models.CASCADE,
+        related_name='usage_records'
+    )
+    # When the request finished, not when the ledger batch was written
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    OPERATION_CHOICES = [
+        ('extract', 'Extraction'),
+        ('stream', 'Streaming Extraction'),
+        ('hedge', 'Hedged Calls'),
+    ]
+    operation = models.CharField(max_length=20, choices=OPERATION_CHOICES, default='extract')
+    success = models.BooleanField(default=True)
+    cache_hit = models.BooleanField(default=False)
+    
+    # Work and usage reported for the request
+    chunk_count = models.PositiveIntegerField(default=0)
+    entity_count = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveIntegerField(default=0)
+    completion_tokens = models.PositiveIntegerField(default=0)
+    latency = models.FloatField(help_text="Seconds")
+    cost = models.DecimalField(max_digits=12, decimal_places=6, default=0)
+    
+    class Meta:
+        db_table = 'llm_integration_llm_usage_record'
+        verbose_name = 'LLM Usage Record'
+        verbose_name_plural = 'LLM Usage Records'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['llm_model', 'created_at']),
+            models.Index(fields=['llm_model', 'latency']),
+        ]
+    
+    def __str__(self):
+        return f"{self.llm_model.name} {self.operation} at {self.created_at}"
+    
+    @property
+    def total_tokens(self):
+        return self.prompt_tokens + self.completion_tokens
@@ -0,0 +1,119 @@
+import logging
+from typing import Dict, List, Any, Iterable, Optional
+from django.conf import settings
+from django.db import transaction
+from core.metrics import EXTRACTION_STAGE_SECONDS
+from documents.counters import EntityCountDeltas
+from entities.models import Entity, EntityType
+from .matching import TextPositionIndex
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_entity_types(names: Iterable[str]) -> Dict[str, EntityType]:
+    """
+    Get entity types by upper-cased name, creating missing ones.
+
+    Uses one query for the lookup and one bulk insert for any new types.
+    """
+    names = {str(name).upper() for name in names if name}
+    entity_types = {
+        entity_type.name: entity_type
+        for entity_type in EntityType.objects.filter(name__in=names)
+    }
+
+    missing = names - entity_types.keys()
+    if missing:
+        EntityType.objects.bulk_create(
+            [
+                EntityType(
+                    name=name,
+                    display_name=name.replace("_", " ").title(),
+                    description=f"{name.title()} entities extracted by the LLM",
+                )
+                for name in sorted(missing)
+            ],
+            ignore_conflicts=True,
+        )
+        # Re-read so concurrently created types are picked up with their ids
+        entity_types.update(
+            {
+                entity_type.name: entity_type
+                for entity_type in EntityType.objects.filter(name__in=missing)
+            }
+        )
+        logger.info(f"Created entity types: {', '.join(sorted(missing))}")
+
+    return entity_types
+
+
+def save_extracted_entities(
+    document,
+    entities_data: List[Dict[str, Any]],
+    prompt_type: str = "marsiya",
+    user_id: Optional[int] = None,
+    text: Optional[str] = None,
+    batch_size: Optional[int] = None,
+) -> List[Entity]:
+    """
+    Persist LLM-extracted entities for a document in batches.
+
+    Entity types are resolved in a single query and entities are written with
+    ``bulk_create`` inside one transaction. Line numbers, word positions and
+    surrounding context are computed from ``text`` (the document content by
+    default) in the same pass.
+    """
+    if not entities_data:
+        return []
+
+    text = document.content if text is None else text
+    batch_size = batch_size or settings.LLM_ENTITY_BATCH_SIZE
+
+    with EXTRACTION_STAGE_SECONDS.time(stage="persist_build"):
+        position_index = TextPositionIndex(text)
+        entity_types = resolve_entity_types(e["entity_type"] for e in entities_data)
+
+        entities = []
+        for entity_data in entities_data:
+            entity_type = entity_types.get(str(entity_data["entity_type"]).upper())
+            if entity_type is None:
+                continue
+
+            start = entity_data["start"]
+            end = entity_data["end"]
+            context_before, context_after = position_index.context(start, end)
+            entity = Entity(
+                document=document,
+                text=entity_data["text"][:500],
+                entity_type=entity_type,
+                start_position=start,
+                end_position=end,
+                line_number=position_index.line_number(start),
+                word_position=position_index.word_position(start),
+                confidence_score=entity_data.get("confidence", 0.8),
+                source="llm",
+                context_before=context_before,
+                context_after=context_after,
+                created_by_id=user_id,
+                attributes={
+                    "llm_model": entity_data.get("llm_model", "unknown"),
+                    "prompt_type": entity_data.get("prompt_type", prompt_type),
+                    "processing_time": entity_data.get("processing_time", 0),
+                    "extraction_method": "llm",
+                },
+            )
+            # bulk_create skips save(), so the search text is built here
+            entity.search_text = entity.build_search_text()
+            entities.append(entity)
+
+    with EXTRACTION_STAGE_SECONDS.time(stage="persist_write"), transaction.atomic():
+        saved_entities = Entity.objects.bulk_create(entities, batch_size=batch_size)
+        deltas = EntityCountDeltas()
+        deltas.add(document.id, total=len(saved_entities))
+        deltas.apply()
+
+    logger.info(
+        f"Saved {len(saved_entities)} entities for document {document.id} "
+        f"in batches of {batch_size}"
+    )
+    return saved_entities
@@ -0,0 +1,282 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from typing import List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when capacity does not free up within the maximum wait."""
+
+
+# Atomically refill and take from several buckets at once. Either every
+# bucket has enough tokens and all are charged, or nothing is taken and the
+# longest wait (in milliseconds) until all of them would have capacity is
+# returned. KEYS are bucket keys, ARGV holds now_ms, ttl and then a
+# (capacity, refill_per_ms, amount) triple per key.
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 3
+    local capacity = tonumber(ARGV[base + 1])
+    local rate = tonumber(ARGV[base + 2])
+    local amount = math.min(tonumber(ARGV[base + 3]), capacity)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens - amount
+    if tokens < amount then
+        wait = math.max(wait, math.ceil((amount - tokens) / rate))
+    end
+end
+if wait > 0 then
+    return wait
+end
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, 'tokens', levels[i], 'ts', now)
+    redis.call('PEXPIRE', key, ttl)
+end
+return 0
+"""
+
+
+class TokenBucketLimiter:
+    """
+    Distributed token-bucket limiter backed by the Django cache.
+
+    With the Redis cache backend all buckets are checked and charged in a
+    single Lua script, so every worker process shares the same budget.
+    Other backends (e.g. local memory in development) fall back to an
+    in-process implementation with the same semantics.
+    """
+
+    KEY_PREFIX = "llm_ratelimit"
+
+    def __init__(self, cache_alias: Optional[str] = None):
+        self.cache_alias = cache_alias
+        self._lock = threading.Lock()
+        self._script = None
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or settings.LLM_CACHE_ALIAS]
+
+    def _redis_acquire(self, buckets, now_ms: int, ttl_ms: int) -> int:
+        keys = [self.cache.make_and_validate_key(key) for key, _, _, _ in buckets]
+        client = self.cache._cache.get_client(keys[0], write=True)
+        if self._script is None:
+            self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+        args = [now_ms, ttl_ms]
+        for _, capacity, rate, amount in buckets:
+            args.extend([capacity, rate, amount])
+        return int(self._script(keys=keys, args=args, client=client))
+
+    def _local_acquire(self, buckets, now_ms: int, ttl_ms: int) -> int:
+        with self._lock:
+            levels = []
+            wait = 0
+            for key, capacity, rate, amount in buckets:
+                amount = min(amount, capacity)
+                state = self.cache.get(key) or {"tokens": capacity, "ts": now_ms}
+                tokens = min(capacity, state["tokens"] + max(0, now_ms - state["ts"]) * rate)
+                levels.append(tokens - amount)
+                if tokens < amount:
+                    wait = max(wait, int((amount - tokens) / rate + 0.999))
+            if wait:
+                return wait
+
+            for (key, _, _, _), tokens in zip(buckets, levels):
+                self.cache.set(key, {"tokens": tokens, "ts": now_ms}, timeout=ttl_ms / 1000)
+            return 0
+
+    def try_acquire(self, buckets: List[Tuple[str, float, float, float]]) -> float:
+        """
+        Try to take tokens from every bucket at once.
+
+        ``buckets`` holds ``(key, capacity, refill_per_second, amount)``
+        tuples. Returns 0 when the tokens were taken, otherwise the number
+        of seconds to wait before trying again.
+        """
+        buckets = [
+            (f"{self.KEY_PREFIX}:{key}", capacity, rate / 1000.0, amount)
+            for key, capacity, rate, amount in buckets
+            if capacity > 0 and rate > 0
+        ]
+        if not buckets:
+            return 0.0
+
+        now_ms = int(time.time() * 1000)
+        # Keep state until the slowest bucket would be full again
+        ttl_ms = int(max(capacity / rate for _, capacity, rate, _ in buckets)) + 1000
+
+        if isinstance(self.cache, RedisCache):
+            wait_ms = self._redis_acquire(buckets, now_ms, ttl_ms)
+        else:
+            wait_ms = self._local_acquire(buckets, now_ms, ttl_ms)
+        return wait_ms / 1000.0
+
+    def get_available(self, buckets: List[Tuple[str, float, float, float]]) -> float:
+        """
+        Get the fraction of capacity left in the emptiest of ``buckets``.
+
+        Takes the same tuples as ``try_acquire`` but charges nothing.
+        """
+        now_ms = int(time.time() * 1000)
+        available = 1.0
+        for key, capacity, rate, _ in buckets:
+            if capacity <= 0 or rate <= 0:
+                continue
+            key = f"{self.KEY_PREFIX}:{key}"
+            if isinstance(self.cache, RedisCache):
+                redis_key = self.cache.make_and_validate_key(key)
+                client = self.cache._cache.get_client(redis_key)
+                tokens, ts = client.hmget(redis_key, "tokens", "ts")
+                state = {"tokens": float(tokens), "ts": float(ts)} if tokens is not None else None
+            else:
+                state = self.cache.get(key)
+            if state is None:
+                continue
+            tokens = min(capacity, state["tokens"] + max(0, now_ms - state["ts"]) * rate / 1000.0)
+            available = min(available, max(0.0, tokens) / capacity)
+        return available
+
+
+class ModelRateLimiter:
+    """
+    Enforce an LLM model's request and token limits across all workers.
+
+    Requests are metered against ``rate_limit_per_minute`` and
+    ``rate_limit_per_hour``; tokens against the optional
+    ``tokens_per_minute`` provider setting.
+    """
+
+    def __init__(self, llm_model, limiter: Optional[TokenBucketLimiter] = None):
+        self.llm_model = llm_model
+        self.limiter = limiter or token_bucket_limiter
+
+    def get_buckets(self, tokens: int) -> List[Tuple[str, float, float, float]]:
+        """Get the buckets a request with ``tokens`` tokens is charged against."""
+        model_key = f"model:{self.llm_model.pk}"
+        buckets = [
+            (f"{model_key}:rpm", self.llm_model.rate_limit_per_minute, self.llm_model.rate_limit_per_minute / 60.0, 1),
+            (f"{model_key}:rph", self.llm_model.rate_limit_per_hour, self.llm_model.rate_limit_per_hour / 3600.0, 1),
+        ]
+        tokens_per_minute = int(self.llm_model.get_setting("tokens_per_minute", 0) or 0)
+        if tokens_per_minute and tokens:
+            buckets.append((f"{model_key}:tpm", tokens_per_minute, tokens_per_minute / 60.0, tokens))
+        return buckets
+
+    def get_available(self) -> float:
+        """Get the fraction of the model's request budget that is left."""
+        return self.limiter.get_available(self.get_buckets(tokens=0))
+
+    async def acquire(self, tokens: int = 0):
+        """Wait until the model has capacity for one request of ``tokens`` tokens."""
+        deadline = time.monotonic() + settings.LLM_RATE_LIMIT_MAX_WAIT
+        buckets = self.get_buckets(tokens)
+
+        while True:
+            wait = await asyncio.to_thread(self.limiter.try_acquire, buckets)
+            if not wait:
+                return
+            if time.monotonic() + wait > deadline:
+                raise RateLimitExceeded(
+                    f"Rate limit for {self.llm_model.model_name} not available "
+                    f"within {settings.LLM_RATE_LIMIT_MAX_WAIT}s"
+                )
+            logger.debug(f"Rate limited {self.llm_model.model_name}, waiting {wait:.2f}s")
+            # Jitter so waiting workers do not all retry at the same moment
+            await asyncio.sleep(wait * random.uniform(1.0, 1.2))
+
+
+token_bucket_limiter = TokenBucketLimiter()
+
+
+def estimate_tokens(text: str, max_tokens: int = 0) -> int:
+    """Roughly estimate the tokens a request uses (about four characters per token)."""
+    return len(text) // 4 + 1 + (max_tokens or 0)
+
+
+def get_retry_after(exc: Exception) -> Optional[float]:
+    """Get the Retry-After delay in seconds from a provider error, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        retry_date = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_date.timestamp() - time.time())
+
+
+def is_retryable(exc: Exception) -> bool:
+    """Check whether a provider error is worth retrying (429, 5xx, timeouts)."""
+    if isinstance(exc, (RateLimitExceeded, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code == 429 or status_code >= 500
+    # Connection and timeout errors of the provider SDKs have no status
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def get_retry_delay(
+    attempt: int,
+    exc: Optional[Exception] = None,
+    base: Optional[float] = None,
+    cap: Optional[float] = None,
+) -> float:
+    """
+    Get how long to wait before retry number ``attempt`` (starting at 0).
+
+    Uses exponential backoff with full jitter, capped at ``cap`` seconds. A
+    Retry-After from the provider is honoured as the minimum delay.
+    """
+    base = settings.LLM_RETRY_BASE_DELAY if base is None else base
+    cap = settings.LLM_RETRY_MAX_DELAY if cap is None else cap
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    retry_after = get_retry_after(exc) if exc is not None else None
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def get_task_retry_countdown(task, exc: Exception) -> float:
+    """Get the backoff for a Celery task retry, scaled from its default_retry_delay."""
+    return get_retry_delay(
+        task.request.retries,
+        exc,
+        base=task.default_retry_delay,
+        cap=task.default_retry_delay * 16,
+    )
@@ -0,0 +1,206 @@
+import logging
+import time
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import caches
+from .models import LLMModel
+from .ratelimit import ModelRateLimiter, is_retryable
+
+logger = logging.getLogger(__name__)
+
+# Providers LLMService can send interactive requests to
+ROUTABLE_PROVIDERS = ("openai", "anthropic")
+
+
+class ModelHealth:
+    """
+    Recent latency and error rate of each LLM model, shared through the cache.
+
+    Latency is tracked as a smoothed mean and mean deviation (the same
+    estimator TCP uses for round-trip times), the error rate as an
+    exponentially weighted average. A model that fails several times in a
+    row is skipped by the router for a cooldown period.
+    """
+
+    KEY_PREFIX = "llm_health"
+    TTL = 60 * 60
+    LATENCY_GAIN = 0.125
+    DEVIATION_GAIN = 0.25
+    ERROR_GAIN = 0.1
+
+    def __init__(self, cache_alias: Optional[str] = None):
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias or settings.LLM_CACHE_ALIAS]
+
+    def _key(self, llm_model: LLMModel) -> str:
+        return f"{self.KEY_PREFIX}:{llm_model.pk}"
+
+    def get(self, llm_model: LLMModel) -> Dict[str, Any]:
+        """Get the health record of a model (a clean record if none is available)."""
+        try:
+            health = self.cache.get(self._key(llm_model))
+        except Exception as e:
+            logger.debug(f"Failed to read health of {llm_model.model_name}: {e}")
+            health = None
+        return health or {
+            "latency": None,
+            "deviation": 0.0,
+            "error_rate": 0.0,
+            "failures": 0,
+            "open_until": 0.0,
+        }
+
+    def _save(self, llm_model: LLMModel, health: Dict[str, Any]):
+        try:
+            self.cache.set(self._key(llm_model), health, timeout=self.TTL)
+        except Exception as e:
+            logger.debug(f"Failed to record health of {llm_model.model_name}: {e}")
+
+    def record_success(self, llm_model: LLMModel, latency: float):
+        """Record a successful request and its latency in seconds."""
+        health = self.get(llm_model)
+        if health["latency"] is None:
+            health["latency"] = latency
+            health["deviation"] = latency / 2
+        else:
+            health["deviation"] += self.DEVIATION_GAIN * (
+                abs(latency - health["latency"]) - health["deviation"]
+            )
+            health["latency"] += self.LATENCY_GAIN * (latency - health["latency"])
+        health["error_rate"] *= 1 - self.ERROR_GAIN
+        health["failures"] = 0
+        self._save(llm_model, health)
+
+    def record_failure(self, llm_model: LLMModel):
+        """Record a failed request; repeated failures open the circuit."""
+        health = self.get(llm_model)
+        health["error_rate"] += self.ERROR_GAIN * (1 - health["error_rate"])
+        health["failures"] += 1
+        if health["failures"] >= settings.LLM_CIRCUIT_FAILURE_THRESHOLD:
+            health["open_until"] = time.time() + settings.LLM_CIRCUIT_COOLDOWN
+            logger.warning(
+                f"LLM model {llm_model.model_name} failed {health['failures']} times "
+                f"in a row, skipping it for {settings.LLM_CIRCUIT_COOLDOWN}s"
+            )
+        self._save(llm_model, health)
+
+    def is_available(self, llm_model: LLMModel) -> bool:
+        """Check whether the model's circuit is closed."""
+        return self.get(llm_model)["open_until"] <= time.time()
+
+    def get_hedge_delay(self, llm_model: LLMModel) -> float:
+        """
+        Get how long to wait for a model before hedging to another one.
+
+        This is a high percentile estimate of the model's latency
+        (mean plus four deviations), never below ``LLM_HEDGE_DELAY``.
+        """
+        health = self.get(llm_model)
+        if health["latency"] is None:
+            return settings.LLM_HEDGE_DELAY
+        return max(settings.LLM_HEDGE_DELAY, health["latency"] + 4 * health["deviation"])
+
+
+class ModelRouter:
+    """
+    Pick the LLM model for each request and fail over between models.
+
+    Active models are ranked by ``priority`` (lower first) and
+    ``is_default``, adjusted for recent error rate, latency and how much
+    of their rate limit budget is left. Models with an open circuit are
+    only used when nothing else is available.
+    """
+
+    DEFAULT_BONUS = 0.5
+    ERROR_WEIGHT = 10.0
+    LATENCY_WEIGHT = 0.2
+    BUDGET_WEIGHT = 5.0
+
+    def __init__(self, health: Optional[ModelHealth] = None):
+        self.health = health or model_health
+
+    def get_candidates(self) -> List[LLMModel]:
+        """Get the active models that can serve extraction requests."""
+        models = list(LLMModel.objects.filter(is_active=True))
+        routable = [m for m in models if m.provider in ROUTABLE_PROVIDERS]
+        return routable or models
+
+    def score(self, llm_model: LLMModel) -> float:
+        """Score a model for routing; lower is better."""
+        health = self.health.get(llm_model)
+        score = float(llm_model.priority)
+        if llm_model.is_default:
+            score -= self.DEFAULT_BONUS
+        score += self.ERROR_WEIGHT * health["error_rate"]
+        score += self.LATENCY_WEIGHT * (health["latency"] or 0.0)
+        try:
+            budget = ModelRateLimiter(llm_model).get_available()
+        except Exception as e:
+            logger.debug(f"Failed to read rate limit budget of {llm_model.model_name}: {e}")
+            budget = 1.0
+        score += self.BUDGET_WEIGHT * (1 - budget)
+        return score
+
+    def rank_models(self) -> List[LLMModel]:
+        """Get the candidate models, best first."""
+        scored = [
+            (not self.health.is_available(m), self.score(m), m.priority, m.name, m)
+            for m in self.get_candidates()
+        ]
+        scored.sort(key=lambda s: s[:4])
+        return [s[-1] for s in scored]
+
+    def select_model(self) -> Optional[LLMModel]:
+        """Get the best model for the next request."""
+        ranked = self.rank_models()
+        return ranked[0] if ranked else None
+
+    def extract_entities(
+        self,
+        text: str,
+        prompt_type: str = "marsiya",
+        hedge: bool = False,
+        usage=None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract entities, failing over to the next model on timeouts, rate
+        limits and server errors.
+
+        With ``hedge`` every provider call that is slower than usual is also
+        sent to the next model and the first answer wins. This trades extra
+        spend for lower tail latency, so it is meant for interactive requests.
+        The tokens used by every attempt are added to ``usage`` (a
+        ``TokenUsage``) when it is given.
+        """
+        from .services import LLMService
+
+        ranked = self.rank_models()
+        if not ranked:
+            raise ValueError("No active LLM model found")
+
+        last_error = None
+        for index, llm_model in enumerate(ranked):
+            hedge_model = ranked[index + 1] if hedge and index + 1 < len(ranked) else None
+            service = None
+            try:
+                service = LLMService(llm_model, hedge_model=hedge_model)
+                return service.extract_entities(text, prompt_type)
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                last_error = e
+                logger.warning(
+                    f"Extraction with {llm_model.model_name} failed ({e}), "
+                    f"failing over to the next model"
+                )
+            finally:
+                if usage is not None and service is not None:
+                    usage.merge(service.get_token_usage())
+        raise last_error
+
+
+model_health = ModelHealth()
+model_router = ModelRouter()
@@ -1,11 +1,19 @@
-import json
+import asyncio
+import bisect
 import logging
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from django.conf import settings
-from django.core.cache import cache
-from django.utils import timezone
 from .models import LLMModel, LLMProcessingConfig
+from .cache import ExtractionCache
+from .chunking import TextChunker, merge_chunk_entities, split_segments
+from .matching import AhoCorasickMatcher
+from .ratelimit import ModelRateLimiter, estimate_tokens, get_retry_delay, is_retryable
+from .router import model_health, model_router
+from .streaming import EntityStreamParser
+from .usage import TokenUsage, build_usage_record, usage_ledger
+from .clients import client_pool, get_provider_api_key
+from core.metrics import EXTRACTION_STAGE_SECONDS, LLM_REQUEST_SECONDS
 from entities.models import EntityType
 from documents.models import Document
 from entities.models import Entity
@@ -15,12 +23,18 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+EXTRACTION_SYSTEM_PROMPT = "You are an expert in Named Entity Recognition (NER). Extract entities from the given text and return them in JSON format with the following structure: [{'text': 'entity_text', 'entity_type': 'PERSON', 'start': 0, 'end': 10, 'confidence': 0.9}]"
+
 
 class LLMService:
     """Service class for handling LLM operations and entity extraction."""
 
-    def __init__(self, llm_model: Optional[LLMModel] = None):
-        self.llm_model = llm_model or LLMModel.objects.filter(is_active=True).first()
+    def __init__(
+        self,
+        llm_model: Optional[LLMModel] = None,
+        hedge_model: Optional[LLMModel] = None,
+    ):
+        self.llm_model = llm_model or model_router.select_model()
         self.config = LLMProcessingConfig.objects.filter(is_active=True).first()
 
         if not self.llm_model:
@@ -29,14 +43,19 @@ class LLMService:
         if not self.config:
             raise ValueError("No active LLM processing configuration found")
 
+        # Slow provider calls are also sent to this model (see _acall_llm_hedged)
+        self.hedge_service = LLMService(hedge_model) if hedge_model else None
+        # Tokens reported by this service's provider responses
+        self.usage = TokenUsage()
+        self._known_entity_types = None
+
     def _get_client(self):
-        """Get the appropriate LLM client based on the provider."""
-        if self.llm_model.provider == "openai":
-            return openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        elif self.llm_model.provider == "anthropic":
-            return anthropic.Anthropic(api_key=settings.ANTHROPIC_API_KEY)
-        else:
-            raise ValueError(f"Unsupported LLM provider: {self.llm_model.provider}")
+        """Get the pooled async LLM client for the model's provider and endpoint."""
+        return client_pool.get_client(
+            self.llm_model.provider,
+            get_provider_api_key(self.llm_model),
+            self.llm_model.api_base_url,
+        )
 
     def _get_prompt_template(self, prompt_type: str = "marsiya") -> str:
         """Get the appropriate prompt template based on type."""
@@ -61,134 +80,439 @@ class LLMService:
         template = self._get_prompt_template(prompt_type)
         return template.format(text=text)
 
-    def _parse_llm_response(self, response: str) -> List[Dict[str, Any]]:
-        """Parse the LLM response to extract entities."""
-        try:
-            # Try to parse as JSON first
-            if response.strip().startswith("{"):
-                data = json.loads(response)
-                if isinstance(data, dict) and "entities" in data:
-                    return data["entities"]
-                elif isinstance(data, list):
-                    return data
-
-            # Fallback: try to extract entities from text
-            entities = []
-            lines = response.strip().split("\n")
-
-            for line in lines:
-                line = line.strip()
-                if not line or line.startswith("#"):
-                    continue
+    def _get_known_entity_types(self) -> set:
+        """Get the upper-cased names of all entity types, loaded once per service."""
+        if self._known_entity_types is None:
+            self._known_entity_types = {
+                name.upper() for name in EntityType.objects.values_list("name", flat=True)
+            } | {str(name).upper() for name in self.config.entity_types or []}
+        return self._known_entity_types
 
-                # Try to parse entity format: "text:entity_type:start:end"
-                parts = line.split(":")
-                if len(parts) >= 2:
-                    entity_text = parts[0].strip()
-                    entity_type = parts[1].strip()
+    def _get_allowed_entity_types(self) -> Optional[set]:
+        """Get the entity types the config restricts extraction to, if any."""
+        if not self.config.entity_types:
+            return None
+        return {str(name).upper() for name in self.config.entity_types}
 
-                    # Validate entity type
-                    if EntityType.objects.filter(name__iexact=entity_type).exists():
-                        entity = {
+    def _parse_llm_response(self, response: str) -> List[Dict[str, Any]]:
+        """
+        Parse the LLM response to extract entities.
+
+        JSON output is read with the incremental parser, which also keeps
+        the complete entities of a truncated response. Output without any
+        JSON falls back to ``text:ENTITY_TYPE`` lines.
+        """
+        parser = EntityStreamParser(self._get_allowed_entity_types())
+        entities = parser.feed(response) + parser.close()
+        if entities or parser.has_json:
+            return entities
+        return self._parse_entity_lines(response)
+
+    def _parse_entity_lines(self, response: str) -> List[Dict[str, Any]]:
+        """Parse ``text:ENTITY_TYPE[:start:end]`` lines, keeping known entity types."""
+        known_entity_types = self._get_known_entity_types()
+        entities = []
+        for line in response.strip().split("\n"):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            parts = line.split(":")
+            if len(parts) >= 2:
+                entity_text = parts[0].strip()
+                entity_type = parts[1].strip()
+                if entity_text and entity_type.upper() in known_entity_types:
+                    entities.append(
+                        {
                             "text": entity_text,
                             "entity_type": entity_type,
                             "start": 0,  # Will be calculated later
                             "end": len(entity_text),
                         }
-                        entities.append(entity)
-
-            return entities
+                    )
+        return entities
 
-        except (json.JSONDecodeError, Exception) as e:
-            logger.error(f"Error parsing LLM response: {e}")
-            logger.error(f"Response: {response}")
-            return []
+    @staticmethod
+    def _has_valid_offsets(text: str, entity: Dict[str, Any]) -> bool:
+        """Check whether the LLM-supplied offsets point at the entity text."""
+        start, end = entity.get("start"), entity.get("end")
+        if not isinstance(start, int) or not isinstance(end, int):
+            return False
+        return 0 <= start < end <= len(text) and text[start:end] == entity["text"]
 
     def _find_entity_positions(
         self, text: str, entities: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
-        """Find the actual positions of entities in the text."""
-        positioned_entities = []
+        """
+        Find the actual positions of entities in the text.
 
-        for entity in entities:
-            entity_text = entity["text"]
-            entity_type = entity["entity_type"]
-
-            # Find all occurrences of the entity text
-            start = 0
-            while True:
-                pos = text.find(entity_text, start)
-                if pos == -1:
-                    break
+        Offsets supplied by the LLM are kept when they match the text. Other
+        entities are resolved with a single multi-pattern pass that only
+        accepts whole-word matches. The result is ordered by position.
+        """
+        positioned = {}
 
-                positioned_entity = {
-                    "text": entity_text,
+        def add(entity: Dict[str, Any], start: int, end: int):
+            entity_type = entity["entity_type"]
+            key = (start, end, str(entity_type).upper())
+            confidence = entity.get("confidence", 0.8)
+            if key not in positioned or confidence > positioned[key]["confidence"]:
+                positioned[key] = {
+                    "text": entity["text"],
                     "entity_type": entity_type,
-                    "start": pos,
-                    "end": pos + len(entity_text),
-                    "confidence": entity.get("confidence", 0.8),
+                    "start": start,
+                    "end": end,
+                    "confidence": confidence,
                 }
-                positioned_entities.append(positioned_entity)
-                start = pos + 1
 
-        return positioned_entities
+        # Surface form -> entities that still need to be located
+        unresolved = {}
+        for entity in entities:
+            if not entity.get("text") or not entity.get("entity_type"):
+                continue
+            if self._has_valid_offsets(text, entity):
+                add(entity, entity["start"], entity["end"])
+            else:
+                unresolved.setdefault(entity["text"], []).append(entity)
+
+        if unresolved:
+            matcher = AhoCorasickMatcher(unresolved)
+            for start, end, pattern in matcher.find_words(text):
+                for entity in unresolved[pattern]:
+                    add(entity, start, end)
+
+        return sorted(positioned.values(), key=lambda e: (e["start"], e["end"]))
+
+    def build_batch_request(
+        self, custom_id: str, text: str, prompt_type: str = "marsiya"
+    ) -> Dict[str, Any]:
+        """Build a provider-neutral request for batch submission."""
+        return {
+            "custom_id": custom_id,
+            "prompt": self._format_prompt(text, prompt_type),
+            "system": EXTRACTION_SYSTEM_PROMPT,
+            "max_tokens": self.config.max_tokens,
+            "temperature": self._get_temperature(),
+        }
+
+    def _get_temperature(self) -> float:
+        """Get the sampling temperature configured for the LLM model."""
+        return float(self.llm_model.get_setting("temperature", 0.1))
+
+    async def _acall_llm(
+        self,
+        client,
+        prompt: str,
+        system: str = EXTRACTION_SYSTEM_PROMPT,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = True,
+    ) -> str:
+        """
+        Send a single prompt to the provider and return the raw text.
+
+        The call waits for capacity in the model's shared rate limits first.
+        Rate limit, server and connection errors are retried with jittered
+        exponential backoff that honours the provider's Retry-After.
+        """
+        max_tokens = max_tokens or self.config.max_tokens
+        if temperature is None:
+            temperature = self._get_temperature()
+        rate_limiter = ModelRateLimiter(self.llm_model)
+        tokens = estimate_tokens(system + prompt, max_tokens)
+
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            await rate_limiter.acquire(tokens)
+            try:
+                async with client_pool.get_semaphore(self.llm_model):
+                    start_time = time.monotonic()
+                    try:
+                        response = await self._asend_request(
+                            client, prompt, system, max_tokens, temperature, json_mode
+                        )
+                    except BaseException as e:
+                        self._observe_request(time.monotonic() - start_time, "request", type(e))
+                        raise
+                elapsed = time.monotonic() - start_time
+                self._observe_request(elapsed, "request")
+                await asyncio.to_thread(model_health.record_success, self.llm_model, elapsed)
+                return response
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                await asyncio.to_thread(model_health.record_failure, self.llm_model)
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                delay = get_retry_delay(attempt, e)
+                logger.warning(
+                    f"LLM request to {self.llm_model.model_name} failed ({e}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    def _observe_request(self, elapsed: float, mode: str, error: Optional[type] = None):
+        """Add a provider call to the request latency histogram."""
+        if error is None:
+            outcome = "success"
+        elif issubclass(error, (asyncio.CancelledError, GeneratorExit)):
+            # Hedged requests that lost the race and abandoned streams
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        LLM_REQUEST_SECONDS.observe(
+            elapsed,
+            provider=self.llm_model.provider,
+            model=self.llm_model.model_name,
+            mode=mode,
+            outcome=outcome,
+        )
+
+    async def _asend_request(
+        self,
+        client,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        json_mode: bool,
+    ) -> str:
+        """Make the provider API call for one prompt."""
+        if self.llm_model.provider == "openai":
+            options = {}
+            if json_mode:
+                options["response_format"] = {"type": "json_object"}
+            response = await client.chat.completions.create(
+                model=self.llm_model.model_name,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **options,
+            )
+            self.usage.add_usage("openai", getattr(response, "usage", None))
+            return response.choices[0].message.content
+
+        elif self.llm_model.provider == "anthropic":
+            response = await client.messages.create(
+                model=self.llm_model.model_name,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            self.usage.add_usage("anthropic", getattr(response, "usage", None))
+            return response.content[0].text
+        else:
+            raise ValueError(f"Unsupported provider: {self.llm_model.provider}")
+
+    async def _acall_llm_hedged(self, client, prompt: str) -> str:
+        """
+        Send a prompt, and send it to the hedge model as well if the answer
+        takes longer than this model usually does. The first successful
+        answer is used and the other request is cancelled.
+        """
+        delay = await asyncio.to_thread(model_health.get_hedge_delay, self.llm_model)
+        primary = asyncio.ensure_future(self._acall_llm(client, prompt))
+        try:
+            return await asyncio.wait_for(asyncio.shield(primary), delay)
+        except asyncio.TimeoutError:
+            if primary.done():
+                raise
+
+        logger.info(
+            f"{self.llm_model.model_name} is slow, hedging with "
+            f"{self.hedge_service.llm_model.model_name}"
+        )
+        backup = asyncio.ensure_future(
+            self.hedge_service._acall_llm(self.hedge_service._get_client(), prompt)
+        )
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return task.result()
+                error = task.exception()
+        raise error
+
+    async def _acall_llm_for_chunks(
+        self, client, prompts: List[str]
+    ) -> List[str]:
+        """Fan prompts out concurrently; the model's semaphore bounds in-flight calls."""
+        call = self._acall_llm_hedged if self.hedge_service else self._acall_llm
+        return await asyncio.gather(*(call(client, prompt) for prompt in prompts))
+
+    def _call_llm_for_chunks(
+        self, chunks: List[Dict[str, Any]], prompt_type: str
+    ) -> List[str]:
+        """Run the LLM over all chunks concurrently, preserving chunk order."""
+        client = self._get_client()
+        prompts = [self._format_prompt(chunk["text"], prompt_type) for chunk in chunks]
+        return client_pool.run(self._acall_llm_for_chunks(client, prompts))
+
+    def _get_extraction_cache(self, prompt_type: str) -> ExtractionCache:
+        """Get the extraction cache for the current model, prompt and config."""
+        return ExtractionCache(
+            model_name=self.llm_model.model_name,
+            prompt_template=f"{EXTRACTION_SYSTEM_PROMPT}\n{self._get_prompt_template(prompt_type)}",
+            temperature=self._get_temperature(),
+            entity_types=self.config.entity_types,
+        )
+
+    @staticmethod
+    def _group_missed_segments(
+        segments: List[Dict[str, Any]], hits: Dict[int, List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """Group consecutive cache misses into runs that are extracted together."""
+        runs = []
+        for segment in segments:
+            if segment["index"] in hits:
+                continue
+            if runs and runs[-1]["segments"][-1]["index"] == segment["index"] - 1:
+                runs[-1]["segments"].append(segment)
+                runs[-1]["end"] = segment["end"]
+            else:
+                runs.append(
+                    {
+                        "start": segment["start"],
+                        "end": segment["end"],
+                        "segments": [segment],
+                    }
+                )
+        return runs
+
+    def _restore_segment_entities(
+        self, segment: Dict[str, Any], cached_entities: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Shift cached segment entities into document offsets."""
+        offset = segment["start"]
+        restored = []
+        for entity in cached_entities:
+            if segment["text"][entity["start"] : entity["end"]] == entity["text"]:
+                restored.append(entity)
+            else:
+                # The segment differs only in whitespace, so resolve it again
+                restored.extend(self._find_entity_positions(segment["text"], [entity]))
+
+        return [
+            dict(entity, start=entity["start"] + offset, end=entity["end"] + offset)
+            for entity in restored
+        ]
 
     def extract_entities(
         self, text: str, prompt_type: str = "marsiya"
     ) -> List[Dict[str, Any]]:
-        """Extract entities from text using the configured LLM."""
+        """
+        Extract entities from text using the configured LLM.
+
+        Results are cached by content digest for the whole document and for
+        every stanza, so only stanzas that are not cached yet are sent to the
+        provider. Those are split into overlapping chunks (``chunk_size`` /
+        ``overlap_size`` from the processing config) which are processed
+        concurrently and merged back into document offsets.
+        """
         try:
-            # Check cache first
-            cache_key = f"llm_entities:{hash(text)}:{prompt_type}:{self.llm_model.id}"
-            cached_result = cache.get(cache_key)
-            if cached_result:
+            self._reset_usage()
+            lookup_start = time.time()
+            extraction_cache = self._get_extraction_cache(prompt_type)
+
+            # Check the document cache first
+            cached_result = extraction_cache.get_document(text)
+            if cached_result is not None:
                 logger.info("Returning cached entity extraction result")
+                self._update_usage_stats(
+                    time.time() - lookup_start, len(cached_result), cache_hit=True
+                )
                 return cached_result
 
-            # Format prompt
-            prompt = self._format_prompt(text, prompt_type)
-
-            # Get LLM client
-            client = self._get_client()
-
-            # Make API call
+            # Look up stanzas that were already extracted
+            segments = split_segments(text, self.config.chunk_size)
+            if not segments:
+                return []
+            hits = extraction_cache.get_segments([s["text"] for s in segments])
+
+            # Split the remaining runs of stanzas into chunks
+            with EXTRACTION_STAGE_SECONDS.time(stage="chunk"):
+                runs = [
+                    run
+                    for run in self._group_missed_segments(segments, hits)
+                    if text[run["start"] : run["end"]].strip()
+                ]
+                chunker = TextChunker(self.config.chunk_size, self.config.overlap_size)
+                chunks = []
+                for run in runs:
+                    for chunk in chunker.split(text[run["start"] : run["end"]]):
+                        chunk["start"] += run["start"]
+                        chunk["end"] += run["start"]
+                        chunks.append(chunk)
+
+            # Make API calls
             start_time = time.time()
-
-            if self.llm_model.provider == "openai":
-                response = client.chat.completions.create(
-                    model=self.llm_model.model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an expert in Named Entity Recognition (NER). Extract entities from the given text and return them in JSON format with the following structure: [{'text': 'entity_text', 'entity_type': 'PERSON', 'start': 0, 'end': 10, 'confidence': 0.9}]",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=self.config.max_tokens,
-                    response_format={"type": "json_object"},
+            try:
+                with EXTRACTION_STAGE_SECONDS.time(stage="call"):
+                    llm_responses = (
+                        self._call_llm_for_chunks(chunks, prompt_type) if chunks else []
+                    )
+            except Exception:
+                self._update_usage_stats(
+                    time.time() - start_time, 0, chunk_count=len(chunks), failed=True
                 )
-                llm_response = response.choices[0].message.content
-
-            elif self.llm_model.provider == "anthropic":
-                response = client.messages.create(
-                    model=self.llm_model.model_name,
-                    max_tokens=self.config.max_tokens,
-                    temperature=self.config.temperature,
-                    system="You are an expert in Named Entity Recognition (NER). Extract entities from the given text and return them in JSON format with the following structure: [{'text': 'entity_text', 'entity_type': 'PERSON', 'start': 0, 'end': 10, 'confidence': 0.9}]",
-                    messages=[{"role": "user", "content": prompt}],
-                )
-                llm_response = response.content[0].text
-            else:
-                raise ValueError(f"Unsupported provider: {self.llm_model.provider}")
-
+                raise
             processing_time = time.time() - start_time
 
-            # Parse response
-            entities = self._parse_llm_response(llm_response)
+            # Parse responses and find positions within each chunk
+            chunk_results = []
+            for chunk, llm_response in zip(chunks, llm_responses):
+                with EXTRACTION_STAGE_SECONDS.time(stage="parse"):
+                    entities = self._parse_llm_response(llm_response)
+                with EXTRACTION_STAGE_SECONDS.time(stage="resolve_positions"):
+                    chunk_results.append(
+                        (chunk, self._find_entity_positions(chunk["text"], entities))
+                    )
+
+            # Merge back into document offsets
+            with EXTRACTION_STAGE_SECONDS.time(stage="merge"):
+                extracted_entities = merge_chunk_entities(chunk_results)
+
+            # Cache fresh results per stanza, relative to the stanza start
+            missed_segments = {
+                segment["index"]: segment
+                for segment in segments
+                if segment["index"] not in hits
+            }
+            segment_entities = {index: [] for index in missed_segments}
+            segment_starts = [segment["start"] for segment in segments]
+            for entity in extracted_entities:
+                index = bisect.bisect_right(segment_starts, entity["start"]) - 1
+                if index in segment_entities:
+                    segment_entities[index].append(
+                        {
+                            "text": entity["text"],
+                            "entity_type": entity["entity_type"],
+                            "start": entity["start"] - segments[index]["start"],
+                            "end": entity["end"] - segments[index]["start"],
+                            "confidence": entity.get("confidence", 0.8),
+                        }
+                    )
+            extraction_cache.set_segments(
+                {
+                    missed_segments[index]["text"]: entities
+                    for index, entities in segment_entities.items()
+                }
+            )
 
-            # Find positions
-            positioned_entities = self._find_entity_positions(text, entities)
+            # Combine with cached stanzas
+            positioned_entities = list(extracted_entities)
+            for index, cached_entities in hits.items():
+                positioned_entities.extend(
+                    self._restore_segment_entities(segments[index], cached_entities)
+                )
+            positioned_entities.sort(key=lambda e: (e["start"], e["end"]))
 
             # Add metadata
             for entity in positioned_entities:
@@ -197,13 +521,18 @@ class LLMService:
                 entity["prompt_type"] = prompt_type
 
             # Cache result
-            cache.set(cache_key, positioned_entities, timeout=3600)  # 1 hour
+            extraction_cache.set_document(text, positioned_entities)
 
             # Update usage statistics
-            self._update_usage_stats(processing_time, len(positioned_entities))
+            if chunks:
+                self._update_usage_stats(
+                    processing_time, len(extracted_entities), chunk_count=len(chunks)
+                )
 
             logger.info(
-                f"Successfully extracted {len(positioned_entities)} entities in {processing_time:.2f}s"
+                f"Successfully extracted {len(positioned_entities)} entities "
+                f"({len(hits)}/{len(segments)} stanzas cached, {len(chunks)} chunks) "
+                f"in {processing_time:.2f}s"
             )
             return positioned_entities
 
@@ -211,24 +540,222 @@ class LLMService:
             logger.error(f"Error in entity extraction: {e}")
             raise
 
-    def _update_usage_stats(self, processing_time: float, entity_count: int):
-        """Update usage statistics for the LLM model."""
+    async def _astream_request(
+        self,
+        client,
+        prompt: str,
+        system: str,
+        max_tokens: int,
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        """Make a streaming provider API call and yield the text deltas."""
+        if self.llm_model.provider == "openai":
+            stream = await client.chat.completions.create(
+                model=self.llm_model.model_name,
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in stream:
+                # The last chunk carries the usage and no choices
+                self.usage.add_usage("openai", getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+
+        elif self.llm_model.provider == "anthropic":
+            stream = await client.messages.create(
+                model=self.llm_model.model_name,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                system=system,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+            )
+            async for event in stream:
+                if event.type == "content_block_delta":
+                    yield event.delta.text
+                elif event.type == "message_start":
+                    self.usage.add(prompt_tokens=event.message.usage.input_tokens)
+                elif event.type == "message_delta":
+                    # The final count of output tokens
+                    self.usage.add(completion_tokens=event.usage.output_tokens)
+        else:
+            raise ValueError(f"Unsupported provider: {self.llm_model.provider}")
+
+    async def _astream_llm(self, client, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream the output for one prompt.
+
+        Rate limits and the concurrency semaphore apply as for ``_acall_llm``.
+        Streams are not retried, since part of the output may already have
+        been delivered.
+        """
+        max_tokens = self.config.max_tokens
+        await ModelRateLimiter(self.llm_model).acquire(
+            estimate_tokens(EXTRACTION_SYSTEM_PROMPT + prompt, max_tokens)
+        )
+        async with client_pool.get_semaphore(self.llm_model):
+            start_time = time.monotonic()
+            try:
+                async for delta in self._astream_request(
+                    client, prompt, EXTRACTION_SYSTEM_PROMPT, max_tokens, self._get_temperature()
+                ):
+                    yield delta
+            except BaseException as e:
+                self._observe_request(time.monotonic() - start_time, "stream", type(e))
+                if isinstance(e, Exception) and is_retryable(e):
+                    await asyncio.to_thread(model_health.record_failure, self.llm_model)
+                raise
+            elapsed = time.monotonic() - start_time
+            self._observe_request(elapsed, "stream")
+            await asyncio.to_thread(model_health.record_success, self.llm_model, elapsed)
+
+    async def astream_entities(
+        self, text: str, prompt_type: str = "marsiya"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extract entities and yield them as events while the provider responds.
+
+        Yields a ``start`` event, an ``entity`` event for every entity as soon
+        as its JSON object is complete, a ``progress`` event when a chunk is
+        finished and a final ``complete`` event. Chunks are streamed
+        concurrently. This runs on the client pool's event loop (see
+        ``AsyncClientPool.iterate``), so it does not touch the database.
+        """
+        self._reset_usage()
+        extraction_cache = self._get_extraction_cache(prompt_type)
+        cached_result = await asyncio.to_thread(extraction_cache.get_document, text)
+        if cached_result is not None:
+            yield {"type": "start", "chunks": 0, "llm_model": self.llm_model.model_name, "cached": True}
+            for entity in cached_result:
+                yield {"type": "entity", "entity": entity}
+            yield {
+                "type": "complete",
+                "total_entities": len(cached_result),
+                "processing_time": 0.0,
+                "cached": True,
+            }
+            return
+
+        chunks = TextChunker(self.config.chunk_size, self.config.overlap_size).split(text)
+        yield {"type": "start", "chunks": len(chunks), "llm_model": self.llm_model.model_name, "cached": False}
+
+        start_time = time.time()
+        client = self._get_client()
+        allowed_entity_types = self._get_allowed_entity_types()
+        queue = asyncio.Queue()
+
+        async def stream_chunk(index: int, chunk: Dict[str, Any]):
+            parser = EntityStreamParser(allowed_entity_types)
+            try:
+                async for delta in self._astream_llm(client, self._format_prompt(chunk["text"], prompt_type)):
+                    for entity in parser.feed(delta):
+                        await queue.put(("entity", index, entity))
+                for entity in parser.close():
+                    await queue.put(("entity", index, entity))
+            except Exception as e:
+                await queue.put(("error", index, e))
+                return
+            await queue.put(("done", index, None))
+
+        tasks = [asyncio.ensure_future(stream_chunk(i, c)) for i, c in enumerate(chunks)]
+        positioned = {}
+        try:
+            completed = 0
+            while completed < len(chunks):
+                kind, index, payload = await queue.get()
+                if kind == "error":
+                    raise payload
+                if kind == "done":
+                    completed += 1
+                    yield {"type": "progress", "chunk": index, "completed": completed, "total": len(chunks)}
+                    continue
+
+                chunk = chunks[index]
+                for entity in self._find_entity_positions(chunk["text"], [payload]):
+                    entity["start"] += chunk["start"]
+                    entity["end"] += chunk["start"]
+                    key = (entity["start"], entity["end"], str(entity["entity_type"]).upper())
+                    # Overlapping chunks report the same entity twice
+                    if key in positioned:
+                        continue
+                    entity["llm_model"] = self.llm_model.model_name
+                    entity["prompt_type"] = prompt_type
+                    positioned[key] = entity
+                    yield {"type": "entity", "entity": dict(entity), "chunk": index}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        processing_time = time.time() - start_time
+        entities = sorted(positioned.values(), key=lambda e: (e["start"], e["end"]))
+        for entity in entities:
+            entity["processing_time"] = processing_time
+        await asyncio.to_thread(extraction_cache.set_document, text, entities)
+
+        yield {
+            "type": "complete",
+            "total_entities": len(entities),
+            "processing_time": processing_time,
+            "cached": False,
+        }
+
+    def _update_usage_stats(
+        self,
+        processing_time: float,
+        entity_count: int,
+        chunk_count: int = 0,
+        failed: bool = False,
+        cache_hit: bool = False,
+        operation: str = "extract",
+    ):
+        """Add an extraction request to the usage ledger, with the tokens it used."""
         try:
-            self.llm_model.total_requests += 1
-            self.llm_model.total_processing_time += processing_time
-            self.llm_model.total_entities_extracted += entity_count
-            self.llm_model.last_used = timezone.now()
-            self.llm_model.save(
-                update_fields=[
-                    "total_requests",
-                    "total_processing_time",
-                    "total_entities_extracted",
-                    "last_used",
-                ]
+            usage_ledger.record(
+                build_usage_record(
+                    self.llm_model,
+                    processing_time,
+                    self.usage,
+                    operation=operation,
+                    success=not failed,
+                    cache_hit=cache_hit,
+                    chunk_count=chunk_count,
+                    entity_count=entity_count,
+                )
             )
+            # Calls the hedge model won are billed to it
+            if self.hedge_service and self.hedge_service.usage.total_tokens:
+                usage_ledger.record(
+                    build_usage_record(
+                        self.hedge_service.llm_model,
+                        processing_time,
+                        self.hedge_service.usage,
+                        operation="hedge",
+                    )
+                )
         except Exception as e:
             logger.error(f"Error updating usage stats: {e}")
 
+    def _reset_usage(self):
+        """Start counting tokens for a new extraction."""
+        self.usage = TokenUsage()
+        if self.hedge_service:
+            self.hedge_service.usage = TokenUsage()
+
+    def get_token_usage(self) -> TokenUsage:
+        """Get the tokens used by this service, including its hedge model."""
+        usage = TokenUsage()
+        usage.merge(self.usage)
+        if self.hedge_service:
+            usage.merge(self.hedge_service.usage)
+        return usage
+
     def test_connection(self) -> Dict[str, Any]:
         """Test the connection to the LLM provider."""
         try:
@@ -240,32 +767,17 @@ class LLMService:
 
             start_time = time.time()
 
-            if self.llm_model.provider == "openai":
-                response = client.chat.completions.create(
-                    model=self.llm_model.model_name,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are a helpful assistant. Respond with 'OK' if you receive this message.",
-                        },
-                        {"role": "user", "content": "Test message"},
-                    ],
-                    max_tokens=10,
-                    temperature=0,
-                )
-                response_text = response.choices[0].message.content
-
-            elif self.llm_model.provider == "anthropic":
-                response = client.messages.create(
-                    model=self.llm_model.model_name,
+            response_text = client_pool.run(
+                self._acall_llm(
+                    client,
+                    "Test message",
+                    system="You are a helpful assistant. Respond with 'OK' if you receive this message.",
                     max_tokens=10,
                     temperature=0,
-                    system="You are a helpful assistant. Respond with 'OK' if you receive this message.",
-                    messages=[{"role": "user", "content": "Test message"}],
-                )
-                response_text = response.content[0].text
-            else:
-                raise ValueError(f"Unsupported provider: {self.llm_model.provider}")
+                    json_mode=False,
+                ),
+                timeout=settings.LLM_REQUEST_TIMEOUT,
+            )
 
             processing_time = time.time() - start_time
 
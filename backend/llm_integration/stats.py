@@ -0,0 +1,152 @@
+import math
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from core.stats import percentage
+from .models import LLMUsageDailyStats, LLMUsageRecord
+
+USAGE_TOTALS = (
+    "request_count",
+    "failed_request_count",
+    "cache_hit_count",
+    "chunk_count",
+    "entities_extracted",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_cost",
+    "total_processing_time",
+)
+
+# Latency percentiles reported per model
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+
+def _usage_summary(row: Dict[str, Any]) -> Dict[str, Any]:
+    requests = row["request_count"] or 0
+    failed = row["failed_request_count"] or 0
+    processing_time = row["total_processing_time"] or 0
+    return {
+        "total_requests": requests,
+        "successful_requests": requests - failed,
+        "failed_requests": failed,
+        "success_rate": percentage(requests - failed, requests),
+        "cache_hits": row["cache_hit_count"] or 0,
+        "total_chunks": row["chunk_count"] or 0,
+        "entities_extracted": row["entities_extracted"] or 0,
+        "prompt_tokens": row["prompt_tokens"] or 0,
+        "completion_tokens": row["completion_tokens"] or 0,
+        "total_cost": row["total_cost"] or 0,
+        "total_processing_time": processing_time,
+        "average_response_time": processing_time / requests if requests else None,
+    }
+
+
+def summarize_llm_usage(since=None) -> Dict[str, Any]:
+    """
+    Summarize LLM usage from the daily rollup, optionally from ``since`` on.
+
+    Reads one row per model and day, so the cost does not depend on how
+    many extractions were run.
+    """
+    rows = LLMUsageDailyStats.objects.order_by()
+    if since is not None:
+        rows = rows.filter(date__gte=since)
+    sums = {field: Sum(field) for field in USAGE_TOTALS}
+
+    models = rows.values(
+        "llm_model", "llm_model__name", "llm_model__model_name", "llm_model__provider"
+    ).annotate(**sums)
+    days = rows.values("date").annotate(**sums).order_by("date")
+
+    totals = Counter()
+    providers: Dict[str, Dict[str, Any]] = {}
+    model_usage = []
+    for row in models:
+        for field in USAGE_TOTALS:
+            totals[field] += row[field] or 0
+        usage = _usage_summary(row)
+        model_usage.append(
+            {
+                "llm_model": row["llm_model"],
+                "name": row["llm_model__name"],
+                "model_name": row["llm_model__model_name"],
+                "provider": row["llm_model__provider"],
+                **usage,
+            }
+        )
+        provider = providers.setdefault(
+            row["llm_model__provider"],
+            {
+                "provider": row["llm_model__provider"],
+                "count": 0,
+                "total_requests": 0,
+                "successful_requests": 0,
+            },
+        )
+        provider["count"] += 1
+        provider["total_requests"] += usage["total_requests"]
+        provider["successful_requests"] += usage["successful_requests"]
+
+    return {
+        **_usage_summary(totals),
+        "provider_distribution": sorted(
+            providers.values(), key=lambda entry: -entry["total_requests"]
+        ),
+        "model_usage": sorted(model_usage, key=lambda entry: -entry["total_requests"]),
+        "daily_usage": [{"date": row["date"], **_usage_summary(row)} for row in days],
+    }
+
+
+def _timed_requests(llm_model_id: int, since: Optional[datetime] = None):
+    """Ledger records of a model's provider-backed requests that succeeded."""
+    records = LLMUsageRecord.objects.filter(
+        llm_model_id=llm_model_id, success=True, cache_hit=False
+    )
+    if since is not None:
+        records = records.filter(created_at__gte=since)
+    return records
+
+
+def latency_percentiles(
+    llm_model_id: int,
+    since: Optional[datetime] = None,
+    percentiles: Sequence[int] = LATENCY_PERCENTILES,
+) -> Dict[str, Any]:
+    """
+    Get exact (nearest-rank) latency percentiles of a model from the ledger.
+
+    Each percentile is one indexed lookup at its offset in latency order,
+    so no database-specific percentile function is needed.
+    """
+    records = _timed_requests(llm_model_id, since)
+    count = records.count()
+    ordered = records.order_by("latency").values_list("latency", flat=True)
+
+    result = {"count": count}
+    for p in percentiles:
+        rank = max(math.ceil(p / 100 * count), 1)
+        result[f"p{p}"] = ordered[rank - 1] if count else None
+    return result
+
+
+def latency_histogram(
+    llm_model_id: int,
+    since: Optional[datetime] = None,
+    buckets: Optional[Sequence[float]] = None,
+) -> list:
+    """
+    Get a cumulative latency histogram of a model in one query.
+
+    Buckets are upper bounds in seconds (``LLM_LATENCY_BUCKETS``), and each
+    count includes the faster buckets, as in Prometheus histograms.
+    """
+    buckets = sorted(buckets or settings.LLM_LATENCY_BUCKETS)
+    counts = _timed_requests(llm_model_id, since).aggregate(
+        total=Count("id"),
+        **{f"le_{i}": Count("id", filter=Q(latency__lte=bound)) for i, bound in enumerate(buckets)},
+    )
+    return [
+        {"le": bound, "count": counts[f"le_{i}"]} for i, bound in enumerate(buckets)
+    ] + [{"le": "+Inf", "count": counts["total"]}]
@@ -0,0 +1,155 @@
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional
+from rest_framework.renderers import BaseRenderer
+
+logger = logging.getLogger(__name__)
+
+# Characters that change the parser state; everything else is skipped in bulk
+STRUCTURAL_CHARS = re.compile(r'[{}\[\]",\\]')
+
+EVENT_STREAM_CONTENT_TYPE = "text/event-stream"
+
+
+class EntityStreamParser:
+    """
+    Incremental parser for streamed entity JSON.
+
+    Feed it the provider's text deltas as they arrive. Every object that is
+    an element of an array (e.g. ``{"entities": [{...}, {...}]}`` or a bare
+    ``[{...}]``) is returned as soon as its closing brace is seen, so
+    entities can be shown before the whole response is complete. Text
+    around the JSON (such as Markdown code fences) is ignored.
+
+    When the output is cut off (e.g. at ``max_tokens``), ``close`` salvages
+    the fields of the last object up to its last complete value. If
+    ``entity_types`` is given, entities of other types are dropped.
+    """
+
+    def __init__(self, entity_types: Optional[Iterable[str]] = None):
+        self.entity_types = (
+            {str(name).upper() for name in entity_types} if entity_types is not None else None
+        )
+        self.has_json = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._item: Optional[List[str]] = None
+        self._item_length = 0
+        self._item_depth = 0
+        self._item_comma: Optional[int] = None
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """Consume a piece of output and return the entities it completed."""
+        entities = []
+        item_from = 0
+        skip_until = 0
+        if self._escape:
+            # The previous delta ended with a backslash inside a string
+            self._escape = False
+            skip_until = 1
+
+        for match in STRUCTURAL_CHARS.finditer(delta):
+            pos = match.start()
+            if pos < skip_until:
+                continue
+            char = match.group()
+
+            if self._in_string:
+                if char == "\\":
+                    if pos + 1 < len(delta):
+                        skip_until = pos + 2
+                    else:
+                        self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char == ",":
+                if self._item is not None and len(self._stack) == self._item_depth + 1:
+                    self._item_comma = self._item_length + pos - item_from
+            elif char in "{[":
+                self.has_json = True
+                if char == "{" and self._item is None and self._stack and self._stack[-1] == "[":
+                    self._item = []
+                    self._item_length = 0
+                    self._item_depth = len(self._stack)
+                    self._item_comma = None
+                    item_from = pos
+                self._stack.append(char)
+            else:
+                if self._stack:
+                    self._stack.pop()
+                if self._item is not None and len(self._stack) == self._item_depth:
+                    self._item.append(delta[item_from : pos + 1])
+                    entity = self._load("".join(self._item))
+                    self._item = None
+                    if entity is not None:
+                        entities.append(entity)
+
+        if self._item is not None:
+            self._item.append(delta[item_from:])
+            self._item_length += len(delta) - item_from
+        return entities
+
+    def close(self) -> List[Dict[str, Any]]:
+        """
+        Finish the stream and salvage a truncated trailing entity.
+
+        Only fields followed by a comma are known to be complete, so the
+        object is cut at its last top-level comma; it is kept if it still
+        has a text and an entity type.
+        """
+        entities = []
+        if self._item is not None and self._item_comma is not None:
+            raw = "".join(self._item)[: self._item_comma] + "}"
+            entity = self._load(raw)
+            if entity is not None:
+                logger.debug(f"Salvaged entity from truncated output: {entity['text']}")
+                entities.append(entity)
+        self._item = None
+        return entities
+
+    def _load(self, raw: str) -> Optional[Dict[str, Any]]:
+        """Decode one array element, keeping it only if it is a valid entity."""
+        try:
+            item = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.debug(f"Skipping malformed streamed entity {raw!r}: {e}")
+            return None
+        if not isinstance(item, dict):
+            return None
+        text, entity_type = item.get("text"), item.get("entity_type")
+        if not isinstance(text, str) or not isinstance(entity_type, str) or not text.strip():
+            return None
+        if self.entity_types is not None and entity_type.strip().upper() not in self.entity_types:
+            logger.debug(f"Skipping entity of unknown type {entity_type}: {text}")
+            return None
+        return item
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode a streaming event as a Server-Sent Events message."""
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Server-Sent Events renderer.
+
+    Lets content negotiation accept ``Accept: text/event-stream``. Streaming
+    views return their events directly; anything else rendered here (e.g.
+    validation errors) becomes a single ``error`` event.
+    """
+
+    media_type = EVENT_STREAM_CONTENT_TYPE
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return format_sse({"type": "error", "errors": data}).encode()
@@ -1,13 +1,20 @@
 import logging
+from collections import defaultdict
 from typing import Dict, List, Any
-from celery import shared_task
+from celery import chain, chord, shared_task
 from django.conf import settings
 from django.core.cache import cache
+from django.db.models import F
+from django.db.models.functions import Least
 from django.utils import timezone
 from .models import LLMModel, LLMProcessingConfig
 from .services import LLMService
+from .router import model_router
+from .batch import BATCH_FAILED, BATCH_IN_PROGRESS, get_batch_provider
+from .chunking import TextChunker, merge_chunk_entities
+from .persistence import save_extracted_entities
+from .ratelimit import get_task_retry_countdown
 from documents.models import Document
-from entities.models import Entity, EntityType
 from processing.models import ProcessingJob
 
 logger = logging.getLogger(__name__)
@@ -20,126 +27,80 @@ def extract_entities_from_text(
     """
     Extract entities from text using LLM in the background.
 
+    The run is tracked by an ``ner_processing`` job whose ``job_id`` is the
+    Celery task id, so retries of the task update the same job.
+
     Args:
         text: The text to process
         document_id: ID of the document being processed
         prompt_type: Type of prompt to use (general, urdu, marsiya, custom)
         user_id: ID of the user requesting the processing
     """
+    job = None
+    failure = "Task failed"
     try:
         # Get the document
-        document = Document.objects.get(id=document_id)
-
-        # Create or update processing job
-        job, created = ProcessingJob.objects.get_or_create(
-            document=document,
-            job_type="entity_extraction",
-            defaults={
-                "status": "processing",
-                "progress": 0,
-                "created_by_id": user_id,
-                "metadata": {
-                    "prompt_type": prompt_type,
-                    "text_length": len(text),
-                    "llm_model": "pending",
-                },
-            },
-        )
-
-        if not created:
-            job.status = "processing"
-            job.progress = 0
-            job.started_at = timezone.now()
-            job.metadata.update(
-                {
-                    "prompt_type": prompt_type,
-                    "text_length": len(text),
-                    "llm_model": "pending",
-                }
+        document = Document.objects.select_related("project").get(id=document_id)
+        if not text:
+            text = document.get_text()
+
+        # Create or reuse the processing job of this task
+        job_fields = {
+            "name": f"LLM entity extraction: {document.title}"[:200],
+            "job_type": "ner_processing",
+            "document": document,
+            "project": document.project,
+            "created_by_id": user_id,
+            "result": {"prompt_type": prompt_type, "text_length": len(text)},
+        }
+        if self.request.id:
+            job, _ = ProcessingJob.objects.get_or_create(
+                job_id=self.request.id, defaults=job_fields
             )
-            job.save()
-
-        # Update progress
-        job.progress = 10
-        job.save()
+        else:
+            job = ProcessingJob.objects.create(**job_fields)
+        job.start()
+        job.update_progress(10, "Initializing LLM service")
 
         # Initialize LLM service
-        try:
-            llm_service = LLMService()
-            job.metadata["llm_model"] = llm_service.llm_model.model_name
-            job.save()
-        except Exception as e:
-            logger.error(f"Failed to initialize LLM service: {e}")
-            job.status = "failed"
-            job.error_message = f"LLM service initialization failed: {str(e)}"
-            job.completed_at = timezone.now()
-            job.save()
-            raise
-
-        # Update progress
-        job.progress = 20
-        job.save()
+        failure = "LLM service initialization failed"
+        llm_service = LLMService()
+        job.update_progress(20, "Extracting entities")
 
         # Extract entities
-        try:
-            entities_data = llm_service.extract_entities(text, prompt_type)
-            job.progress = 80
-            job.save()
-        except Exception as e:
-            logger.error(f"Entity extraction failed: {e}")
-            job.status = "failed"
-            job.error_message = f"Entity extraction failed: {str(e)}"
-            job.completed_at = timezone.now()
-            job.save()
-            raise
+        failure = "Entity extraction failed"
+        entities_data = llm_service.extract_entities(text, prompt_type)
+        job.update_progress(80, "Saving entities")
 
         # Save entities to database
-        try:
-            saved_entities = []
-            for entity_data in entities_data:
-                # Get entity type
-                entity_type, _ = EntityType.objects.get_or_create(
-                    name=entity_data["entity_type"].upper()
-                )
-
-                # Create entity
-                entity = Entity.objects.create(
-                    document=document,
-                    text=entity_data["text"],
-                    entity_type=entity_type,
-                    start_position=entity_data["start"],
-                    end_position=entity_data["end"],
-                    confidence=entity_data.get("confidence", 0.8),
-                    source="llm",
-                    metadata={
-                        "llm_model": entity_data.get("llm_model", "unknown"),
-                        "prompt_type": entity_data.get("prompt_type", prompt_type),
-                        "processing_time": entity_data.get("processing_time", 0),
-                        "extraction_method": "llm",
-                    },
-                )
-                saved_entities.append(entity)
-
-            job.progress = 90
-            job.save()
-
-            # Update document metadata
-            document.metadata.update(
-                {
-                    "last_processed": timezone.now().isoformat(),
-                    "entities_count": len(saved_entities),
-                    "processing_status": "completed",
-                    "llm_model_used": llm_service.llm_model.model_name,
-                    "prompt_type_used": prompt_type,
-                }
-            )
-            document.save()
-
-            # Update processing job
-            job.status = "completed"
-            job.progress = 100
-            job.completed_at = timezone.now()
-            job.result = {
+        failure = "Failed to save entities"
+        saved_entities = save_extracted_entities(
+            document,
+            entities_data,
+            prompt_type=prompt_type,
+            user_id=user_id,
+            text=text,
+        )
+        job.update_progress(90, "Updating document")
+
+        # Update document metadata
+        document.metadata.update(
+            {
+                "last_processed": timezone.now().isoformat(),
+                "entities_count": len(saved_entities),
+                "processing_status": "completed",
+                "llm_model_used": llm_service.llm_model.model_name,
+                "prompt_type_used": prompt_type,
+            }
+        )
+        document.save(update_fields=["metadata"])
+
+        # Update processing job
+        job.complete(
+            result={
+                "prompt_type": prompt_type,
+                "text_length": len(text),
+                "llm_model": llm_service.llm_model.model_name,
                 "entities_extracted": len(saved_entities),
                 "entities_data": [
                     {
@@ -148,39 +109,29 @@ def extract_entities_from_text(
                         "entity_type": entity.entity_type.name,
                         "start": entity.start_position,
                         "end": entity.end_position,
-                        "confidence": entity.confidence,
+                        "confidence": entity.confidence_score,
                     }
                     for entity in saved_entities
                 ],
             }
-            job.save()
-
-            logger.info(
-                f"Successfully extracted {len(saved_entities)} entities from document {document_id}"
-            )
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to save entities: {e}")
-            job.status = "failed"
-            job.error_message = f"Failed to save entities: {str(e)}"
-            job.completed_at = timezone.now()
-            job.save()
-            raise
+        logger.info(
+            f"Successfully extracted {len(saved_entities)} entities from document {document_id}"
+        )
 
     except Document.DoesNotExist:
         logger.error(f"Document {document_id} not found")
         raise
     except Exception as e:
-        logger.error(f"Task failed: {e}")
-        job.status = "failed"
-        job.error_message = str(e)
-        job.completed_at = timezone.now()
-        job.save()
+        logger.error(f"{failure}: {e}")
+        if job is not None:
+            job.complete(error_message=f"{failure}: {str(e)}")
 
         # Retry logic
         if self.request.retries < self.max_retries:
             logger.info(f"Retrying task (attempt {self.request.retries + 1})")
-            raise self.retry(exc=e)
+            raise self.retry(exc=e, countdown=get_task_retry_countdown(self, e))
         else:
             logger.error(f"Task failed after {self.max_retries} retries")
             raise
@@ -279,113 +230,361 @@ def test_llm_connection(self, llm_model_id: int):
             raise
 
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def _build_bulk_lanes(document_ids: List[int], lanes_per_project: int) -> List[List[int]]:
+    """
+    Split documents into lanes that are processed one document at a time.
+
+    Each project gets at most ``lanes_per_project`` lanes, which bounds how
+    many of its documents are extracted concurrently.
+    """
+    project_ids = dict(
+        Document.objects.filter(id__in=document_ids).values_list("id", "project_id")
+    )
+    by_project = defaultdict(list)
+    for document_id in dict.fromkeys(document_ids):
+        by_project[project_ids.get(document_id)].append(document_id)
+
+    lanes = []
+    for project_document_ids in by_project.values():
+        lane_count = min(max(1, lanes_per_project), len(project_document_ids))
+        lanes.extend(project_document_ids[i::lane_count] for i in range(lane_count))
+    return lanes
+
+
+@shared_task
 def bulk_entity_extraction(
-    self, document_ids: List[int], prompt_type: str = "marsiya", user_id: int = None
+    document_ids: List[int], prompt_type: str = "marsiya", user_id: int = None
 ):
     """
     Process multiple documents for entity extraction.
 
+    Documents are fanned out with a chord whose header holds one chain per
+    lane; lanes are capped per project by ``LLM_BULK_PROJECT_CONCURRENCY``.
+    The chord callback aggregates entity counts and failures, so the bulk
+    job only reaches 100% once every document has finished.
+
     Args:
         document_ids: List of document IDs to process
         prompt_type: Type of prompt to use
         user_id: ID of the user requesting the processing
     """
-    try:
-        total_documents = len(document_ids)
-        processed_count = 0
-        failed_count = 0
-
-        # Create bulk processing job
-        job, created = ProcessingJob.objects.get_or_create(
-            job_type="bulk_entity_extraction",
-            metadata={"document_count": total_documents},
-            defaults={
-                "status": "processing",
-                "progress": 0,
-                "created_by_id": user_id,
-                "metadata": {
-                    "document_count": total_documents,
-                    "prompt_type": prompt_type,
-                    "processed": 0,
-                    "failed": 0,
-                },
-            },
+    lanes = _build_bulk_lanes(document_ids, settings.LLM_BULK_PROJECT_CONCURRENCY)
+    total_documents = sum(len(lane) for lane in lanes)
+    project_ids = set(
+        Document.objects.filter(id__in=document_ids).values_list("project_id", flat=True)
+    )
+
+    job = ProcessingJob.objects.create(
+        name=f"Bulk LLM processing ({total_documents} documents)",
+        job_type="ner_processing",
+        project_id=project_ids.pop() if len(project_ids) == 1 else None,
+        status="queued",
+        total_steps=total_documents,
+        created_by_id=user_id,
+        tags=["bulk"],
+        result={"prompt_type": prompt_type, "document_ids": list(dict.fromkeys(document_ids))},
+    )
+
+    if not lanes:
+        job.complete(result={"total_documents": 0, "processed": 0, "failed": 0})
+        return {"job_id": job.id, "documents": 0, "lanes": 0}
+
+    job.start()
+    job.update_progress(0, f"Extracting entities from {total_documents} documents")
+
+    header = [
+        chain(
+            extract_bulk_document.s([], lane[0], prompt_type, user_id, job.id),
+            *(
+                extract_bulk_document.s(document_id, prompt_type, user_id, job.id)
+                for document_id in lane[1:]
+            ),
         )
+        for lane in lanes
+    ]
+    chord(header)(aggregate_bulk_extraction.s(job.id))
 
-        if not created:
-            job.status = "processing"
-            job.progress = 0
-            job.started_at = timezone.now()
-            job.metadata.update(
-                {
-                    "document_count": total_documents,
-                    "prompt_type": prompt_type,
-                    "processed": 0,
-                    "failed": 0,
-                }
-            )
-            job.save()
+    logger.info(
+        f"Queued bulk entity extraction for {total_documents} documents "
+        f"in {len(lanes)} lanes (job {job.id})"
+    )
+    return {"job_id": job.id, "documents": total_documents, "lanes": len(lanes)}
 
-        for i, doc_id in enumerate(document_ids):
-            try:
-                # Update progress
-                progress = int((i / total_documents) * 100)
-                job.progress = progress
-                job.save()
-
-                # Process individual document
-                extract_entities_from_text.delay(
-                    text="",  # Will be fetched from document
-                    document_id=doc_id,
-                    prompt_type=prompt_type,
-                    user_id=user_id,
-                )
 
-                processed_count += 1
-                job.metadata["processed"] = processed_count
-                job.save()
-
-            except Exception as e:
-                logger.error(f"Failed to process document {doc_id}: {e}")
-                failed_count += 1
-                job.metadata["failed"] = failed_count
-                job.save()
-                continue
-
-        # Update final status
-        job.progress = 100
-        job.status = "completed"
-        job.completed_at = timezone.now()
-        job.result = {
-            "total_documents": total_documents,
-            "processed": processed_count,
-            "failed": failed_count,
-            "success_rate": (processed_count / total_documents) * 100
-            if total_documents > 0
-            else 0,
-        }
-        job.save()
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def extract_bulk_document(
+    self,
+    lane_results: List[Dict[str, Any]],
+    document_id: int,
+    prompt_type: str = "marsiya",
+    user_id: int = None,
+    bulk_job_id: int = None,
+):
+    """
+    Extract and save entities for one document of a bulk job.
 
-        logger.info(
-            f"Bulk entity extraction completed: {processed_count}/{total_documents} documents processed"
+    Failures are recorded in the returned summaries instead of raised, so
+    the rest of the lane and the aggregation callback still run.
+    """
+    summary = {"document_id": document_id, "status": "completed", "entities_extracted": 0}
+    document = None
+
+    try:
+        if ProcessingJob.objects.filter(id=bulk_job_id, status="cancelled").exists():
+            summary["status"] = "cancelled"
+            return lane_results + [summary]
+
+        document = Document.objects.get(id=document_id)
+        document.start_processing()
+
+        text = document.get_text()
+        if not text.strip():
+            raise ValueError("Document has no readable text content")
+
+        entities_data = model_router.extract_entities(text, prompt_type)
+        saved_entities = save_extracted_entities(
+            document, entities_data, prompt_type=prompt_type, user_id=user_id, text=text
         )
-        return job.result
+        document.complete_processing(success=True)
+        document.mark_processed(text)
+        summary["entities_extracted"] = len(saved_entities)
 
+    except (Document.DoesNotExist, ValueError) as e:
+        logger.error(f"Bulk extraction skipped document {document_id}: {e}")
+        summary.update(status="failed", error=str(e))
     except Exception as e:
-        logger.error(f"Bulk entity extraction task failed: {e}")
-
-        # Retry logic
         if self.request.retries < self.max_retries:
             logger.info(
-                f"Retrying bulk entity extraction (attempt {self.request.retries + 1})"
+                f"Retrying bulk extraction of document {document_id} "
+                f"(attempt {self.request.retries + 1})"
             )
-            raise self.retry(exc=e)
+            raise self.retry(exc=e, countdown=get_task_retry_countdown(self, e))
+        logger.error(f"Bulk extraction failed for document {document_id}: {e}")
+        summary.update(status="failed", error=str(e))
+
+    if summary["status"] == "failed" and document is not None:
+        document.complete_processing(success=False)
+
+    # The callback sets 100% once every lane has finished
+    bulk_jobs = ProcessingJob.objects.filter(id=bulk_job_id)
+    total_documents = bulk_jobs.values_list("total_steps", flat=True).first() or 1
+    bulk_jobs.update(progress=Least(F("progress") + max(1, 99 // total_documents), 99))
+    return lane_results + [summary]
+
+
+@shared_task
+def aggregate_bulk_extraction(lane_results: List[List[Dict[str, Any]]], bulk_job_id: int):
+    """Aggregate per-document summaries and complete the bulk job."""
+    summaries = [summary for lane in lane_results for summary in lane]
+    processed = [s for s in summaries if s["status"] == "completed"]
+    failed = [s for s in summaries if s["status"] == "failed"]
+    total_documents = len(summaries)
+
+    result = {
+        "total_documents": total_documents,
+        "processed": len(processed),
+        "failed": len(failed),
+        "cancelled": total_documents - len(processed) - len(failed),
+        "entities_extracted": sum(s["entities_extracted"] for s in processed),
+        "success_rate": (len(processed) / total_documents) * 100
+        if total_documents > 0
+        else 0,
+        "failures": [
+            {"document_id": s["document_id"], "error": s.get("error", "")} for s in failed
+        ],
+    }
+
+    job = ProcessingJob.objects.get(id=bulk_job_id)
+    if job.status == "cancelled":
+        job.set_result("summary", result)
+    elif failed and not processed:
+        job.result = result
+        job.complete(result=result, error_message="All documents failed")
+    else:
+        job.complete(result=result)
+
+    logger.info(
+        f"Bulk entity extraction completed: {len(processed)}/{total_documents} "
+        f"documents processed, {result['entities_extracted']} entities"
+    )
+    return result
+
+
+@shared_task
+def submit_batch_extraction(
+    document_ids: List[int], prompt_type: str = "marsiya", user_id: int = None
+):
+    """
+    Submit documents for offline extraction through the provider's batch API.
+
+    Every chunk of every document becomes one batch request. The batch is
+    tracked by a ProcessingJob and polled by ``poll_batch_extraction``.
+
+    Args:
+        document_ids: List of document IDs to process
+        prompt_type: Type of prompt to use
+        user_id: ID of the user requesting the processing
+    """
+    llm_service = LLMService()
+    chunker = TextChunker(llm_service.config.chunk_size, llm_service.config.overlap_size)
+
+    batch_requests = []
+    chunk_map = {}
+    for document in Document.objects.filter(id__in=document_ids):
+        for chunk in chunker.split(document.get_text()):
+            custom_id = f"doc-{document.id}-chunk-{chunk['index']}"
+            chunk_map[custom_id] = [document.id, chunk["start"], chunk["end"]]
+            batch_requests.append(
+                llm_service.build_batch_request(custom_id, chunk["text"], prompt_type)
+            )
+
+    job = ProcessingJob.objects.create(
+        name=f"Batch LLM processing ({len(document_ids)} documents)",
+        job_type="ner_processing",
+        status="queued",
+        total_steps=len(batch_requests),
+        created_by_id=user_id,
+        tags=["batch"],
+        result={
+            "prompt_type": prompt_type,
+            "llm_model_id": llm_service.llm_model.id,
+            "chunks": chunk_map,
+        },
+    )
+
+    if not batch_requests:
+        job.complete(result={"total_documents": 0, "entities_extracted": 0})
+        return {"job_id": job.id, "requests": 0}
+
+    provider = get_batch_provider(llm_service.llm_model)
+    batch_id = provider.submit(batch_requests)
+
+    job.start()
+    job.set_result("batch_id", batch_id)
+    job.update_progress(10, "Waiting for provider batch")
+    poll_batch_extraction.apply_async(
+        (job.id,), countdown=settings.LLM_BATCH_POLL_INTERVAL
+    )
+
+    logger.info(
+        f"Submitted batch {batch_id} with {len(batch_requests)} requests (job {job.id})"
+    )
+    return {"job_id": job.id, "batch_id": batch_id, "requests": len(batch_requests)}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def poll_batch_extraction(self, job_id: int):
+    """
+    Check a submitted batch and persist its results once it has finished.
+
+    While the provider is still working the task re-schedules itself
+    instead of waiting, so no worker is held for the batch's duration.
+    """
+    job = ProcessingJob.objects.get(id=job_id)
+    if job.status in ["cancelled", "completed", "failed"]:
+        return {"job_id": job_id, "status": job.status}
+
+    llm_model = LLMModel.objects.get(id=job.get_result("llm_model_id"))
+    batch_id = job.get_result("batch_id")
+    prompt_type = job.get_result("prompt_type", "marsiya")
+
+    try:
+        provider = get_batch_provider(llm_model)
+        status = provider.get_status(batch_id)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e, countdown=get_task_retry_countdown(self, e))
+        job.complete(error_message=f"Failed to poll batch {batch_id}: {e}")
+        raise
+
+    if status == BATCH_IN_PROGRESS:
+        poll_batch_extraction.apply_async(
+            (job_id,), countdown=settings.LLM_BATCH_POLL_INTERVAL
+        )
+        return {"job_id": job_id, "status": status}
+
+    if status == BATCH_FAILED:
+        job.complete(error_message=f"Provider batch {batch_id} failed")
+        return {"job_id": job_id, "status": status}
+
+    job.update_progress(50, "Processing batch results")
+
+    # Collect raw responses per document
+    chunk_map = job.get_result("chunks", {})
+    responses = defaultdict(dict)
+    failed_chunks = {}
+    for custom_id, text, error in provider.iter_results(batch_id):
+        if custom_id not in chunk_map:
+            continue
+        if error:
+            failed_chunks[custom_id] = error
         else:
-            logger.error(
-                f"Bulk entity extraction failed after {self.max_retries} retries"
+            responses[chunk_map[custom_id][0]][custom_id] = text
+
+    # A document with a failed chunk is failed as a whole. Saving its partial
+    # entities and processed version would make incremental re-extraction
+    # treat the missing chunks as already done.
+    failed_documents = {chunk_map[custom_id][0] for custom_id in failed_chunks}
+
+    # Persist each document through the normal extraction path
+    llm_service = LLMService(llm_model)
+    documents = Document.objects.in_bulk(list(set(responses) | failed_documents))
+    entities_extracted = 0
+    for document_id, document in documents.items():
+        if document_id in failed_documents:
+            document.complete_processing(success=False)
+            continue
+
+        text = document.get_text()
+        chunk_results = []
+        for custom_id, llm_response in responses[document_id].items():
+            _, start, end = chunk_map[custom_id]
+            entities = llm_service._parse_llm_response(llm_response)
+            chunk_results.append(
+                (
+                    {"start": start, "end": end},
+                    llm_service._find_entity_positions(text[start:end], entities),
+                )
             )
-            raise
+
+        entities_data = merge_chunk_entities(chunk_results)
+        for entity in entities_data:
+            entity["llm_model"] = llm_model.model_name
+            entity["prompt_type"] = prompt_type
+
+        saved_entities = save_extracted_entities(
+            document,
+            entities_data,
+            prompt_type=prompt_type,
+            user_id=job.created_by_id,
+            text=text,
+        )
+        document.complete_processing(success=True)
+        document.mark_processed(text)
+        entities_extracted += len(saved_entities)
+
+    failed_documents &= set(documents)
+    result = {
+        "prompt_type": prompt_type,
+        "batch_id": batch_id,
+        "total_documents": len(documents),
+        "processed": len(documents) - len(failed_documents),
+        "entities_extracted": entities_extracted,
+        "failed_documents": sorted(failed_documents),
+        "failed_chunks": failed_chunks,
+    }
+    if documents and result["processed"] == 0:
+        job.result = result
+        job.complete(result=result, error_message="All documents failed")
+    else:
+        job.complete(result=result)
+
+    logger.info(
+        f"Batch {batch_id} completed: {entities_extracted} entities "
+        f"from {result['processed']}/{len(documents)} documents, "
+        f"{len(failed_chunks)} failed chunks"
+    )
+    return result
 
 
 @shared_task
@@ -401,36 +600,17 @@ def cleanup_expired_cache():
 
 @shared_task
 def update_llm_usage_stats():
-    """Update LLM usage statistics and cleanup old data."""
+    """Cache the LLM usage statistics of the last 30 days from the daily rollup."""
     try:
-        # Update daily usage stats
-        from django.db.models import Sum, Avg, Count
-        from django.utils import timezone
         from datetime import timedelta
+        from .stats import summarize_llm_usage
 
-        # Get stats for the last 30 days
-        thirty_days_ago = timezone.now() - timedelta(days=30)
-
-        # Update LLM model stats
-        for llm_model in LLMModel.objects.all():
-            recent_jobs = ProcessingJob.objects.filter(
-                document__metadata__llm_model_used=llm_model.model_name,
-                created_at__gte=thirty_days_ago,
-            )
-
-            if recent_jobs.exists():
-                llm_model.daily_requests = recent_jobs.count()
-                llm_model.daily_processing_time = (
-                    recent_jobs.aggregate(
-                        total_time=Sum("metadata__processing_time", default=0)
-                    )["total_time"]
-                    or 0
-                )
-                llm_model.save(
-                    update_fields=["daily_requests", "daily_processing_time"]
-                )
+        usage = summarize_llm_usage(since=timezone.localdate() - timedelta(days=30))
+        cache.set("llm_usage_stats", usage, timeout=3600)  # 1 hour
 
         logger.info("LLM usage statistics updated")
+        return usage["total_requests"]
 
     except Exception as e:
         logger.error(f"Failed to update LLM usage stats: {e}")
+        return None
@@ -47,6 +47,11 @@ urlpatterns = [
     ),
     # Entity extraction
     path("extract/", views.EntityExtractionView.as_view(), name="entity_extraction"),
+    path(
+        "extract/stream/",
+        views.EntityExtractionStreamView.as_view(),
+        name="entity_extraction_stream",
+    ),
     # System information
     path("prompt-templates/", views.prompt_templates, name="prompt_templates"),
     path("providers/", views.llm_providers, name="llm_providers"),
@@ -60,4 +65,7 @@ urlpatterns = [
     path(
         "models/<int:pk>/reset-stats/", views.reset_llm_stats, name="reset_model_stats"
     ),
+    path(
+        "models/<int:pk>/latency/", views.llm_model_latency, name="model_latency"
+    ),
 ]
@@ -0,0 +1,208 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from core.rollups import add_to_rollup
+from .models import LLMModel, LLMUsageDailyStats, LLMUsageRecord
+
+logger = logging.getLogger(__name__)
+
+
+def _token_count(value) -> int:
+    return value if isinstance(value, int) else 0
+
+
+@dataclass
+class TokenUsage:
+    """Prompt and completion tokens reported by provider responses."""
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        self.prompt_tokens += _token_count(prompt_tokens)
+        self.completion_tokens += _token_count(completion_tokens)
+
+    def add_usage(self, provider: str, usage) -> None:
+        """Add the ``usage`` object of an OpenAI or Anthropic response."""
+        if usage is None:
+            return
+        if provider == "anthropic":
+            self.add(getattr(usage, "input_tokens", 0), getattr(usage, "output_tokens", 0))
+        else:
+            self.add(getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0))
+
+    def merge(self, other: "TokenUsage") -> None:
+        self.add(other.prompt_tokens, other.completion_tokens)
+
+
+def build_usage_record(
+    llm_model: LLMModel,
+    latency: float,
+    usage: Optional[TokenUsage] = None,
+    **fields,
+) -> LLMUsageRecord:
+    """Build an unsaved ledger record, pricing its tokens with the model's cost."""
+    usage = usage or TokenUsage()
+    return LLMUsageRecord(
+        llm_model=llm_model,
+        latency=latency,
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        cost=llm_model.get_cost(usage.total_tokens),
+        **fields,
+    )
+
+
+def write_usage_records(records: List[LLMUsageRecord]) -> None:
+    """
+    Append records to the ledger and add them to the model counters and daily rollup.
+
+    Counters are updated with F-expressions, one update per model and one
+    per rollup row, so concurrent writers never overwrite each other.
+    """
+    if not records:
+        return
+
+    models: Dict[int, Dict] = defaultdict(lambda: defaultdict(int))
+    days: Dict[tuple, Dict] = defaultdict(lambda: defaultdict(int))
+    for record in records:
+        model = models[record.llm_model_id]
+        day = days[timezone.localdate(record.created_at), record.llm_model_id]
+        day["total_cost"] += record.cost
+        day["prompt_tokens"] += record.prompt_tokens
+        day["completion_tokens"] += record.completion_tokens
+        model["cost"] += record.cost
+        if record.cache_hit:
+            day["cache_hit_count"] += 1
+            continue
+        model["requests"] += 1
+        model["failed"] += int(not record.success)
+        model["latency"] += record.latency
+        day["request_count"] += 1
+        day["failed_request_count"] += int(not record.success)
+        day["chunk_count"] += record.chunk_count
+        day["entities_extracted"] += record.entity_count
+        day["total_processing_time"] += record.latency
+
+    with transaction.atomic():
+        LLMUsageRecord.objects.bulk_create(records)
+
+        for model_id, totals in models.items():
+            updates = {"total_cost": F("total_cost") + totals["cost"]}
+            if totals["requests"]:
+                updates.update(
+                    total_requests=F("total_requests") + totals["requests"],
+                    successful_requests=F("successful_requests")
+                    + (totals["requests"] - totals["failed"]),
+                    failed_requests=F("failed_requests") + totals["failed"],
+                    # The right-hand side sees the row before this update
+                    average_response_time=(
+                        Coalesce(F("average_response_time"), 0.0) * F("total_requests")
+                        + totals["latency"]
+                    )
+                    / (F("total_requests") + totals["requests"]),
+                )
+            LLMModel.objects.filter(pk=model_id).update(**updates)
+
+        for (day, model_id), deltas in days.items():
+            add_to_rollup(
+                LLMUsageDailyStats, {"date": day, "llm_model_id": model_id}, **deltas
+            )
+
+
+class UsageLedger:
+    """
+    Process-wide, batched writer for the LLM usage ledger.
+
+    Records are queued once the surrounding transaction commits and
+    written by a background thread, in batches of up to
+    ``LLM_USAGE_BATCH_SIZE`` or at least every ``LLM_USAGE_FLUSH_INTERVAL``
+    seconds, so extraction requests never wait for the ledger.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        """Drop all state, e.g. after the process was forked."""
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running yet."""
+        with self._lock:
+            # Celery prefork workers inherit the parent's ledger but not its thread
+            if self._pid != os.getpid():
+                self._reset()
+
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="llm-usage-ledger", daemon=True
+                )
+                self._thread.start()
+
+    def record(self, record: LLMUsageRecord) -> None:
+        """Queue a record for writing once the current transaction commits."""
+        transaction.on_commit(partial(self._enqueue, record))
+
+    def _enqueue(self, record: LLMUsageRecord) -> None:
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def _next_batch(self) -> List[LLMUsageRecord]:
+        """Wait for a record, then collect more until the batch is full or due."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + settings.LLM_USAGE_FLUSH_INTERVAL
+        while len(batch) < settings.LLM_USAGE_BATCH_SIZE:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[LLMUsageRecord]) -> None:
+        try:
+            write_usage_records(batch)
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} LLM usage records: {e}")
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            self._write(batch)
+            close_old_connections()
+
+    def flush(self) -> None:
+        """Write every queued record from the calling thread."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._write(batch)
+
+
+usage_ledger = UsageLedger()
+atexit.register(usage_ledger.flush)
@@ -2,9 +2,12 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Q, Count
 from django.utils import timezone
+from datetime import timedelta
 from .models import LLMModel, LLMProcessingConfig
 from .serializers import (
     LLMModelSerializer,
@@ -21,7 +24,12 @@ from .serializers import (
     EntityExtractionResponseSerializer,
     LLMProviderSerializer,
 )
+from .clients import client_pool
+from .router import model_router
 from .services import LLMService
+from .stats import latency_histogram, latency_percentiles, summarize_llm_usage
+from .streaming import EVENT_STREAM_CONTENT_TYPE, EventStreamRenderer, format_sse
+from .usage import TokenUsage
 from .tasks import test_llm_connection
 
 
@@ -230,11 +238,11 @@ class EntityExtractionView(generics.GenericAPIView):
                         status=status.HTTP_400_BAD_REQUEST,
                     )
 
-            # Initialize LLM service
-            llm_service = LLMService()
-
-            # Extract entities
-            entities = llm_service.extract_entities(text=text, prompt_type=prompt_type)
+            # Extract entities, hedging slow calls since a user is waiting
+            usage = TokenUsage()
+            entities = model_router.extract_entities(
+                text, prompt_type, hedge=True, usage=usage
+            )
 
             # Serialize response
             response_data = {
@@ -248,7 +256,7 @@ class EntityExtractionView(generics.GenericAPIView):
                 "processing_time": entities[0].get("processing_time")
                 if entities
                 else None,
-                "tokens_used": len(entities),  # Simplified token count
+                "tokens_used": usage.total_tokens,
             }
 
             response_serializer = EntityExtractionResponseSerializer(response_data)
@@ -261,6 +269,55 @@ class EntityExtractionView(generics.GenericAPIView):
             )
 
 
+class EntityExtractionStreamView(generics.GenericAPIView):
+    """
+    Stream entity extraction as Server-Sent Events.
+
+    Fallback for clients that cannot use the ``ws/llm/extract/`` WebSocket;
+    the events are the same. Clients may send ``Accept: text/event-stream``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = EntityExtractionRequestSerializer
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        text = serializer.validated_data["text"]
+        prompt_type = serializer.validated_data.get("prompt_type", "marsiya_ner")
+
+        try:
+            llm_service = LLMService()
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def event_stream():
+            try:
+                chunk_count = 0
+                for event in client_pool.iterate(llm_service.astream_entities(text, prompt_type)):
+                    if event["type"] == "start":
+                        chunk_count = event["chunks"]
+                    elif event["type"] == "complete":
+                        llm_service._update_usage_stats(
+                            event["processing_time"],
+                            event["total_entities"],
+                            chunk_count=chunk_count,
+                            cache_hit=event["cached"],
+                            operation="stream",
+                        )
+                    yield format_sse(event)
+            except Exception as e:
+                yield format_sse({"type": "error", "message": str(e)})
+
+        response = StreamingHttpResponse(event_stream(), content_type=EVENT_STREAM_CONTENT_TYPE)
+        response["Cache-Control"] = "no-cache"
+        # Keep nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def prompt_templates(request):
@@ -362,57 +419,51 @@ def llm_providers(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def llm_stats(request):
-    """Get LLM usage statistics."""
-    # Get total requests across all models
-    total_requests = (
-        LLMModel.objects.aggregate(total=Count("total_requests"))["total"] or 0
-    )
-
-    successful_requests = (
-        LLMModel.objects.aggregate(successful=Count("successful_requests"))[
-            "successful"
-        ]
-        or 0
-    )
-
-    failed_requests = (
-        LLMModel.objects.aggregate(failed=Count("failed_requests"))["failed"] or 0
-    )
+    """Get LLM usage statistics, optionally for the last ``days`` days."""
+    since = None
+    days = request.query_params.get("days")
+    if days is not None:
+        try:
+            since = timezone.localdate() - timedelta(days=max(int(days) - 1, 0))
+        except ValueError:
+            return Response(
+                {"error": "days must be an integer"}, status=status.HTTP_400_BAD_REQUEST
+            )
 
-    # Get average response times
-    avg_response_time = LLMModel.objects.aggregate(
-        avg_time=Avg("average_response_time")
-    )["avg_time"]
-
-    # Get total cost
-    total_cost = LLMModel.objects.aggregate(cost=Sum("total_cost"))["cost"] or 0
-
-    # Get provider distribution
-    provider_stats = (
-        LLMModel.objects.values("provider")
-        .annotate(
-            count=Count("id"),
-            total_requests=Sum("total_requests"),
-            successful_requests=Sum("successful_requests"),
+    stats = summarize_llm_usage(since=since)
+    stats.update(
+        LLMModel.objects.aggregate(
+            active_models=Count("id", filter=Q(is_active=True)),
+            total_models=Count("id"),
         )
-        .order_by("-total_requests")
     )
+    return Response(stats)
 
-    stats = {
-        "total_requests": total_requests,
-        "successful_requests": successful_requests,
-        "failed_requests": failed_requests,
-        "success_rate": (successful_requests / total_requests * 100)
-        if total_requests > 0
-        else 0,
-        "average_response_time": avg_response_time,
-        "total_cost": total_cost,
-        "provider_distribution": list(provider_stats),
-        "active_models": LLMModel.objects.filter(is_active=True).count(),
-        "total_models": LLMModel.objects.count(),
-    }
 
-    return Response(stats)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def llm_model_latency(request, pk):
+    """Get latency percentiles and a histogram for an LLM model."""
+    llm_model = get_object_or_404(LLMModel, pk=pk)
+    since = None
+    days = request.query_params.get("days")
+    if days is not None:
+        try:
+            since = timezone.now() - timedelta(days=float(days))
+        except ValueError:
+            return Response(
+                {"error": "days must be a number"}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+    percentiles = latency_percentiles(llm_model.pk, since=since)
+    return Response(
+        {
+            "llm_model": llm_model.pk,
+            "count": percentiles.pop("count"),
+            "percentiles": percentiles,
+            "histogram": latency_histogram(llm_model.pk, since=since),
+        }
+    )
 
 
 @api_view(["POST"])
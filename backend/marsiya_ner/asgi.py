@@ -11,7 +11,6 @@ import os
 
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from channels.security.websocket import AllowedHostsOriginValidator
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'marsiya_ner.settings')
@@ -19,12 +18,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'marsiya_ner.settings')
 django_asgi_app = get_asgi_application()
 
 # Import routing after Django is set up
+from core.websocket import JWTAuthMiddleware
 from llm_integration.routing import websocket_urlpatterns
 
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": AllowedHostsOriginValidator(
-        AuthMiddlewareStack(
+        JWTAuthMiddleware(
             URLRouter(
                 websocket_urlpatterns
             )
@@ -57,6 +57,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -258,6 +259,41 @@ CELERY_BEAT_SCHEDULE = {
     },
 }
 
+# LLM Processing Configuration
+LLM_MAX_CONCURRENT_REQUESTS = config('LLM_MAX_CONCURRENT_REQUESTS', default=8, cast=int)
+LLM_REQUEST_TIMEOUT = config('LLM_REQUEST_TIMEOUT', default=120, cast=float)
+
+# Shared rate limits and retries for provider calls
+LLM_RATE_LIMIT_MAX_WAIT = config('LLM_RATE_LIMIT_MAX_WAIT', default=300, cast=float)
+LLM_MAX_RETRIES = config('LLM_MAX_RETRIES', default=4, cast=int)
+LLM_RETRY_BASE_DELAY = config('LLM_RETRY_BASE_DELAY', default=1.0, cast=float)
+LLM_RETRY_MAX_DELAY = config('LLM_RETRY_MAX_DELAY', default=60.0, cast=float)
+
+# Model routing: failing models are skipped for a while, slow calls are hedged
+LLM_CIRCUIT_FAILURE_THRESHOLD = config('LLM_CIRCUIT_FAILURE_THRESHOLD', default=3, cast=int)
+LLM_CIRCUIT_COOLDOWN = config('LLM_CIRCUIT_COOLDOWN', default=60, cast=float)
+LLM_HEDGE_DELAY = config('LLM_HEDGE_DELAY', default=2.0, cast=float)
+
+# Extraction results are cached by content digest; hits refresh the TTL
+LLM_CACHE_ALIAS = config('LLM_CACHE_ALIAS', default='default')
+LLM_CACHE_TTL = config('LLM_CACHE_TTL', default=60 * 60 * 24 * 7, cast=int)
+LLM_CACHE_COMPRESSION_LEVEL = config('LLM_CACHE_COMPRESSION_LEVEL', default=6, cast=int)
+LLM_ENTITY_BATCH_SIZE = config('LLM_ENTITY_BATCH_SIZE', default=500, cast=int)
+LLM_BULK_PROJECT_CONCURRENCY = config('LLM_BULK_PROJECT_CONCURRENCY', default=4, cast=int)
+
+# Usage ledger writes are batched on a background thread
+LLM_USAGE_BATCH_SIZE = config('LLM_USAGE_BATCH_SIZE', default=100, cast=int)
+LLM_USAGE_FLUSH_INTERVAL = config('LLM_USAGE_FLUSH_INTERVAL', default=5.0, cast=float)
+LLM_LATENCY_BUCKETS = config(
+    'LLM_LATENCY_BUCKETS',
+    default='0.5,1,2.5,5,10,30,60,120',
+    cast=lambda v: [float(s) for s in v.split(',')]
+)
+
+# Provider batch mode for offline backfills
+LLM_BATCH_POLL_INTERVAL = config('LLM_BATCH_POLL_INTERVAL', default=300, cast=int)
+LLM_BATCH_LOCAL_DIR = config('LLM_BATCH_LOCAL_DIR', default=str(MEDIA_ROOT / 'llm_batches'))
+
 # File Upload Configuration
 FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
@@ -326,6 +362,19 @@ CACHES = {
     }
 }
 
+# Project permissions are cached per user; membership changes invalidate them
+PROJECT_ACCESS_CACHE_TTL = config('PROJECT_ACCESS_CACHE_TTL', default=300, cast=int)
+
+# Dashboard stats are cached briefly, then served stale while they are recomputed
+STATS_CACHE_TTL = config('STATS_CACHE_TTL', default=60, cast=int)
+STATS_CACHE_STALE_TTL = config('STATS_CACHE_STALE_TTL', default=60 * 60, cast=int)
+STATS_REFRESH_LOCK_TTL = config('STATS_REFRESH_LOCK_TTL', default=60, cast=int)
+
+# Metrics: each process shares its values through the cache for /system/metrics/
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PUBLISH_INTERVAL = config('METRICS_PUBLISH_INTERVAL', default=15.0, cast=float)
+SYSTEM_SAMPLE_INTERVAL = config('SYSTEM_SAMPLE_INTERVAL', default=15.0, cast=float)
+
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
 SESSION_CACHE_ALIAS = 'default'
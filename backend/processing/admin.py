@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ProcessingJob
+from .models import ProcessingDailyStats, ProcessingJob
 
 
 @admin.register(ProcessingJob)
@@ -64,3 +64,12 @@ class ProcessingJobAdmin(admin.ModelAdmin):
                 count += 1
         self.message_user(request, f'{count} jobs have been cancelled.')
     cancel_jobs.short_description = "Cancel selected jobs"
+
+
+@admin.register(ProcessingDailyStats)
+class ProcessingDailyStatsAdmin(admin.ModelAdmin):
+    """Admin for ProcessingDailyStats."""
+    list_display = ('date', 'job_type', 'status', 'job_count', 'timed_job_count', 'total_processing_time')
+    list_filter = ('job_type', 'status', 'date')
+    readonly_fields = ('date', 'job_type', 'status', 'job_count', 'timed_job_count', 'total_processing_time')
+    ordering = ('-date', 'job_type', 'status')
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.5 on 2026-10-18 02:13
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def fill_daily_stats(apps, schema_editor):
+    ProcessingJob = apps.get_model('processing', 'ProcessingJob')
+    ProcessingDailyStats = apps.get_model('processing', 'ProcessingDailyStats')
+    rows = (
+        ProcessingJob.objects.filter(
+            status__in=['completed', 'failed', 'cancelled'], completed_at__isnull=False
+        )
+        .order_by()
+        .values('job_type', 'status', day=TruncDate('completed_at'))
+        .annotate(
+            job_count=Count('id'),
+            timed_job_count=Count('processing_time'),
+            processing_time=Sum('processing_time'),
+        )
+    )
+    ProcessingDailyStats.objects.bulk_create(
+        ProcessingDailyStats(
+            date=row['day'],
+            job_type=row['job_type'],
+            status=row['status'],
+            job_count=row['job_count'],
+            timed_job_count=row['timed_job_count'],
+            total_processing_time=(
+                row['processing_time'].total_seconds() if row['processing_time'] else 0
+            ),
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('processing', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('job_type', models.CharField(max_length=30)),
+                ('status', models.CharField(max_length=20)),
+                ('job_count', models.IntegerField(default=0)),
+                ('timed_job_count', models.IntegerField(default=0)),
+                ('total_processing_time', models.FloatField(default=0, help_text='Seconds')),
+            ],
+            options={
+                'verbose_name': 'Processing Daily Stats',
+                'verbose_name_plural': 'Processing Daily Stats',
+                'db_table': 'processing_daily_stats',
+                'ordering': ['-date', 'job_type', 'status'],
+                'unique_together': {('date', 'job_type', 'status')},
+            },
+        ),
+        migrations.RunPython(fill_daily_stats, migrations.RunPython.noop),
+    ]
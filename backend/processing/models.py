@@ -1,7 +1,9 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from core.models import UserStampedModel, SoftDeleteModel
+from core.stats import invalidate_stats
+from .rollups import ROLLUP_FIELDS, apply_job_rollup_change, job_rollup_state
 import uuid
 from django.core.exceptions import ValidationError
 
@@ -114,11 +116,46 @@ class ProcessingJob(UserStampedModel, SoftDeleteModel):
     def __str__(self):
         return f"{self.name} ({self.job_id})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ROLLUP_FIELDS):
+            instance._rollup_state = instance._get_rollup_state()
+        return instance
+    
+    def _get_rollup_state(self):
+        return job_rollup_state(
+            self.status, self.job_type, self.completed_at, self.processing_time
+        )
+    
+    def _get_saved_rollup_state(self):
+        """Get how the stored row is rolled up, as loaded or from the database."""
+        if self._state.adding:
+            return None
+        if hasattr(self, '_rollup_state'):
+            return self._rollup_state
+        row = ProcessingJob.objects.filter(pk=self.pk).values_list(
+            'status', 'job_type', 'completed_at', 'processing_time'
+        ).first()
+        return job_rollup_state(*row) if row else None
+    
     def save(self, *args, **kwargs):
-        """Override save to generate job_id if not provided."""
+        """Generate job_id if not provided and keep the daily rollup in step."""
         if not self.job_id:
             self.job_id = str(uuid.uuid4())
-        super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not ROLLUP_FIELDS & set(update_fields):
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                old = self._get_saved_rollup_state()
+                super().save(*args, **kwargs)
+                new = self._get_rollup_state()
+                apply_job_rollup_change(old, new)
+            self._rollup_state = new
+        invalidate_stats('processing')
+        invalidate_stats('project', self.project_id)
     
     def clean(self):
         """Validate job data."""
@@ -266,3 +303,32 @@ class ProcessingJob(UserStampedModel, SoftDeleteModel):
         if not self.result:
             return default
         return self.result.get(key, default)
+
+
+class ProcessingDailyStats(models.Model):
+    """Daily rollup of finished processing jobs per job type and status."""
+    
+    date = models.DateField()
+    job_type = models.CharField(max_length=30)
+    status = models.CharField(max_length=20)
+    
+    # Counters, maintained incrementally as jobs finish
+    job_count = models.IntegerField(default=0)
+    timed_job_count = models.IntegerField(default=0)
+    total_processing_time = models.FloatField(default=0, help_text="Seconds")
+    
+    class Meta:
+        db_table = 'processing_daily_stats'
+        verbose_name = 'Processing Daily Stats'
+        verbose_name_plural = 'Processing Daily Stats'
+        ordering = ['-date', 'job_type', 'status']
+        unique_together = ['date', 'job_type', 'status']
+    
+    def __str__(self):
+        return f"{self.date} {self.job_type} {self.status}: {self.job_count}"
+    
+    def get_average_processing_time(self):
+        """Get the average processing time in seconds of the timed jobs."""
+        if not self.timed_job_count:
+            return None
+        return self.total_processing_time / self.timed_job_count
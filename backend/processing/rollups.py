@@ -0,0 +1,56 @@
+from datetime import date, datetime, timedelta
+from typing import Optional, Tuple
+from django.utils import timezone
+from core.rollups import add_to_rollup
+
+# Statuses a job is counted in once it has finished
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+# Fields of a job that decide its rollup row
+ROLLUP_FIELDS = {'status', 'job_type', 'completed_at', 'processing_time'}
+
+# How a job contributes to the daily rollup: (day, job type, status,
+# processing seconds or None), or None while it has not finished
+JobRollupState = Optional[Tuple[date, str, str, Optional[float]]]
+
+
+def job_rollup_state(
+    status: str,
+    job_type: str,
+    completed_at: Optional[datetime],
+    processing_time: Optional[timedelta],
+) -> JobRollupState:
+    """Get the rollup contribution of a job."""
+    if status not in FINISHED_STATUSES or completed_at is None:
+        return None
+    seconds = processing_time.total_seconds() if processing_time is not None else None
+    return timezone.localdate(completed_at), job_type, status, seconds
+
+
+def _add_job(state: JobRollupState, sign: int) -> None:
+    from .models import ProcessingDailyStats
+
+    day, job_type, status, seconds = state
+    add_to_rollup(
+        ProcessingDailyStats,
+        {'date': day, 'job_type': job_type, 'status': status},
+        job_count=sign,
+        timed_job_count=sign if seconds is not None else 0,
+        total_processing_time=sign * (seconds or 0),
+    )
+
+
+def apply_job_rollup_change(old: JobRollupState, new: JobRollupState) -> None:
+    """
+    Move a job between daily rollup rows.
+
+    A job counts once, on the day it finished and under its final status,
+    so a failed job that is retried moves from ``failed`` to its new
+    outcome instead of being counted twice.
+    """
+    if old == new:
+        return
+    if old is not None:
+        _add_job(old, -1)
+    if new is not None:
+        _add_job(new, 1)
@@ -1,8 +1,8 @@
 from rest_framework import serializers
 from .models import ProcessingJob
-from users.serializers import UserListSerializer
-from documents.serializers import DocumentListSerializer
-from projects.serializers import ProjectListSerializer
+from users.serializers import UserListSerializer, UserSummarySerializer
+from documents.serializers import DocumentListSerializer, DocumentSummarySerializer
+from projects.serializers import ProjectListSerializer, ProjectSummarySerializer
 
 
 class ProcessingJobSerializer(serializers.ModelSerializer):
@@ -95,9 +95,9 @@ class ProcessingJobUpdateSerializer(serializers.ModelSerializer):
 class ProcessingJobListSerializer(serializers.ModelSerializer):
     """Processing job list serializer."""
 
-    created_by = UserListSerializer(read_only=True)
-    document = DocumentListSerializer(read_only=True)
-    project = ProjectListSerializer(read_only=True)
+    created_by = UserSummarySerializer(read_only=True)
+    document = DocumentSummarySerializer(read_only=True)
+    project = ProjectSummarySerializer(read_only=True)
     processing_time_display = serializers.CharField(
         source="get_processing_time_display", read_only=True
     )
@@ -190,10 +190,11 @@ class ProcessingJobStatsSerializer(serializers.Serializer):
     running_jobs = serializers.IntegerField()
     pending_jobs = serializers.IntegerField()
     success_rate = serializers.FloatField()
-    average_processing_time = serializers.CharField()
-    job_type_breakdown = serializers.DictField()
-    status_breakdown = serializers.DictField()
-    recent_jobs = serializers.ListField()
+    job_type_distribution = serializers.ListField()
+    status_distribution = serializers.ListField()
+    performance_stats = serializers.DictField()
+    user_stats = serializers.ListField()
+    recent_jobs = serializers.IntegerField()
 
 
 class ProcessingJobBulkActionSerializer(serializers.Serializer):
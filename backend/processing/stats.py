@@ -0,0 +1,146 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Any, Dict, Optional
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from core.stats import percentage, stats_provider
+from .models import ProcessingDailyStats, ProcessingJob
+
+# Per-row sums and counts that are added up into the performance averages
+PERFORMANCE_TOTALS = (
+    "processing_time_count",
+    "memory_usage_sum",
+    "memory_usage_count",
+    "cpu_usage_sum",
+    "cpu_usage_count",
+)
+
+
+def _average(total, count):
+    return total / count if count else None
+
+
+@stats_provider("processing")
+def compute_processing_job_stats() -> Dict[str, Any]:
+    """Compute the processing job dashboard in one grouped query."""
+    completed = Q(status="completed")
+    rows = (
+        ProcessingJob.objects.order_by()
+        .values("job_type", "status", "created_by__username")
+        .annotate(
+            count=Count("id"),
+            recent=Count("id", filter=Q(created_at__gte=timezone.now() - timedelta(days=7))),
+            processing_time_sum=Sum("processing_time", filter=completed),
+            processing_time_count=Count("processing_time", filter=completed),
+            memory_usage_sum=Sum("memory_usage", filter=completed),
+            memory_usage_count=Count("memory_usage", filter=completed),
+            cpu_usage_sum=Sum("cpu_usage", filter=completed),
+            cpu_usage_count=Count("cpu_usage", filter=completed),
+        )
+    )
+
+    statuses = Counter()
+    job_types: Dict[str, Dict[str, Any]] = {}
+    users: Dict[str, Dict[str, Any]] = {}
+    totals = Counter()
+    processing_time_sum = timedelta()
+    recent_jobs = 0
+    for row in rows:
+        status = row["status"]
+        statuses[status] += row["count"]
+        recent_jobs += row["recent"]
+
+        job_type = job_types.setdefault(
+            row["job_type"],
+            {"job_type": row["job_type"], "count": 0, "completed": 0, "failed": 0, "running": 0},
+        )
+        job_type["count"] += row["count"]
+        if status in ("completed", "failed", "running"):
+            job_type[status] += row["count"]
+
+        username = row["created_by__username"]
+        user = users.setdefault(
+            username,
+            {
+                "created_by__username": username,
+                "total_jobs": 0,
+                "completed_jobs": 0,
+                "failed_jobs": 0,
+            },
+        )
+        user["total_jobs"] += row["count"]
+        if status in ("completed", "failed"):
+            user[f"{status}_jobs"] += row["count"]
+
+        processing_time_sum += row["processing_time_sum"] or timedelta()
+        for field in PERFORMANCE_TOTALS:
+            totals[field] += row[field] or 0
+
+    total_jobs = sum(statuses.values())
+    return {
+        "total_jobs": total_jobs,
+        "completed_jobs": statuses["completed"],
+        "failed_jobs": statuses["failed"],
+        "running_jobs": statuses["running"],
+        "pending_jobs": statuses["pending"],
+        "success_rate": percentage(statuses["completed"], total_jobs),
+        "job_type_distribution": sorted(job_types.values(), key=lambda entry: -entry["count"]),
+        "status_distribution": [
+            {"status": status, "count": count} for status, count in statuses.most_common()
+        ],
+        "performance_stats": {
+            "avg_processing_time": _average(
+                processing_time_sum, totals["processing_time_count"]
+            ),
+            "avg_memory_usage": _average(
+                totals["memory_usage_sum"], totals["memory_usage_count"]
+            ),
+            "avg_cpu_usage": _average(totals["cpu_usage_sum"], totals["cpu_usage_count"]),
+        },
+        "user_stats": sorted(users.values(), key=lambda entry: -entry["total_jobs"]),
+        "recent_jobs": recent_jobs,
+    }
+
+
+def summarize_processing_rollup(since: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Summarize finished jobs from the daily rollup, optionally from ``since`` on.
+
+    Reads one row per day, job type and status, so the cost does not
+    depend on the size of the job history.
+    """
+    rows = ProcessingDailyStats.objects.order_by()
+    if since is not None:
+        rows = rows.filter(date__gte=since)
+    rows = rows.values("job_type", "status").annotate(
+        jobs=Sum("job_count"),
+        timed_jobs=Sum("timed_job_count"),
+        processing_time=Sum("total_processing_time"),
+    )
+
+    def empty():
+        return {"total": 0, "completed": 0, "failed": 0, "cancelled": 0, "timed": 0, "time": 0}
+
+    totals = empty()
+    job_types: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        for entry in (totals, job_types.setdefault(row["job_type"], empty())):
+            entry["total"] += row["jobs"]
+            entry[row["status"]] += row["jobs"]
+            entry["timed"] += row["timed_jobs"]
+            entry["time"] += row["processing_time"]
+
+    def summary(entry):
+        return {
+            "total_jobs": entry["total"],
+            "completed_jobs": entry["completed"],
+            "failed_jobs": entry["failed"],
+            "cancelled_jobs": entry["cancelled"],
+            "success_rate": percentage(entry["completed"], entry["total"]),
+            "avg_processing_time": _average(entry["time"], entry["timed"]),
+        }
+
+    return {
+        **summary(totals),
+        "job_types": {job_type: summary(entry) for job_type, entry in job_types.items()},
+    }
@@ -1,128 +1,300 @@
 import logging
 from typing import Dict, List, Any
-from celery import shared_task
+from celery import chain, chord, shared_task
 from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Least
 from django.utils import timezone
 from django.core.mail import send_mail
 from .models import ProcessingJob
 from documents.models import Document
 from entities.models import Entity
+from llm_integration.chunking import TextChunker, merge_chunk_entities
+from llm_integration.incremental import reextract_changes
+from llm_integration.models import LLMProcessingConfig
+from llm_integration.persistence import save_extracted_entities
+from llm_integration.ratelimit import get_task_retry_countdown
+from llm_integration.router import model_router
 from llm_integration.tasks import extract_entities_from_text
 
 logger = logging.getLogger(__name__)
 
 
+PIPELINE_STEPS = ["load", "chunk", "extract", "merge", "persist"]
+
+
+def _get_active_job(job_id: int):
+    """Get a pipeline job, or None if it was cancelled or already failed."""
+    job = ProcessingJob.objects.select_related("document").get(id=job_id)
+    if job.status in ["cancelled", "failed"]:
+        logger.info(f"Skipping pipeline stage for {job.status} job {job_id}")
+        return None
+    return job
+
+
+def _fail_job(job: ProcessingJob, message: str):
+    """Mark a pipeline job and its document as failed."""
+    logger.error(f"Processing job {job.id} failed: {message}")
+    job.complete(error_message=message)
+    if job.document:
+        job.document.complete_processing(success=False)
+
+
 @shared_task(bind=True, max_retries=3, default_retry_delay=60)
 def process_document_with_llm(
-    self, document_id: int, prompt_type: str = "marsiya", user_id: int = None
+    self,
+    document_id: int,
+    prompt_type: str = "marsiya",
+    user_id: int = None,
+    incremental: bool = False,
 ):
     """
-    Process a document with LLM for entity extraction.
+    Start LLM entity extraction for a document.
+
+    The work runs as a pipeline of load -> chunk -> extract -> merge ->
+    persist stages. Stages pass only the job ID and chunk offsets between
+    them, and no task waits on another, so a worker slot is held only for
+    the duration of a single stage.
+
+    With ``incremental``, a document that was processed before is diffed
+    against the processed version and only the changed stanzas are
+    extracted again (see ``reextract_document_changes``).
 
     Args:
         document_id: ID of the document to process
         prompt_type: Type of prompt to use
         user_id: ID of the user requesting the processing
+        incremental: Re-extract only what changed since the last run
     """
     try:
-        # Get the document
         document = Document.objects.get(id=document_id)
+    except Document.DoesNotExist:
+        logger.error(f"Document {document_id} not found")
+        raise
 
-        # Create or update processing job
-        job, created = ProcessingJob.objects.get_or_create(
-            document=document,
-            job_type="llm_processing",
-            defaults={
-                "status": "processing",
-                "progress": 0,
-                "created_by_id": user_id,
-                "metadata": {"prompt_type": prompt_type, "processing_method": "llm"},
-            },
-        )
+    job = ProcessingJob.objects.create(
+        name=f"LLM processing: {document.title}"[:200],
+        job_type="ner_processing",
+        document=document,
+        project=document.project,
+        status="queued",
+        total_steps=len(PIPELINE_STEPS),
+        created_by_id=user_id,
+        result={"prompt_type": prompt_type},
+    )
 
-        if not created:
-            job.status = "processing"
-            job.progress = 0
-            job.started_at = timezone.now()
-            job.metadata.update(
-                {"prompt_type": prompt_type, "processing_method": "llm"}
-            )
-            job.save()
+    if incremental and document.get_processed_version() is not None:
+        reextract_document_changes.delay(job.id, prompt_type)
+        logger.info(f"Queued incremental re-extraction for document {document_id} (job {job.id})")
+        return {"job_id": job.id, "document_id": document_id, "prompt_type": prompt_type}
 
-        # Update progress
-        job.progress = 10
-        job.save()
+    pipeline = chain(
+        load_document_text.si(job.id),
+        chunk_document_text.si(job.id, prompt_type),
+    )
+    pipeline.apply_async()
 
-        # Get document text
-        if document.file:
-            # Read from file
-            try:
-                with document.file.open("r", encoding="utf-8") as f:
-                    text = f.read()
-            except UnicodeDecodeError:
-                # Try with different encoding
-                with document.file.open("r", encoding="latin-1") as f:
-                    text = f.read()
-        else:
-            # Use content field
-            text = document.content or ""
-
-        if not text.strip():
-            raise ValueError("Document has no readable text content")
-
-        job.progress = 20
-        job.save()
-
-        # Process with LLM
-        try:
-            # Call the LLM entity extraction task
-            llm_task = extract_entities_from_text.delay(
-                text=text,
-                document_id=document_id,
-                prompt_type=prompt_type,
-                user_id=user_id,
-            )
+    logger.info(f"Queued LLM processing pipeline for document {document_id} (job {job.id})")
+    return {"job_id": job.id, "document_id": document_id, "prompt_type": prompt_type}
 
-            # Update job with LLM task ID
-            job.metadata["llm_task_id"] = llm_task.id
-            job.progress = 50
-            job.save()
-
-            # Wait for LLM task to complete
-            result = llm_task.get(timeout=300)  # 5 minutes timeout
-
-            job.progress = 100
-            job.status = "completed"
-            job.completed_at = timezone.now()
-            job.result = result
-            job.save()
-
-            logger.info(f"Document {document_id} processed successfully with LLM")
-            return result
-
-        except Exception as e:
-            logger.error(f"LLM processing failed for document {document_id}: {e}")
-            job.status = "failed"
-            job.error_message = f"LLM processing failed: {str(e)}"
-            job.completed_at = timezone.now()
-            job.save()
-            raise
 
-    except Document.DoesNotExist:
-        logger.error(f"Document {document_id} not found")
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def load_document_text(self, job_id: int):
+    """Pipeline stage: check that the document has text to process."""
+    job = _get_active_job(job_id)
+    if job is None:
+        return job_id
+
+    job.start()
+    job.update_progress(10, "Loading document")
+    job.document.start_processing()
+
+    try:
+        text = job.document.get_text()
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        _fail_job(job, f"Failed to load document: {e}")
         raise
+
+    if not text.strip():
+        _fail_job(job, "Document has no readable text content")
+        raise ValueError("Document has no readable text content")
+
+    return job_id
+
+
+@shared_task
+def chunk_document_text(job_id: int, prompt_type: str = "marsiya"):
+    """
+    Pipeline stage: split the document and fan chunks out to extraction.
+
+    Each chunk is extracted by its own task; a chord collects the results
+    and hands them to the merge and persist stages.
+    """
+    job = _get_active_job(job_id)
+    if job is None:
+        return None
+
+    try:
+        config = LLMProcessingConfig.objects.filter(is_active=True).first()
+        if not config:
+            raise ValueError("No active LLM processing configuration found")
+
+        chunks = TextChunker(config.chunk_size, config.overlap_size).split(
+            job.document.get_text()
+        )
     except Exception as e:
-        logger.error(f"Document processing task failed: {e}")
+        _fail_job(job, f"Failed to chunk document: {e}")
+        raise
 
-        # Retry logic
+    job.total_steps = len(chunks)
+    job.save(update_fields=["total_steps"])
+    job.update_progress(20, f"Extracting entities from {len(chunks)} chunks")
+
+    header = [
+        extract_chunk_entities.si(job_id, chunk["start"], chunk["end"], prompt_type)
+        for chunk in chunks
+    ]
+    body = merge_chunk_results.s(job_id) | persist_document_entities.s(
+        job_id, prompt_type
+    )
+    chord(header)(body)
+
+    return {"job_id": job_id, "chunks": len(chunks)}
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def extract_chunk_entities(
+    self, job_id: int, start: int, end: int, prompt_type: str = "marsiya"
+):
+    """Pipeline stage: extract entities from one chunk of the document."""
+    job = _get_active_job(job_id)
+    if job is None:
+        return {"start": start, "end": end, "entities": []}
+
+    try:
+        text = job.document.get_text()[start:end]
+        entities = model_router.extract_entities(text, prompt_type)
+    except Exception as e:
         if self.request.retries < self.max_retries:
             logger.info(
-                f"Retrying document processing (attempt {self.request.retries + 1})"
+                f"Retrying chunk {start}-{end} of job {job_id} "
+                f"(attempt {self.request.retries + 1})"
             )
-            raise self.retry(exc=e)
-        else:
-            logger.error(f"Document processing failed after {self.max_retries} retries")
-            raise
+            raise self.retry(exc=e, countdown=get_task_retry_countdown(self, e))
+        _fail_job(job, f"Entity extraction failed: {e}")
+        raise
+
+    # Every finished chunk moves the job forward, up to the merge stage
+    step = max(1, 60 // max(job.total_steps, 1))
+    ProcessingJob.objects.filter(id=job_id).update(
+        progress=Least(F("progress") + step, 80)
+    )
+
+    return {"start": start, "end": end, "entities": entities}
+
+
+@shared_task
+def merge_chunk_results(chunk_results: List[Dict[str, Any]], job_id: int):
+    """Pipeline stage: merge chunk entities back into document offsets."""
+    job = _get_active_job(job_id)
+    if job is None:
+        return []
+
+    job.update_progress(85, "Merging chunk results")
+    return merge_chunk_entities(
+        (result, result["entities"]) for result in chunk_results
+    )
+
+
+@shared_task
+def persist_document_entities(
+    entities_data: List[Dict[str, Any]], job_id: int, prompt_type: str = "marsiya"
+):
+    """Pipeline stage: save merged entities and complete the job."""
+    job = _get_active_job(job_id)
+    if job is None:
+        return None
+
+    job.update_progress(95, "Saving entities")
+    document = job.document
+
+    try:
+        text = document.get_text()
+        saved_entities = save_extracted_entities(
+            document,
+            entities_data,
+            prompt_type=prompt_type,
+            user_id=job.created_by_id,
+            text=text,
+        )
+        document.complete_processing(success=True)
+        document.mark_processed(text)
+    except Exception as e:
+        _fail_job(job, f"Failed to save entities: {e}")
+        raise
+
+    result = {
+        "prompt_type": prompt_type,
+        "entities_extracted": len(saved_entities),
+        "chunks": job.total_steps,
+    }
+    job.complete(result=result)
+
+    logger.info(
+        f"Document {document.id} processed successfully with LLM: "
+        f"{len(saved_entities)} entities"
+    )
+    return result
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def reextract_document_changes(self, job_id: int, prompt_type: str = "marsiya"):
+    """
+    Re-extract only the parts of a document that changed since it was processed.
+
+    The current text is diffed against the processed ``DocumentVersion``.
+    Changed stanzas go to the LLM; entities elsewhere are shifted to their
+    new offsets instead of being extracted again.
+    """
+    job = _get_active_job(job_id)
+    if job is None:
+        return None
+
+    document = job.document
+    job.start()
+    job.update_progress(10, "Diffing against the processed version")
+    document.start_processing()
+
+    try:
+        config = LLMProcessingConfig.objects.filter(is_active=True).first()
+        if not config:
+            raise ValueError("No active LLM processing configuration found")
+
+        text = document.get_text()
+        result = reextract_changes(
+            document,
+            document.get_processed_version().content,
+            text,
+            extract=lambda span: model_router.extract_entities(span, prompt_type),
+            prompt_type=prompt_type,
+            user_id=job.created_by_id,
+            max_segment_size=config.chunk_size,
+        )
+        document.complete_processing(success=True)
+        document.mark_processed(text)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.info(f"Retrying incremental re-extraction of job {job_id}: {e}")
+            raise self.retry(exc=e, countdown=get_task_retry_countdown(self, e))
+        _fail_job(job, f"Incremental re-extraction failed: {e}")
+        raise
+
+    result["prompt_type"] = prompt_type
+    result["incremental"] = True
+    job.complete(result=result)
+    return result
 
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=30)
@@ -140,23 +312,10 @@ def cancel_processing_job(self, job_id: int):
             logger.warning(f"Job {job_id} cannot be cancelled (status: {job.status})")
             return False
 
-        # Cancel the job
-        job.status = "cancelled"
-        job.cancelled_at = timezone.now()
-        job.metadata["cancelled_by"] = "system"
-        job.save()
-
-        # If there's an associated LLM task, try to revoke it
-        if "llm_task_id" in job.metadata:
-            try:
-                from celery.result import AsyncResult
-
-                llm_task = AsyncResult(job.metadata["llm_task_id"])
-                if llm_task.state in ["PENDING", "STARTED"]:
-                    llm_task.revoke(terminate=True)
-                    logger.info(f"LLM task {job.metadata['llm_task_id']} revoked")
-            except Exception as e:
-                logger.warning(f"Failed to revoke LLM task: {e}")
+        # Cancel the job; pending pipeline stages check the status and stop
+        job.cancel()
+        if job.document and job.document.processing_status == "processing":
+            job.document.cancel_processing()
 
         logger.info(f"Processing job {job_id} cancelled successfully")
         return True
@@ -193,23 +352,17 @@ def retry_processing_job(self, job_id: int):
             logger.warning(f"Job {job_id} cannot be retried (status: {job.status})")
             return False
 
-        # Reset job for retry
-        job.status = "pending"
-        job.progress = 0
-        job.started_at = None
-        job.completed_at = None
-        job.cancelled_at = None
-        job.error_message = None
-        job.metadata["retry_count"] = job.metadata.get("retry_count", 0) + 1
-        job.metadata["retry_attempt"] = timezone.now().isoformat()
-        job.save()
+        # Record the retry; the re-queued work tracks itself in a new job
+        job.retry_count += 1
+        job.status = "retrying"
+        job.save(update_fields=["retry_count", "status"])
 
         # Re-queue the job based on its type
-        if job.job_type == "llm_processing":
+        if job.job_type == "ner_processing":
             # Re-queue LLM processing
             process_document_with_llm.delay(
                 document_id=job.document.id,
-                prompt_type=job.metadata.get("prompt_type", "marsiya"),
+                prompt_type=job.get_result("prompt_type", "marsiya"),
                 user_id=job.created_by_id,
             )
         elif job.job_type == "entity_extraction":
@@ -350,48 +503,21 @@ Marsiya NER Team
 
 @shared_task
 def update_processing_stats():
-    """Update processing statistics and metrics."""
+    """Cache the processing statistics of the last day from the daily rollup."""
     try:
-        from django.db.models import Count, Avg, Sum
-        from django.utils import timezone
-        from datetime import timedelta
-
-        # Get stats for the last 24 hours
-        yesterday = timezone.now() - timedelta(days=1)
-
-        # Daily processing stats
-        daily_stats = ProcessingJob.objects.filter(created_at__gte=yesterday).aggregate(
-            total_jobs=Count("id"),
-            completed_jobs=Count("id", filter={"status": "completed"}),
-            failed_jobs=Count("id", filter={"status": "failed"}),
-            cancelled_jobs=Count("id", filter={"status": "cancelled"}),
-            avg_processing_time=Avg("metadata__processing_time"),
-        )
-
-        # Update cache with daily stats
         from django.core.cache import cache
+        from datetime import timedelta
+        from .stats import summarize_processing_rollup
 
-        cache.set("daily_processing_stats", daily_stats, timeout=3600)  # 1 hour
-
-        # Update job performance metrics
-        for job_type in [
-            "llm_processing",
-            "entity_extraction",
-            "bulk_entity_extraction",
-        ]:
-            type_stats = ProcessingJob.objects.filter(
-                job_type=job_type, created_at__gte=yesterday
-            ).aggregate(
-                total=Count("id"),
-                completed=Count("id", filter={"status": "completed"}),
-                failed=Count("id", filter={"status": "failed"}),
-                avg_time=Avg("metadata__processing_time"),
-            )
+        summary = summarize_processing_rollup(since=timezone.localdate() - timedelta(days=1))
+        job_types = summary.pop("job_types")
 
+        cache.set("daily_processing_stats", summary, timeout=3600)  # 1 hour
+        for job_type, type_stats in job_types.items():
             cache.set(f"job_type_stats_{job_type}", type_stats, timeout=3600)
 
         logger.info("Processing statistics updated")
-        return daily_stats
+        return summary
 
     except Exception as e:
         logger.error(f"Failed to update processing stats: {e}")
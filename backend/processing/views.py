@@ -22,13 +22,18 @@ from .serializers import (
 
 from .tasks import cancel_processing_job, retry_processing_job
 from projects.permissions import IsProjectMember
+from projects.access import get_request_project
+from core.query_plan import QueryPlan, QueryPlanMixin
+from core.stats import get_stats
+from .stats import compute_processing_job_stats
 
 
-class ProcessingJobListView(generics.ListAPIView):
+class ProcessingJobListView(QueryPlanMixin, generics.ListAPIView):
     """List processing jobs."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = ProcessingJobListSerializer
+    query_plan = QueryPlan(select_related=("created_by", "document", "project"))
     queryset = ProcessingJob.objects.all().order_by("-created_at")
 
     def get_queryset(self):
@@ -261,70 +266,7 @@ class ProcessingJobFilterView(generics.ListAPIView):
 @permission_classes([IsAuthenticated])
 def processing_job_stats(request):
     """Get processing job statistics."""
-    # Overall statistics
-    total_jobs = ProcessingJob.objects.count()
-    completed_jobs = ProcessingJob.objects.filter(status="completed").count()
-    failed_jobs = ProcessingJob.objects.filter(status="failed").count()
-    running_jobs = ProcessingJob.objects.filter(status="running").count()
-    pending_jobs = ProcessingJob.objects.filter(status="pending").count()
-
-    # Job type distribution
-    job_type_stats = (
-        ProcessingJob.objects.values("job_type")
-        .annotate(
-            count=Count("id"),
-            completed=Count("id", filter=Q(status="completed")),
-            failed=Count("id", filter=Q(status="failed")),
-            running=Count("id", filter=Q(status="running")),
-        )
-        .order_by("-count")
-    )
-
-    # Status distribution
-    status_stats = (
-        ProcessingJob.objects.values("status")
-        .annotate(count=Count("id"))
-        .order_by("-count")
-    )
-
-    # Performance statistics
-    performance_stats = ProcessingJob.objects.filter(status="completed").aggregate(
-        avg_processing_time=Avg("processing_time"),
-        avg_memory_usage=Avg("memory_usage"),
-        avg_cpu_usage=Avg("cpu_usage"),
-    )
-
-    # User statistics
-    user_stats = (
-        ProcessingJob.objects.values("created_by__username")
-        .annotate(
-            total_jobs=Count("id"),
-            completed_jobs=Count("id", filter=Q(status="completed")),
-            failed_jobs=Count("id", filter=Q(status="failed")),
-        )
-        .order_by("-total_jobs")
-    )
-
-    # Recent activity
-    recent_jobs = ProcessingJob.objects.filter(
-        created_at__gte=timezone.now() - timezone.timedelta(days=7)
-    ).count()
-
-    stats = {
-        "total_jobs": total_jobs,
-        "completed_jobs": completed_jobs,
-        "failed_jobs": failed_jobs,
-        "running_jobs": running_jobs,
-        "pending_jobs": pending_jobs,
-        "success_rate": (completed_jobs / total_jobs * 100) if total_jobs > 0 else 0,
-        "job_type_distribution": list(job_type_stats),
-        "status_distribution": list(status_stats),
-        "performance_stats": performance_stats,
-        "user_stats": list(user_stats),
-        "recent_jobs": recent_jobs,
-    }
-
-    serializer = ProcessingJobStatsSerializer(stats)
+    serializer = ProcessingJobStatsSerializer(get_stats(compute_processing_job_stats))
     return Response(serializer.data)
 
 
@@ -332,9 +274,7 @@ def processing_job_stats(request):
 @permission_classes([IsAuthenticated])
 def project_processing_stats(request, project_slug):
     """Get processing statistics for a specific project."""
-    from projects.models import Project
-
-    project = get_object_or_404(Project, slug=project_slug)
+    project = get_request_project(request, project_slug)
 
     # Project-specific job statistics
     project_jobs = ProcessingJob.objects.filter(project=project)
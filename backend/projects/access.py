@@ -0,0 +1,119 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
+
+logger = logging.getLogger(__name__)
+
+ACCESS_FLAGS = (
+    "can_edit_project",
+    "can_manage_members",
+    "can_upload_documents",
+    "can_edit_entities",
+    "can_export_data",
+)
+
+_MISSING = object()
+
+
+def _version_key(project_slug: str) -> str:
+    return f"project_access_version:{project_slug}"
+
+
+def _get_version(project_slug: str) -> int:
+    """Get the cache version of a project's access entries, creating it if needed."""
+    key = _version_key(project_slug)
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock so an evicted version never revives old entries
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_project_access(project_slug: str) -> None:
+    """Drop every cached access entry for a project by bumping its version."""
+    key = _version_key(project_slug)
+    try:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+    except Exception as e:
+        logger.warning(f"Could not invalidate access cache for project {project_slug}: {e}")
+
+
+def _load_access(user, project_slug: str) -> Optional[Dict[str, Any]]:
+    """Look up a user's role and capability flags in a project."""
+    from .models import Project, ProjectMembership
+
+    project = Project.objects.filter(slug=project_slug).first()
+    if project is None:
+        return None
+
+    membership = (
+        ProjectMembership.objects.filter(user=user, project=project, is_active=True)
+        .only("role", *ACCESS_FLAGS)
+        .first()
+    )
+    access = {"project": project, "role": membership.role if membership else None}
+    for flag in ACCESS_FLAGS:
+        access[flag] = bool(membership and getattr(membership, flag))
+    return access
+
+
+def _get_cached_access(user, project_slug: str) -> Optional[Dict[str, Any]]:
+    """Get a user's access to a project, from the cache when possible."""
+    key = None
+    try:
+        key = f"project_access:{project_slug}:{_get_version(project_slug)}:{user.pk}"
+        access = cache.get(key, _MISSING)
+        if access is not _MISSING:
+            return access
+    except Exception as e:
+        logger.debug(f"Project access cache unavailable: {e}")
+
+    access = _load_access(user, project_slug)
+    if key is not None:
+        try:
+            cache.set(key, access, settings.PROJECT_ACCESS_CACHE_TTL)
+        except Exception as e:
+            logger.debug(f"Could not cache project access: {e}")
+    return access
+
+
+def resolve_project_access(request, project_slug: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve the requesting user's access to a project.
+
+    Returns the ``project`` with the user's ``role`` (None for non-members)
+    and capability flags, or None if the project does not exist. Results
+    are memoized on the request and cached across requests until the
+    project or one of its memberships changes. The project is attached
+    to the request as ``request.project``.
+    """
+    memo = getattr(request, "_project_access", None)
+    if memo is None:
+        memo = {}
+        request._project_access = memo
+
+    if project_slug not in memo:
+        memo[project_slug] = _get_cached_access(request.user, project_slug)
+
+    access = memo[project_slug]
+    if access is not None:
+        request.project = access["project"]
+    return access
+
+
+def get_request_project(request, project_slug: str):
+    """Get the project resolved by the permission checks, or fetch it (404 if missing)."""
+    from .models import Project
+
+    project = getattr(request, "project", None)
+    if project is None or project.slug != project_slug:
+        project = get_object_or_404(Project, slug=project_slug)
+        request.project = project
+    return project
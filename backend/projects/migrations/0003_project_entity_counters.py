@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-18 01:34
+
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def fill_entity_counters(apps, schema_editor):
+    Project = apps.get_model('projects', 'Project')
+    visible = Q(documents__is_deleted=False)
+    projects = Project.objects.annotate(
+        document_total=Sum('documents__total_entities', filter=visible),
+        document_verified=Sum('documents__verified_entities', filter=visible),
+    )
+    for project in projects:
+        Project.objects.filter(pk=project.pk).update(
+            total_entities=project.document_total or 0,
+            verified_entities=project.document_verified or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_initial'),
+        ('documents', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='total_entities',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='verified_entities',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_entity_counters, migrations.RunPython.noop),
+    ]
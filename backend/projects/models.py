@@ -1,12 +1,16 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
-from core.models import UserStampedModel, SoftDeleteModel
+from core.models import CounterFieldsModel, UserStampedModel, SoftDeleteModel
+from core.query_plan import annotated, count_subquery
+from core.stats import invalidate_stats
 
 
-class Project(UserStampedModel, SoftDeleteModel):
+class Project(CounterFieldsModel, UserStampedModel, SoftDeleteModel):
     """Research project for organizing documents and collaboration."""
 
+    counter_fields = ("total_entities", "verified_entities")
+
     # Basic Information
     name = models.CharField(max_length=200, db_index=True)
     description = models.TextField(blank=True)
@@ -41,6 +45,10 @@ class Project(UserStampedModel, SoftDeleteModel):
     tags = models.JSONField(default=list)
     references = models.JSONField(default=list)
 
+    # Entity counts of non-deleted documents, maintained by documents.counters
+    total_entities = models.IntegerField(default=0)
+    verified_entities = models.IntegerField(default=0)
+
     class Meta:
         db_table = "projects_project"
         verbose_name = "Project"
@@ -60,28 +68,47 @@ class Project(UserStampedModel, SoftDeleteModel):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+        self._invalidate_access()
+
+    def hard_delete(self, using=None, keep_parents=False):
+        result = super().hard_delete(using=using, keep_parents=keep_parents)
+        self._invalidate_access()
+        return result
+
+    def _invalidate_access(self):
+        from .access import invalidate_project_access
+
+        invalidate_project_access(self.slug)
+
+    @staticmethod
+    def count_annotations():
+        """Get annotations that precompute the member and document counts."""
+        from documents.models import Document
+
+        return {
+            "members_count": count_subquery(ProjectMembership.objects.all(), "project"),
+            "documents_count": count_subquery(
+                Document.objects.filter(is_deleted=False), "project"
+            ),
+        }
 
     def get_members_count(self):
         """Get total number of project members."""
-        return self.users.count()
+        count = annotated(self, "members_count")
+        return self.users.count() if count is None else count
 
     def get_documents_count(self):
         """Get total number of documents in project."""
-        return self.documents.filter(is_deleted=False).count()
+        count = annotated(self, "documents_count")
+        return self.documents.filter(is_deleted=False).count() if count is None else count
 
     def get_entities_count(self):
         """Get total number of entities across all documents."""
-        total = 0
-        for doc in self.documents.filter(is_deleted=False):
-            total += doc.total_entities
-        return total
+        return self.total_entities
 
     def get_verified_entities_count(self):
         """Get total number of verified entities."""
-        total = 0
-        for doc in self.documents.filter(is_deleted=False):
-            total += doc.verified_entities
-        return total
+        return self.verified_entities
 
     def add_member(self, user, role="researcher"):
         """Add user to project with specified role."""
@@ -185,6 +212,18 @@ class ProjectMembership(models.Model):
             self.can_export_data = False
 
         super().save(*args, **kwargs)
+        self._invalidate_access()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self._invalidate_access()
+        return result
+
+    def _invalidate_access(self):
+        from .access import invalidate_project_access
+
+        invalidate_project_access(self.project.slug)
+        invalidate_stats("project", self.project_id)
 
     def get_permissions_display(self):
         """Get human-readable permissions."""
@@ -1,39 +1,17 @@
 from rest_framework import permissions
-from .models import Project, ProjectMembership
+from .access import resolve_project_access
 
 
-class IsProjectMember(permissions.BasePermission):
-    """Allow access only to project members."""
-
-    def has_permission(self, request, view):
-        # Check if user is authenticated
-        if not request.user.is_authenticated:
-            return False
+class ProjectPermission(permissions.BasePermission):
+    """
+    Base class for project-level permissions.
 
-        # Allow superusers and staff users to do anything
-        if request.user.is_superuser or request.user.is_staff:
-            return True
+    Membership is resolved through ``resolve_project_access``, so several
+    permission classes on one view share a single lookup and the resolved
+    project is available to the view as ``request.project``.
+    """
 
-        # For list views, allow access (filtering will be done in queryset)
-        if hasattr(view, "action") and view.action == "list":
-            return True
-
-        # For other actions, check project membership
-        project_slug = view.kwargs.get("project_slug") or view.kwargs.get("slug")
-        if not project_slug:
-            return False
-
-        try:
-            project = Project.objects.get(slug=project_slug)
-            return ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).exists()
-        except Project.DoesNotExist:
-            return False
-
-
-class IsProjectAdmin(permissions.BasePermission):
-    """Allow access only to project administrators."""
+    slug_kwargs = ("project_slug",)
 
     def has_permission(self, request, view):
         if not request.user.is_authenticated:
@@ -43,141 +21,72 @@ class IsProjectAdmin(permissions.BasePermission):
         if request.user.is_superuser or request.user.is_staff:
             return True
 
-        project_slug = view.kwargs.get("project_slug") or view.kwargs.get("slug")
+        project_slug = next(
+            (view.kwargs[name] for name in self.slug_kwargs if view.kwargs.get(name)), None
+        )
         if not project_slug:
             return False
 
-        try:
-            project = Project.objects.get(slug=project_slug)
-            membership = ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).first()
-
-            if not membership:
-                return False
-
-            # Check if user has admin privileges
-            return (
-                membership.role in ["owner", "admin"]
-                or membership.can_edit_project
-                or membership.can_manage_members
-            )
-        except Project.DoesNotExist:
+        access = resolve_project_access(request, project_slug)
+        if access is None or access["role"] is None:
             return False
+        return self.has_access(access)
 
+    def has_access(self, access):
+        """Check the resolved role and capability flags of a member."""
+        return True
 
-class IsProjectOwner(permissions.BasePermission):
-    """Allow access only to project owners."""
-
-    def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-
-        # Allow superusers and staff users to do anything
-        if request.user.is_superuser or request.user.is_staff:
-            return True
-
-        project_slug = view.kwargs.get("project_slug") or view.kwargs.get("slug")
-        if not project_slug:
-            return False
-
-        try:
-            project = Project.objects.get(slug=project_slug)
-            membership = ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).first()
-
-            if not membership:
-                return False
-
-            # Check if user is owner
-            return membership.role == "owner"
-        except Project.DoesNotExist:
-            return False
 
+class IsProjectMember(ProjectPermission):
+    """Allow access only to project members."""
 
-class CanUploadDocuments(permissions.BasePermission):
-    """Allow document upload only to users with permission."""
+    slug_kwargs = ("project_slug", "slug")
 
     def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-
-        # Allow superusers and staff users to do anything
-        if request.user.is_superuser or request.user.is_staff:
+        # For list views, allow access (filtering will be done in queryset)
+        if request.user.is_authenticated and getattr(view, "action", None) == "list":
             return True
+        return super().has_permission(request, view)
 
-        project_slug = view.kwargs.get("project_slug")
-        if not project_slug:
-            return False
-
-        try:
-            project = Project.objects.get(slug=project_slug)
-            membership = ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).first()
-
-            if not membership:
-                return False
 
-            return membership.can_upload_documents
-        except Project.DoesNotExist:
-            return False
+class IsProjectAdmin(ProjectPermission):
+    """Allow access only to project administrators."""
 
+    slug_kwargs = ("project_slug", "slug")
 
-class CanEditEntities(permissions.BasePermission):
-    """Allow entity editing only to users with permission."""
+    def has_access(self, access):
+        return (
+            access["role"] in ["owner", "admin"]
+            or access["can_edit_project"]
+            or access["can_manage_members"]
+        )
 
-    def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
-
-        # Allow superusers and staff users to do anything
-        if request.user.is_superuser or request.user.is_staff:
-            return True
 
-        project_slug = view.kwargs.get("project_slug")
-        if not project_slug:
-            return False
+class IsProjectOwner(ProjectPermission):
+    """Allow access only to project owners."""
 
-        try:
-            project = Project.objects.get(slug=project_slug)
-            membership = ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).first()
+    slug_kwargs = ("project_slug", "slug")
 
-            if not membership:
-                return False
+    def has_access(self, access):
+        return access["role"] == "owner"
 
-            return membership.can_edit_entities
-        except Project.DoesNotExist:
-            return False
 
+class CanUploadDocuments(ProjectPermission):
+    """Allow document upload only to users with permission."""
 
-class CanExportData(permissions.BasePermission):
-    """Allow data export only to users with permission."""
+    def has_access(self, access):
+        return access["can_upload_documents"]
 
-    def has_permission(self, request, view):
-        if not request.user.is_authenticated:
-            return False
 
-        # Allow superusers and staff users to do anything
-        if request.user.is_superuser or request.user.is_staff:
-            return True
+class CanEditEntities(ProjectPermission):
+    """Allow entity editing only to users with permission."""
 
-        project_slug = view.kwargs.get("project_slug")
-        if not project_slug:
-            return False
+    def has_access(self, access):
+        return access["can_edit_entities"]
 
-        try:
-            project = Project.objects.get(slug=project_slug)
-            membership = ProjectMembership.objects.filter(
-                user=request.user, project=project, is_active=True
-            ).first()
 
-            if not membership:
-                return False
+class CanExportData(ProjectPermission):
+    """Allow data export only to users with permission."""
 
-            return membership.can_export_data
-        except Project.DoesNotExist:
-            return False
+    def has_access(self, access):
+        return access["can_export_data"]
@@ -165,6 +165,15 @@ class ProjectListSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "slug", "created_by", "created_at"]
 
 
+class ProjectSummarySerializer(serializers.ModelSerializer):
+    """Minimal project serializer for nesting in list rows."""
+
+    class Meta:
+        model = Project
+        fields = ["id", "name", "slug"]
+        read_only_fields = fields
+
+
 class ProjectMembershipCreateSerializer(serializers.ModelSerializer):
     """Project membership creation serializer."""
 
@@ -207,9 +216,14 @@ class ProjectStatsSerializer(serializers.Serializer):
     """Project statistics serializer."""
 
     total_documents = serializers.IntegerField()
+    processed_documents = serializers.IntegerField()
+    pending_documents = serializers.IntegerField()
     total_entities = serializers.IntegerField()
     verified_entities = serializers.IntegerField()
-    unverified_entities = serializers.IntegerField()
-    entity_types_breakdown = serializers.DictField()
     verification_rate = serializers.FloatField()
-    recent_activity = serializers.ListField()
+    total_members = serializers.IntegerField()
+    active_members = serializers.IntegerField()
+    processing_jobs = serializers.IntegerField()
+    completed_jobs = serializers.IntegerField()
+    failed_jobs = serializers.IntegerField()
+    success_rate = serializers.FloatField()
@@ -0,0 +1,47 @@
+from datetime import timedelta
+from typing import Any, Dict
+from django.utils import timezone
+from core.query_plan import count_subquery
+from core.stats import percentage, stats_provider
+from .models import Project, ProjectMembership
+
+
+@stats_provider("project")
+def compute_project_stats(project_id) -> Dict[str, Any]:
+    """Compute the dashboard of a project in one query."""
+    from documents.models import Document
+    from processing.models import ProcessingJob
+
+    documents = Document.objects.filter(is_deleted=False)
+    members = ProjectMembership.objects.filter(is_active=True)
+    jobs = ProcessingJob.objects.all()
+    active_since = timezone.now() - timedelta(days=30)
+
+    counts = {
+        "total_documents": count_subquery(documents, "project"),
+        "processed_documents": count_subquery(
+            documents.filter(processing_status="completed"), "project"
+        ),
+        "pending_documents": count_subquery(
+            documents.filter(processing_status="pending"), "project"
+        ),
+        "total_members": count_subquery(members, "project"),
+        "active_members": count_subquery(
+            members.filter(user__last_activity__gte=active_since), "project"
+        ),
+        # "processing_jobs" is taken by the reverse relation
+        "jobs_count": count_subquery(jobs, "project"),
+        "completed_jobs": count_subquery(jobs.filter(status="completed"), "project"),
+        "failed_jobs": count_subquery(jobs.filter(status="failed"), "project"),
+    }
+    stats = (
+        Project.objects.filter(pk=project_id)
+        .annotate(**counts)
+        .values("total_entities", "verified_entities", *counts)
+        .get()
+    )
+
+    stats["processing_jobs"] = stats.pop("jobs_count")
+    stats["verification_rate"] = percentage(stats["verified_entities"], stats["total_entities"])
+    stats["success_rate"] = percentage(stats["completed_jobs"], stats["processing_jobs"])
+    return stats
@@ -19,7 +19,7 @@ urlpatterns = [
     # Project actions
     path("archive/<slug:slug>/", views.project_archive, name="project_archive"),
     path("restore/<slug:slug>/", views.project_restore, name="project_restore"),
-    path("stats/<slug:slug>/", views.project_stats, name="project_stats"),
+    path("stats/<slug:project_slug>/", views.project_stats, name="project_stats"),
     path("user-projects/", views.user_projects, name="user_projects"),
     # Project membership
     path(
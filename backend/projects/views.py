@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count, Avg
+from django.db.models import Q, Avg
 from django.utils import timezone
 from .models import Project, ProjectMembership
 from .serializers import (
@@ -16,6 +16,14 @@ from .serializers import (
     ProjectStatsSerializer,
 )
 from .permissions import IsProjectMember, IsProjectAdmin, IsProjectOwner
+from .access import get_request_project
+from .stats import compute_project_stats
+from core.stats import get_stats
+from core.query_plan import QueryPlan, QueryPlanMixin
+
+PROJECT_LIST_PLAN = QueryPlan(
+    select_related=("created_by__profile",), annotations=Project.count_annotations()
+)
 
 
 class ProjectCreateView(generics.CreateAPIView):
@@ -40,11 +48,12 @@ class ProjectCreateView(generics.CreateAPIView):
         )
 
 
-class ProjectListView(generics.ListAPIView):
+class ProjectListView(QueryPlanMixin, generics.ListAPIView):
     """List projects for the authenticated user."""
 
     permission_classes = [IsAuthenticated]
     serializer_class = ProjectListSerializer
+    query_plan = PROJECT_LIST_PLAN
 
     def get_queryset(self):
         user = self.request.user
@@ -52,7 +61,7 @@ class ProjectListView(generics.ListAPIView):
         # Get projects where user is a member (excluding deleted projects)
         member_projects = Project.objects.filter(
             memberships__user=user, memberships__is_active=True, is_deleted=False
-        ).distinct()
+        )
 
         # Get public projects (excluding deleted projects)
         public_projects = Project.objects.filter(
@@ -60,7 +69,7 @@ class ProjectListView(generics.ListAPIView):
         ).exclude(id__in=member_projects.values_list("id", flat=True))
 
         # Combine and order by creation date
-        all_projects = (member_projects | public_projects).order_by("-created_at")
+        all_projects = (member_projects | public_projects).distinct().order_by("-created_at")
 
         # Apply filters
         status_filter = self.request.query_params.get("status")
@@ -114,15 +123,16 @@ class ProjectDeleteView(generics.DestroyAPIView):
         instance.save()
 
 
-class ProjectMembershipListView(generics.ListAPIView):
+class ProjectMembershipListView(QueryPlanMixin, generics.ListAPIView):
     """List project members."""
 
     permission_classes = [IsAuthenticated, IsProjectMember]
     serializer_class = ProjectMembershipSerializer
+    query_plan = QueryPlan(select_related=("user__profile",))
 
     def get_queryset(self):
         project_slug = self.kwargs.get("project_slug")
-        project = get_object_or_404(Project, slug=project_slug)
+        project = get_request_project(self.request, project_slug)
         return ProjectMembership.objects.filter(project=project, is_active=True)
 
 
@@ -134,7 +144,7 @@ class ProjectMembershipCreateView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         project_slug = self.kwargs.get("project_slug")
-        project = get_object_or_404(Project, slug=project_slug)
+        project = get_request_project(self.request, project_slug)
         serializer.save(project=project)
 
 
@@ -175,57 +185,9 @@ class ProjectMembershipDeleteView(generics.DestroyAPIView):
 @permission_classes([IsAuthenticated, IsProjectMember])
 def project_stats(request, project_slug):
     """Get project statistics."""
-    project = get_object_or_404(Project, slug=project_slug)
-
-    # Document statistics
-    total_documents = project.documents.count()
-    processed_documents = project.documents.filter(
-        processing_status="completed"
-    ).count()
-    pending_documents = project.documents.filter(processing_status="pending").count()
-
-    # Entity statistics
-    total_entities = project.documents.aggregate(total=Count("entities"))["total"] or 0
-
-    verified_entities = (
-        project.documents.aggregate(
-            verified=Count("entities", filter=Q(entities__is_verified=True))
-        )["verified"]
-        or 0
-    )
+    project = get_request_project(request, project_slug)
 
-    # Member statistics
-    total_members = project.memberships.filter(is_active=True).count()
-    active_members = project.memberships.filter(
-        is_active=True,
-        user__last_activity__gte=timezone.now() - timezone.timedelta(days=30),
-    ).count()
-
-    # Processing statistics
-    processing_jobs = project.processing_jobs.count()
-    completed_jobs = project.processing_jobs.filter(status="completed").count()
-    failed_jobs = project.processing_jobs.filter(status="failed").count()
-
-    stats = {
-        "total_documents": total_documents,
-        "processed_documents": processed_documents,
-        "pending_documents": pending_documents,
-        "total_entities": total_entities,
-        "verified_entities": verified_entities,
-        "verification_rate": (verified_entities / total_entities * 100)
-        if total_entities > 0
-        else 0,
-        "total_members": total_members,
-        "active_members": active_members,
-        "processing_jobs": processing_jobs,
-        "completed_jobs": completed_jobs,
-        "failed_jobs": failed_jobs,
-        "success_rate": (completed_jobs / processing_jobs * 100)
-        if processing_jobs > 0
-        else 0,
-    }
-
-    serializer = ProjectStatsSerializer(stats)
+    serializer = ProjectStatsSerializer(get_stats(compute_project_stats, project.pk))
     return Response(serializer.data)
 
 
@@ -233,7 +195,7 @@ def project_stats(request, project_slug):
 @permission_classes([IsAuthenticated, IsProjectAdmin])
 def project_archive(request, project_slug):
     """Archive a project."""
-    project = get_object_or_404(Project, slug=project_slug)
+    project = get_request_project(request, project_slug)
     project.status = "completed"
     project.save()
 
@@ -244,7 +206,7 @@ def project_archive(request, project_slug):
 @permission_classes([IsAuthenticated, IsProjectAdmin])
 def project_restore(request, project_slug):
     """Restore a deleted project."""
-    project = get_object_or_404(Project, slug=project_slug)
+    project = get_request_project(request, project_slug)
     project.is_deleted = False
     project.deleted_at = None
     project.deleted_by = None
@@ -277,5 +239,5 @@ def user_projects(request):
         .order_by("-created_at")
     )
 
-    serializer = ProjectListSerializer(all_projects, many=True)
+    serializer = ProjectListSerializer(PROJECT_LIST_PLAN.apply(all_projects), many=True)
     return Response(serializer.data)
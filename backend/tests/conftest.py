@@ -18,7 +18,8 @@ django.setup()
 
 # Now import Django modules after setup
 from django.conf import settings
-from django.test import RequestFactory
+from django.core.cache import caches
+from django.test import RequestFactory, override_settings
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
@@ -32,6 +33,11 @@ from core.models import AuditLog
 
 User = get_user_model()
 
+# Tests use an in-process cache rather than the configured Redis server
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
 
 @pytest.fixture(scope="session")
 def django_db_setup(django_db_setup, django_db_blocker):
@@ -275,3 +281,16 @@ def create_test_data():
 def enable_db_access_for_all_tests(db):
     """Enable database access for all tests."""
     pass
+
+
+@pytest.fixture(scope="session", autouse=True)
+def locmem_cache():
+    """Use the local-memory cache for the whole test session."""
+    with override_settings(CACHES=LOCMEM_CACHES):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(locmem_cache):
+    """Start every test with an empty cache."""
+    caches["default"].clear()
@@ -0,0 +1,83 @@
+"""
+Shared helpers for tests of the LLM extraction tasks.
+"""
+
+from django.contrib.auth import get_user_model
+from marsiya_ner.celery import app as celery_app
+from llm_integration.models import LLMModel, LLMProcessingConfig
+from projects.models import Project
+
+User = get_user_model()
+
+# The name the fake extractor finds
+PERSON_NAME = "حسین"
+
+
+def find_names(text):
+    """Return every occurrence of the person name as extracted entities."""
+    entities = []
+    start = text.find(PERSON_NAME)
+    while start != -1:
+        entities.append(
+            {
+                "text": PERSON_NAME,
+                "entity_type": "PERSON",
+                "start": start,
+                "end": start + len(PERSON_NAME),
+                "confidence": 0.9,
+            }
+        )
+        start = text.find(PERSON_NAME, start + 1)
+    return entities
+
+
+def fake_extract_entities(self, text, prompt_type="marsiya"):
+    """Stand-in for LLMService.extract_entities, patched onto the class."""
+    return find_names(text)
+
+
+def run_celery_eagerly(testcase):
+    """Run Celery tasks inline, raising their errors, until the test ends."""
+    previous = (celery_app.conf.task_always_eager, celery_app.conf.task_eager_propagates)
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+
+    def restore():
+        celery_app.conf.task_always_eager, celery_app.conf.task_eager_propagates = previous
+
+    testcase.addCleanup(restore)
+
+
+def create_user_and_project():
+    """Create the test user and a project it created."""
+    user = User.objects.create_user(
+        username="testuser", email="test@example.com", password="testpass123"
+    )
+    project = Project.objects.create(name="Test Project", slug="test-project", created_by=user)
+    return user, project
+
+
+def create_llm_model(**fields) -> LLMModel:
+    """Create an active OpenAI model; ``fields`` override the defaults."""
+    return LLMModel.objects.create(
+        **{
+            "name": "Test GPT Model",
+            "provider": "openai",
+            "model_name": "gpt-3.5-turbo",
+            "api_key": "test-key-123",
+            "is_active": True,
+            **fields,
+        }
+    )
+
+
+def create_llm_config(llm_model=None, **fields) -> LLMProcessingConfig:
+    """Create the active processing config, with a default model unless one is given."""
+    return LLMProcessingConfig.objects.create(
+        **{
+            "name": "Test Config",
+            "llm_model": llm_model or create_llm_model(),
+            "is_active": True,
+            **fields,
+        }
+    )
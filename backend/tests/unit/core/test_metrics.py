@@ -0,0 +1,172 @@
+"""
+Unit tests for the metrics registry and endpoint.
+"""
+
+from unittest.mock import Mock, patch
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.health import SystemSampler
+from core.metrics import (
+    HTTP_REQUEST_QUERIES,
+    MetricsRegistry,
+    merge_snapshots,
+    registry,
+    render_snapshot,
+)
+from core.signals import observe_task_duration, start_task_timer
+
+User = get_user_model()
+
+
+def sample_value(metric, **labels):
+    """The value of one labelled series of a registered metric."""
+    key = [str(labels[name]) for name in metric.labelnames]
+    for sample_labels, value in metric.snapshot()["samples"]:
+        if sample_labels == key:
+            return value
+    return None
+
+
+class TestMetricsRegistry(TestCase):
+    """Test metric types and the text format."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.registry = MetricsRegistry()
+
+    def test_render_histogram(self):
+        """Histogram buckets are rendered cumulatively with sum and count."""
+        histogram = self.registry.histogram(
+            "stage_seconds", "Stage time.", ["stage"], buckets=[0.1, 1]
+        )
+        for value in (0.05, 0.5, 0.5, 3):
+            histogram.observe(value, stage="parse")
+
+        text = render_snapshot(self.registry.snapshot())
+
+        self.assertIn("# TYPE stage_seconds histogram", text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="0.1"} 1', text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="1.0"} 3', text)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="+Inf"} 4', text)
+        self.assertIn('stage_seconds_sum{stage="parse"} 4.05', text)
+        self.assertIn('stage_seconds_count{stage="parse"} 4', text)
+
+    def test_labels_are_checked_and_escaped(self):
+        """Series need exactly the declared labels; values are escaped."""
+        counter = self.registry.counter("calls_total", "Calls.", ["view"])
+        counter.inc(view='say "hi"')
+
+        with self.assertRaises(ValueError):
+            counter.inc(method="GET")
+        self.assertIn(
+            'calls_total{view="say \\"hi\\""} 1', render_snapshot(self.registry.snapshot())
+        )
+
+    def test_conflicting_registration(self):
+        """A name cannot be registered as two different metrics."""
+        counter = self.registry.counter("jobs", "Jobs.")
+
+        self.assertIs(self.registry.counter("jobs", "Jobs."), counter)
+        with self.assertRaises(ValueError):
+            self.registry.gauge("jobs", "Jobs.")
+
+    def test_merge_snapshots(self):
+        """Counters and histograms keep a series per process; the first gauge wins."""
+        other = MetricsRegistry()
+        for reg, value in ((self.registry, 0.2), (other, 2.0)):
+            reg.counter("tasks_total", "Tasks.", ["task"]).inc(task="load")
+            reg.histogram("task_seconds", "Task time.", buckets=[1]).observe(value)
+            reg.gauge("cpu", "CPU.").set(value)
+
+        merged = merge_snapshots({"web:1": self.registry.snapshot(), "worker:2": other.snapshot()})
+
+        self.assertEqual(merged["tasks_total"]["labels"], ["task", "process"])
+        self.assertEqual(
+            merged["tasks_total"]["samples"], [[["load", "web:1"], 1], [["load", "worker:2"], 1]]
+        )
+        self.assertEqual(
+            merged["task_seconds"]["samples"],
+            [
+                [["web:1"], {"counts": [1, 0], "sum": 0.2}],
+                [["worker:2"], {"counts": [0, 1], "sum": 2.0}],
+            ],
+        )
+        self.assertEqual(merged["cpu"]["labels"], [])
+        self.assertEqual(merged["cpu"]["samples"], [[[], 0.2]])
+
+    def test_collect_reads_published_processes(self):
+        """A scrape includes what other processes published to the cache."""
+        other = MetricsRegistry()
+        other.counter("tasks_total", "Tasks.").inc(3)
+        with patch.object(MetricsRegistry, "_process_key", return_value="metrics:process:worker:1"):
+            other.publish()
+        self.registry.counter("tasks_total", "Tasks.").inc()
+
+        with patch.object(MetricsRegistry, "_process_key", return_value="metrics:process:web:2"):
+            self.assertEqual(
+                self.registry.collect()["tasks_total"]["samples"],
+                [[["web:2"], 1], [["worker:1"], 3]],
+            )
+
+            # A process that is gone drops its series instead of lowering a total
+            caches["default"].delete("metrics:process:worker:1")
+            self.assertEqual(
+                self.registry.collect()["tasks_total"]["samples"], [[["web:2"], 1]]
+            )
+        self.assertEqual(caches["default"].get("metrics:processes"), [])
+        self.assertIn('tasks_total{process="', self.registry.render())
+
+
+class TestMetricsInstrumentation(TestCase):
+    """Test the request middleware, Celery timing and the scrape endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.admin = User.objects.create_user(
+            username="admin", password="adminpass123", is_staff=True, is_superuser=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_requests_are_timed_per_view(self):
+        """Requests are labelled by URL name and their queries are counted."""
+        before = sample_value(HTTP_REQUEST_QUERIES, view="core:system_health", method="GET")
+        before = before["counts"][0] if before else 0
+
+        with patch.object(SystemSampler, "_ensure_sampler"):
+            response = self.client.get(reverse("core:system_health"))
+
+        self.assertEqual(response.status_code, 200)
+        # The health check runs a single query, which falls in the first bucket
+        after = sample_value(HTTP_REQUEST_QUERIES, view="core:system_health", method="GET")
+        self.assertEqual(after["counts"][0], before + 1)
+
+    def test_celery_tasks_are_timed(self):
+        """Task run time is observed by task name and final state."""
+        task = Mock()
+        task.name = "processing.tasks.load_document_text"
+
+        start_task_timer(task_id="abc")
+        observe_task_duration(task_id="abc", task=task, state="SUCCESS")
+
+        self.assertIn(
+            'celery_task_duration_seconds_count{task="processing.tasks.load_document_text",'
+            'state="SUCCESS",process="',
+            registry.render(),
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_endpoint_requires_token(self):
+        """Scrapes need the bearer token and get the text format."""
+        url = reverse("core:metrics")
+        with patch.object(SystemSampler, "_ensure_sampler"):
+            self.assertEqual(self.client.get(url).status_code, 403)
+            response = self.client.get(url, HTTP_AUTHORIZATION="Bearer secret")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"# TYPE http_request_duration_seconds histogram", response.content)
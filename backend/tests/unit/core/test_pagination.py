@@ -0,0 +1,191 @@
+"""
+Unit tests for keyset pagination and NDJSON streaming.
+"""
+
+import json
+from datetime import timedelta
+from unittest.mock import Mock
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.pagination import KeysetPagination
+from documents.models import Document
+from entities.models import Entity, EntityType
+from projects.models import Project, ProjectMembership
+
+User = get_user_model()
+
+
+class TestKeysetPagination(TestCase):
+    """Test cursor pagination and streaming on the list and search endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        ProjectMembership.objects.create(user=self.user, project=self.project, role="viewer")
+        entity_type = EntityType.objects.create(
+            name="PERSON", display_name="Person", color_code="#87CEEB"
+        )
+
+        self.documents = [
+            Document.objects.create(
+                title=f"مرثیہ {i}",
+                content="کربلا",
+                project=self.project,
+                created_by=self.user,
+            )
+            for i in range(5)
+        ]
+        # Equal confidence scores, so pages must be split on the pk tie-breaker
+        for i in range(7):
+            Entity.objects.create(
+                document=self.documents[0],
+                text="حسین",
+                entity_type=entity_type,
+                start_position=0,
+                end_position=4,
+                line_number=1,
+                word_position=i + 1,
+                confidence_score=0.9 if i < 5 else 0.5,
+                source="manual",
+            )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.entity_url = reverse(
+            "entities:entity_search", kwargs={"project_slug": "test-project"}
+        )
+        self.document_url = reverse(
+            "documents:document_search", kwargs={"project_slug": "test-project"}
+        )
+
+    def collect_entity_pages(self, body):
+        url, seen = f"{self.entity_url}?page_size=3", []
+        while url:
+            response = self.client.post(url, body, format="json")
+            self.assertEqual(response.status_code, 200)
+            seen.extend(entity["id"] for entity in response.data["results"])
+            url = response.data["next"]
+        return seen
+
+    def test_entity_pages_cover_results_once(self):
+        """Following next links returns every entity once, in order."""
+        expected = list(
+            Entity.objects.order_by("-confidence_score", "-pk").values_list("pk", flat=True)
+        )
+
+        self.assertEqual(self.collect_entity_pages({}), expected)
+        self.assertEqual(sorted(self.collect_entity_pages({"query": "حسین"})), sorted(expected))
+
+    def test_document_pages(self):
+        """Ranked document results are split across cursor pages."""
+        response = self.client.get(self.document_url, {"q": "کربلا", "page_size": 2})
+        first = [document["id"] for document in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        second = [document["id"] for document in response.data["results"]]
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+
+    def test_no_count_query(self):
+        """Pages are served without counting the matches."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.document_url, {"q": "کربلا"})
+
+        search_queries = [q["sql"] for q in queries.captured_queries if "MATCH" in q["sql"]]
+        self.assertEqual(len(search_queries), 1)
+        self.assertNotIn("COUNT(", search_queries[0].upper())
+
+    def test_invalid_cursor(self):
+        """A malformed cursor is rejected."""
+        response = self.client.get(self.document_url, {"q": "کربلا", "cursor": "bogus"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_ndjson_stream(self):
+        """NDJSON output streams every match as one JSON object per line."""
+        response = self.client.post(
+            f"{self.entity_url}?format=ndjson", {"query": "حسین"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(json.loads(lines[0])["text"], "حسین")
+
+    def test_ndjson_accept_header(self):
+        """The Accept header selects NDJSON output too."""
+        response = self.client.get(
+            self.document_url, {"q": "کربلا"}, HTTP_ACCEPT="application/x-ndjson"
+        )
+
+        self.assertTrue(response.streaming)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+
+    def test_entity_list_reading_order(self):
+        """Entity list pages follow line and word order without counting."""
+        url = reverse(
+            "entities:entity_list",
+            kwargs={"project_slug": "test-project", "document_pk": self.documents[0].pk},
+        )
+        expected = list(
+            Entity.objects.order_by("line_number", "word_position").values_list("pk", flat=True)
+        )
+
+        seen, next_url = [], f"{url}?page_size=2"
+        while next_url:
+            response = self.client.get(next_url)
+            self.assertNotIn("count", response.data)
+            seen.extend(entity["id"] for entity in response.data["results"])
+            next_url = response.data["next"]
+
+        self.assertEqual(seen, expected)
+
+    def test_document_list_ordering(self):
+        """Document list pages honour the ordering parameter and break ties by pk."""
+        url = reverse("documents:document_list", kwargs={"project_slug": "test-project"})
+
+        response = self.client.get(url, {"ordering": "title", "page_size": 3})
+        first = [document["title"] for document in response.data["results"]]
+        response = self.client.get(response.data["next"])
+        second = [document["title"] for document in response.data["results"]]
+
+        self.assertEqual(first + second, sorted(d.title for d in self.documents))
+
+    def test_document_list_within_one_millisecond(self):
+        """Rows created within the same millisecond are not skipped between pages."""
+        base = timezone.now().replace(microsecond=0)
+        for i, document in enumerate(self.documents):
+            Document.objects.filter(pk=document.pk).update(
+                created_at=base + timedelta(microseconds=100 * i)
+            )
+        url = reverse("documents:document_list", kwargs={"project_slug": "test-project"})
+
+        seen, next_url = [], f"{url}?page_size=2"
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(document["id"] for document in response.data["results"])
+            next_url = response.data["next"]
+
+        self.assertEqual(seen, [document.pk for document in reversed(self.documents)])
+
+    def test_cursor_keeps_microseconds(self):
+        """Datetimes survive the cursor round trip exactly."""
+        paginator = KeysetPagination()
+        moment = timezone.now().replace(microsecond=123456)
+        request = Mock(query_params={"cursor": paginator.encode_cursor([moment, 7])})
+
+        self.assertEqual(paginator.decode_cursor(request, ["-created_at", "-pk"]), [moment, 7])
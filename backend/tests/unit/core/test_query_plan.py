@@ -0,0 +1,106 @@
+"""
+Unit tests for query plans on list endpoints.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.query_plan import QueryPlan
+from documents.models import Document
+from entities.models import Entity, EntityType
+from projects.models import Project, ProjectMembership
+
+User = get_user_model()
+
+
+class TestQueryPlans(TestCase):
+    """Test that list endpoints run a fixed number of queries."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        ProjectMembership.objects.create(user=self.user, project=self.project, role="owner")
+        self.entity_type = EntityType.objects.create(
+            name="PERSON", display_name="Person", color_code="#87CEEB"
+        )
+        self.document = Document.objects.create(
+            title="Test Document", content="حسین", project=self.project, created_by=self.user
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_entities(self, count):
+        for i in range(count):
+            Entity.objects.create(
+                document=self.document,
+                text="حسین",
+                entity_type=self.entity_type,
+                start_position=0,
+                end_position=4,
+                line_number=1,
+                word_position=i + 1,
+                confidence_score=0.9,
+                source="manual",
+                is_verified=i % 2 == 0,
+                created_by=self.user,
+            )
+
+    def count_queries(self, url):
+        # Start cold, so cached permission lookups do not skew the comparison
+        caches["default"].clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries.captured_queries)
+
+    def test_entity_list_queries_do_not_grow(self):
+        """Listing more entities does not run more queries."""
+        url = reverse(
+            "entities:entity_list",
+            kwargs={"project_slug": "test-project", "document_pk": self.document.pk},
+        )
+        self.create_entities(2)
+        few = self.count_queries(url)
+        self.create_entities(18)
+
+        self.assertEqual(self.count_queries(url), few)
+        self.assertLessEqual(few, 6)
+
+    def test_project_list_counts_are_annotated(self):
+        """Project counts come from annotations, not per-row queries."""
+        url = reverse("projects:project_list")
+        few = self.count_queries(url)
+        for i in range(5):
+            project = Project.objects.create(
+                name=f"Project {i}", slug=f"project-{i}", created_by=self.user
+            )
+            ProjectMembership.objects.create(user=self.user, project=project, role="owner")
+
+        self.assertEqual(self.count_queries(url), few)
+        response = self.client.get(url)
+        listed = next(p for p in response.data["results"] if p["slug"] == "test-project")
+        self.assertEqual((listed["members_count"], listed["documents_count"]), (1, 1))
+
+    def test_entity_type_counts(self):
+        """Entity type counts come from one grouped query."""
+        self.create_entities(3)
+        EntityType.objects.create(name="LOCATION", display_name="Location", color_code="#90EE90")
+
+        plan = QueryPlan(annotations=EntityType.count_annotations())
+        with self.assertNumQueries(1):
+            counts = {
+                t.name: (t.get_entities_count(), t.get_verified_entities_count())
+                for t in plan.apply(EntityType.objects.all())
+            }
+
+        self.assertEqual(counts, {"PERSON": (3, 2), "LOCATION": (0, 0)})
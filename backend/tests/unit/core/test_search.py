@@ -0,0 +1,126 @@
+"""
+Unit tests for Urdu full-text search.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.search import normalize_urdu, search, search_terms
+from documents.models import Document
+from entities.models import EntityType
+from llm_integration.persistence import save_extracted_entities
+from projects.models import Project, ProjectMembership
+
+User = get_user_model()
+
+
+class TestNormalizeUrdu(TestCase):
+    """Test normalize_urdu."""
+
+    def test_diacritics_are_removed(self):
+        """Harakat and tatweel do not affect matching."""
+        self.assertEqual(normalize_urdu("حُسَیـن"), "حسین")
+
+    def test_letter_variants_are_unified(self):
+        """Arabic alef, yeh, heh and kaf forms map to Urdu ones."""
+        self.assertEqual(normalize_urdu("علي"), normalize_urdu("علی"))
+        self.assertEqual(normalize_urdu("فاطمه"), normalize_urdu("فاطمہ"))
+        self.assertEqual(normalize_urdu("أكبر"), normalize_urdu("اکبر"))
+        self.assertEqual(normalize_urdu("آسمان"), normalize_urdu("اسمان"))
+
+    def test_terms(self):
+        """Queries split into normalized words, ignoring punctuation."""
+        self.assertEqual(search_terms("  Imam  حُسین! "), ["imam", "حسین"])
+
+
+class TestSearch(TestCase):
+    """Test search over documents and entities."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        ProjectMembership.objects.create(user=self.user, project=self.project, role="viewer")
+        EntityType.objects.create(name="PERSON", display_name="Person", color_code="#87CEEB")
+
+        self.karbala = Document.objects.create(
+            title="کربلا کا مرثیہ",
+            content="حسین کربلا میں، کربلا کی خاک پر",
+            project=self.project,
+            created_by=self.user,
+        )
+        self.other = Document.objects.create(
+            title="دوسرا مرثیہ",
+            content="علي اور عباس",
+            project=self.project,
+            created_by=self.user,
+        )
+        save_extracted_entities(
+            self.karbala,
+            [{"text": "حسین", "entity_type": "PERSON", "start": 0, "end": 4}],
+        )
+        save_extracted_entities(
+            self.other,
+            [{"text": "علي", "entity_type": "PERSON", "start": 0, "end": 3}],
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_variant_spelling_matches(self):
+        """An Urdu query finds text written with Arabic letter forms."""
+        results = search(Document.objects.all(), "علی")
+
+        self.assertEqual(list(results), [self.other])
+
+    def test_results_are_ranked(self):
+        """Documents where the term is more frequent rank higher."""
+        Document.objects.create(
+            title="Notes",
+            content="کربلا " + " ".join(["مصرع"] * 20),
+            project=self.project,
+            created_by=self.user,
+        )
+
+        results = list(search(Document.objects.all(), "کربلا"))
+
+        self.assertEqual(results[0], self.karbala)
+        self.assertGreater(results[0].search_rank, results[1].search_rank)
+
+    def test_index_follows_updates(self):
+        """Edited and deleted rows are re-indexed."""
+        self.other.content = "کربلا"
+        self.other.save()
+        self.assertIn(self.other, search(Document.objects.all(), "کربلا"))
+
+        other_pk = self.other.pk
+        self.other.hard_delete()
+        results = search(Document.objects.all(), "کربلا")
+        self.assertNotIn(other_pk, results.values_list("pk", flat=True))
+
+    def test_document_search_endpoint(self):
+        """The document search is paginated and ranked."""
+        response = self.client.get(
+            reverse("documents:document_search", kwargs={"project_slug": "test-project"}),
+            {"q": "کربلا"},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([d["id"] for d in response.data["results"]], [self.karbala.id])
+        self.assertIsNone(response.data["next"])
+
+    def test_entity_search_endpoint(self):
+        """Entity search matches the entity text and its context."""
+        response = self.client.post(
+            reverse("entities:entity_search", kwargs={"project_slug": "test-project"}),
+            {"query": "خاک"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e["text"] for e in response.data["results"]], ["حسین"])
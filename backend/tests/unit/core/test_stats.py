@@ -0,0 +1,195 @@
+"""
+Unit tests for the cached dashboard stats engine.
+"""
+
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.stats import get_stats, refresh_stats
+from documents.models import Document
+from documents.stats import compute_document_stats
+from entities.models import Entity, EntityType
+from projects.models import Project, ProjectMembership
+from projects.stats import compute_project_stats
+
+User = get_user_model()
+
+
+class TestStatsCache(TestCase):
+    """Test get_stats, invalidation and the stats endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        ProjectMembership.objects.create(user=self.user, project=self.project, role="owner")
+        self.entity_type = EntityType.objects.create(
+            name="PERSON", display_name="Person", color_code="#87CEEB"
+        )
+        self.document = Document.objects.create(
+            title="Test Document", content="حسین", project=self.project, created_by=self.user
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_entity(self, word_position=1, is_verified=False):
+        return Entity.objects.create(
+            document=self.document,
+            text="حسین",
+            entity_type=self.entity_type,
+            start_position=0,
+            end_position=4,
+            line_number=1,
+            word_position=word_position,
+            confidence_score=0.9,
+            source="manual",
+            is_verified=is_verified,
+            created_by=self.user,
+        )
+
+    def test_fresh_entry_is_served_from_cache(self):
+        """A cached dashboard is served without touching the database."""
+        stats = get_stats(compute_project_stats, self.project.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_stats(compute_project_stats, self.project.pk), stats)
+        self.assertEqual(stats["total_documents"], 1)
+
+    def test_invalidated_entry_is_served_stale(self):
+        """After a write the old dashboard is served while a refresh is queued."""
+        get_stats(compute_document_stats, self.document.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_entity()
+
+        with patch("core.tasks.refresh_cached_stats.delay") as delay:
+            stale = get_stats(compute_document_stats, self.document.pk)
+            get_stats(compute_document_stats, self.document.pk)
+
+        self.assertEqual(stale["total_entities"], 0)
+        delay.assert_called_once_with(
+            "documents.stats.compute_document_stats", self.document.pk
+        )
+
+        refresh_stats(compute_document_stats, self.document.pk)
+        with self.assertNumQueries(0):
+            fresh = get_stats(compute_document_stats, self.document.pk)
+        self.assertEqual(fresh["total_entities"], 1)
+
+    def test_refresh_runs_inline_when_queueing_fails(self):
+        """Stats are recomputed during the request when no worker can be reached."""
+        get_stats(compute_project_stats, self.project.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Document.objects.create(
+                title="Second", content="کربلا", project=self.project, created_by=self.user
+            )
+
+        with patch("core.tasks.refresh_cached_stats.delay", side_effect=ConnectionError):
+            stats = get_stats(compute_project_stats, self.project.pk)
+
+        self.assertEqual(stats["total_documents"], 2)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+    )
+    def test_no_cache(self):
+        """Without a working cache every request computes the dashboard."""
+        self.create_entity(is_verified=True)
+
+        stats = get_stats(compute_document_stats, self.document.pk)
+
+        self.assertEqual(stats["verified_entities"], 1)
+        self.assertEqual(stats["verification_rate"], 100)
+
+    def test_stats_endpoints(self):
+        """The stats endpoints return their computed dashboards."""
+        self.create_entity(word_position=1, is_verified=True)
+        self.create_entity(word_position=2)
+
+        response = self.client.get(
+            reverse(
+                "documents:document_stats",
+                kwargs={"project_slug": "test-project", "pk": self.document.pk},
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_entities"], 2)
+        self.assertEqual(response.data["verification_rate"], 50)
+
+        response = self.client.get(
+            reverse(
+                "entities:entity_stats",
+                kwargs={"project_slug": "test-project", "document_pk": self.document.pk},
+            )
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_entities"], 2)
+
+        response = self.client.get(
+            reverse("projects:project_stats", kwargs={"project_slug": "test-project"})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_entities"], 2)
+
+        response = self.client.get(reverse("users:user_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["entities_count"], 2)
+
+    def test_stats_of_other_project_documents(self):
+        """Documents outside the requested project are not found."""
+        other = Project.objects.create(name="Other", slug="other", created_by=self.user)
+        ProjectMembership.objects.create(user=self.user, project=other, role="owner")
+
+        response = self.client.get(
+            reverse(
+                "documents:document_stats",
+                kwargs={"project_slug": "other", "pk": self.document.pk},
+            )
+        )
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_entity_edit_invalidates_entity_stats(self):
+        """Changing an entity's type refreshes the cached entity dashboard."""
+        entity = self.create_entity()
+        location = EntityType.objects.create(
+            name="LOCATION", display_name="Location", color_code="#90EE90"
+        )
+        stats_url = reverse(
+            "entities:entity_stats",
+            kwargs={"project_slug": "test-project", "document_pk": self.document.pk},
+        )
+        response = self.client.get(stats_url)
+        self.assertEqual(response.data["entity_type_distribution"][0]["entity_type__name"], "PERSON")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse(
+                    "entities:entity_update",
+                    kwargs={
+                        "project_slug": "test-project",
+                        "document_pk": self.document.pk,
+                        "pk": entity.pk,
+                    },
+                ),
+                {"entity_type": location.pk},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200)
+
+        # Refresh inline, so the request sees the recomputed dashboard
+        with patch("core.tasks.refresh_cached_stats.delay", side_effect=ConnectionError):
+            response = self.client.get(stats_url)
+
+        self.assertEqual(
+            [entry["entity_type__name"] for entry in response.data["entity_type_distribution"]],
+            ["LOCATION"],
+        )
@@ -9,6 +9,7 @@ from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from unittest.mock import patch, MagicMock
+from core.health import SystemSampler
 from core.models import AuditLog
 from core.views import (
     system_health,
@@ -39,9 +40,9 @@ class TestSystemHealthView(TestCase):
         self.client.force_authenticate(user=self.user)
         self.factory = RequestFactory()
 
-    @patch("core.views.psutil.cpu_percent")
-    @patch("core.views.psutil.virtual_memory")
-    @patch("core.views.psutil.disk_usage")
+    @patch("core.health.psutil.cpu_percent")
+    @patch("core.health.psutil.virtual_memory")
+    @patch("core.health.psutil.disk_usage")
     def test_system_health_success(self, mock_disk, mock_memory, mock_cpu):
         """Test successful system health check."""
         # Mock system resources
@@ -50,7 +51,10 @@ class TestSystemHealthView(TestCase):
         mock_disk.return_value = MagicMock(percent=45.0, free=107374182400)  # 100GB
 
         url = reverse("core:system_health")
-        response = self.client.get(url)
+        with patch("core.views.system_sampler", SystemSampler()), patch.object(
+            SystemSampler, "_ensure_sampler"
+        ):
+            response = self.client.get(url)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         data = response.data
@@ -71,6 +75,8 @@ class TestSystemHealthView(TestCase):
         self.assertEqual(resources["cpu_percent"], 25.5)
         self.assertEqual(resources["memory_percent"], 65.2)
         self.assertEqual(resources["disk_percent"], 45.0)
+        # CPU usage is never measured by blocking the request
+        mock_cpu.assert_called_once_with(interval=None)
 
     def test_system_health_unauthorized(self):
         """Test system health without authentication."""
@@ -0,0 +1,131 @@
+"""
+Unit tests for incrementally maintained entity counters.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from documents.counters import reconcile_entity_counts
+from documents.models import Document
+from documents.tasks import update_entity_counts
+from entities.models import Entity, EntityType
+from projects.models import Project
+
+User = get_user_model()
+
+
+class TestEntityCounters(TestCase):
+    """Test counter maintenance on Document and Project."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        self.document = Document.objects.create(
+            title="Test Document",
+            content="حسین کربلا میں",
+            project=self.project,
+            created_by=self.user,
+        )
+        self.entity_type = EntityType.objects.create(
+            name="PERSON", display_name="Person", color_code="#87CEEB"
+        )
+
+    def create_entity(self, document=None):
+        return Entity.objects.create(
+            document=document or self.document,
+            text="حسین",
+            entity_type=self.entity_type,
+            start_position=0,
+            end_position=4,
+            line_number=1,
+            word_position=1,
+            confidence_score=0.9,
+            source="manual",
+        )
+
+    def assertCounts(self, total, verified, document=None):
+        document = document or self.document
+        document.refresh_from_db()
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (document.total_entities, document.verified_entities, document.unverified_entities),
+            (total, verified, total - verified),
+        )
+        self.assertEqual(
+            (self.project.get_entities_count(), self.project.get_verified_entities_count()),
+            (total, verified),
+        )
+
+    def test_entity_lifecycle(self):
+        """Create, verify, unverify, delete and restore adjust the counters."""
+        entity = self.create_entity()
+        self.create_entity()
+        self.assertCounts(2, 0)
+
+        entity.verify(self.user)
+        self.assertCounts(2, 1)
+
+        entity.delete()
+        self.assertCounts(1, 0)
+
+        entity.restore()
+        self.assertCounts(2, 1)
+
+        entity.unverify()
+        self.assertCounts(2, 0)
+
+        entity.hard_delete()
+        self.assertCounts(1, 0)
+
+    def test_unrelated_saves_do_not_count(self):
+        """Saving a loaded entity without state changes leaves counters alone."""
+        self.create_entity()
+        entity = Entity.objects.get()
+
+        entity.notes = "checked"
+        entity.save()
+        entity.add_tag("reviewed")
+
+        self.assertCounts(1, 0)
+
+    def test_stale_document_save_keeps_counters(self):
+        """A full save of an outdated instance does not overwrite counters."""
+        stale = Document.objects.get(pk=self.document.pk)
+        self.create_entity()
+
+        stale.title = "Renamed"
+        stale.save()
+
+        self.assertCounts(1, 0)
+        self.assertEqual(Document.objects.get(pk=self.document.pk).title, "Renamed")
+
+    def test_deleted_documents_leave_project_counts(self):
+        """Soft-deleting a document removes its entities from the project."""
+        other = Document.objects.create(
+            title="Other", content="حسین", project=self.project, created_by=self.user
+        )
+        self.create_entity()
+        self.create_entity(other)
+
+        other.delete()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.total_entities, 1)
+
+        other.restore()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.total_entities, 2)
+
+    def test_reconciliation(self):
+        """Drift from raw updates is corrected by the periodic task."""
+        self.create_entity()
+        self.create_entity()
+        Entity.objects.update(is_verified=True)
+        Project.objects.filter(pk=self.project.pk).update(total_entities=7)
+
+        self.assertEqual(update_entity_counts(), 2)
+        self.assertCounts(2, 2)
+        self.assertEqual(reconcile_entity_counts(), 0)
@@ -0,0 +1,143 @@
+"""
+Unit tests for set-based bulk entity actions.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from documents.models import Document
+from entities.models import Entity, EntityType
+from llm_integration.persistence import save_extracted_entities
+from projects.models import Project, ProjectMembership
+
+User = get_user_model()
+
+
+class TestEntityBulkActions(TestCase):
+    """Test the bulk verify, delete and update endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        ProjectMembership.objects.create(user=self.user, project=self.project, role="researcher")
+        self.person = EntityType.objects.create(
+            name="PERSON", display_name="Person", color_code="#87CEEB"
+        )
+        self.location = EntityType.objects.create(
+            name="LOCATION", display_name="Location", color_code="#90EE90"
+        )
+
+        self.documents = []
+        for i in range(2):
+            text = "\n".join(f"مصرع {j} میں حسین" for j in range(20))
+            document = Document.objects.create(
+                title=f"Document {i}", content=text, project=self.project, created_by=self.user
+            )
+            entities = []
+            start = text.find("حسین")
+            while start != -1:
+                entities.append(
+                    {"text": "حسین", "entity_type": "PERSON", "start": start, "end": start + 4}
+                )
+                start = text.find("حسین", start + 1)
+            save_extracted_entities(document, entities, user_id=self.user.id)
+            document.update_entity_counts()
+            self.documents.append(document)
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def entity_ids(self, document=None):
+        queryset = Entity.objects.filter(is_deleted=False)
+        if document is not None:
+            queryset = queryset.filter(document=document)
+        return list(queryset.values_list("id", flat=True))
+
+    def assertCountsConsistent(self):
+        for document in self.documents:
+            document.refresh_from_db()
+            live = Entity.objects.filter(document=document, is_deleted=False)
+            self.assertEqual(document.total_entities, live.count())
+            self.assertEqual(document.verified_entities, live.filter(is_verified=True).count())
+            self.assertEqual(
+                document.unverified_entities, document.total_entities - document.verified_entities
+            )
+
+    def test_bulk_verify_across_documents(self):
+        """Entities of several documents are verified in one statement."""
+        ids = self.entity_ids()
+        url = reverse("entities:project_entity_bulk_verify", kwargs={"project_slug": "test-project"})
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, {"entity_ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        entity_updates = [
+            q for q in queries.captured_queries if q["sql"].startswith('UPDATE "entities_entity"')
+        ]
+        self.assertEqual(len(entity_updates), 1)
+        self.assertEqual(response.data["verified_count"], 40)
+        self.assertEqual(Entity.objects.filter(is_verified=True, verified_by=self.user).count(), 40)
+        self.assertCountsConsistent()
+
+        # Already verified entities are not counted again
+        response = self.client.post(url, {"entity_ids": ids}, format="json")
+        self.assertEqual(response.data["verified_count"], 0)
+        self.assertCountsConsistent()
+
+    def test_bulk_delete(self):
+        """Deleting adjusts total and verified counters."""
+        document = self.documents[0]
+        ids = self.entity_ids(document)
+        Entity.objects.filter(id__in=ids[:5]).update(is_verified=True)
+        document.update_entity_counts()
+
+        response = self.client.post(
+            reverse(
+                "entities:entity_bulk_delete",
+                kwargs={"project_slug": "test-project", "document_pk": document.pk},
+            ),
+            {"entity_ids": ids[:10]},
+            format="json",
+        )
+
+        self.assertEqual(response.data["deleted_count"], 10)
+        self.assertEqual(Entity.objects.filter(is_deleted=True, deleted_by=self.user).count(), 10)
+        self.assertCountsConsistent()
+
+    def test_bulk_update(self):
+        """The same values are set on all entities."""
+        ids = self.entity_ids()
+
+        response = self.client.post(
+            reverse("entities:project_entity_bulk_update", kwargs={"project_slug": "test-project"}),
+            {"entity_ids": ids, "entity_type": self.location.id, "tags": ["reviewed"]},
+            format="json",
+        )
+
+        self.assertEqual(response.data["updated_count"], 40)
+        entity = Entity.objects.get(id=ids[0])
+        self.assertEqual(entity.entity_type, self.location)
+        self.assertEqual(entity.tags, ["reviewed"])
+
+    def test_out_of_scope_entities_are_rejected(self):
+        """Entities outside the document leave everything unchanged."""
+        response = self.client.post(
+            reverse(
+                "entities:entity_bulk_verify",
+                kwargs={"project_slug": "test-project", "document_pk": self.documents[0].pk},
+            ),
+            {"entity_ids": self.entity_ids()},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Entity.objects.filter(is_verified=True).exists())
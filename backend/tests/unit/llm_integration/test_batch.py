@@ -0,0 +1,211 @@
+"""
+Unit tests for provider batch mode.
+"""
+
+import json
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from documents.models import Document, DocumentVersion
+from entities.models import Entity
+from llm_integration.batch import (
+    BATCH_COMPLETED,
+    BATCH_IN_PROGRESS,
+    AnthropicBatchProvider,
+    LocalBatchProvider,
+    OpenAIBatchProvider,
+    get_batch_provider,
+)
+from llm_integration.models import LLMModel
+from llm_integration.tasks import submit_batch_extraction
+from processing.models import ProcessingJob
+from tests.helpers import (
+    create_llm_config,
+    create_llm_model,
+    create_user_and_project,
+    run_celery_eagerly,
+)
+
+
+def fake_responder(request):
+    """Answer every prompt with the person name."""
+    return json.dumps(
+        {"entities": [{"text": "حسین", "entity_type": "PERSON", "confidence": 0.9}]}
+    )
+
+
+class TestBatchProviders(TestCase):
+    """Test batch provider request and result formats."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.llm_model = LLMModel(
+            name="Test GPT Model",
+            provider="openai",
+            model_name="gpt-3.5-turbo",
+            api_key="test-key-123",
+        )
+        self.request = {
+            "custom_id": "doc-1-chunk-0",
+            "prompt": "Extract entities",
+            "system": "You are an expert",
+            "max_tokens": 100,
+            "temperature": 0.1,
+        }
+
+    def test_openai_line_format(self):
+        """OpenAI lines target the chat completions endpoint."""
+        line = OpenAIBatchProvider(self.llm_model).build_line(self.request)
+
+        self.assertEqual(line["custom_id"], "doc-1-chunk-0")
+        self.assertEqual(line["url"], "/v1/chat/completions")
+        self.assertEqual(line["body"]["model"], "gpt-3.5-turbo")
+        self.assertEqual(line["body"]["messages"][1]["content"], "Extract entities")
+
+    def test_openai_result_parsing(self):
+        """Successful and failed OpenAI result lines are told apart."""
+        ok = json.dumps({
+            "custom_id": "a",
+            "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "{}"}}]}},
+        })
+        failed = json.dumps({
+            "custom_id": "b",
+            "response": {"status_code": 429, "body": {"error": "rate limited"}},
+        })
+
+        self.assertEqual(OpenAIBatchProvider.parse_line(ok), ("a", "{}", None))
+        self.assertEqual(OpenAIBatchProvider.parse_line(failed)[0:2], ("b", None))
+
+    def test_anthropic_format(self):
+        """Anthropic requests and results use the Message Batches format."""
+        self.llm_model.provider = "anthropic"
+        line = AnthropicBatchProvider(self.llm_model).build_line(self.request)
+        result = json.dumps({
+            "custom_id": "a",
+            "result": {"type": "succeeded", "message": {"content": [{"text": "{}"}]}},
+        })
+
+        self.assertEqual(line["params"]["system"], "You are an expert")
+        self.assertEqual(AnthropicBatchProvider.parse_line(result), ("a", "{}", None))
+
+    def test_unsupported_provider(self):
+        """Providers without batch support raise ValueError."""
+        self.llm_model.provider = "custom"
+        with self.assertRaises(ValueError):
+            get_batch_provider(self.llm_model)
+
+
+class TestLocalBatchExtraction(TestCase):
+    """Test the batch flow end to end with the local provider."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.batch_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            LLM_BATCH_LOCAL_DIR=self.batch_dir, LLM_BATCH_POLL_INTERVAL=0
+        )
+        self.settings_override.enable()
+        run_celery_eagerly(self)
+
+        self.user, project = create_user_and_project()
+        self.documents = [
+            Document.objects.create(
+                title=f"Document {i}",
+                content="\n".join(f"مصرع {l} میں حسین" for l in range(20)),
+                project=project,
+                created_by=self.user,
+            )
+            for i in range(2)
+        ]
+        self.llm_model = create_llm_model(
+            name="Local Model", provider="local", model_name="local-ner", api_key="unused"
+        )
+        create_llm_config(self.llm_model, name="Batch Config", chunk_size=200, overlap_size=40)
+
+    def tearDown(self):
+        """Restore settings and remove batch files."""
+        self.settings_override.disable()
+        shutil.rmtree(self.batch_dir, ignore_errors=True)
+
+    def test_local_provider_lifecycle(self):
+        """A local batch completes on the poll after submission."""
+        provider = LocalBatchProvider(self.llm_model, responder=fake_responder)
+        batch_id = provider.submit([{"custom_id": "a", "prompt": "x"}])
+
+        self.assertEqual(provider.get_status(batch_id), BATCH_IN_PROGRESS)
+        self.assertEqual(provider.get_status(batch_id), BATCH_COMPLETED)
+        self.assertEqual(list(provider.iter_results(batch_id)), [("a", fake_responder({}), None)])
+
+    def test_batch_extraction_persists_results(self):
+        """Batch results go through the normal merge and persistence path."""
+        with patch(
+            "llm_integration.tasks.get_batch_provider",
+            lambda llm_model: LocalBatchProvider(llm_model, responder=fake_responder),
+        ):
+            result = submit_batch_extraction([d.id for d in self.documents], "marsiya", self.user.id)
+
+        self.assertGreater(result["requests"], 2)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.result["entities_extracted"], 40)
+        self.assertEqual(job.result["failed_chunks"], {})
+
+        for document in self.documents:
+            self.assertEqual(Entity.objects.filter(document=document).count(), 20)
+            document.refresh_from_db()
+            self.assertEqual(document.processing_status, "completed")
+
+    def test_failed_chunk_fails_its_document(self):
+        """A document with a failed chunk is failed and not marked processed."""
+        failing, complete = self.documents
+        failing_id = f"doc-{failing.id}-chunk-1"
+        for document in self.documents:
+            DocumentVersion.objects.create(
+                document=document, version_number=1, content=document.content
+            )
+
+        def responder(request):
+            if request["custom_id"] == failing_id:
+                raise RuntimeError("chunk rejected")
+            return fake_responder(request)
+
+        with patch(
+            "llm_integration.tasks.get_batch_provider",
+            lambda llm_model: LocalBatchProvider(llm_model, responder=responder),
+        ):
+            result = submit_batch_extraction([d.id for d in self.documents], "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.result["processed"], 1)
+        self.assertEqual(job.result["failed_documents"], [failing.id])
+        self.assertEqual(list(job.result["failed_chunks"]), [failing_id])
+
+        failing.refresh_from_db()
+        self.assertEqual(failing.processing_status, "failed")
+        self.assertIsNone(failing.get_metadata("processed_version"))
+        self.assertFalse(Entity.objects.filter(document=failing).exists())
+        complete.refresh_from_db()
+        self.assertEqual(complete.processing_status, "completed")
+        self.assertIsNotNone(complete.get_metadata("processed_version"))
+        self.assertEqual(Entity.objects.filter(document=complete).count(), 20)
+
+    def test_all_chunks_failed(self):
+        """When every chunk fails, every document and the job are failed."""
+        def responder(request):
+            raise RuntimeError("provider down")
+
+        with patch(
+            "llm_integration.tasks.get_batch_provider",
+            lambda llm_model: LocalBatchProvider(llm_model, responder=responder),
+        ):
+            result = submit_batch_extraction([d.id for d in self.documents], "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.result["processed"], 0)
+        for document in self.documents:
+            document.refresh_from_db()
+            self.assertEqual(document.processing_status, "failed")
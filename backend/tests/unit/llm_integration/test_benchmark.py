@@ -0,0 +1,113 @@
+"""
+Unit tests for the extraction benchmark.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from documents.models import Document
+from llm_integration.benchmark import (
+    GAZETTEER,
+    STAGES,
+    FakeLLMClient,
+    FakeProviderConfig,
+    FakeProviderError,
+    compare_results,
+    generate_corpus,
+    run_benchmark,
+)
+
+FAST_PROVIDER = FakeProviderConfig(latency=0, jitter=0, tokens_per_second=10**9)
+
+
+class TestBenchmarkHarness(TestCase):
+    """Test the corpus, the fake provider and the benchmark run."""
+
+    def test_corpus_is_deterministic(self):
+        """The same size and seed give the same stanzas."""
+        text = generate_corpus(3, seed=1)
+
+        self.assertEqual(text, generate_corpus(3, seed=1))
+        self.assertNotEqual(text, generate_corpus(3, seed=2))
+        self.assertEqual(len(text.split("\n\n")), 3)
+        self.assertTrue(all(len(band.split("\n")) == 6 for band in text.split("\n\n")))
+
+    def test_fake_provider_reports_names_and_usage(self):
+        """Names in the prompt come back as entities with token usage."""
+        client = FakeLLMClient(FAST_PROVIDER)
+        messages = [{"role": "user", "content": "حسین کربلا میں"}]
+
+        response = asyncio.run(client.chat.completions.create(model="fake", messages=messages))
+
+        entities = json.loads(response.choices[0].message.content)["entities"]
+        self.assertEqual(
+            {(e["text"], e["entity_type"]) for e in entities},
+            {("حسین", GAZETTEER["حسین"]), ("کربلا", "LOCATION")},
+        )
+        self.assertGreater(response.usage.completion_tokens, 0)
+
+    def test_fake_provider_errors(self):
+        """Failures are retryable and repeat for the same seed."""
+        config = FakeProviderConfig(latency=0, tokens_per_second=10**9, error_rate=0.5)
+        messages = [{"role": "user", "content": "عباس"}]
+
+        def outcomes():
+            client = FakeLLMClient(config)
+            results = []
+            for _ in range(10):
+                try:
+                    asyncio.run(client.chat.completions.create(model="fake", messages=messages))
+                    results.append(True)
+                except FakeProviderError as e:
+                    self.assertEqual(e.status_code, 503)
+                    results.append(False)
+            return results
+
+        first = outcomes()
+        self.assertEqual(first, outcomes())
+        self.assertIn(False, first)
+        with self.assertRaises(ValueError):
+            FakeProviderConfig(error_rate=1)
+
+    def test_run_benchmark(self):
+        """A run reports throughput, stages and queries, and leaves no rows behind."""
+        results = run_benchmark(sizes=[2, 8], documents=2, provider=FAST_PROVIDER, chunk_size=300)
+
+        self.assertEqual([r["stanzas"] for r in results["results"]], [2, 8])
+        result = results["results"][1]
+        self.assertEqual(result["failed_documents"], 0)
+        self.assertGreater(result["entities"], 0)
+        self.assertGreater(result["documents_per_minute"], 0)
+        self.assertGreater(result["queries_per_document"], 0)
+        self.assertIsNotNone(result["peak_traced_memory_mb"])
+        self.assertEqual(list(result["stages"]), list(STAGES))
+        self.assertGreater(result["stages"]["call"]["count"], 0)
+        self.assertGreater(result["provider_calls"]["count"], 1)
+        self.assertEqual(Document.objects.count(), 0)
+
+        changes = compare_results(results, results)
+        self.assertEqual(changes[0]["documents_per_minute"], 0.0)
+
+    def test_command_writes_results(self):
+        """The management command writes the results as JSON."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            call_command(
+                "benchmark_extraction",
+                "--sizes=2",
+                "--documents=1",
+                "--latency=0",
+                "--tokens-per-second=1000000",
+                "--no-tracemalloc",
+                f"--output={path}",
+                stdout=StringIO(),
+            )
+            with open(path, encoding="utf-8") as f:
+                results = json.load(f)
+
+        self.assertEqual(results["parameters"]["sizes"], [2])
+        self.assertEqual(results["results"][0]["documents"], 1)
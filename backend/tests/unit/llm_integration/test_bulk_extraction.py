@@ -0,0 +1,85 @@
+"""
+Unit tests for chord-based bulk entity extraction.
+"""
+
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from documents.models import Document
+from entities.models import Entity
+from llm_integration.tasks import _build_bulk_lanes, bulk_entity_extraction
+from processing.models import ProcessingJob
+from projects.models import Project
+from tests.helpers import (
+    create_llm_config,
+    create_user_and_project,
+    fake_extract_entities,
+    run_celery_eagerly,
+)
+
+
+@override_settings(LLM_BULK_PROJECT_CONCURRENCY=2)
+class TestBulkEntityExtraction(TestCase):
+    """Test bulk_entity_extraction."""
+
+    def setUp(self):
+        """Set up test data."""
+        run_celery_eagerly(self)
+        self.user, self.project = create_user_and_project()
+        self.other_project = Project.objects.create(
+            name="Other Project", slug="other-project", created_by=self.user
+        )
+        self.documents = [
+            Document.objects.create(
+                title=f"Document {i}",
+                content=f"مصرع {i} میں حسین",
+                project=self.project if i < 5 else self.other_project,
+                created_by=self.user,
+            )
+            for i in range(6)
+        ]
+        create_llm_config(name="Bulk Config")
+
+    def test_lanes_are_limited_per_project(self):
+        """Each project gets at most the configured number of lanes."""
+        lanes = _build_bulk_lanes([d.id for d in self.documents], 2)
+
+        self.assertEqual(len(lanes), 3)
+        self.assertEqual(
+            sorted(d for lane in lanes for d in lane), sorted(d.id for d in self.documents)
+        )
+
+    def test_bulk_extraction_aggregates_results(self):
+        """Documents are loaded, extracted and counted in the callback."""
+        self.documents[2].content = "   "
+        self.documents[2].save()
+        document_ids = [d.id for d in self.documents] + [999999]
+
+        with patch(
+            "llm_integration.services.LLMService.extract_entities", fake_extract_entities
+        ):
+            result = bulk_entity_extraction(document_ids, "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.result["total_documents"], 7)
+        self.assertEqual(job.result["processed"], 5)
+        self.assertEqual(job.result["failed"], 2)
+        self.assertEqual(job.result["entities_extracted"], 5)
+        self.assertEqual(
+            {f["document_id"] for f in job.result["failures"]},
+            {self.documents[2].id, 999999},
+        )
+
+        self.assertEqual(Entity.objects.count(), 5)
+        self.documents[0].refresh_from_db()
+        self.assertEqual(self.documents[0].processing_status, "completed")
+        self.assertEqual(self.documents[0].total_entities, 1)
+
+    def test_empty_bulk_job_completes(self):
+        """A bulk job without documents completes immediately."""
+        result = bulk_entity_extraction([], "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.result["total_documents"], 0)
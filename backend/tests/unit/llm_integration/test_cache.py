@@ -0,0 +1,179 @@
+"""
+Unit tests for the content-addressed extraction cache.
+"""
+
+import json
+from django.core.cache import caches
+from django.test import TestCase
+from unittest.mock import patch, Mock, AsyncMock
+from llm_integration.cache import ExtractionCache, normalize_text
+from llm_integration.chunking import split_segments
+from llm_integration.services import LLMService
+from llm_integration.models import LLMModel, LLMProcessingConfig
+
+
+def make_marsiya(stanzas=4):
+    """Build a synthetic marsiya with blank lines between stanzas."""
+    return "\n\n".join(
+        "\n".join(f"بند {s} مصرع {l} حسین کربلا" for l in range(4))
+        for s in range(stanzas)
+    )
+
+
+class TestSplitSegments(TestCase):
+    """Test split_segments."""
+
+    def test_segments_cover_text(self):
+        """Segments are stanzas and cover the text without gaps."""
+        text = make_marsiya()
+        segments = split_segments(text, 1000)
+
+        self.assertEqual(len(segments), 4)
+        self.assertEqual("".join(s["text"] for s in segments), text)
+        for segment in segments:
+            self.assertEqual(text[segment["start"] : segment["end"]], segment["text"])
+
+    def test_long_stanza_is_split(self):
+        """Stanzas longer than the maximum size are split further."""
+        segments = split_segments(make_marsiya(stanzas=1), 60)
+
+        self.assertGreater(len(segments), 1)
+        for segment in segments:
+            self.assertLessEqual(len(segment["text"]), 60)
+
+
+class TestExtractionCache(TestCase):
+    """Test ExtractionCache."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.cache = ExtractionCache("gpt-3.5-turbo", "template", 0.1, ["PERSON"])
+
+    def test_keys_are_stable_and_normalized(self):
+        """Keys ignore trailing whitespace, newline style and Unicode form."""
+        key = self.cache.make_key("segment", "حسین\nکربلا")
+
+        self.assertEqual(key, self.cache.make_key("segment", "حسین  \r\nکربلا\n"))
+        self.assertEqual(normalize_text("é"), normalize_text("é"))
+        self.assertTrue(key.startswith("llm_entities:v1:segment:"))
+        self.assertNotEqual(key, self.cache.make_key("document", "حسین\nکربلا"))
+
+    def test_keys_depend_on_extraction_settings(self):
+        """Changing model, prompt, temperature or entity types changes the key."""
+        key = self.cache.make_key("segment", "حسین")
+        others = [
+            ExtractionCache("gpt-4", "template", 0.1, ["PERSON"]),
+            ExtractionCache("gpt-3.5-turbo", "other", 0.1, ["PERSON"]),
+            ExtractionCache("gpt-3.5-turbo", "template", 0.7, ["PERSON"]),
+            ExtractionCache("gpt-3.5-turbo", "template", 0.1, ["LOCATION"]),
+        ]
+        for other in others:
+            self.assertNotEqual(key, other.make_key("segment", "حسین"))
+
+        same = ExtractionCache("gpt-3.5-turbo", "template", 0.1, ["person"])
+        self.assertEqual(key, same.make_key("segment", "حسین"))
+
+    def test_values_are_compressed(self):
+        """Values are stored compressed and round-trip unchanged."""
+        entities = [{"text": "حسین", "entity_type": "PERSON", "start": 0, "end": 4}]
+        self.cache.set_document("حسین کربلا", entities)
+
+        raw = caches["default"].get(self.cache.make_key("document", "حسین کربلا"))
+        self.assertIsInstance(raw, bytes)
+        self.assertEqual(self.cache.get_document("حسین کربلا"), entities)
+
+    def test_document_requires_exact_text(self):
+        """Document entries are only reused for the exact same text."""
+        self.cache.set_document("حسین کربلا", [])
+
+        self.assertEqual(self.cache.get_document("حسین کربلا"), [])
+        self.assertIsNone(self.cache.get_document("حسین کربلا  "))
+
+    def test_segments_round_trip(self):
+        """Segment entries are fetched in one call by index."""
+        self.cache.set_segments({"الف": [{"text": "الف"}], "ب": []})
+
+        hits = self.cache.get_segments(["ب", "ج", "الف"])
+
+        self.assertEqual(hits, {0: [], 2: [{"text": "الف"}]})
+
+
+class TestCachedExtraction(TestCase):
+    """Test LLMService.extract_entities with the extraction cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.llm_model = LLMModel.objects.create(
+            name="Test GPT Model",
+            provider="openai",
+            model_name="gpt-3.5-turbo",
+            api_key="test-key-123",
+            is_active=True,
+        )
+        self.llm_config = LLMProcessingConfig.objects.create(
+            name="Cached Config",
+            llm_model=self.llm_model,
+            chunk_size=1000,
+            overlap_size=100,
+            is_active=True,
+        )
+        self.client = Mock()
+        self.client.chat.completions.create = AsyncMock(side_effect=self._fake_completion)
+
+    def _fake_completion(self, **kwargs):
+        """Return the person name for every prompt."""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps(
+            {"entities": [{"text": "حسین", "entity_type": "PERSON", "confidence": 0.9}]}
+        )
+        return response
+
+    def _extract(self, text):
+        service = LLMService()
+        with patch.object(LLMService, "_get_client", return_value=self.client), patch.object(
+            LLMService, "_update_usage_stats"
+        ):
+            return service.extract_entities(text, "marsiya")
+
+    def test_repeated_document_is_not_sent_again(self):
+        """A second extraction of the same text is served from the cache."""
+        text = make_marsiya()
+        first = self._extract(text)
+        second = self._extract(text)
+
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 16)
+
+    def test_only_edited_stanza_is_sent_again(self):
+        """Editing one stanza only re-extracts that stanza."""
+        self._extract(make_marsiya())
+        self.client.chat.completions.create.reset_mock()
+
+        stanzas = make_marsiya().split("\n\n")
+        stanzas[2] = stanzas[2].replace("مصرع 1", "مصرع نیا")
+        edited = "\n\n".join(stanzas)
+        entities = self._extract(edited)
+
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+        prompt = self.client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("مصرع نیا", prompt)
+        self.assertNotIn("بند 0", prompt)
+
+        self.assertEqual(len(entities), 16)
+        for entity in entities:
+            self.assertEqual(edited[entity["start"] : entity["end"]], "حسین")
+
+    def test_temperature_change_misses_cache(self):
+        """Changing the model temperature invalidates cached results."""
+        text = make_marsiya()
+        self._extract(text)
+
+        self.llm_model.settings = {"temperature": 0.7}
+        self.llm_model.save()
+        self._extract(text)
+
+        self.assertEqual(self.client.chat.completions.create.call_count, 2)
@@ -0,0 +1,154 @@
+"""
+Unit tests for chunked LLM entity extraction.
+"""
+
+import json
+from django.test import TestCase
+from unittest.mock import patch, Mock, AsyncMock
+from llm_integration.chunking import TextChunker, merge_chunk_entities
+from llm_integration.services import LLMService
+from llm_integration.models import LLMModel, LLMProcessingConfig
+
+
+def make_marsiya(stanzas=20, lines_per_stanza=6):
+    """Build a synthetic marsiya with blank lines between stanzas."""
+    stanza_texts = []
+    for s in range(stanzas):
+        lines = [f"بند {s} مصرع {l} حسین کربلا" for l in range(lines_per_stanza)]
+        stanza_texts.append("\n".join(lines))
+    return "\n\n".join(stanza_texts)
+
+
+class TestTextChunker(TestCase):
+    """Test TextChunker splitting."""
+
+    def test_short_text_single_chunk(self):
+        """Text shorter than the chunk size is returned as one chunk."""
+        chunks = TextChunker(1000, 100).split("حسین کربلا")
+
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]["start"], 0)
+        self.assertEqual(chunks[0]["text"], "حسین کربلا")
+
+    def test_empty_text(self):
+        """Empty text produces no chunks."""
+        self.assertEqual(TextChunker(1000, 100).split(""), [])
+
+    def test_chunks_cover_text_on_line_boundaries(self):
+        """Chunks cover the whole text and start at line boundaries."""
+        text = make_marsiya()
+        chunks = TextChunker(300, 60).split(text)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0]["start"], 0)
+        self.assertEqual(chunks[-1]["end"], len(text))
+
+        for chunk in chunks:
+            self.assertEqual(text[chunk["start"] : chunk["end"]], chunk["text"])
+            self.assertLessEqual(len(chunk["text"]), 300)
+            self.assertTrue(chunk["start"] == 0 or text[chunk["start"] - 1] == "\n")
+
+        for previous, current in zip(chunks, chunks[1:]):
+            # No gaps, bounded overlap, always making progress
+            self.assertLessEqual(current["start"], previous["end"])
+            self.assertLessEqual(previous["end"] - current["start"], 60)
+            self.assertGreater(current["start"], previous["start"])
+
+    def test_prefers_stanza_breaks(self):
+        """Chunks end at blank lines between stanzas when possible."""
+        text = make_marsiya()
+        chunks = TextChunker(400, 0).split(text)
+
+        for chunk in chunks[:-1]:
+            self.assertTrue(chunk["text"].endswith("\n\n"))
+
+    def test_long_line_is_split(self):
+        """A single line longer than the chunk size is split on whitespace."""
+        text = " ".join(["کربلا"] * 200)
+        chunks = TextChunker(100, 10).split(text)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(c["text"] for c in chunks), text)
+
+    def test_invalid_overlap(self):
+        """Overlap must be smaller than the chunk size."""
+        with self.assertRaises(ValueError):
+            TextChunker(100, 100)
+
+
+class TestMergeChunkEntities(TestCase):
+    """Test merging of chunk-level entities."""
+
+    def test_offsets_shifted_and_deduplicated(self):
+        """Entities in overlapping windows are merged into one."""
+        chunk_a = {"index": 0, "text": "", "start": 0, "end": 30}
+        chunk_b = {"index": 1, "text": "", "start": 20, "end": 50}
+        results = [
+            (chunk_a, [{"text": "حسین", "entity_type": "PERSON", "start": 22, "end": 26, "confidence": 0.7}]),
+            (chunk_b, [
+                {"text": "حسین", "entity_type": "person", "start": 2, "end": 6, "confidence": 0.9},
+                {"text": "کربلا", "entity_type": "LOCATION", "start": 10, "end": 15, "confidence": 0.8},
+            ]),
+        ]
+
+        merged = merge_chunk_entities(results)
+
+        self.assertEqual(len(merged), 2)
+        self.assertEqual((merged[0]["start"], merged[0]["end"]), (22, 26))
+        self.assertEqual(merged[0]["confidence"], 0.9)
+        self.assertEqual((merged[1]["start"], merged[1]["end"]), (30, 35))
+
+
+class TestChunkedExtraction(TestCase):
+    """Test LLMService.extract_entities over chunked documents."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.llm_model = LLMModel.objects.create(
+            name="Test GPT Model",
+            provider="openai",
+            model_name="gpt-3.5-turbo",
+            api_key="test-key-123",
+            is_active=True,
+        )
+        self.llm_config = LLMProcessingConfig.objects.create(
+            name="Chunked Config",
+            llm_model=self.llm_model,
+            chunk_size=300,
+            overlap_size=60,
+            is_active=True,
+        )
+
+    def _fake_completion(self, **kwargs):
+        """Return every occurrence of the person name in the prompted chunk."""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps(
+            {"entities": [{"text": "حسین", "entity_type": "PERSON", "confidence": 0.9}]}
+        )
+        return response
+
+    def test_long_document_is_chunked(self):
+        """Every occurrence is found once, in document offsets."""
+        text = make_marsiya()
+        client = Mock()
+        client.chat.completions.create = AsyncMock(side_effect=self._fake_completion)
+
+        service = LLMService()
+        with patch.object(LLMService, "_get_client", return_value=client), patch.object(
+            LLMService, "_update_usage_stats"
+        ):
+            entities = service.extract_entities(text, "marsiya")
+
+        chunk_count = len(TextChunker(300, 60).split(text))
+        self.assertEqual(client.chat.completions.create.call_count, chunk_count)
+
+        expected = []
+        pos = text.find("حسین")
+        while pos != -1:
+            expected.append(pos)
+            pos = text.find("حسین", pos + 1)
+
+        self.assertEqual([e["start"] for e in entities], expected)
+        for entity in entities:
+            self.assertEqual(text[entity["start"] : entity["end"]], "حسین")
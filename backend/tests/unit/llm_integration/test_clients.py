@@ -0,0 +1,99 @@
+"""
+Unit tests for the pooled async LLM client layer.
+"""
+
+import asyncio
+from django.test import TestCase, override_settings
+from unittest.mock import patch
+from llm_integration.clients import AsyncClientPool, get_provider_api_key
+from llm_integration.models import LLMModel
+
+
+class TestAsyncClientPool(TestCase):
+    """Test AsyncClientPool."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.pool = AsyncClientPool()
+        self.llm_model = LLMModel.objects.create(
+            name="Test GPT Model",
+            provider="openai",
+            model_name="gpt-3.5-turbo",
+            api_key="test-key-123",
+            rate_limit_per_minute=60,
+        )
+
+    def test_clients_are_reused_per_key(self):
+        """The same provider/endpoint/key gets the same client."""
+        first = self.pool.get_client("openai", "key-a")
+        second = self.pool.get_client("openai", "key-a")
+        other_key = self.pool.get_client("openai", "key-b")
+        other_url = self.pool.get_client("openai", "key-a", "http://localhost:8000/v1")
+        anthropic_client = self.pool.get_client("anthropic", "key-a")
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_key)
+        self.assertIsNot(first, other_url)
+        self.assertIsNot(first, anthropic_client)
+
+    def test_unsupported_provider(self):
+        """Unsupported providers raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.pool.get_client("unsupported", "key")
+
+    def test_run_executes_on_background_loop(self):
+        """Coroutines run on the shared pool loop."""
+
+        async def get_loop():
+            return asyncio.get_running_loop()
+
+        self.assertIs(self.pool.run(get_loop()), self.pool.run(get_loop()))
+
+    @override_settings(LLM_MAX_CONCURRENT_REQUESTS=8)
+    def test_concurrency_limit_from_rate_limit(self):
+        """Concurrency is derived from rate_limit_per_minute and capped."""
+        self.llm_model.rate_limit_per_minute = 30
+        self.assertEqual(AsyncClientPool.get_concurrency_limit(self.llm_model), 5)
+
+        self.llm_model.rate_limit_per_minute = 3
+        self.assertEqual(AsyncClientPool.get_concurrency_limit(self.llm_model), 1)
+
+        self.llm_model.rate_limit_per_minute = 6000
+        self.assertEqual(AsyncClientPool.get_concurrency_limit(self.llm_model), 8)
+
+        self.llm_model.settings = {"max_concurrency": 2}
+        self.assertEqual(AsyncClientPool.get_concurrency_limit(self.llm_model), 2)
+
+    def test_semaphore_bounds_in_flight_requests(self):
+        """No more than the model's limit run at the same time."""
+        self.llm_model.settings = {"max_concurrency": 3}
+        state = {"in_flight": 0, "peak": 0}
+
+        async def fake_request():
+            async with self.pool.get_semaphore(self.llm_model):
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+                await asyncio.sleep(0.01)
+                state["in_flight"] -= 1
+
+        async def fan_out():
+            await asyncio.gather(*(fake_request() for _ in range(12)))
+
+        self.pool.run(fan_out())
+
+        self.assertEqual(state["peak"], 3)
+
+    def test_pool_resets_after_fork(self):
+        """A forked worker starts with a fresh loop and no inherited clients."""
+        client = self.pool.get_client("openai", "key-a")
+
+        with patch("llm_integration.clients.os.getpid", return_value=-1):
+            self.assertIsNot(self.pool.get_client("openai", "key-a"), client)
+
+    def test_api_key_fallback(self):
+        """The model's own key wins over the provider-wide setting."""
+        self.assertEqual(get_provider_api_key(self.llm_model), "test-key-123")
+
+        self.llm_model.api_key = ""
+        with override_settings(OPENAI_API_KEY="settings-key"):
+            self.assertEqual(get_provider_api_key(self.llm_model), "settings-key")
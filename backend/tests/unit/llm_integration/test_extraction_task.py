@@ -0,0 +1,76 @@
+"""
+Unit tests for the background entity extraction task.
+"""
+
+from django.test import TestCase
+from unittest.mock import patch
+from documents.models import Document
+from entities.models import Entity
+from llm_integration.services import LLMService
+from llm_integration.tasks import extract_entities_from_text
+from processing.models import ProcessingJob
+from tests.helpers import create_llm_config, create_user_and_project, fake_extract_entities
+
+
+class TestExtractEntitiesFromText(TestCase):
+    """Test extract_entities_from_text."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user, self.project = create_user_and_project()
+        self.document = Document.objects.create(
+            title="Marsiya",
+            content="حسین کربلا میں\nحسین کا غم",
+            project=self.project,
+            created_by=self.user,
+        )
+        create_llm_config()
+
+    def run_task(self, task_id="extract-1"):
+        return extract_entities_from_text.apply(
+            kwargs={
+                "text": "",
+                "document_id": self.document.id,
+                "prompt_type": "marsiya",
+                "user_id": self.user.id,
+            },
+            task_id=task_id,
+        )
+
+    def test_entities_are_saved_and_job_completed(self):
+        """The task saves the entities and completes a job for the document."""
+        with patch.object(LLMService, "extract_entities", fake_extract_entities):
+            result = self.run_task()
+
+        self.assertTrue(result.successful())
+        self.assertEqual(Entity.objects.filter(document=self.document).count(), 2)
+
+        job = ProcessingJob.objects.get(job_id="extract-1")
+        self.assertEqual(job.job_type, "ner_processing")
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.document, self.document)
+        self.assertEqual(job.project, self.project)
+        self.assertEqual(job.created_by, self.user)
+        self.assertIsNotNone(job.processing_time)
+        self.assertEqual(job.result["entities_extracted"], 2)
+        self.assertEqual(job.result["llm_model"], "gpt-3.5-turbo")
+        self.assertEqual(
+            [(e["start"], e["end"]) for e in job.result["entities_data"]], [(0, 4), (15, 19)]
+        )
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.metadata["entities_count"], 2)
+
+    def test_failure_is_recorded_on_one_job(self):
+        """Retries reuse the job of the task, which ends up failed."""
+        with patch.object(LLMService, "extract_entities", side_effect=ValueError("bad response")):
+            result = self.run_task()
+
+        self.assertTrue(result.failed())
+        job = ProcessingJob.objects.get()
+        self.assertEqual(job.job_id, "extract-1")
+        self.assertEqual(job.status, "failed")
+        self.assertEqual(job.error_message, "Entity extraction failed: bad response")
+        self.assertEqual(job.result["prompt_type"], "marsiya")
+        self.assertFalse(Entity.objects.exists())
@@ -0,0 +1,149 @@
+"""
+Unit tests for incremental re-extraction of edited documents.
+"""
+
+from django.test import TestCase
+from unittest.mock import patch
+from documents.models import Document, DocumentVersion
+from entities.models import Entity
+from llm_integration.incremental import OffsetMap, diff_texts, plan_reextraction, reextract_changes
+from llm_integration.persistence import resolve_entity_types, save_extracted_entities
+from processing.models import ProcessingJob
+from processing.tasks import process_document_with_llm
+from tests.helpers import (
+    create_llm_config,
+    create_user_and_project,
+    find_names,
+    run_celery_eagerly,
+)
+
+STANZAS = [
+    "\n".join(f"بند {s} مصرع {l} میں حسین" for l in range(4)) for s in range(5)
+]
+OLD_TEXT = "\n\n".join(STANZAS)
+
+
+def edit(text):
+    """Add a title line and fix a word in the third stanza."""
+    return "عنوان\n" + text.replace("بند 2 مصرع 1", "بند 2 مصرعہ 1")
+
+
+class TestReextractionPlan(TestCase):
+    """Test diffing and planning."""
+
+    def test_unchanged_text_needs_nothing(self):
+        """Identical texts produce no spans."""
+        self.assertEqual(plan_reextraction(OLD_TEXT, OLD_TEXT)["spans"], [])
+
+    def test_edits_widen_to_stanzas(self):
+        """Each edit is re-extracted with its whole stanza only."""
+        new_text = edit(OLD_TEXT)
+        spans = plan_reextraction(OLD_TEXT, new_text)["spans"]
+
+        texts = [new_text[s["new_start"] : s["new_end"]].strip() for s in spans]
+        self.assertEqual(texts, ["عنوان\n" + STANZAS[0], STANZAS[2].replace("مصرع 1", "مصرعہ 1")])
+
+    def test_offset_map(self):
+        """Unchanged spans shift by the inserted characters; edited ones do not map."""
+        new_text = edit(OLD_TEXT)
+        offset_map = OffsetMap(diff_texts(OLD_TEXT, new_text))
+        start = OLD_TEXT.find("بند 4")
+
+        self.assertEqual(offset_map.old_to_new(start, start + 5), (start + 7, start + 12))
+        edited = OLD_TEXT.find("بند 2 مصرع 1")
+        self.assertIsNone(offset_map.old_to_new(edited, edited + 5))
+
+
+class TestReextractChanges(TestCase):
+    """Test reextract_changes."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user, project = create_user_and_project()
+        self.document = Document.objects.create(
+            title="Marsiya", content=OLD_TEXT, project=project, created_by=self.user
+        )
+        save_extracted_entities(self.document, find_names(OLD_TEXT), user_id=self.user.id)
+
+        # A reviewer's manual entity in an untouched stanza
+        start = OLD_TEXT.find("بند 3 مصرع 2")
+        save_extracted_entities(
+            self.document,
+            [{"text": "بند", "entity_type": "LOCATION", "start": start, "end": start + 3}],
+            user_id=self.user.id,
+        )
+        Entity.objects.filter(entity_type=resolve_entity_types(["LOCATION"])["LOCATION"]).update(
+            source="manual", is_verified=True
+        )
+
+    def test_only_changed_stanzas_are_extracted(self):
+        """Unchanged stanzas are shifted, edited ones re-extracted."""
+        new_text = edit(OLD_TEXT)
+        calls = []
+
+        def extract(text):
+            calls.append(text)
+            return find_names(text)
+
+        result = reextract_changes(self.document, OLD_TEXT, new_text, extract, user_id=self.user.id)
+
+        self.assertEqual(len(calls), 2)
+        self.assertLess(result["reextracted_characters"], len(new_text) / 2)
+        self.assertEqual(result["entities_extracted"], 8)
+        self.assertEqual(result["entities_invalidated"], 8)
+
+        entities = Entity.objects.filter(document=self.document, is_deleted=False)
+        self.assertEqual(entities.count(), 21)
+        for entity in entities:
+            self.assertEqual(new_text[entity.start_position : entity.end_position], entity.text)
+            self.assertEqual(
+                entity.line_number, new_text.count("\n", 0, entity.start_position) + 1
+            )
+
+        manual = entities.get(source="manual")
+        self.assertTrue(manual.is_verified)
+        self.assertEqual(manual.start_position, new_text.find("بند 3 مصرع 2"))
+
+
+class TestIncrementalProcessingTask(TestCase):
+    """Test incremental mode of process_document_with_llm."""
+
+    def setUp(self):
+        """Set up test data."""
+        run_celery_eagerly(self)
+        self.user, project = create_user_and_project()
+        self.document = Document.objects.create(
+            title="Marsiya", content=OLD_TEXT, project=project, created_by=self.user
+        )
+        DocumentVersion.objects.create(document=self.document, version_number=1, content=OLD_TEXT)
+        create_llm_config(chunk_size=1000)
+
+    def test_incremental_run_after_edit(self):
+        """After a full run, an edit only sends the changed stanzas."""
+        with patch(
+            "llm_integration.router.ModelRouter.extract_entities",
+            side_effect=lambda text, prompt_type: find_names(text),
+        ) as mock_extract:
+            process_document_with_llm(self.document.id, "marsiya", self.user.id)
+            self.document.refresh_from_db()
+            self.assertEqual(self.document.get_metadata("processed_version"), 1)
+
+            self.document.content = edit(OLD_TEXT)
+            self.document.save()
+            DocumentVersion.objects.create(
+                document=self.document, version_number=2, content=self.document.content
+            )
+            mock_extract.reset_mock()
+
+            result = process_document_with_llm(
+                self.document.id, "marsiya", self.user.id, incremental=True
+            )
+
+        self.assertEqual(mock_extract.call_count, 2)
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertTrue(job.result["incremental"])
+
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.get_metadata("processed_version"), 2)
+        self.assertEqual(self.document.total_entities, 20)
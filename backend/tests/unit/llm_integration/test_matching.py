@@ -0,0 +1,100 @@
+"""
+Unit tests for entity position matching.
+"""
+
+from django.test import TestCase
+from llm_integration.matching import AhoCorasickMatcher, TextPositionIndex
+from llm_integration.services import LLMService
+from tests.helpers import create_llm_config
+
+
+class TestAhoCorasickMatcher(TestCase):
+    """Test AhoCorasickMatcher."""
+
+    def test_finds_all_patterns_in_one_pass(self):
+        """Overlapping and nested patterns are all reported."""
+        matcher = AhoCorasickMatcher(["he", "she", "his", "hers"])
+
+        matches = sorted(matcher.iter_matches("ushers"))
+
+        self.assertEqual(matches, [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+
+    def test_whole_words_only(self):
+        """Names inside longer Urdu words are not matched."""
+        text = "علی اور علیم، علی‌گڑھ میں مولا علی"
+        matcher = AhoCorasickMatcher(["علی"])
+
+        starts = [start for start, _, _ in matcher.find_words(text)]
+
+        self.assertEqual(starts, [0, text.rindex("علی")])
+
+    def test_diacritics_do_not_end_a_word(self):
+        """A following combining mark keeps the match inside the word."""
+        matcher = AhoCorasickMatcher(["حسین"])
+
+        self.assertEqual(matcher.find_words("حسینِ مظلوم"), [])
+        self.assertEqual(len(matcher.find_words("امام حسین، مظلوم")), 1)
+
+
+class TestTextPositionIndex(TestCase):
+    """Test TextPositionIndex."""
+
+    def test_line_and_word_positions(self):
+        """Offsets map to 1-based line numbers and word positions."""
+        text = "پہلا مصرع حسین\nدوسرا مصرع کربلا میں\n"
+        index = TextPositionIndex(text)
+
+        self.assertEqual(index.line_number(0), 1)
+        self.assertEqual(index.word_position(0), 1)
+        self.assertEqual(index.word_position(text.index("حسین")), 3)
+        self.assertEqual(index.line_number(text.index("کربلا")), 2)
+        self.assertEqual(index.word_position(text.index("کربلا")), 3)
+        self.assertEqual(index.line_number(len(text)), 2)
+
+    def test_context(self):
+        """Context is taken from around the span."""
+        index = TextPositionIndex("abc حسین def")
+
+        self.assertEqual(index.context(4, 8, size=2), ("c ", " d"))
+
+
+class TestFindEntityPositions(TestCase):
+    """Test LLMService._find_entity_positions."""
+
+    def setUp(self):
+        """Set up test data."""
+        create_llm_config()
+        self.service = LLMService()
+
+    def test_llm_offsets_are_preferred(self):
+        """Valid LLM offsets are kept and not expanded to every occurrence."""
+        text = "علی نے کہا یا علی مدد"
+        second = text.rindex("علی")
+        entities = [{"text": "علی", "entity_type": "PERSON", "start": second, "end": second + 3}]
+
+        positioned = self.service._find_entity_positions(text, entities)
+
+        self.assertEqual([(e["start"], e["end"]) for e in positioned], [(second, second + 3)])
+
+    def test_wrong_offsets_are_resolved(self):
+        """Offsets that do not match the text fall back to matching."""
+        text = "یا علی مدد"
+        entities = [{"text": "علی", "entity_type": "PERSON", "start": 0, "end": 3}]
+
+        positioned = self.service._find_entity_positions(text, entities)
+
+        self.assertEqual([e["start"] for e in positioned], [3])
+
+    def test_duplicates_are_merged(self):
+        """The same mention listed twice is returned once with the best confidence."""
+        text = "حسین کربلا میں"
+        entities = [
+            {"text": "حسین", "entity_type": "PERSON", "confidence": 0.6},
+            {"text": "حسین", "entity_type": "PERSON", "confidence": 0.9},
+            {"text": "کربلا", "entity_type": "LOCATION"},
+        ]
+
+        positioned = self.service._find_entity_positions(text, entities)
+
+        self.assertEqual([e["text"] for e in positioned], ["حسین", "کربلا"])
+        self.assertEqual(positioned[0]["confidence"], 0.9)
@@ -0,0 +1,97 @@
+"""
+Unit tests for batched persistence of extracted entities.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from llm_integration.persistence import resolve_entity_types, save_extracted_entities
+from documents.models import Document
+from entities.models import Entity, EntityType
+from projects.models import Project
+
+User = get_user_model()
+
+
+class TestSaveExtractedEntities(TestCase):
+    """Test save_extracted_entities."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.user
+        )
+        lines = [f"مصرع {i} میں حسین اور کربلا" for i in range(50)]
+        self.document = Document.objects.create(
+            title="Test Document",
+            content="\n".join(lines),
+            project=self.project,
+            created_by=self.user,
+        )
+        EntityType.objects.create(
+            name="PERSON",
+            display_name="Person",
+            description="Names of people",
+            color_code="#87CEEB",
+        )
+
+    def _entities_data(self):
+        content = self.document.content
+        entities_data = []
+        for name, entity_type in (("حسین", "person"), ("کربلا", "LOCATION")):
+            start = content.find(name)
+            while start != -1:
+                entities_data.append(
+                    {
+                        "text": name,
+                        "entity_type": entity_type,
+                        "start": start,
+                        "end": start + len(name),
+                        "confidence": 0.9,
+                        "llm_model": "gpt-3.5-turbo",
+                    }
+                )
+                start = content.find(name, start + 1)
+        return entities_data
+
+    def test_entities_saved_with_positions(self):
+        """All entities are saved with line, word and context fields."""
+        saved = save_extracted_entities(
+            self.document, self._entities_data(), user_id=self.user.id
+        )
+
+        self.assertEqual(len(saved), 100)
+        self.assertEqual(Entity.objects.filter(document=self.document).count(), 100)
+
+        entity = Entity.objects.filter(text="کربلا").order_by("start_position")[1]
+        self.assertEqual(entity.line_number, 2)
+        self.assertEqual(entity.word_position, 6)
+        self.assertEqual(entity.entity_type.name, "LOCATION")
+        self.assertEqual(entity.confidence_score, 0.9)
+        self.assertEqual(entity.created_by, self.user)
+        self.assertEqual(entity.attributes["llm_model"], "gpt-3.5-turbo")
+        self.assertTrue(entity.context_before.endswith("حسین اور "))
+
+    def test_query_count_is_independent_of_entity_count(self):
+        """Types are resolved in bulk and entities written in batches."""
+        with CaptureQueriesContext(connection) as queries:
+            save_extracted_entities(self.document, self._entities_data(), batch_size=50)
+
+        # Type lookup, type insert, type re-read, two entity batches, and the
+        # document lookup and counter updates (plus savepoint queries)
+        self.assertLessEqual(len(queries), 11)
+
+    def test_resolve_entity_types_creates_missing(self):
+        """Missing types are created once and existing ones reused."""
+        entity_types = resolve_entity_types(["person", "Location", "LOCATION"])
+
+        self.assertEqual(set(entity_types), {"PERSON", "LOCATION"})
+        self.assertEqual(EntityType.objects.filter(name="LOCATION").count(), 1)
+
+    def test_empty(self):
+        """Nothing is written for an empty result."""
+        self.assertEqual(save_extracted_entities(self.document, []), [])
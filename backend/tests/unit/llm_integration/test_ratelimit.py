@@ -0,0 +1,149 @@
+"""
+Unit tests for shared LLM rate limiting and retry backoff.
+"""
+
+import json
+import httpx
+import openai
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from unittest.mock import patch, Mock, AsyncMock
+from llm_integration.clients import client_pool
+from llm_integration.models import LLMModel
+from llm_integration.ratelimit import (
+    ModelRateLimiter,
+    RateLimitExceeded,
+    TokenBucketLimiter,
+    get_retry_after,
+    get_retry_delay,
+    is_retryable,
+)
+from llm_integration.services import LLMService
+from tests.helpers import create_llm_config
+
+
+def make_rate_limit_error(headers=None):
+    """Build an OpenAI 429 error with the given response headers."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+
+class TestTokenBucketLimiter(TestCase):
+    """Test TokenBucketLimiter."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.limiter = TokenBucketLimiter()
+
+    def test_bucket_drains_and_reports_wait(self):
+        """A full bucket grants its capacity, then asks the caller to wait."""
+        bucket = [("test:rpm", 3, 1.0, 1)]
+
+        self.assertEqual([self.limiter.try_acquire(bucket) for _ in range(3)], [0, 0, 0])
+        self.assertGreater(self.limiter.try_acquire(bucket), 0)
+
+    def test_all_buckets_charged_together(self):
+        """Nothing is taken when one of several buckets is empty."""
+        self.limiter.try_acquire([("test:tpm", 100, 1.0, 100)])
+
+        wait = self.limiter.try_acquire([("test:rpm", 10, 1.0, 1), ("test:tpm", 100, 1.0, 50)])
+
+        self.assertGreater(wait, 0)
+        self.assertEqual(caches["default"].get("llm_ratelimit:test:rpm"), None)
+
+    def test_refill_over_time(self):
+        """Tokens come back at the refill rate."""
+        bucket = [("test:rpm", 1, 1.0, 1)]
+        with patch("llm_integration.ratelimit.time.time", return_value=1000.0):
+            self.limiter.try_acquire(bucket)
+            self.assertGreater(self.limiter.try_acquire(bucket), 0)
+        with patch("llm_integration.ratelimit.time.time", return_value=1001.5):
+            self.assertEqual(self.limiter.try_acquire(bucket), 0)
+
+
+@override_settings(LLM_RATE_LIMIT_MAX_WAIT=0.5)
+class TestModelRateLimiter(TestCase):
+    """Test ModelRateLimiter."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.llm_model = LLMModel.objects.create(
+            name="Test GPT Model",
+            provider="openai",
+            model_name="gpt-3.5-turbo",
+            api_key="test-key-123",
+            rate_limit_per_minute=2,
+            rate_limit_per_hour=100,
+            settings={"tokens_per_minute": 1000},
+        )
+
+    def test_buckets_from_model_limits(self):
+        """Requests and tokens are metered per model."""
+        buckets = ModelRateLimiter(self.llm_model).get_buckets(tokens=200)
+
+        self.assertEqual([b[1] for b in buckets], [2, 100, 1000])
+        self.assertEqual(buckets[2][3], 200)
+
+    def test_waits_then_gives_up(self):
+        """Callers wait for capacity and fail only after the maximum wait."""
+        limiter = ModelRateLimiter(self.llm_model)
+        client_pool.run(limiter.acquire())
+        client_pool.run(limiter.acquire())
+
+        with self.assertRaises(RateLimitExceeded):
+            client_pool.run(limiter.acquire())
+
+
+class TestRetryBackoff(TestCase):
+    """Test retry classification and backoff."""
+
+    def test_retry_after_header(self):
+        """Retry-After (seconds or milliseconds) is read from the response."""
+        self.assertEqual(get_retry_after(make_rate_limit_error({"retry-after": "7"})), 7.0)
+        self.assertEqual(get_retry_after(make_rate_limit_error({"retry-after-ms": "1500"})), 1.5)
+        self.assertIsNone(get_retry_after(make_rate_limit_error()))
+        self.assertIsNone(get_retry_after(ValueError("no response")))
+
+    def test_delay_is_jittered_and_capped(self):
+        """Backoff grows exponentially, stays under the cap and honours Retry-After."""
+        for attempt in range(10):
+            delay = get_retry_delay(attempt, base=1.0, cap=8.0)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, 8.0)
+
+        error = make_rate_limit_error({"retry-after": "30"})
+        self.assertGreaterEqual(get_retry_delay(0, error, base=1.0, cap=8.0), 30.0)
+
+    def test_is_retryable(self):
+        """429s are retried, client errors are not."""
+        self.assertTrue(is_retryable(make_rate_limit_error()))
+        self.assertFalse(is_retryable(ValueError("Unsupported provider")))
+
+
+@override_settings(LLM_RETRY_BASE_DELAY=0.01, LLM_RETRY_MAX_DELAY=0.01)
+class TestLLMCallRetries(TestCase):
+    """Test retries of provider calls in LLMService."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        create_llm_config()
+
+    def test_rate_limited_call_is_retried(self):
+        """A 429 is retried and the next response is used."""
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps({"entities": []})
+        client = Mock()
+        client.chat.completions.create = AsyncMock(
+            side_effect=[make_rate_limit_error({"retry-after": "0"}), response]
+        )
+
+        service = LLMService()
+        result = client_pool.run(service._acall_llm(client, "prompt"))
+
+        self.assertEqual(result, json.dumps({"entities": []}))
+        self.assertEqual(client.chat.completions.create.call_count, 2)
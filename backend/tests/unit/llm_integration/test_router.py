@@ -0,0 +1,148 @@
+"""
+Unit tests for LLM model routing, failover and hedging.
+"""
+
+import asyncio
+import time
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from unittest.mock import Mock, patch
+from llm_integration.clients import client_pool
+from llm_integration.models import LLMModel, LLMProcessingConfig
+from llm_integration.ratelimit import ModelRateLimiter
+from llm_integration.router import ModelHealth, ModelRouter
+from llm_integration.services import LLMService
+
+
+@override_settings(
+    LLM_CIRCUIT_FAILURE_THRESHOLD=2,
+    LLM_CIRCUIT_COOLDOWN=60,
+    LLM_HEDGE_DELAY=0.05,
+    LLM_MAX_RETRIES=0,
+)
+class TestModelRouter(TestCase):
+    """Test ModelRouter."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.primary = LLMModel.objects.create(
+            name="Primary",
+            provider="openai",
+            model_name="gpt-4",
+            api_key="test-key-123",
+            priority=1,
+            is_active=True,
+        )
+        self.secondary = LLMModel.objects.create(
+            name="Secondary",
+            provider="anthropic",
+            model_name="claude-3-haiku",
+            api_key="test-key-456",
+            priority=2,
+            is_active=True,
+        )
+        LLMProcessingConfig.objects.create(
+            name="Test Config", llm_model=self.primary, is_active=True
+        )
+        self.health = ModelHealth()
+        self.router = ModelRouter(self.health)
+
+    def test_ranks_by_priority(self):
+        """Healthy models are ranked by priority, with the default model first on ties."""
+        self.assertEqual(self.router.rank_models(), [self.primary, self.secondary])
+
+        self.secondary.priority = 1
+        self.secondary.is_default = True
+        self.secondary.save()
+        self.assertEqual(self.router.select_model(), self.secondary)
+
+    def test_errors_and_latency_demote_a_model(self):
+        """A model with recent errors and slow responses falls behind."""
+        self.health.record_failure(self.primary)
+        self.health.record_success(self.primary, 5.0)
+
+        self.assertEqual(self.router.select_model(), self.secondary)
+
+    def test_exhausted_budget_demotes_a_model(self):
+        """A model whose rate limit is used up falls behind."""
+        self.primary.rate_limit_per_minute = 2
+        self.primary.save()
+        limiter = ModelRateLimiter(self.primary)
+        client_pool.run(limiter.acquire())
+        client_pool.run(limiter.acquire())
+
+        self.assertLess(limiter.get_available(), 0.01)
+        self.assertEqual(self.router.select_model(), self.secondary)
+
+    def test_open_circuit_goes_last(self):
+        """Repeated failures take a model out of rotation for the cooldown."""
+        self.health.record_failure(self.primary)
+        self.health.record_failure(self.primary)
+
+        self.assertFalse(self.health.is_available(self.primary))
+        self.secondary.priority = 10
+        self.secondary.save()
+        self.assertEqual(self.router.rank_models(), [self.secondary, self.primary])
+
+    def test_hedge_delay_tracks_latency(self):
+        """The hedge delay follows the model's latency, with a floor."""
+        self.assertEqual(self.health.get_hedge_delay(self.primary), 0.05)
+
+        for latency in (1.0, 1.2, 0.8):
+            self.health.record_success(self.primary, latency)
+        self.assertGreater(self.health.get_hedge_delay(self.primary), 1.0)
+
+    def test_fails_over_on_server_errors(self):
+        """Retryable errors move the request to the next model."""
+        def extract(service, text, prompt_type="marsiya"):
+            if service.llm_model == self.primary:
+                raise ConnectionError("connection reset")
+            return [{"text": "حسین", "llm_model": service.llm_model.model_name}]
+
+        with patch.object(LLMService, "extract_entities", extract):
+            entities = self.router.extract_entities("حسین")
+
+        self.assertEqual(entities[0]["llm_model"], "claude-3-haiku")
+
+    def test_client_errors_are_not_failed_over(self):
+        """Errors that another model would repeat are raised."""
+        with patch.object(
+            LLMService, "extract_entities", side_effect=ValueError("bad request")
+        ) as mock_extract:
+            with self.assertRaises(ValueError):
+                self.router.extract_entities("حسین")
+
+        self.assertEqual(mock_extract.call_count, 1)
+
+    def test_hedged_call_uses_first_answer(self):
+        """A slow call is hedged to the next model and the faster answer wins."""
+        async def send(service, client, prompt, *args):
+            if service.llm_model == self.primary:
+                await asyncio.sleep(1.0)
+                return "primary"
+            return "secondary"
+
+        service = LLMService(self.primary, hedge_model=self.secondary)
+        with patch.object(LLMService, "_asend_request", send):
+            start = time.monotonic()
+            result = client_pool.run(service._acall_llm_hedged(Mock(), "prompt"))
+
+        self.assertEqual(result, "secondary")
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIsNotNone(self.health.get(self.secondary)["latency"])
+
+    def test_fast_call_is_not_hedged(self):
+        """Calls that answer within the hedge delay go to one model only."""
+        calls = []
+
+        async def send(service, client, prompt, *args):
+            calls.append(service.llm_model)
+            return "primary"
+
+        service = LLMService(self.primary, hedge_model=self.secondary)
+        with patch.object(LLMService, "_asend_request", send):
+            result = client_pool.run(service._acall_llm_hedged(Mock(), "prompt"))
+
+        self.assertEqual(result, "primary")
+        self.assertEqual(calls, [self.primary])
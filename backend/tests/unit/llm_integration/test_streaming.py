@@ -0,0 +1,251 @@
+"""
+Unit tests for streamed entity extraction.
+"""
+
+import json
+from asgiref.sync import async_to_sync
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from unittest.mock import patch
+from llm_integration.clients import client_pool
+from llm_integration.services import LLMService
+from llm_integration.streaming import EntityStreamParser
+from marsiya_ner.asgi import application
+from tests.helpers import create_llm_config
+
+User = get_user_model()
+
+
+IN_MEMORY_CHANNEL_LAYERS = {
+    "default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}
+}
+
+RESPONSE = json.dumps(
+    {
+        "entities": [
+            {"text": "حسین", "entity_type": "PERSON", "confidence": 0.9},
+            {"text": "کربلا", "entity_type": "LOCATION", "confidence": 0.8},
+        ]
+    },
+    ensure_ascii=False,
+)
+
+
+async def fake_stream(self, client, prompt, *args):
+    """Stream the canned response a few characters at a time."""
+    for i in range(0, len(RESPONSE), 7):
+        yield RESPONSE[i : i + 7]
+
+
+class TestEntityStreamParser(TestCase):
+    """Test EntityStreamParser."""
+
+    def test_entities_are_emitted_as_they_close(self):
+        """Each entity is returned by the delta that completes it."""
+        parser = EntityStreamParser()
+        emitted = [parser.feed(RESPONSE[i : i + 5]) for i in range(0, len(RESPONSE), 5)]
+
+        entities = [e for batch in emitted for e in batch]
+        self.assertEqual([e["text"] for e in entities], ["حسین", "کربلا"])
+        # The first entity arrives before the output is complete
+        first = next(i for i, batch in enumerate(emitted) if batch)
+        self.assertLess(first, len(emitted) - 2)
+
+    def test_braces_inside_strings(self):
+        """Braces and escaped quotes inside strings do not end an object."""
+        parser = EntityStreamParser()
+        raw = '[{"text": "a } \\" {", "entity_type": "PERSON"}, {"text": "b", "entity_type": "DATE"}]'
+
+        entities = parser.feed(raw)
+
+        self.assertEqual([e["text"] for e in entities], ['a } " {', "b"])
+
+    def test_non_entities_are_skipped(self):
+        """Array elements without text and entity_type are ignored."""
+        parser = EntityStreamParser()
+
+        self.assertEqual(parser.feed('{"entities": [{"foo": 1}, {"text": "x"}]}'), [])
+
+    def test_escape_split_across_deltas(self):
+        """A backslash at the end of a delta escapes the next delta's first character."""
+        parser = EntityStreamParser()
+        entities = parser.feed('[{"text": "a\\') + parser.feed('"}", "entity_type": "PERSON"}]')
+
+        self.assertEqual([e["text"] for e in entities], ['a"}'])
+
+    def test_truncated_output_is_salvaged(self):
+        """Complete entities survive a cut-off response, as do complete fields of the last one."""
+        parser = EntityStreamParser()
+        truncated = (
+            '{"entities": [{"text": "حسین", "entity_type": "PERSON"}, '
+            '{"text": "کربلا", "entity_type": "LOCATION", "confidence": 0.'
+        )
+
+        entities = parser.feed(truncated) + parser.close()
+
+        self.assertEqual([e["text"] for e in entities], ["حسین", "کربلا"])
+        self.assertNotIn("confidence", entities[1])
+
+    def test_incomplete_fields_are_not_salvaged(self):
+        """A trailing object cut off inside its text is dropped."""
+        parser = EntityStreamParser()
+        parser.feed('[{"entity_type": "PERSON", "text": "حس')
+
+        self.assertEqual(parser.close(), [])
+
+    def test_entity_types_are_validated(self):
+        """Only the given entity types are kept, case-insensitively."""
+        parser = EntityStreamParser(entity_types=["PERSON"])
+        entities = parser.feed(
+            '[{"text": "a", "entity_type": "person"}, {"text": "b", "entity_type": "WEAPON"}]'
+        )
+
+        self.assertEqual([e["text"] for e in entities], ["a"])
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_CHANNEL_LAYERS)
+class TestStreamedExtraction(TestCase):
+    """Test LLMService.astream_entities and its endpoints."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        create_llm_config(chunk_size=100, overlap_size=20)
+        self.text = "\n".join(f"مصرع {i} میں حسین اور کربلا" for i in range(8))
+
+    def collect(self, service):
+        with patch.object(LLMService, "_astream_request", fake_stream):
+            return list(client_pool.iterate(service.astream_entities(self.text)))
+
+    def test_event_sequence(self):
+        """Entities stream in with per-chunk progress and a final summary."""
+        events = self.collect(LLMService())
+
+        self.assertEqual(events[0]["type"], "start")
+        self.assertGreater(events[0]["chunks"], 1)
+        self.assertEqual(events[-1]["type"], "complete")
+
+        entities = [e["entity"] for e in events if e["type"] == "entity"]
+        progress = [e for e in events if e["type"] == "progress"]
+        self.assertEqual(len(progress), events[0]["chunks"])
+        self.assertEqual(events[-1]["total_entities"], len(entities))
+        # Every occurrence is found once, despite overlapping chunks
+        self.assertEqual(len(entities), 16)
+        for entity in entities:
+            self.assertEqual(self.text[entity["start"] : entity["end"]], entity["text"])
+
+    def test_second_request_is_cached(self):
+        """A repeated document is answered from the extraction cache."""
+        self.collect(LLMService())
+        events = self.collect(LLMService())
+
+        self.assertTrue(events[0]["cached"])
+        self.assertEqual(events[-1]["total_entities"], 16)
+
+    def connect(self, path="/ws/llm/extract/", subprotocols=None):
+        """A communicator for the ASGI application, with its auth middleware."""
+        return WebsocketCommunicator(
+            application,
+            path,
+            headers=[(b"origin", b"http://localhost")],
+            subprotocols=subprotocols,
+        )
+
+    def test_websocket_streams_events(self):
+        """The consumer forwards extraction events to the client."""
+        token = str(AccessToken.for_user(self.user))
+
+        async def run():
+            communicator = self.connect(subprotocols=["access_token", token])
+            connected, subprotocol = await communicator.connect()
+            self.assertTrue(connected)
+            self.assertEqual(subprotocol, "access_token")
+
+            await communicator.send_json_to({"text": self.text, "prompt_type": "marsiya_ner"})
+            events = []
+            while not events or events[-1]["type"] not in ("complete", "error"):
+                events.append(await communicator.receive_json_from(timeout=5))
+            await communicator.disconnect()
+            return events
+
+        with patch.object(LLMService, "_astream_request", fake_stream):
+            events = async_to_sync(run)()
+
+        self.assertEqual(events[-1]["type"], "complete")
+        self.assertEqual(events[-1]["total_entities"], 16)
+        self.assertEqual(
+            len([e for e in events if e["type"] == "entity"]), events[-1]["total_entities"]
+        )
+
+    def test_websocket_query_string_token(self):
+        """The access token can also be passed as the token query parameter."""
+        token = str(AccessToken.for_user(self.user))
+
+        async def run():
+            communicator = self.connect(f"/ws/llm/extract/?token={token}")
+            connected, _ = await communicator.connect()
+            await communicator.disconnect()
+            return connected
+
+        self.assertTrue(async_to_sync(run)())
+
+    def test_websocket_requires_authentication(self):
+        """Connections without a valid access token are rejected."""
+        async def run(path, subprotocols=None):
+            communicator = self.connect(path, subprotocols)
+            connected, code = await communicator.connect()
+            return connected, code
+
+        self.assertEqual(async_to_sync(run)("/ws/llm/extract/"), (False, 4401))
+        self.assertEqual(
+            async_to_sync(run)("/ws/llm/extract/?token=not-a-token"), (False, 4401)
+        )
+        self.assertEqual(
+            async_to_sync(run)("/ws/llm/extract/", ["access_token"]), (False, 4401)
+        )
+
+    def test_sse_fallback(self):
+        """The SSE endpoint sends the same events as server-sent events."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+
+        with patch.object(LLMService, "_astream_request", fake_stream):
+            response = client.post(
+                reverse("llm_integration:entity_extraction_stream"),
+                {"text": self.text},
+                format="json",
+            )
+            body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertTrue(body.startswith("event: start\n"))
+        self.assertIn("event: entity\n", body)
+        self.assertIn("event: complete\n", body)
+
+    def test_sse_accept_header(self):
+        """Clients asking for text/event-stream get the stream, errors included."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse("llm_integration:entity_extraction_stream")
+
+        with patch.object(LLMService, "_astream_request", fake_stream):
+            response = client.post(
+                url, {"text": self.text}, format="json", HTTP_ACCEPT="text/event-stream"
+            )
+            body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("event: complete\n", body)
+
+        response = client.post(url, {}, format="json", HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response["Content-Type"], "text/event-stream; charset=utf-8")
+        self.assertTrue(response.content.decode("utf-8").startswith("event: error\n"))
@@ -0,0 +1,267 @@
+"""
+Unit tests for the LLM usage ledger.
+"""
+
+import json
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from unittest.mock import AsyncMock, Mock, patch
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from core.metrics import EXTRACTION_STAGE_SECONDS, LLM_REQUEST_SECONDS
+from llm_integration.models import (
+    LLMModel,
+    LLMProcessingConfig,
+    LLMUsageDailyStats,
+    LLMUsageRecord,
+)
+from llm_integration.services import LLMService
+from llm_integration.stats import latency_histogram, latency_percentiles
+from llm_integration.usage import (
+    TokenUsage,
+    UsageLedger,
+    build_usage_record,
+    usage_ledger,
+    write_usage_records,
+)
+
+User = get_user_model()
+
+
+class TestTokenUsage(TestCase):
+    """Test TokenUsage."""
+
+    def test_provider_usage_objects(self):
+        """OpenAI and Anthropic usage objects are both understood."""
+        usage = TokenUsage()
+        usage.add_usage("openai", SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+        usage.add_usage("anthropic", SimpleNamespace(input_tokens=50, output_tokens=5))
+        usage.add_usage("openai", None)
+
+        self.assertEqual((usage.prompt_tokens, usage.completion_tokens), (150, 25))
+        self.assertEqual(usage.total_tokens, 175)
+
+    def test_missing_counts_are_ignored(self):
+        """Usage objects without integer counts add nothing."""
+        usage = TokenUsage()
+        usage.add_usage("openai", Mock())
+
+        self.assertEqual(usage.total_tokens, 0)
+
+
+class TestUsageLedger(TestCase):
+    """Test writing the ledger and querying it."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.llm_model = LLMModel.objects.create(
+            name="GPT",
+            provider="openai",
+            model_name="gpt-4o-mini",
+            api_key="test-key",
+            cost_per_1k_tokens=Decimal("0.002"),
+        )
+
+    def record(self, latency, success=True, cache_hit=False, tokens=(0, 0)):
+        return build_usage_record(
+            self.llm_model,
+            latency,
+            TokenUsage(*tokens),
+            success=success,
+            cache_hit=cache_hit,
+            chunk_count=0 if cache_hit else 2,
+            entity_count=3,
+        )
+
+    def test_write_updates_counters_and_rollup(self):
+        """A batch is appended and added to the model counters and daily rollup."""
+        write_usage_records(
+            [
+                self.record(1.0, tokens=(800, 200)),
+                self.record(3.0, success=False, tokens=(500, 0)),
+                self.record(0.01, cache_hit=True),
+            ]
+        )
+
+        self.assertEqual(LLMUsageRecord.objects.count(), 3)
+        self.llm_model.refresh_from_db()
+        self.assertEqual(
+            (
+                self.llm_model.total_requests,
+                self.llm_model.successful_requests,
+                self.llm_model.failed_requests,
+            ),
+            (2, 1, 1),
+        )
+        self.assertEqual(self.llm_model.average_response_time, 2.0)
+        self.assertEqual(self.llm_model.total_cost, Decimal("0.003"))
+
+        row = LLMUsageDailyStats.objects.get()
+        self.assertEqual((row.request_count, row.cache_hit_count), (2, 1))
+        self.assertEqual((row.prompt_tokens, row.completion_tokens), (1300, 200))
+        self.assertEqual(row.total_cost, Decimal("0.003"))
+
+    def test_average_response_time_accumulates(self):
+        """The running average covers every batch written so far."""
+        write_usage_records([self.record(1.0)])
+        write_usage_records([self.record(2.0), self.record(3.0)])
+
+        self.llm_model.refresh_from_db()
+        self.assertEqual(self.llm_model.total_requests, 3)
+        self.assertAlmostEqual(self.llm_model.average_response_time, 2.0)
+
+    def test_records_are_queued_on_commit(self):
+        """Records wait for the transaction to commit and are written in one batch."""
+        ledger = UsageLedger()
+        with patch.object(UsageLedger, "_ensure_writer"):
+            with self.captureOnCommitCallbacks() as callbacks:
+                ledger.record(self.record(1.0))
+                ledger.record(self.record(2.0))
+            self.assertEqual(ledger._queue.qsize(), 0)
+
+            for callback in callbacks:
+                callback()
+
+        with CaptureQueriesContext(connection) as queries:
+            ledger.flush()
+        inserts = [
+            q["sql"] for q in queries.captured_queries
+            if q["sql"].startswith('INSERT INTO "llm_integration_llm_usage_record"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(LLMUsageRecord.objects.count(), 2)
+
+    def test_latency_percentiles(self):
+        """Percentiles use the nearest rank over successful provider requests."""
+        write_usage_records(
+            [self.record(float(latency)) for latency in range(1, 101)]
+            + [self.record(500.0, success=False), self.record(0.0, cache_hit=True)]
+        )
+
+        percentiles = latency_percentiles(self.llm_model.pk)
+
+        self.assertEqual(percentiles["count"], 100)
+        self.assertEqual(
+            (percentiles["p50"], percentiles["p90"], percentiles["p99"]), (50.0, 90.0, 99.0)
+        )
+        self.assertIsNone(
+            latency_percentiles(self.llm_model.pk, since=timezone.now() + timedelta(1))["p50"]
+        )
+
+    def test_latency_histogram(self):
+        """Histogram buckets are cumulative."""
+        write_usage_records([self.record(latency) for latency in (0.2, 0.7, 3.0, 200.0)])
+
+        with self.assertNumQueries(1):
+            histogram = latency_histogram(self.llm_model.pk, buckets=[0.5, 1, 5])
+
+        self.assertEqual(
+            histogram,
+            [
+                {"le": 0.5, "count": 1},
+                {"le": 1, "count": 2},
+                {"le": 5, "count": 3},
+                {"le": "+Inf", "count": 4},
+            ],
+        )
+
+    def test_latency_endpoint(self):
+        """The latency endpoint reports percentiles and the histogram."""
+        write_usage_records([self.record(1.0), self.record(2.0)])
+        client = APIClient()
+        client.force_authenticate(
+            user=User.objects.create_user(username="testuser", password="testpass123")
+        )
+
+        response = client.get(
+            reverse("llm_integration:model_latency", kwargs={"pk": self.llm_model.pk})
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(response.data["percentiles"]["p50"], 1.0)
+        self.assertEqual(response.data["histogram"][-1], {"le": "+Inf", "count": 2})
+
+
+class TestExtractionUsage(TestCase):
+    """Test that extractions are recorded in the ledger with their tokens."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.llm_model = LLMModel.objects.create(
+            name="GPT",
+            provider="openai",
+            model_name="gpt-4o-mini",
+            api_key="test-key",
+            cost_per_1k_tokens=Decimal("0.01"),
+        )
+        LLMProcessingConfig.objects.create(
+            name="Config", llm_model=self.llm_model, chunk_size=1000, is_active=True
+        )
+        self.client = Mock()
+        self.client.chat.completions.create = AsyncMock(side_effect=self._fake_completion)
+
+    def _fake_completion(self, **kwargs):
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = json.dumps(
+            {"entities": [{"text": "حسین", "entity_type": "PERSON", "confidence": 0.9}]}
+        )
+        response.usage = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+        return response
+
+    def extract(self):
+        service = LLMService()
+        with patch.object(LLMService, "_get_client", return_value=self.client), patch.object(
+            usage_ledger, "record"
+        ) as record:
+            service.extract_entities("حسین کربلا", "marsiya")
+        return record.call_args.args[0]
+
+    def test_provider_tokens_are_recorded(self):
+        """A provider-backed extraction records its tokens and cost."""
+        record = self.extract()
+
+        self.assertFalse(record.cache_hit)
+        self.assertEqual((record.prompt_tokens, record.completion_tokens), (120, 30))
+        self.assertEqual(record.chunk_count, 1)
+        self.assertEqual(record.entity_count, 1)
+        self.assertEqual(record.cost, Decimal("0.0015"))
+
+    def test_cache_hits_are_recorded(self):
+        """A repeated extraction is recorded as a cache hit without tokens."""
+        self.extract()
+        record = self.extract()
+
+        self.assertTrue(record.cache_hit)
+        self.assertEqual(record.total_tokens, 0)
+        self.assertEqual(self.client.chat.completions.create.call_count, 1)
+
+    def test_provider_calls_are_timed(self):
+        """Provider calls and the parse stage are added to the metrics."""
+        labels = {"provider": "openai", "model": "gpt-4o-mini", "mode": "request", "outcome": "success"}
+        calls = self.observation_count(LLM_REQUEST_SECONDS, **labels)
+        parses = self.observation_count(EXTRACTION_STAGE_SECONDS, stage="parse")
+
+        self.extract()
+
+        self.assertEqual(self.observation_count(LLM_REQUEST_SECONDS, **labels), calls + 1)
+        self.assertEqual(
+            self.observation_count(EXTRACTION_STAGE_SECONDS, stage="parse"), parses + 1
+        )
+
+    @staticmethod
+    def observation_count(histogram, **labels):
+        key = [labels[name] for name in histogram.labelnames]
+        for sample_labels, value in histogram.snapshot()["samples"]:
+            if sample_labels == key:
+                return sum(value["counts"])
+        return 0
@@ -0,0 +1,90 @@
+"""
+Unit tests for the daily LLM usage rollup.
+"""
+
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from llm_integration.models import LLMModel, LLMUsageDailyStats
+from llm_integration.usage import TokenUsage, build_usage_record, write_usage_records
+
+User = get_user_model()
+
+
+class TestLLMUsageDailyStats(TestCase):
+    """Test the daily rollup and the llm_stats endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.openai = LLMModel.objects.create(
+            name="GPT", provider="openai", model_name="gpt-4o-mini", api_key="test-key"
+        )
+        self.anthropic = LLMModel.objects.create(
+            name="Claude", provider="anthropic", model_name="claude-3-haiku", api_key="test-key"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def record_usage(self, llm_model, latency, chunk_count=0, entity_count=0, failed=False):
+        write_usage_records(
+            [
+                build_usage_record(
+                    llm_model,
+                    latency,
+                    TokenUsage(100, 10),
+                    success=not failed,
+                    chunk_count=chunk_count,
+                    entity_count=entity_count,
+                )
+            ]
+        )
+
+    def test_requests_accumulate_in_one_row(self):
+        """Requests of a model on the same day add up in a single row."""
+        self.record_usage(self.openai, 1.5, chunk_count=2, entity_count=4)
+        self.record_usage(self.openai, 0.5, chunk_count=1, failed=True)
+
+        row = LLMUsageDailyStats.objects.get()
+        self.assertEqual(row.date, timezone.localdate())
+        self.assertEqual(
+            (row.request_count, row.failed_request_count, row.chunk_count, row.entities_extracted),
+            (2, 1, 3, 4),
+        )
+        self.assertEqual(row.total_processing_time, 2.0)
+        self.assertEqual(row.prompt_tokens, 200)
+
+    def test_llm_stats(self):
+        """llm_stats reports totals and distributions from the rollup."""
+        for _ in range(3):
+            self.record_usage(self.openai, 1.0, chunk_count=1, entity_count=2)
+        self.record_usage(self.anthropic, 2.0, failed=True)
+        LLMUsageDailyStats.objects.create(
+            date=timezone.localdate() - timedelta(days=10), llm_model=self.openai, request_count=5
+        )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("llm_integration:llm_stats"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total_requests"], 9)
+        self.assertEqual(response.data["failed_requests"], 1)
+        self.assertEqual(response.data["total_models"], 2)
+        self.assertEqual(response.data["provider_distribution"][0]["provider"], "openai")
+        self.assertEqual(len(response.data["daily_usage"]), 2)
+
+        response = self.client.get(reverse("llm_integration:llm_stats"), {"days": 1})
+        self.assertEqual(response.data["total_requests"], 4)
+        self.assertEqual(response.data["successful_requests"], 3)
+        self.assertEqual(response.data["average_response_time"], 1.25)
+
+    def test_llm_stats_invalid_days(self):
+        """A non-numeric window is rejected."""
+        response = self.client.get(reverse("llm_integration:llm_stats"), {"days": "week"})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,116 @@
+"""
+Unit tests for the daily processing rollup.
+"""
+
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import TestCase
+from django.utils import timezone
+from processing.models import ProcessingDailyStats, ProcessingJob
+from processing.stats import summarize_processing_rollup
+from processing.tasks import update_processing_stats
+
+User = get_user_model()
+
+
+class TestProcessingDailyStats(TestCase):
+    """Test that finished jobs are rolled up incrementally."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+
+    def create_job(self, job_type="ner_processing"):
+        return ProcessingJob.objects.create(
+            name="Test Job", job_type=job_type, created_by=self.user
+        )
+
+    def rollup(self):
+        return {
+            (row.job_type, row.status): row.job_count
+            for row in ProcessingDailyStats.objects.filter(job_count__gt=0)
+        }
+
+    def test_finished_jobs_are_counted(self):
+        """Completed, failed and cancelled jobs land in today's rows."""
+        job = self.create_job()
+        job.start()
+        self.assertEqual(self.rollup(), {})
+
+        job.complete(result={})
+        self.create_job().complete(error_message="Boom")
+        self.create_job("cleanup").cancel()
+
+        self.assertEqual(
+            self.rollup(),
+            {
+                ("ner_processing", "completed"): 1,
+                ("ner_processing", "failed"): 1,
+                ("cleanup", "cancelled"): 1,
+            },
+        )
+        row = ProcessingDailyStats.objects.get(status="completed")
+        self.assertEqual(row.date, timezone.localdate())
+        self.assertEqual(row.timed_job_count, 1)
+
+    def test_retried_job_moves_between_rows(self):
+        """A failed job that is retried and completes is counted once."""
+        job = self.create_job()
+        job.complete(error_message="Boom")
+        job.retry()
+        self.assertEqual(self.rollup(), {})
+
+        job = ProcessingJob.objects.get(pk=job.pk)
+        job.complete(result={})
+
+        self.assertEqual(self.rollup(), {("ner_processing", "completed"): 1})
+
+    def test_rollup_matches_job_rows(self):
+        """The rollup equals a GROUP BY over the finished job rows."""
+        for i in range(6):
+            job = self.create_job("cleanup" if i % 2 else "ner_processing")
+            job.start()
+            job.complete(error_message="Boom" if i % 3 == 0 else None)
+        self.create_job().reset()
+
+        raw = {
+            (row["job_type"], row["status"]): row["count"]
+            for row in ProcessingJob.objects.filter(status__in=["completed", "failed"])
+            .values("job_type", "status")
+            .annotate(count=Count("id"))
+        }
+        self.assertEqual(self.rollup(), raw)
+
+    def test_progress_updates_skip_the_rollup(self):
+        """Saves that do not touch the rollup fields do not query it."""
+        job = self.create_job()
+
+        with self.assertNumQueries(1):
+            job.update_progress(50, "Halfway")
+
+    def test_summary_reads_the_rollup(self):
+        """The summary is computed from the rollup rows alone."""
+        job = self.create_job()
+        job.started_at = timezone.now() - timedelta(seconds=30)
+        job.complete(result={})
+        self.create_job().complete(error_message="Boom")
+        ProcessingJob.objects.all().delete()
+
+        summary = summarize_processing_rollup(since=timezone.localdate())
+
+        self.assertEqual(summary["total_jobs"], 2)
+        self.assertEqual(summary["success_rate"], 50)
+        self.assertAlmostEqual(summary["avg_processing_time"], 30, delta=1)
+        self.assertEqual(summary["job_types"]["ner_processing"]["failed_jobs"], 1)
+
+    def test_update_processing_stats(self):
+        """The periodic task caches the last day from the rollup."""
+        self.create_job().complete(result={})
+
+        with self.assertNumQueries(1):
+            stats = update_processing_stats()
+
+        self.assertEqual(stats["completed_jobs"], 1)
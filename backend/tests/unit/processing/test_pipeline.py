@@ -0,0 +1,90 @@
+"""
+Unit tests for the staged document processing pipeline.
+"""
+
+from django.test import TestCase
+from unittest.mock import patch
+from documents.models import Document
+from entities.models import Entity
+from processing.models import ProcessingJob
+from processing.tasks import (
+    cancel_processing_job,
+    extract_chunk_entities,
+    process_document_with_llm,
+)
+from tests.helpers import (
+    create_llm_config,
+    create_user_and_project,
+    fake_extract_entities,
+    run_celery_eagerly,
+)
+
+
+class TestDocumentPipeline(TestCase):
+    """Test process_document_with_llm and its stages."""
+
+    def setUp(self):
+        """Set up test data."""
+        run_celery_eagerly(self)
+        self.user, self.project = create_user_and_project()
+        stanzas = ["\n".join(f"بند {s} مصرع {l} حسین" for l in range(4)) for s in range(10)]
+        self.document = Document.objects.create(
+            title="Test Document",
+            content="\n\n".join(stanzas),
+            project=self.project,
+            created_by=self.user,
+        )
+        create_llm_config(name="Pipeline Config", chunk_size=200, overlap_size=40)
+
+    def test_pipeline_extracts_and_persists(self):
+        """The staged pipeline saves each mention once and completes the job."""
+        with patch(
+            "llm_integration.services.LLMService.extract_entities", fake_extract_entities
+        ):
+            result = process_document_with_llm(self.document.id, "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(id=result["job_id"])
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.progress, 100)
+        self.assertGreater(job.total_steps, 1)
+        self.assertEqual(job.result["entities_extracted"], 40)
+
+        self.assertEqual(Entity.objects.filter(document=self.document).count(), 40)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.processing_status, "completed")
+        self.assertEqual(self.document.total_entities, 40)
+
+    def test_pipeline_never_waits_on_results(self):
+        """No stage blocks on another task's result."""
+        with patch(
+            "llm_integration.services.LLMService.extract_entities", fake_extract_entities
+        ), patch("celery.result.AsyncResult.get") as mock_get:
+            process_document_with_llm(self.document.id, "marsiya", self.user.id)
+
+        mock_get.assert_not_called()
+
+    def test_empty_document_fails_job(self):
+        """A document without text marks the job as failed."""
+        self.document.content = "   "
+        self.document.save()
+
+        with self.assertRaises(ValueError):
+            process_document_with_llm(self.document.id, "marsiya", self.user.id)
+
+        job = ProcessingJob.objects.get(document=self.document)
+        self.assertEqual(job.status, "failed")
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.processing_status, "failed")
+
+    def test_cancelled_job_skips_stages(self):
+        """Stages of a cancelled job do not call the LLM."""
+        job = ProcessingJob.objects.create(
+            name="Cancelled", job_type="ner_processing", document=self.document
+        )
+        cancel_processing_job(job.id)
+
+        with patch("llm_integration.services.LLMService.extract_entities") as mock_extract:
+            result = extract_chunk_entities(job.id, 0, 50)
+
+        mock_extract.assert_not_called()
+        self.assertEqual(result["entities"], [])
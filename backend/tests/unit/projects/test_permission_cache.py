@@ -0,0 +1,108 @@
+"""
+Unit tests for cached project permission resolution.
+"""
+
+from types import SimpleNamespace
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from projects.access import resolve_project_access
+from projects.models import Project, ProjectMembership
+from projects.permissions import CanUploadDocuments, IsProjectAdmin, IsProjectMember
+
+User = get_user_model()
+
+
+class TestProjectPermissionCache(TestCase):
+    """Test resolve_project_access and the project permission classes."""
+
+    def setUp(self):
+        """Set up test data."""
+        caches["default"].clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+        self.owner = User.objects.create_user(
+            username="owner", email="owner@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            name="Test Project", slug="test-project", created_by=self.owner
+        )
+        self.membership = ProjectMembership.objects.create(
+            user=self.user, project=self.project, role="researcher"
+        )
+        self.view = SimpleNamespace(kwargs={"project_slug": "test-project"})
+
+    def make_request(self):
+        return SimpleNamespace(user=self.user)
+
+    def test_checks_share_one_lookup(self):
+        """Several permission checks on one request resolve membership once."""
+        request = self.make_request()
+
+        with self.assertNumQueries(2):
+            self.assertTrue(IsProjectMember().has_permission(request, self.view))
+            self.assertTrue(CanUploadDocuments().has_permission(request, self.view))
+            self.assertFalse(IsProjectAdmin().has_permission(request, self.view))
+
+        self.assertEqual(request.project, self.project)
+
+    def test_later_requests_use_cache(self):
+        """A new request for the same user and project needs no queries."""
+        resolve_project_access(self.make_request(), "test-project")
+
+        with self.assertNumQueries(0):
+            access = resolve_project_access(self.make_request(), "test-project")
+
+        self.assertEqual(access["role"], "researcher")
+        self.assertTrue(access["can_upload_documents"])
+        self.assertFalse(access["can_manage_members"])
+
+    def test_membership_change_invalidates(self):
+        """Saving a membership drops the cached access."""
+        resolve_project_access(self.make_request(), "test-project")
+
+        self.membership.role = "admin"
+        self.membership.save()
+
+        request = self.make_request()
+        self.assertTrue(IsProjectAdmin().has_permission(request, self.view))
+
+    def test_membership_delete_invalidates(self):
+        """Deleting a membership revokes access at once."""
+        self.assertTrue(IsProjectMember().has_permission(self.make_request(), self.view))
+
+        self.membership.delete()
+
+        self.assertFalse(IsProjectMember().has_permission(self.make_request(), self.view))
+
+    def test_missing_project(self):
+        """Unknown projects are denied and become visible once created."""
+        view = SimpleNamespace(kwargs={"project_slug": "new-project"})
+        self.assertFalse(IsProjectMember().has_permission(self.make_request(), view))
+
+        project = Project.objects.create(
+            name="New Project", slug="new-project", created_by=self.owner
+        )
+        ProjectMembership.objects.create(user=self.user, project=project, role="viewer")
+
+        self.assertTrue(IsProjectMember().has_permission(self.make_request(), view))
+
+    def test_view_reuses_resolved_project(self):
+        """The view gets its project from the permission check."""
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse("projects:membership_list", kwargs={"project_slug": "test-project"})
+        client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(
+            any('FROM "projects_project"' in query["sql"] for query in queries.captured_queries)
+        )
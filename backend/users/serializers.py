@@ -169,3 +169,14 @@ class UserListSerializer(serializers.ModelSerializer):
             return obj.profile.profile_completion
         except UserProfile.DoesNotExist:
             return 0
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    """Minimal user serializer for nesting in list rows."""
+
+    full_name = serializers.CharField(source="get_full_name", read_only=True)
+
+    class Meta:
+        model = User
+        fields = ["id", "username", "full_name"]
+        read_only_fields = fields
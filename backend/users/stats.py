@@ -0,0 +1,29 @@
+from typing import Any, Dict
+from django.contrib.auth import get_user_model
+from core.query_plan import count_subquery
+from core.stats import stats_provider
+
+User = get_user_model()
+
+
+@stats_provider("user")
+def compute_user_stats(user_id) -> Dict[str, Any]:
+    """Compute a user's activity counts in one query."""
+    from documents.models import Document
+    from entities.models import Entity
+    from projects.models import ProjectMembership
+
+    counts = {
+        "projects_count": count_subquery(ProjectMembership.objects.all(), "user"),
+        "documents_count": count_subquery(Document.objects.all(), "created_by"),
+        "entities_count": count_subquery(Entity.objects.all(), "created_by"),
+        "verified_entities_count": count_subquery(Entity.objects.all(), "verified_by"),
+    }
+    stats = (
+        User.objects.filter(pk=user_id)
+        .annotate(**counts)
+        .values("profile__profile_completion", *counts)
+        .get()
+    )
+    stats["profile_completion"] = stats.pop("profile__profile_completion") or 0
+    return stats
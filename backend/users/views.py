@@ -16,6 +16,8 @@ from .serializers import (
     UserListSerializer,
 )
 from .models import UserProfile
+from .stats import compute_user_stats
+from core.stats import get_stats
 
 User = get_user_model()
 
@@ -183,31 +185,7 @@ def update_last_activity(request):
 @permission_classes([IsAuthenticated])
 def user_stats(request):
     """Get user statistics."""
-    user = request.user
-
-    # Get user's projects count
-    projects_count = user.projects.count()
-
-    # Get user's documents count
-    documents_count = user.documents.count()
-
-    # Get user's entities count
-    entities_count = user.entities.count()
-
-    # Get user's verified entities count
-    verified_entities_count = user.verified_entities.count()
-
-    return Response(
-        {
-            "projects_count": projects_count,
-            "documents_count": documents_count,
-            "entities_count": entities_count,
-            "verified_entities_count": verified_entities_count,
-            "profile_completion": getattr(user.profile, "profile_completion", 0)
-            if hasattr(user, "profile")
-            else 0,
-        }
-    )
+    return Response(get_stats(compute_user_stats, request.user.pk))
 
 
 @api_view(["POST"])
@@ -68,7 +68,7 @@ export default function DocumentList({
           try {
         setIsLoading(true)
         const response = await documentsAPI.list(projectSlug)
-        // The backend returns a paginated response with {count, results, next, previous}
+        // The backend returns a cursor-paginated response with {results, next}
         const documentsData = response.data.results || response.data
         setDocuments(documentsData)
       } catch (error: any) {